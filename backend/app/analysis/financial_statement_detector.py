@@ -4,6 +4,8 @@ from typing import Any, Dict, Iterable, List, Sequence, Tuple
 
 import pandas as pd
 
+from app.analysis.table_metrics import LabelIndex
+
 
 class FinancialStatementDetector:
     """Detect and summarize financial statements extracted from tables."""
@@ -54,28 +56,31 @@ class FinancialStatementDetector:
 
     def parse_financial_statement(self, table_df: pd.DataFrame, stmt_type: str) -> Dict[str, Any]:
         """Extract structured metrics for supported statement types."""
-        if stmt_type == "income_statement":
-            return self._parse_income_statement(table_df)
-        if stmt_type == "balance_sheet":
-            return self._parse_balance_sheet(table_df)
-        if stmt_type == "cash_flow":
-            return self._parse_cash_flow(table_df)
-        return {}
+        parsers = {
+            "income_statement": self._parse_income_statement,
+            "balance_sheet": self._parse_balance_sheet,
+            "cash_flow": self._parse_cash_flow,
+        }
+        parser = parsers.get(stmt_type)
+        if parser is None:
+            return {}
+        # Labels and numeric values are prepared once for all lookups
+        return parser(LabelIndex(table_df))
 
     # ---- Income statement helpers -------------------------------------------------
-    def _parse_income_statement(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _parse_income_statement(self, index: LabelIndex) -> Dict[str, Any]:
         return {
-            "revenue": self._find_value(df, ("revenue", "total revenue")),
-            "expenses": self._find_value(df, ("expenses", "total expenses")),
-            "net_income": self._find_value(df, ("net income", "profit")),
-            "gross_profit": self._find_value(df, ("gross profit",)),
+            "revenue": index.find_value(("revenue", "total revenue")),
+            "expenses": index.find_value(("expenses", "total expenses")),
+            "net_income": index.find_value(("net income", "profit")),
+            "gross_profit": index.find_value(("gross profit",)),
         }
 
     # ---- Balance sheet helpers ----------------------------------------------------
-    def _parse_balance_sheet(self, df: pd.DataFrame) -> Dict[str, Any]:
-        assets = self._find_value(df, ("total assets", "assets"))
-        liabilities = self._find_value(df, ("total liabilities", "liabilities"))
-        equity = self._find_value(df, ("total equity", "equity"))
+    def _parse_balance_sheet(self, index: LabelIndex) -> Dict[str, Any]:
+        assets = index.find_value(("total assets", "assets"))
+        liabilities = index.find_value(("total liabilities", "liabilities"))
+        equity = index.find_value(("total equity", "equity"))
         return {
             "total_assets": assets,
             "total_liabilities": liabilities,
@@ -84,11 +89,11 @@ class FinancialStatementDetector:
         }
 
     # ---- Cash flow helpers --------------------------------------------------------
-    def _parse_cash_flow(self, df: pd.DataFrame) -> Dict[str, Any]:
-        operating = self._find_value(df, ("net cash provided by operating", "operating activities"))
-        investing = self._find_value(df, ("net cash used in investing", "investing activities"))
-        financing = self._find_value(df, ("net cash used in financing", "financing activities"))
-        net_change = self._find_value(df, ("net increase", "net decrease", "net change"))
+    def _parse_cash_flow(self, index: LabelIndex) -> Dict[str, Any]:
+        operating = index.find_value(("net cash provided by operating", "operating activities"))
+        investing = index.find_value(("net cash used in investing", "investing activities"))
+        financing = index.find_value(("net cash used in financing", "financing activities"))
+        net_change = index.find_value(("net increase", "net decrease", "net change"))
         return {
             "operating": operating,
             "investing": investing,
@@ -97,61 +102,6 @@ class FinancialStatementDetector:
         }
 
     # ---- Shared utilities ---------------------------------------------------------
-    def _find_value(self, df: pd.DataFrame, search_terms: Sequence[str]) -> float | None:
-        if df.empty:
-            return None
-        columns = list(df.columns)
-        label_col = columns[0] if columns else None
-        for _, row in df.iterrows():
-            label = self._extract_label(row, label_col)
-            if not label:
-                continue
-            label_lower = label.lower()
-            if any(term in label_lower for term in search_terms):
-                values = row.tolist()
-                if label_col is not None and values:
-                    values = values[1:]
-                for value in values:
-                    numeric = self._to_numeric(value)
-                    if numeric is not None:
-                        return numeric
-                for value in reversed(row.tolist()):
-                    numeric = self._to_numeric(value)
-                    if numeric is not None:
-                        return numeric
-        return None
-
-    def _extract_label(self, row: pd.Series, label_col: Any | None) -> str:
-        if label_col is not None and label_col in row:
-            return str(row[label_col])
-        for value in row.tolist():
-            text = str(value)
-            if not self._to_numeric(value) and any(ch.isalpha() for ch in text):
-                return text
-        return ""
-
-    def _to_numeric(self, value: Any) -> float | None:
-        if value is None:
-            return None
-        if isinstance(value, (int, float)) and not pd.isna(value):
-            return float(value)
-        stringified = str(value).strip()
-        if not stringified:
-            return None
-        stringified = stringified.replace(",", "")
-        stringified = stringified.replace("$", "")
-        negative = False
-        if stringified.startswith("(") and stringified.endswith(")"):
-            negative = True
-            stringified = stringified[1:-1]
-        if stringified.endswith("%"):
-            stringified = stringified[:-1]
-        try:
-            result = float(stringified)
-            return -result if negative else result
-        except ValueError:
-            return None
-
     def _safe_sum(self, *values: float | None) -> float | None:
         numeric_values = [v for v in values if v is not None]
         if not numeric_values:
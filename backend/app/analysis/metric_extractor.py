@@ -1,56 +1,206 @@
-"""Pattern-based extraction of business metrics with context."""
+"""Pattern-based extraction of business metrics with context.
+
+All metric regexes go through one ``MetricPatternEngine``. Each text is
+case-folded once. Each pattern's required literal (for example ``revenue``
+in ``revenue[:\\s]+\\$?...``) is checked against the folded text with a
+substring test. Only the patterns whose literal is present are then run.
+Most paragraphs mention no metric keyword at all and cost a handful of
+substring checks. The engine holds both pattern families, the narrative
+metrics reported by ``BusinessMetricExtractor`` and the marketing KPIs
+behind ``pdf_processor.extract_metrics_from_text``. A paragraph is scanned
+once for both.
+
+Classes:
+    MetricMatch: One regex hit
+    MetricPatternEngine: Compiled multi-pattern matcher
+    BusinessMetricExtractor: Metric spans with surrounding context
+
+Functions:
+    first_metric_values: Numeric value of the first hit per metric
+"""
 
 from __future__ import annotations
 
 import re
-from typing import Dict, List
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence
+
+BUSINESS_METRIC_PATTERNS: Dict[str, List[str]] = {
+    "revenue": [
+        r"revenue[:\s]+\$?\s*([0-9,.]+[KMB]?)",
+        r"sales[:\s]+\$?\s*([0-9,.]+[KMB]?)",
+        r"\$([0-9,.]+[KMB]?)\s+in\s+revenue",
+        r"revenue\s+(?:reached|totaled)\s+\$?\s*([0-9,.]+[KMB]?)",
+    ],
+    "growth": [
+        r"growth[:\s]+([0-9.]+)%",
+        r"increase[d]?\s+by\s+([0-9.]+)%",
+        r"([0-9.]+)%\s+growth",
+    ],
+    "margin": [
+        r"margin[:\s]+([0-9.]+)%",
+        r"([0-9.]+)%\s+margin",
+    ],
+    "profit": [
+        r"profit[:\s]+\$?\s*([0-9,.]+[KMB]?)",
+        r"net\s+income[:\s]+\$?\s*([0-9,.]+[KMB]?)",
+    ],
+}
+
+# Marketing KPIs stated inline ("ROAS: 3.2", "Spend: $1,200")
+MARKETING_METRIC_PATTERNS: Dict[str, List[str]] = {
+    "roas": [r"ROAS[:\s]+([0-9.]+)"],
+    "cpa": [r"CPA[:\s]+\$?\s*([0-9,.]+)"],
+    "ctr": [r"CTR[:\s]+([0-9.]+)\s*%?"],
+    "revenue": [r"revenue[:\s]+\$?\s*([0-9,]+(?:\.[0-9]+)?)"],
+    "spend": [r"spend[:\s]+\$?\s*([0-9,]+(?:\.[0-9]+)?)"],
+    "conversions": [r"conversions?[:\s]+([0-9,]+)"],
+    "clicks": [r"clicks?[:\s]+([0-9,]+)"],
+    "impressions": [r"impressions?[:\s]+([0-9,]+)"],
+}
+
+_ESCAPE_RE = re.compile(r"\\.")
+_CLASS_RE = re.compile(r"\[[^\]]*\]")
+_GROUP_RE = re.compile(r"\([^()]*\)")
+_OPTIONAL_CHAR_RE = re.compile(r"[A-Za-z][?*]|[A-Za-z]\{0[^}]*\}")
+_LITERAL_RE = re.compile(r"[a-z]{2,}")
+
+
+def _required_literal(pattern: str) -> Optional[str]:
+    """Longest run of letters that every match of ``pattern`` contains.
+
+    Escapes, character classes, groups and optional letters are blanked out
+    first, so only text outside them counts. Returns None for patterns with
+    a top-level alternation or without such a run. Those patterns are always
+    run.
+    """
+    skeleton = _CLASS_RE.sub(" ", _ESCAPE_RE.sub(" ", pattern))
+    while True:
+        reduced = _GROUP_RE.sub(" ", skeleton)
+        if reduced == skeleton:
+            break
+        skeleton = reduced
+    if "|" in skeleton or "(" in skeleton:
+        return None
+    runs = _LITERAL_RE.findall(_OPTIONAL_CHAR_RE.sub(" ", skeleton).casefold())
+    return max(runs, key=len) if runs else None
+
+
+class MetricMatch(NamedTuple):
+    """One regex hit: ``value`` is the first capture group."""
+
+    family: str
+    metric: str
+    value: str
+    start: int
+    end: int
+
+
+class MetricPatternEngine:
+    """Compiled multi-pattern matcher for metric phrases.
+
+    Patterns are grouped into families (``{family: {metric: [regex, ...]}}``)
+    and matched case-insensitively. ``scan`` returns the same hits as running
+    ``re.finditer`` for every pattern in declaration order.
+    """
+
+    def __init__(self, families: Mapping[str, Mapping[str, Sequence[str]]]):
+        self._entries = [
+            (family, metric, re.compile(pattern, re.IGNORECASE), _required_literal(pattern))
+            for family, patterns in families.items()
+            for metric, regexes in patterns.items()
+            for pattern in regexes
+        ]
+
+    def scan(self, text: str, families: Optional[Iterable[str]] = None) -> List[MetricMatch]:
+        """All hits in ``text``, by family, metric, pattern and then position."""
+        haystack = text or ""
+        if not haystack:
+            return []
+        wanted = set(families) if families is not None else None
+        folded = haystack.casefold()
+        matches: List[MetricMatch] = []
+        for family, metric, regex, literal in self._entries:
+            if wanted is not None and family not in wanted:
+                continue
+            if literal is not None and literal not in folded:
+                continue
+            for match in regex.finditer(haystack):
+                matches.append(MetricMatch(family, metric, match.group(1), match.start(), match.end()))
+        return matches
+
+
+METRIC_ENGINE = MetricPatternEngine(
+    {"business": BUSINESS_METRIC_PATTERNS, "marketing": MARKETING_METRIC_PATTERNS}
+)
+
+
+def first_metric_values(matches: Iterable[MetricMatch], family: str = "marketing") -> Dict[str, float]:
+    """Numeric value of the leftmost hit per metric of ``family``.
+
+    Thousands separators are dropped. A metric whose first hit is not a
+    number is left out.
+    """
+    first: Dict[str, MetricMatch] = {}
+    for match in matches:
+        if match.family != family:
+            continue
+        current = first.get(match.metric)
+        if current is None or match.start < current.start:
+            first[match.metric] = match
+    metrics: Dict[str, float] = {}
+    for metric, match in first.items():
+        try:
+            metrics[metric] = float(match.value.replace(",", ""))
+        except ValueError:
+            continue
+    return metrics
 
 
 class BusinessMetricExtractor:
     """Extract simple financial and growth metrics from raw text."""
 
-    def __init__(self) -> None:
-        self.patterns: Dict[str, List[str]] = {
-            "revenue": [
-                r"revenue[:\s]+\$?\s*([0-9,.]+[KMB]?)",
-                r"sales[:\s]+\$?\s*([0-9,.]+[KMB]?)",
-                r"\$([0-9,.]+[KMB]?)\s+in\s+revenue",
-                r"revenue\s+(?:reached|totaled)\s+\$?\s*([0-9,.]+[KMB]?)",
-            ],
-            "growth": [
-                r"growth[:\s]+([0-9.]+)%",
-                r"increase[d]?\s+by\s+([0-9.]+)%",
-                r"([0-9.]+)%\s+growth",
-            ],
-            "margin": [
-                r"margin[:\s]+([0-9.]+)%",
-                r"([0-9.]+)%\s+margin",
-            ],
-            "profit": [
-                r"profit[:\s]+\$?\s*([0-9,.]+[KMB]?)",
-                r"net\s+income[:\s]+\$?\s*([0-9,.]+[KMB]?)",
-            ],
-        }
-
-    def extract_metrics(self, text: str, context_window: int = 50) -> List[Dict]:
-        """Extract matching metric spans with a slice of surrounding context."""
+    def __init__(self, engine: MetricPatternEngine = METRIC_ENGINE) -> None:
+        self.engine = engine
+        self.patterns: Dict[str, List[str]] = dict(BUSINESS_METRIC_PATTERNS)
+
+    def extract_metrics(
+        self,
+        text: str,
+        context_window: int = 50,
+        matches: Optional[Sequence[MetricMatch]] = None,
+    ) -> List[Dict]:
+        """Extract matching metric spans with a slice of surrounding context.
+
+        ``matches`` may be the result of an earlier ``engine.scan(text)`` so
+        that a paragraph shared with other extractors is scanned only once.
+        """
 
-        metrics: List[Dict] = []
         haystack = text or ""
-        for metric_type, patterns in self.patterns.items():
-            for pattern in patterns:
-                for match in re.finditer(pattern, haystack, re.IGNORECASE):
-                    start = max(0, match.start() - context_window)
-                    end = min(len(haystack), match.end() + context_window)
-                    metrics.append(
-                        {
-                            "type": metric_type,
-                            "value": match.group(1),
-                            "context": haystack[start:end],
-                            "position": match.start(),
-                        }
-                    )
+        if matches is None:
+            matches = self.engine.scan(haystack, families=("business",))
+        metrics: List[Dict] = []
+        for match in matches:
+            if match.family != "business":
+                continue
+            start = max(0, match.start - context_window)
+            end = min(len(haystack), match.end + context_window)
+            metrics.append(
+                {
+                    "type": match.metric,
+                    "value": match.value,
+                    "context": haystack[start:end],
+                    "position": match.start,
+                }
+            )
         return metrics
 
 
-__all__ = ["BusinessMetricExtractor"]
+__all__ = [
+    "BUSINESS_METRIC_PATTERNS",
+    "MARKETING_METRIC_PATTERNS",
+    "METRIC_ENGINE",
+    "MetricMatch",
+    "MetricPatternEngine",
+    "BusinessMetricExtractor",
+    "first_metric_values",
+]
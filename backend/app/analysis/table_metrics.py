@@ -0,0 +1,201 @@
+"""Vectorized metric extraction for tabular data.
+
+Shared by the CSV/XLSX processors, PDF table metrics and the financial
+statement detector so that column classification, numeric coercion and
+derived metrics are implemented once:
+
+- ``ColumnClassifier`` matches column labels against one compiled regex per
+  metric and memoizes the result per label.
+- ``coerce_numeric`` converts a whole column at once, understanding
+  thousands separators, currency symbols, percent signs and accounting
+  negatives such as ``(1,200)``.
+- ``LabelIndex`` lowercases the label column and coerces the value columns
+  once per table, so repeated label lookups are array scans instead of
+  ``iterrows`` walks.
+
+Classes:
+    ColumnClassifier: Compiled column-label to metric classifier
+    LabelIndex: Precomputed label/value lookup for statement-style tables
+
+Functions:
+    coerce_numeric: Parse a column into floats (NaN where not numeric)
+    column_metric_totals: Sum the columns matching each metric
+    add_derived_metrics: Add ctr/cpa/roas from the base totals
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Column-label substrings per metric for tables extracted from documents.
+TABLE_METRIC_PATTERNS: Dict[str, Sequence[str]] = {
+    "spend": ("spend", "cost", "budget"),
+    "revenue": ("revenue", "sales", "income"),
+    "conversions": ("conversions", "leads", "sales"),
+    "clicks": ("clicks",),
+    "impressions": ("impressions", "views"),
+    "ctr": ("ctr", "click rate"),
+    "cpa": ("cpa", "cost per"),
+    "roas": ("roas", "return on"),
+}
+
+# Column-label substrings for uploaded CSV exports (first match wins).
+CSV_METRIC_PATTERNS: Dict[str, Sequence[str]] = {
+    "spend": ("spend", "cost"),
+    "revenue": ("revenue",),
+    "conversions": ("conversion",),
+    "clicks": ("click",),
+    "impressions": ("impression",),
+}
+
+# Column-label substrings for spreadsheet sheets (first match wins).
+XLSX_METRIC_PATTERNS: Dict[str, Sequence[str]] = {
+    "spend": ("spend", "cost"),
+    "revenue": ("revenue",),
+    "conversions": ("conversion", "lead"),
+}
+
+
+class ColumnClassifier:
+    """Compiled column-label to metric classifier.
+
+    Labels are lowercased and matched by substring against each metric's
+    patterns, in the order the metrics are declared.
+    """
+
+    def __init__(self, patterns: Mapping[str, Sequence[str]]):
+        self._compiled = [
+            (metric, re.compile("|".join(re.escape(p.lower()) for p in pats)))
+            for metric, pats in patterns.items()
+        ]
+        self._memo: Dict[str, List[str]] = {}
+
+    @property
+    def metrics(self) -> List[str]:
+        """Metric names in declaration order."""
+        return [metric for metric, _ in self._compiled]
+
+    def metrics_for(self, label: Any) -> List[str]:
+        """Every metric whose patterns match ``label``."""
+        key = str(label).lower()
+        hit = self._memo.get(key)
+        if hit is None:
+            hit = [metric for metric, rx in self._compiled if rx.search(key)]
+            self._memo[key] = hit
+        return hit
+
+    def metric_for(self, label: Any) -> Optional[str]:
+        """The first metric whose patterns match ``label``."""
+        hit = self.metrics_for(label)
+        return hit[0] if hit else None
+
+
+_TABLE_CLASSIFIER = ColumnClassifier(TABLE_METRIC_PATTERNS)
+_NEGATIVE_RE = r"^\((.*)\)$"
+
+
+def coerce_numeric(values: pd.Series) -> pd.Series:
+    """Parse a column into floats, NaN where a cell is not numeric.
+
+    Numeric dtypes pass through. Text is stripped of ``,`` and ``$`` and a
+    trailing ``%``; ``(x)`` is read as ``-x``.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    text = values.astype(str).str.strip().str.replace(",", "", regex=False).str.replace("$", "", regex=False)
+    negative = text.str.match(_NEGATIVE_RE).fillna(False).to_numpy(dtype=bool)
+    text = text.str.replace(_NEGATIVE_RE, r"\1", regex=True).str.replace(r"%$", "", regex=True)
+    out = pd.to_numeric(text, errors="coerce").astype(float)
+    return out.where(~negative, -out)
+
+
+def column_metric_totals(
+    df: pd.DataFrame,
+    classifier: ColumnClassifier = _TABLE_CLASSIFIER,
+) -> Dict[str, float]:
+    """Sum the columns matching each metric.
+
+    Each column is converted once with ``pd.to_numeric(errors="coerce")``
+    however many metrics it matches. When several columns match a metric,
+    the last one wins.
+    """
+    metrics: Dict[str, float] = {}
+    totals: Dict[int, float] = {}
+    matches = [(pos, classifier.metrics_for(col)) for pos, col in enumerate(df.columns)]
+    for metric in classifier.metrics:
+        for pos, hit in matches:
+            if metric not in hit:
+                continue
+            if pos not in totals:
+                totals[pos] = pd.to_numeric(df.iloc[:, pos], errors="coerce").sum()
+            total = totals[pos]
+            if not pd.isna(total):
+                metrics[metric] = float(total)
+    return metrics
+
+
+def add_derived_metrics(metrics: Dict[str, float]) -> Dict[str, float]:
+    """Add ctr, cpa and roas when their inputs are present (in place)."""
+    if "clicks" in metrics and "impressions" in metrics and metrics["impressions"] > 0:
+        metrics["ctr"] = metrics["clicks"] / metrics["impressions"]
+    if "spend" in metrics and "conversions" in metrics and metrics["conversions"] > 0:
+        metrics["cpa"] = metrics["spend"] / metrics["conversions"]
+    if "revenue" in metrics and "spend" in metrics and metrics["spend"] > 0:
+        metrics["roas"] = metrics["revenue"] / metrics["spend"]
+    return metrics
+
+
+class LabelIndex:
+    """Precomputed label/value lookup for statement-style tables.
+
+    The first column holds row labels; every column is coerced to numbers
+    once, so ``find_value`` is a scan over arrays.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.empty = df.empty or df.shape[1] == 0
+        if self.empty:
+            self.labels = pd.Series([], dtype=str)
+            self.values = np.empty((0, 0))
+            return
+        self.labels = df.iloc[:, 0].astype(str).str.lower().reset_index(drop=True)
+        self.values = np.column_stack([coerce_numeric(df.iloc[:, i]).to_numpy() for i in range(df.shape[1])])
+
+    def rows_matching(self, terms: Iterable[str]) -> np.ndarray:
+        """Row positions whose label contains any of ``terms``."""
+        pattern = "|".join(re.escape(t) for t in terms)
+        return np.flatnonzero(self.labels.str.contains(pattern, regex=True).to_numpy(dtype=bool))
+
+    def find_value(self, terms: Iterable[str]) -> Optional[float]:
+        """First number on the first labelled row matching ``terms``.
+
+        Values after the label column are tried left to right, then the
+        whole row right to left; rows without any number are skipped.
+        """
+        if self.empty:
+            return None
+        for row in self.rows_matching(terms):
+            values = self.values[row]
+            present = np.flatnonzero(~np.isnan(values[1:]))
+            if present.size:
+                return float(values[1 + present[0]])
+            present = np.flatnonzero(~np.isnan(values))
+            if present.size:
+                return float(values[present[-1]])
+        return None
+
+
+__all__ = [
+    "TABLE_METRIC_PATTERNS",
+    "CSV_METRIC_PATTERNS",
+    "XLSX_METRIC_PATTERNS",
+    "ColumnClassifier",
+    "LabelIndex",
+    "coerce_numeric",
+    "column_metric_totals",
+    "add_derived_metrics",
+]
@@ -16,8 +16,8 @@ from pathlib import Path
 logger = logging.getLogger(__name__)
 
 from app.globals import (
-    db, qa_engine, summary_service, HRM_ENABLED, HRM_CFG, HRM_STATS,
-    ARTIFACTS_DIR, env_flag, UPLOAD_DIR
+    db, EVIDENCE_PAYLOADS, qa_engine, summary_service, HRM_ENABLED, HRM_CFG, HRM_STATS,
+    ARTIFACTS_DIR, env_flag, UPLOAD_DIR, INGEST_REGISTRY
 )
 from app.hrm import HRMConfig, refine_sort_digits
 from app.auth import get_current_user, optional_auth
@@ -141,7 +141,7 @@ async def get_financial_statements(
                 "confidence": statement.get("confidence"),
                 "summary": statement.get("summary") or {},
                 "columns": full_data.get("columns", []),
-                "rows": full_data.get("rows", []),
+                "rows": EVIDENCE_PAYLOADS.read_rows(full_data),
                 "header_info": full_data.get("header_info"),
             }
         )
@@ -171,6 +171,33 @@ async def get_evidence(
         raise HTTPException(404, "Evidence not found")
     return evidence
 
+@router.get("/evidence/{evidence_id}/rows")
+async def get_evidence_rows(
+    evidence_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=5000),
+    _user_id: Optional[str] = Depends(optional_auth),
+):
+    """Page through the rows of a table, CSV or spreadsheet evidence payload.
+
+    Rows are read from the out-of-line payload file when the evidence has one,
+    so large tables never have to be loaded whole.
+
+    Returns:
+        ``evidence_id``, ``columns``, ``total``, ``offset``, ``limit``, ``rows``
+        and ``next_offset`` (None on the last page).
+    """
+    evidence = db.get_evidence(evidence_id)
+    if not evidence:
+        raise HTTPException(404, "Evidence not found")
+    try:
+        page = EVIDENCE_PAYLOADS.read_page(evidence.get("full_data"), offset=offset, limit=limit)
+    except OSError:
+        raise HTTPException(404, "Evidence payload file not found")
+    if page is None:
+        raise HTTPException(404, "Evidence has no rows")
+    return {"evidence_id": evidence_id, **page}
+
 @router.post("/ask")
 async def ask_question(
     question: str,
@@ -203,6 +230,8 @@ async def ask_question(
 async def reset_database(_user_id: str = Depends(get_current_user)):
     """Clear all data (authentication required)."""
     db.reset()
+    EVIDENCE_PAYLOADS.clear()
+    INGEST_REGISTRY.clear()
     return {"status": "Database reset"}
 
 # ---------------- Tags & Extraction ----------------
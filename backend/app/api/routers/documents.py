@@ -1,21 +1,25 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Form, Query
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Query
 from fastapi.responses import FileResponse
 from typing import List, Dict, Annotated, Optional, Any
+import asyncio
 import logging
 import os
 import shutil
 import sys
+import time
 import traceback
 import uuid
 import json
-import threading
 from pathlib import Path
 
 from app.globals import (
-    db, TASKS, UPLOAD_DIR, ARTIFACTS_DIR, MAX_FILE_SIZE,
-    MEDIA_SUFFIXES, VIDEO_SUFFIXES, IMAGE_SUFFIXES, env_flag
+    db, TASKS, EVIDENCE_PAYLOADS, search_index, ingestion_scheduler, UPLOAD_DIR, ARTIFACTS_DIR,
+    MAX_FILE_SIZE, MEDIA_SUFFIXES, VIDEO_SUFFIXES, IMAGE_SUFFIXES, INGEST_REGISTRY, env_flag
 )
+from app.ingest_dedup import claim_content, duplicate_result, ingest_outputs, save_upload
+from app.ingest_registry import copy_with_digest
 from app.ingestion.pdf_processor import process_pdf
+from app.ingestion.pdf_sharding import count_pdf_pages
 from app.ingestion.csv_processor import process_csv
 from app.ingestion.xlsx_processor import process_xlsx
 from app.ingestion.xml_ingestion import process_xml
@@ -24,6 +28,10 @@ from app.ingestion.postman_ingestion import process_postman
 from app.ingestion.web_ingestion import ingest_web_url
 from app.ingestion.media_transcriber import transcribe_media
 from app.ingestion.image_ocr import extract_text_from_image
+from app.ingestion.scheduler import (
+    PRIORITY_BACKFILL, PRIORITY_INTERACTIVE, PRIORITY_WATCH, QueueFullError
+)
+from app.task_store import ACTIVE_STATUSES
 
 router = APIRouter()
 
@@ -50,13 +58,34 @@ def _process_pdf_fast(file_path: Path, artifacts_dir: Path) -> tuple[list[dict],
 
 _log = logging.getLogger(__name__)
 
+def _refresh_search_index(artifact_id: str | None = None, document_id: str | None = None) -> None:
+    """Apply an incremental search index update for newly stored content."""
+    try:
+        if artifact_id:
+            search_index.index_artifact(artifact_id)
+        if document_id:
+            search_index.index_document(document_id)
+    except Exception as exc:
+        _log.warning("Incremental search index update failed: %s", exc)
+
+
 def _process_and_store(file_path: Path, report_week: str, artifact_id: str, suffix: str, task_id: str | None = None):
 
     try:
+        if task_id:
+            # Atomic with respect to DELETE /tasks/{id}: a cancel either wins here or sees "running"
+            if not TASKS.start(task_id):
+                INGEST_REGISTRY.release(artifact_id)
+                return
+            TASKS.set_progress(task_id, stage="convert")
+        stage_started = time.perf_counter()
         analysis_payload: dict | None = None
         facts: list[dict] = []
         evidence: list[dict] = []
         if suffix == ".pdf":
+            pages_total = count_pdf_pages(file_path)
+            if task_id:
+                TASKS.set_progress(task_id, pages_done=0, pages_total=pages_total)
             # process_pdf is synchronous - call directly from background task
             fast_mode = env_flag("FAST_PDF_MODE", False)  # Docling runs by default
             _log.warning(f"[DOCLING] Processing {file_path.name}, FAST_PDF_MODE={fast_mode}")
@@ -78,6 +107,14 @@ def _process_and_store(file_path: Path, report_week: str, artifact_id: str, suff
                     _log.error(traceback.format_exc())
                     print(f"[DOCLING] Fallback to fast mode due to error: {docling_err}", file=sys.stderr, flush=True)
                     facts, evidence, analysis_payload = _process_pdf_fast(file_path, ARTIFACTS_DIR)
+            # Per-stage PDF timings go to the task record, not the analysis tables
+            pdf_timings = (analysis_payload or {}).pop("stage_timings", None) or {}
+            if task_id:
+                TASKS.set_progress(
+                    task_id,
+                    pages_done=pages_total,
+                    stage_seconds={f"pdf.{name}": seconds for name, seconds in pdf_timings.items()},
+                )
             # Ensure a PDF document row exists for deeplinks/open
             try:
                 db.add_document({
@@ -90,9 +127,9 @@ def _process_and_store(file_path: Path, report_week: str, artifact_id: str, suff
             except Exception:
                 pass
         elif suffix == ".csv":
-            facts, evidence = process_csv(file_path, report_week)
+            facts, evidence = process_csv(file_path, report_week, EVIDENCE_PAYLOADS)
         elif suffix in [".xlsx", ".xls"]:
-            facts, evidence = process_xlsx(file_path, report_week)
+            facts, evidence = process_xlsx(file_path, report_week, EVIDENCE_PAYLOADS)
         elif suffix in MEDIA_SUFFIXES:
             facts = []
             media_payload = transcribe_media(file_path, ARTIFACTS_DIR, artifact_id)
@@ -168,23 +205,28 @@ def _process_and_store(file_path: Path, report_week: str, artifact_id: str, suff
         else:
             raise HTTPException(400, f"Unsupported file type: {suffix}")
 
+        if task_id:
+            TASKS.set_progress(task_id, stage="store", stage_seconds={"convert": time.perf_counter() - stage_started})
+        stage_started = time.perf_counter()
         print(f"[STORAGE] Starting to store {len(facts)} facts and {len(evidence)} evidence", file=sys.stderr, flush=True)
-        for idx, fact in enumerate(facts):
-            try:
-                fact["artifact_id"] = artifact_id
-                db.add_fact(fact)
-            except Exception as e:
-                print(f"[STORAGE] Error adding fact {idx}: {e}", file=sys.stderr, flush=True)
-                raise
+        for fact in facts:
+            fact["artifact_id"] = artifact_id
+        for ev in evidence:
+            ev["artifact_id"] = artifact_id
+        # Large row payloads go to artifacts/evidence; evidence keeps a reference
+        evidence = [EVIDENCE_PAYLOADS.offload(ev) for ev in evidence]
+        try:
+            db.add_facts(facts)
+        except Exception as e:
+            print(f"[STORAGE] Error adding facts: {e}", file=sys.stderr, flush=True)
+            raise
         print(f"[STORAGE] Stored {len(facts)} facts", file=sys.stderr, flush=True)
 
-        for idx, ev in enumerate(evidence):
-            try:
-                ev["artifact_id"] = artifact_id
-                db.add_evidence(ev)
-            except Exception as e:
-                print(f"[STORAGE] Error adding evidence {idx}: {e}", file=sys.stderr, flush=True)
-                raise
+        try:
+            db.add_evidence_many(evidence)
+        except Exception as e:
+            print(f"[STORAGE] Error adding evidence: {e}", file=sys.stderr, flush=True)
+            raise
         print(f"[STORAGE] Stored {len(evidence)} evidence", file=sys.stderr, flush=True)
 
         if analysis_payload and suffix == ".pdf":
@@ -249,13 +291,15 @@ def _process_and_store(file_path: Path, report_week: str, artifact_id: str, suff
             except Exception:
                 pass
 
+        if task_id:
+            TASKS.set_progress(task_id, stage="index", stage_seconds={"store": time.perf_counter() - stage_started})
+        stage_started = time.perf_counter()
+        _refresh_search_index(artifact_id=artifact_id)
+        INGEST_REGISTRY.complete(artifact_id, ingest_outputs(file_path))
         print("[STORAGE] All storage complete, marking task as completed", file=sys.stderr, flush=True)
         if task_id:
-            TASKS[task_id].update({
-                "status": "completed",
-                "facts_count": len(facts),
-                "evidence_count": len(evidence)
-            })
+            TASKS.set_progress(task_id, stage="done", stage_seconds={"index": time.perf_counter() - stage_started})
+            TASKS.update(task_id, status="completed", facts_count=len(facts), evidence_count=len(evidence))
         # Update artifact status to processed
         try:
             db.update_artifact(artifact_id, status="processed")
@@ -263,111 +307,207 @@ def _process_and_store(file_path: Path, report_week: str, artifact_id: str, suff
         except Exception as e:
             print(f"[STORAGE] Failed to update artifact status: {e}", file=sys.stderr, flush=True)
     except Exception as e:
+        INGEST_REGISTRY.release(artifact_id)
         print(f"[STORAGE] ERROR in _process_and_store: {e}", file=sys.stderr, flush=True)
         print(traceback.format_exc(), file=sys.stderr, flush=True)
         if task_id:
-            TASKS[task_id].update({"status": "error", "error": str(e)})
-        else:
-            raise
+            TASKS.update(task_id, status="error", error=str(e))
+        # The scheduler counts the job as failed
+        raise
+
+def queue_pdf(
+    file_path: Path,
+    report_week: str,
+    artifact_id: str,
+    suffix: str,
+    filename: str | None,
+    priority: int = PRIORITY_INTERACTIVE,
+    block: bool = False,
+) -> str:
+    """Register a task and queue the PDF on the ingestion scheduler.
+
+    Raises:
+        QueueFullError: The PDF queue is full (and ``block`` is False).
+    """
+    task_id = str(uuid.uuid4())
+    TASKS.create(task_id, filename=filename, artifact_id=artifact_id)
+    try:
+        ingestion_scheduler.submit(
+            task_id,
+            _process_and_store,
+            file_path,
+            report_week,
+            artifact_id,
+            suffix,
+            task_id,
+            lane="heavy",
+            file_type=suffix,
+            priority=priority,
+            block=block,
+        )
+    except QueueFullError:
+        TASKS.delete(task_id)
+        db.update_artifact(artifact_id, status="error")
+        raise
+    return task_id
+
+
+def require_pdf_capacity(count: int) -> None:
+    """Reject the request with 429 when the PDF queue cannot take ``count`` more jobs."""
+    if count and not ingestion_scheduler.has_capacity("heavy", count):
+        raise HTTPException(
+            429,
+            "Ingestion queue is full; retry later",
+            headers={"Retry-After": "5"},
+        )
+
+
+_WATCH_HEAVY_SUFFIXES = {".pdf"} | MEDIA_SUFFIXES | IMAGE_SUFFIXES
+_WATCH_LIGHT_SUFFIXES = {".csv", ".xlsx", ".xls", ".xml", ".yaml", ".yml", ".json"}
+WATCH_SUFFIXES = _WATCH_HEAVY_SUFFIXES | _WATCH_LIGHT_SUFFIXES
+
+
+def ingest_file_from_watch(src: Path, report_week: str = "") -> bool | str:
+    """Copy a watch-folder file into uploads and queue it for ingestion.
 
-def ingest_file_from_watch(src: Path, report_week: str = ""):
+    Returns:
+        The ingestion task id once the file is queued, True when it matched
+        an earlier ingestion, or False when it could not be queued.
+    """
     try:
         if not src.exists() or not src.is_file():
-            return
+            return False
         file_id = str(uuid.uuid4())
         dst = UPLOAD_DIR / f"{file_id}_{src.name}"
-        shutil.copy2(src, dst)
+        digest, size = copy_with_digest(src, dst)
         suffix = dst.suffix.lower()
+        duplicate = claim_content(digest, size, suffix, file_id, src.name)
+        if duplicate:
+            dst.unlink(missing_ok=True)
+            if duplicate["status"] == "pending":
+                # Retried after a backoff, once the earlier ingestion finished or failed
+                _log.info("watch: %s is still being ingested as artifact %s", src.name, duplicate["artifact_id"])
+                return False
+            _log.info("watch: %s matches artifact %s; skipped", src.name, duplicate["artifact_id"])
+            return True
         artifact_id = db.add_artifact({
             "id": file_id,
             "filename": src.name,
             "filepath": str(dst),
             "filetype": suffix,
             "report_week": report_week,
-            "status": "processing" if suffix == ".pdf" else "processed"
+            "status": "processing" if suffix in _WATCH_HEAVY_SUFFIXES else "processed"
         })
-        if suffix == ".pdf":
+        if suffix in _WATCH_HEAVY_SUFFIXES:
+            # Blocks while the heavy queue is full, so a bulk drop is throttled
+            # instead of starting one conversion per file.
+            return queue_pdf(dst, report_week, artifact_id, suffix, src.name, priority=PRIORITY_WATCH, block=True)
+        if suffix in _WATCH_LIGHT_SUFFIXES:
             task_id = str(uuid.uuid4())
-            TASKS[task_id] = {"status": "queued", "filename": src.name, "artifact_id": artifact_id}
-            # schedule background processing using the same helper
-            _thread = threading.Thread(target=_process_and_store, args=(dst, report_week, artifact_id, suffix, task_id), daemon=True)
-            _thread.start()
-        elif suffix in (".csv", ".xlsx", ".xls"):
-            _process_and_store(dst, report_week, artifact_id, suffix, None)
-        elif suffix == ".xml":
+            TASKS.create(task_id, filename=src.name, artifact_id=artifact_id)
+            try:
+                ingestion_scheduler.submit(
+                    task_id,
+                    _ingest_light_file,
+                    dst,
+                    report_week,
+                    artifact_id,
+                    suffix,
+                    task_id,
+                    lane="light",
+                    file_type=suffix,
+                    priority=PRIORITY_WATCH,
+                    block=True,
+                )
+            except Exception:
+                TASKS.delete(task_id)
+                INGEST_REGISTRY.release(artifact_id)
+                raise
+            return task_id
+        return True
+    except Exception:
+        _log.exception("watch: failed to ingest %s", src)
+        return False
+
+
+def watch_task_outcome(task_id: str) -> bool | None:
+    """Outcome of a queued watch-folder ingestion.
+
+    Returns:
+        True once the task completed or was cancelled, False when it failed,
+        or None while it is still queued or running.
+    """
+    task = TASKS.get(task_id)
+    if task is None:
+        # Compacted or lost; a retry is matched against the content registry
+        return False
+    if task.get("status") in ACTIVE_STATUSES:
+        return None
+    return task.get("status") in ("completed", "cancelled")
+
+
+def _ingest_light_file(dst: Path, report_week: str, artifact_id: str, suffix: str, task_id: str | None = None):
+    if suffix in (".csv", ".xlsx", ".xls"):
+        # Completes or releases the content claim (and task) itself
+        _process_and_store(dst, report_week, artifact_id, suffix, task_id)
+        return
+    if task_id and not TASKS.start(task_id):
+        INGEST_REGISTRY.release(artifact_id)
+        return
+    document_id = None
+    try:
+        if suffix == ".xml":
             doc, rows = process_xml(dst)
             db.add_document(doc)
-            for row in rows:
-                db.add_log(row)
+            db.add_logs(rows)
+            document_id = doc["id"]
         elif suffix in (".yaml", ".yml", ".json"):
             # Try OpenAPI then Postman
             try:
                 doc, rows = process_openapi(dst)
-                db.add_document(doc)
-                for row in rows:
-                    db.add_api(row)
             except Exception:
-                try:
-                    doc, rows = process_postman(dst)
-                    db.add_document(doc)
-                    for row in rows:
-                        db.add_api(row)
-                except Exception:
-                    pass
-    except Exception:
-        pass
+                doc, rows = process_postman(dst)
+            db.add_document(doc)
+            db.add_apis(rows)
+            document_id = doc["id"]
+    except Exception as e:
+        # Let a later copy of the same bytes be ingested again
+        INGEST_REGISTRY.release(artifact_id)
+        if task_id:
+            TASKS.update(task_id, status="error", error=str(e))
+        raise
+    if document_id:
+        _refresh_search_index(document_id=document_id)
+    INGEST_REGISTRY.complete(artifact_id, ingest_outputs(dst))
+    if task_id:
+        TASKS.update(task_id, status="completed")
+
+
+# content_type -> per-artifact counter reported by /artifacts
+_EVIDENCE_COUNT_KEYS = {
+    "table": "table_evidence",
+    "chart": "chart_evidence",
+    "formula": "formula_evidence",
+    "media_transcript": "media_transcripts",
+    "audio_transcript": "media_transcripts",
+    "video_transcript": "media_transcripts",
+    "media_metadata": "media_metadata",
+    "web_page": "web_pages",
+    "image_ocr": "image_ocr",
+}
+
 
 @router.get("/artifacts")
 async def list_artifacts():
     artifacts = db.get_artifacts()
-    evidence = db.get_all_evidence()
-    summary: dict[str, dict[str, int]] = {}
-    for ev in evidence:
-        art_id = ev.get("artifact_id")
-        if not art_id:
-            continue
-        bucket = summary.setdefault(
-            art_id,
-            {
-                "table_evidence": 0,
-                "chart_evidence": 0,
-                "formula_evidence": 0,
-                "media_transcripts": 0,
-                "media_metadata": 0,
-                "web_pages": 0,
-                "image_ocr": 0,
-            },
-        )
-        ctype = (ev.get("content_type") or "").lower()
-        if ctype == "table":
-            bucket["table_evidence"] += 1
-        elif ctype == "chart":
-            bucket["chart_evidence"] += 1
-        elif ctype == "formula":
-            bucket["formula_evidence"] += 1
-        elif ctype in {"media_transcript", "audio_transcript", "video_transcript"}:
-            bucket["media_transcripts"] += 1
-        elif ctype == "media_metadata":
-            bucket["media_metadata"] += 1
-        elif ctype == "web_page":
-            bucket["web_pages"] += 1
-        elif ctype == "image_ocr":
-            bucket["image_ocr"] += 1
-
+    type_counts = db.count_evidence_by_type()
     enriched = []
     for art in artifacts:
-        counts = summary.get(
-            art.get("id"),
-            {
-                "table_evidence": 0,
-                "chart_evidence": 0,
-                "formula_evidence": 0,
-                "media_transcripts": 0,
-                "media_metadata": 0,
-                "web_pages": 0,
-                "image_ocr": 0,
-            },
-        )
+        counts = dict.fromkeys(_EVIDENCE_COUNT_KEYS.values(), 0)
+        for ctype, n in type_counts.get(art.get("id"), {}).items():
+            key = _EVIDENCE_COUNT_KEYS.get(ctype.lower())
+            if key:
+                counts[key] += n
         enriched.append({**art, **counts})
     return {"artifacts": enriched}
 
@@ -413,12 +553,12 @@ async def artifact_media():
 
 @router.get("/artifacts/{artifact_id}")
 async def artifact_detail(artifact_id: str):
-    arts = db.get_artifacts()
-    art = next((a for a in arts if a.get("id") == artifact_id), None)
+    art = db.get_artifact(artifact_id)
     if not art:
         raise HTTPException(404, "Artifact not found")
-    facts = [f for f in db.get_facts() if f.get("artifact_id") == artifact_id]
-    evidence = [e for e in db.get_all_evidence() if e.get("artifact_id") == artifact_id]
+    facts = db.get_facts_for_artifact(artifact_id)
+    # The detail view renders transcript and metadata payloads
+    evidence = db.get_evidence_for_artifact(artifact_id, include_full_data=True)
     return {"artifact": art, "facts": facts, "evidence": evidence}
 
 @router.get("/documents")
@@ -430,35 +570,46 @@ WebUrlForm = Annotated[List[str], Form()]
 
 @router.post("/upload")
 async def upload_files(
-    background_tasks: BackgroundTasks,
     files: Annotated[List[UploadFile], File()] = [],
     report_week: str = "",
     async_pdf: bool = True,
     web_urls: WebUrlForm = [],
+    force: bool = False,
 ):
-    """Upload and process documents."""
+    """Upload and process documents.
+
+    Files whose exact content was ingested before are not processed again;
+    their result has status ``duplicate`` and the existing ``artifact_id``.
+    Content still being ingested gets status ``conflict``; retry it later.
+    Pass ``force=true`` to reprocess them.
+    """
 
     results: List[Dict] = []
     incoming_files = files or []
+    if async_pdf:
+        require_pdf_capacity(sum(1 for f in incoming_files if (f.filename or "").lower().endswith(".pdf")))
 
     for file in incoming_files:
         file_id = str(uuid.uuid4())
         safe_filename = os.path.basename(file.filename) if file.filename else "upload"
         safe_filename = safe_filename.replace("/", "_").replace("\\", "_")
         file_path = UPLOAD_DIR / f"{file_id}_{safe_filename}"
-        file_content = await file.read()
-        if len(file_content) > MAX_FILE_SIZE:
+        saved = await save_upload(file, file_path)
+        if saved is None:
             results.append({
                 "filename": file.filename,
                 "status": "error",
                 "error": f"File size exceeds maximum allowed size of {MAX_FILE_SIZE // (1024*1024)}MB"
             })
             continue
-        with file_path.open("wb") as buffer:
-            buffer.write(file_content)
 
         try:
             suffix = file_path.suffix.lower()
+            duplicate = claim_content(*saved, suffix, file_id, file.filename, force=force)
+            if duplicate:
+                file_path.unlink(missing_ok=True)
+                results.append(duplicate_result(file.filename, duplicate))
+                continue
             artifact_id = db.add_artifact(
                 {
                     "id": file_id,
@@ -470,14 +621,16 @@ async def upload_files(
                 }
             )
             if async_pdf and suffix == ".pdf":
-                task_id = str(uuid.uuid4())
-                TASKS[task_id] = {"status": "queued", "filename": file.filename, "artifact_id": artifact_id}
-                background_tasks.add_task(_process_and_store, file_path, report_week, artifact_id, suffix, task_id)
+                try:
+                    task_id = queue_pdf(file_path, report_week, artifact_id, suffix, file.filename)
+                except QueueFullError as exc:
+                    results.append({"filename": file.filename, "status": "rejected", "error": str(exc)})
+                    continue
                 results.append({"filename": file.filename, "status": "queued", "task_id": task_id})
             else:
                 _process_and_store(file_path, report_week, artifact_id, suffix, None)
-                facts_count = len([f for f in db.get_facts(report_week) if f.get("artifact_id") == artifact_id])
-                evidence_count = len([e for e in db.get_all_evidence() if e.get("artifact_id") == artifact_id])
+                facts_count = len(db.get_facts_for_artifact(artifact_id, report_week))
+                evidence_count = sum(db.count_evidence_by_type(artifact_id).get(artifact_id, {}).values())
                 results.append(
                     {
                         "filename": file.filename,
@@ -552,8 +705,8 @@ async def ingest_xml_endpoint(file: UploadFile = File(...)):
     
     doc, rows = process_xml(file_path)
     db.add_document(doc)
-    for row in rows:
-        db.add_log(row)
+    db.add_logs(rows)
+    await asyncio.to_thread(_refresh_search_index, document_id=doc["id"])
     return {"document_id": doc["id"], "status": "success"}
 
 @router.post("/ingest/openapi")
@@ -565,8 +718,8 @@ async def ingest_openapi_endpoint(file: UploadFile = File(...)):
         
     doc, rows = process_openapi(file_path)
     db.add_document(doc)
-    for row in rows:
-        db.add_api(row)
+    db.add_apis(rows)
+    await asyncio.to_thread(_refresh_search_index, document_id=doc["id"])
     return {"document_id": doc["id"], "status": "success"}
 
 @router.post("/ingest/postman")
@@ -578,12 +731,12 @@ async def ingest_postman_endpoint(file: UploadFile = File(...)):
         
     doc, rows = process_postman(file_path)
     db.add_document(doc)
-    for row in rows:
-        db.add_api(row)
+    db.add_apis(rows)
+    await asyncio.to_thread(_refresh_search_index, document_id=doc["id"])
     return {"document_id": doc["id"], "status": "success"}
 
 @router.post("/load_samples")
-async def load_samples(background_tasks: BackgroundTasks, report_week: str = "", async_pdf: bool = True):
+async def load_samples(report_week: str = "", async_pdf: bool = True):
     """Server-side ingestion of sample files from SAMPLE_DIR."""
     sample_dir = Path(os.getenv("SAMPLE_DIR", "/app/samples"))
     if not sample_dir.exists():
@@ -614,14 +767,12 @@ async def load_samples(background_tasks: BackgroundTasks, report_week: str = "",
             })
 
             if async_pdf and suffix == ".pdf":
-                task_id = str(uuid.uuid4())
-                TASKS[task_id] = {"status": "queued", "filename": p.name, "artifact_id": artifact_id}
-                background_tasks.add_task(_process_and_store, file_path, report_week, artifact_id, suffix, task_id)
+                task_id = queue_pdf(file_path, report_week, artifact_id, suffix, p.name, priority=PRIORITY_BACKFILL)
                 results.append({"filename": p.name, "status": "queued", "task_id": task_id})
             else:
                 _process_and_store(file_path, report_week, artifact_id, suffix, None)
-                facts_count = len([f for f in db.get_facts(report_week) if f.get("artifact_id") == artifact_id])
-                evidence_count = len([e for e in db.get_all_evidence() if e.get("artifact_id") == artifact_id])
+                facts_count = len(db.get_facts_for_artifact(artifact_id, report_week))
+                evidence_count = sum(db.count_evidence_by_type(artifact_id).get(artifact_id, {}).values())
                 results.append({
                     "filename": p.name,
                     "status": "success",
@@ -20,6 +20,8 @@ from fastapi import APIRouter, HTTPException, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
+from app.task_store import get_task_store
+
 
 # =============================================================================
 # Enums and Constants
@@ -47,16 +49,29 @@ class AgentType(str, Enum):
 
 
 # =============================================================================
-# In-Memory Task Storage
+# Task Storage
 # =============================================================================
 
 
-# In-memory storage for tasks (stub implementation)
-_task_store: Dict[str, Dict[str, Any]] = {}
+# Orchestration records live in the shared persistent task registry; the
+# record is kept as one field and its status mirrored for indexing.
+_TASK_KIND = "orchestration"
+
+# Store vocabulary for the mirrored status, so compaction and restart
+# recovery treat orchestration tasks like ingestion tasks.
+_STORE_STATUS = {
+    TaskStatus.PENDING.value: "queued",
+    TaskStatus.IN_PROGRESS.value: "running",
+    TaskStatus.FAILED.value: "error",
+}
+
+
+def _store_status(status: Optional[str]) -> Optional[str]:
+    return _STORE_STATUS.get(status, status) if status else status
 
 
 def _get_task(task_id: str) -> Optional[Dict[str, Any]]:
-    """Retrieve a task from the in-memory store.
+    """Retrieve a task from the task store.
 
     Args:
         task_id: The UUID of the task to retrieve.
@@ -64,11 +79,28 @@ def _get_task(task_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Task dictionary if found, None otherwise.
     """
-    return _task_store.get(task_id)
+    task = get_task_store().get(task_id)
+    if task is None or task.get("kind") != _TASK_KIND:
+        return None
+    record = task.get("record")
+    if record and task.get("status") == "error" and record.get("status") != TaskStatus.FAILED.value:
+        # Failed by restart recovery, which only updates the mirrored status
+        record = {**record, "status": TaskStatus.FAILED.value, "error": task.get("error")}
+    return record
+
+
+def _put_task(task_id: str, record: Dict[str, Any]) -> None:
+    """Insert or replace a task in the task store.
+
+    Args:
+        task_id: Store key for the task.
+        record: Task dictionary; must include ``status``.
+    """
+    get_task_store().create(task_id, status=_store_status(record["status"]), kind=_TASK_KIND, record=record)
 
 
 def _update_task(task_id: str, updates: Dict[str, Any]) -> bool:
-    """Update a task in the in-memory store.
+    """Update a task in the task store.
 
     Args:
         task_id: The UUID of the task to update.
@@ -77,11 +109,12 @@ def _update_task(task_id: str, updates: Dict[str, Any]) -> bool:
     Returns:
         True if task was found and updated, False otherwise.
     """
-    if task_id not in _task_store:
+    record = _get_task(task_id)
+    if record is None:
         return False
-    _task_store[task_id].update(updates)
-    _task_store[task_id]["updated_at"] = datetime.utcnow().isoformat()
-    return True
+    record.update(updates)
+    record["updated_at"] = datetime.utcnow().isoformat()
+    return get_task_store().update(task_id, status=_store_status(record.get("status")), record=record)
 
 
 # =============================================================================
@@ -367,8 +400,8 @@ async def decompose_task(request: DecomposeRequest) -> DecomposeResponse:
         request.agent_hints,
     )
 
-    # Store the task in memory
-    _task_store[task_id] = {
+    # Persist the task
+    _put_task(task_id, {
         "task_id": task_id,
         "original_task": request.task,
         "context": request.context,
@@ -376,7 +409,7 @@ async def decompose_task(request: DecomposeRequest) -> DecomposeResponse:
         "status": TaskStatus.PENDING.value,
         "created_at": created_at,
         "updated_at": created_at,
-    }
+    })
 
     return DecomposeResponse(
         task_id=task_id,
@@ -424,7 +457,7 @@ async def dispatch_subtask(request: DispatchRequest) -> DispatchResponse:
 
     # Store dispatch information
     dispatch_key = f"dispatch_{dispatch_id}"
-    _task_store[dispatch_key] = {
+    dispatch = {
         "dispatch_id": dispatch_id,
         "subtask_id": request.subtask_id,
         "task_id": request.task_id,
@@ -438,8 +471,9 @@ async def dispatch_subtask(request: DispatchRequest) -> DispatchResponse:
     }
 
     # Simulate status transition to in_progress
-    _task_store[dispatch_key]["status"] = TaskStatus.IN_PROGRESS.value
-    _task_store[dispatch_key]["started_at"] = datetime.utcnow().isoformat()
+    dispatch["status"] = TaskStatus.IN_PROGRESS.value
+    dispatch["started_at"] = datetime.utcnow().isoformat()
+    _put_task(dispatch_key, dispatch)
 
     return DispatchResponse(
         dispatch_id=dispatch_id,
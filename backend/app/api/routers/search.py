@@ -1,16 +1,55 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from dataclasses import asdict
 from typing import Optional
+import asyncio
+import json
+import logging
 import time
 from app.globals import search_index
+from app.search import iter_search_batches, parse_fields, project_fields, search_page
+from app.embedding_client import EmbeddingProviderUnavailable
 from app.auth import get_current_user, optional_auth
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class SearchRequest(BaseModel):
     q: str
-    k: int = 5
+    k: int = 5  # page size
     types: list[str] | None = None
+    artifact_id: str | None = None
+    document_id: str | None = None
+    page: int | None = None
+    mode: str | None = None  # 'hybrid' | 'vector' | 'lexical'; default SEARCH_MODE
+    cursor: str | None = None  # next_cursor of the previous page
+    fields: str | None = None  # projection, e.g. "score,id,meta.type"
+
+def _search_filters(req: SearchRequest) -> dict:
+    return {
+        "types": req.types,
+        "artifact_id": req.artifact_id,
+        "document_id": req.document_id,
+        "page": req.page,
+        "mode": req.mode,
+    }
+
+async def _in_thread(fn, *args, **kwargs):
+    """Run a search call off the event loop, mapping its errors to HTTP ones."""
+    try:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    except EmbeddingProviderUnavailable as exc:
+        raise HTTPException(503, f"Embedding provider unavailable: {exc}")
+    except ValueError as exc:
+        raise HTTPException(400, str(exc)) from exc
+
+async def _run_search(req: SearchRequest) -> tuple[list[dict], Optional[str]]:
+    hits, next_cursor = await _in_thread(
+        search_page, search_index, req.q, limit=req.k, cursor=req.cursor, **_search_filters(req)
+    )
+    fields = parse_fields(req.fields)
+    return [project_fields(asdict(hit), fields) for hit in hits], next_cursor
 
 @router.post("/search")
 async def search_documents(
@@ -23,13 +62,46 @@ async def search_documents(
     Authentication: Optional. Currently returns global results.
     Future: Authenticated users will get user-scoped results.
     """
-    results = search_index.search(req.q, k=req.k)
-    return {"results": results}
+    results, next_cursor = await _run_search(req)
+    return {"results": results, "next_cursor": next_cursor}
+
+@router.post("/search/stream")
+async def stream_search_documents(
+    req: SearchRequest,
+    _user_id: Optional[str] = Depends(optional_auth)
+):
+    """Search documents, streaming hits as NDJSON followed by a summary line.
+
+    Hits are ranked in growing batches, so the first lines go out before the
+    whole page has been ranked.
+    """
+    fields = parse_fields(req.fields)
+    batches = iter_search_batches(search_index, req.q, limit=req.k, cursor=req.cursor, **_search_filters(req))
+    # Rank the first batch before responding so a bad request still gets its status code
+    first = await _in_thread(next, batches, None)
+
+    def gen():
+        summary = {"done": True, "count": 0, "next_cursor": None}
+        batch = first
+        while batch is not None:
+            hits, summary["next_cursor"] = batch
+            for hit in hits:
+                yield json.dumps(project_fields(asdict(hit), fields), default=str) + "\n"
+            summary["count"] += len(hits)
+            try:
+                batch = next(batches, None)
+            except Exception as exc:
+                logger.warning("Search stream stopped early: %s", exc)
+                summary["error"] = str(exc)
+                break
+        yield json.dumps(summary) + "\n"
+
+    return StreamingResponse(gen(), media_type="application/x-ndjson")
 
 @router.post("/search/rebuild")
 async def rebuild_search_index(_user_id: str = Depends(get_current_user)):
     """Rebuild the search index (authentication required)."""
     t0 = time.time()
-    count = search_index.rebuild()
+    count = await asyncio.to_thread(search_index.rebuild)
     dt = time.time() - t0
     return {"status": "ok", "indexed_count": count, "duration_seconds": round(dt, 3)}
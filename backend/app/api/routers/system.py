@@ -4,12 +4,14 @@ Provides endpoints for health checks, configuration discovery,
 task status monitoring, and system metrics.
 """
 
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Query, Response
 import csv
 import io
 import os
 import time
-from app.globals import TASKS, START_TIME, DB_BACKEND_META, env_flag, search_index, db, HRM_STATS
+from app.globals import TASKS, START_TIME, DB_BACKEND_META, env_flag, search_index, db, HRM_STATS, ingestion_scheduler
+from app.embedding_cache import get_embedding_cache
+from app.ingestion.watch_folder import active_watch_folder
 
 
 async def check_ollama_available(base_url: str) -> bool:
@@ -127,30 +129,39 @@ async def config():
     }
 
 @router.get("/tasks")
-async def list_tasks():
-    """List all background tasks with status summary.
+async def list_tasks(
+    status: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """List background tasks with status summary.
+
+    Args:
+        status: Only list tasks with this status.
+        limit: Page size.
+        offset: Number of tasks to skip (newest first).
 
     Returns:
         A dictionary containing:
         - total: Total number of tasks
-        - queued: Number of queued tasks
-        - completed: Number of completed tasks
-        - errored: Number of failed tasks
-        - queued_items: List of queued task details
+        - queued, running, completed, errored, cancelled: Counts per status
+        - queued_items: Up to ``limit`` queued task details
+        - items: The requested page of tasks
+        - next_offset: Offset of the next page, or None on the last page
     """
-    # Return a lightweight summary including counts and queued items
-    items = [
-        {"id": k, **v} for k, v in TASKS.items()
-    ]
-    queued = [t for t in items if t.get("status") == "queued"]
-    completed = [t for t in items if t.get("status") == "completed"]
-    errored = [t for t in items if t.get("status") == "error"]
+    # Counts come from the status index; items are paged newest first
+    counts = TASKS.counts(kind="ingest")
+    items = TASKS.list(status=status, kind="ingest", limit=limit + 1, offset=offset)
     return {
-        "total": len(items),
-        "queued": len(queued),
-        "completed": len(completed),
-        "errored": len(errored),
-        "queued_items": queued,
+        "total": sum(counts.values()),
+        "queued": counts.get("queued", 0),
+        "running": counts.get("running", 0),
+        "completed": counts.get("completed", 0),
+        "errored": counts.get("error", 0),
+        "cancelled": counts.get("cancelled", 0),
+        "queued_items": TASKS.list(status="queued", kind="ingest", limit=limit),
+        "items": items[:limit],
+        "next_offset": offset + limit if len(items) > limit else None,
     }
 
 @router.get("/tasks/{task_id}")
@@ -171,6 +182,33 @@ async def get_task_status(task_id: str):
         raise HTTPException(404, "Task not found")
     return task
 
+@router.delete("/tasks/{task_id}")
+async def cancel_task(task_id: str):
+    """Cancel a queued background task.
+
+    Args:
+        task_id: The unique identifier of the task.
+
+    Returns:
+        The updated task details.
+
+    Raises:
+        HTTPException: 404 if the task is not found, 409 if it already started.
+    """
+    task = TASKS.get(task_id)
+    if not task:
+        raise HTTPException(404, "Task not found")
+    status = ingestion_scheduler.cancel(task_id)
+    if status is None and TASKS.cancel_queued(task_id):
+        # Queued by another worker; its job checks the flag before starting
+        status = "cancelled"
+    if status != "cancelled":
+        raise HTTPException(409, f"Task cannot be cancelled (status: {status or task.get('status')})")
+    TASKS.update(task_id, status="cancelled")
+    if task.get("artifact_id"):
+        db.update_artifact(task["artifact_id"], status="cancelled")
+    return TASKS.get(task_id)
+
 @router.get("/health")
 async def health():
     """Health check endpoint for monitoring.
@@ -195,14 +233,23 @@ async def watch_status():
         - dir: Directory being watched
         - debounce_ms: File stability debounce time in milliseconds
         - min_bytes: Minimum file size to trigger processing
+        - batch_size: Ready files handed to ingestion per batch
+        - workers: Threads dispatching batches
         - available: Whether watchgod library is available
+        - watcher: Live counters of the running watcher (tracked files,
+          backlog, in-flight, checkpointed, dispatched/ingested/failed),
+          or None when it is not running
     """
+    watcher = active_watch_folder()
     return {
         "enabled": env_flag("WATCH_ENABLED", True),
         "dir": os.getenv("WATCH_DIR", "/app/watch"),
         "debounce_ms": int(os.getenv("WATCH_DEBOUNCE_MS", "1000")),
         "min_bytes": int(os.getenv("WATCH_MIN_BYTES", "1")),
+        "batch_size": int(os.getenv("WATCH_BATCH_SIZE", "32")),
+        "workers": int(os.getenv("WATCH_WORKERS", "4")),
         "available": bool(watch),
+        "watcher": watcher.stats() if watcher else None,
     }
 
 @router.get("/metrics/hrm")
@@ -215,6 +262,29 @@ def hrm_metrics():
     """
     return HRM_STATS.snapshot()
 
+@router.get("/metrics/embedding_cache")
+def embedding_cache_metrics():
+    """Get persistent embedding cache statistics.
+
+    Returns:
+        A dictionary with entry count, size cap, hit/miss/eviction
+        counters and hit rate, or ``{"enabled": False}`` when disabled.
+    """
+    cache = get_embedding_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@router.get("/metrics/ingestion")
+def ingestion_metrics():
+    """Get ingestion scheduler statistics.
+
+    Returns:
+        A dictionary with queue depth and worker count per lane, and
+        queue depth, wait time and service time per file type.
+    """
+    return ingestion_scheduler.stats()
+
 @router.get("/metrics")
 def metrics_prometheus():
     """Get Prometheus-formatted metrics for monitoring systems.
@@ -229,23 +299,57 @@ def metrics_prometheus():
         f"pmoves_hrm_avg_steps {snap['avg_steps']}",
         f"pmoves_hrm_avg_latency_ms {snap['avg_latency_ms']}",
     ]
+    cache = get_embedding_cache()
+    if cache is not None:
+        stats = cache.stats()
+        lines += [
+            f"pmoves_embedding_cache_entries {stats['entries']}",
+            f"pmoves_embedding_cache_hits_total {stats['hits']}",
+            f"pmoves_embedding_cache_misses_total {stats['misses']}",
+            f"pmoves_embedding_cache_evictions_total {stats['evictions']}",
+        ]
+    query_stats = search_index.query_cache.stats()
+    lines += [
+        f"pmoves_search_query_cache_hits_total {query_stats['hits']}",
+        f"pmoves_search_query_cache_misses_total {query_stats['misses']}",
+        f"pmoves_search_query_embed_batches_total {search_index._query_batcher.batches}",
+    ]
+    lines += ingestion_scheduler.prometheus_lines()
     return ("\n".join(lines) + "\n", 200, {"Content-Type": "text/plain; version=0.0.4"})
 
 @router.get("/logs")
-async def get_logs(level: str | None = None, code: str | None = None, q: str | None = None, document_id: str | None = None):
+async def get_logs(
+    level: str | None = None,
+    code: str | None = None,
+    q: str | None = None,
+    ts_from: str | None = None,
+    ts_to: str | None = None,
+    document_id: str | None = None,
+    limit: int | None = Query(None, ge=1, le=10000),
+    offset: int = Query(0, ge=0),
+):
     """Query system logs with optional filters.
 
     Args:
         level: Filter by log level (ERROR, WARN, INFO, etc.)
         code: Filter by error code
-        q: Full-text search query
+        q: Case-insensitive substring of the message
+        ts_from: Inclusive lower bound on the entry timestamp (ISO 8601)
+        ts_to: Inclusive upper bound on the entry timestamp (ISO 8601)
         document_id: Filter by associated document ID
+        limit: Page size; all matching entries when omitted
+        offset: Number of matching entries to skip
 
     Returns:
-        A dictionary with a "logs" key containing the filtered log entries.
+        A dictionary with a "logs" key containing the filtered log entries
+        and, when ``limit`` is given, "next_offset" (None on the last page).
     """
-    logs = db.list_logs(level=level, code=code, q=q, document_id=document_id)
-    return {"logs": logs}
+    logs = db.list_logs(level=level, code=code, q=q, ts_from=ts_from, ts_to=ts_to,
+                        document_id=document_id, limit=None if limit is None else limit + 1,
+                        offset=offset)
+    if limit is None:
+        return {"logs": logs}
+    return {"logs": logs[:limit], "next_offset": offset + limit if len(logs) > limit else None}
 
 @router.get("/logs/export")
 async def export_logs(level: str | None = None):
@@ -5,24 +5,43 @@ from typing import List, Dict, Tuple
 
 import numpy as np
 
+from app.embedding_cache import get_embedding_cache
+
 
 def _maybe_st_model():
     try:
         from sentence_transformers import SentenceTransformer  # type: ignore
-        return SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        return SentenceTransformer(_ST_MODEL_NAME)
     except Exception:
         return None
 
 
+_ST_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# Cache provider key; vectors are stored already L2-normalized.
+_ST_CACHE_PROVIDER = "sentence_transformers:normalized"
+
+
 def embed_texts(texts: List[str]) -> Tuple[np.ndarray, str]:
     texts = [t if isinstance(t, str) else str(t) for t in texts]
+    cache = get_embedding_cache()
+    if cache is not None and texts:
+        # Skip loading the model entirely when every text is already cached.
+        cached = cache.get_many(_ST_CACHE_PROVIDER, _ST_MODEL_NAME, texts)
+        if len(cached) == len(texts):
+            return np.vstack([cached[i] for i in range(len(texts))]).astype(np.float32), _ST_MODEL_NAME
     model = _maybe_st_model()
     if model is not None:
         try:
-            vecs = model.encode(
-                texts, batch_size=32, show_progress_bar=False, convert_to_numpy=True, normalize_embeddings=True
-            )
-            return vecs.astype(np.float32), "sentence-transformers/all-MiniLM-L6-v2"
+            def _encode(batch: List[str]) -> np.ndarray:
+                return model.encode(
+                    batch, batch_size=32, show_progress_bar=False, convert_to_numpy=True, normalize_embeddings=True
+                )
+
+            if cache is not None and texts:
+                vecs = cache.encode(_ST_CACHE_PROVIDER, _ST_MODEL_NAME, texts, _encode)
+            else:
+                vecs = _encode(texts)
+            return vecs.astype(np.float32), _ST_MODEL_NAME
         except Exception:
             pass
     # Fallback: hashing vectorizer
@@ -16,18 +16,112 @@ Classes:
     TagRow: Extracted tags from documents
     Database: Core database operations (SQLite)
     ExtendedDatabase: Extended database with additional methods
+
+SQLite tuning (environment):
+    SQLITE_BUSY_TIMEOUT_MS: Wait this long for a lock before failing (default: 30000)
+    SQLITE_CACHE_SIZE_KB: Page cache per connection (default: 65536)
+    SQLITE_MMAP_SIZE: Bytes of the file to memory-map (default: 268435456)
+    SQLITE_READ_POOL_SIZE: Pooled read-only connections (default: 8)
 """
 
 import os
 import json
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Dict, Optional, Any
 from pathlib import Path
 
+from sqlalchemy import Index, event, func, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import defer
 from sqlmodel import SQLModel, Field, create_engine, Session, select, delete, text
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _sqlite_pragmas(read_only: bool) -> List[str]:
+    pragmas = [
+        f"PRAGMA busy_timeout={_env_int('SQLITE_BUSY_TIMEOUT_MS', 30000)}",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA cache_size=-{_env_int('SQLITE_CACHE_SIZE_KB', 65536)}",
+        f"PRAGMA mmap_size={_env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+# Fallbacks for timestamps fromisoformat rejects, matched on their prefix
+_LOG_TS_FORMATS = (("%Y-%m-%d %H:%M:%S", 19), ("%Y-%m-%d", 10))
+
+
+def log_ts_epoch(value: Optional[str]) -> Optional[float]:
+    """Normalize a log timestamp to epoch seconds (naive values are UTC).
+
+    Returns:
+        Epoch seconds, or None when the value is empty or unparseable.
+    """
+    if not value:
+        return None
+    raw = str(value).strip()
+    try:
+        parsed = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        parsed = None
+        for fmt, width in _LOG_TS_FORMATS:
+            try:
+                parsed = datetime.strptime(raw[:width], fmt)
+                break
+            except ValueError:
+                continue
+        if parsed is None:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def create_sqlite_engine(db_url: str, read_only: bool = False) -> Engine:
+    """Create an engine whose connections apply the tuned SQLite profile.
+
+    The write engine keeps a single pooled connection so in-process writers
+    queue on the pool rather than on SQLite's file lock; overflow connections
+    (nested sessions) wait on ``busy_timeout`` instead of failing with
+    "database is locked". Read engines are larger and ``query_only``.
+    """
+    if db_url in ("sqlite://", "sqlite:///:memory:"):
+        # In-memory databases use SingletonThreadPool, which takes no sizing
+        pool_args = {}
+    elif read_only:
+        pool_size = max(1, _env_int("SQLITE_READ_POOL_SIZE", 8))
+        pool_args = {"pool_size": pool_size, "max_overflow": pool_size}
+    else:
+        pool_args = {"pool_size": 1, "max_overflow": 4}
+    engine = create_engine(
+        db_url,
+        echo=False,
+        connect_args={"check_same_thread": False},
+        **pool_args,
+    )
+    pragmas = _sqlite_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_conn, _record):  # pragma: no cover - exercised via engine use
+        cursor = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return engine
+
+
 class Artifact(SQLModel, table=True):
     """Uploaded file metadata.
 
@@ -63,8 +157,11 @@ class Evidence(SQLModel, table=True):
         coordinates_json: Bounding box coordinates as JSON
         full_data_json: Complete extracted data as JSON
     """
+    # Covers per-artifact content-type counts without touching row data
+    __table_args__ = (Index("ix_evidence_artifact_content_type", "artifact_id", "content_type"),)
+
     id: str = Field(primary_key=True)
-    artifact_id: str
+    artifact_id: str = Field(index=True)
     locator: Optional[str] = None
     preview: Optional[str] = None
     content_type: Optional[str] = None
@@ -84,7 +181,7 @@ class Fact(SQLModel, table=True):
         evidence_id: Source evidence reference
     """
     id: str = Field(primary_key=True)
-    artifact_id: str
+    artifact_id: str = Field(index=True)
     report_week: Optional[str] = None
     entity: Optional[str] = None
     metrics_json: str
@@ -128,7 +225,8 @@ class Database:
 
     Attributes:
         db_url: SQLAlchemy database URL
-        engine: SQLAlchemy engine instance
+        engine: SQLAlchemy engine for writes
+        read_engine: SQLAlchemy engine for reads (query_only connections)
     """
 
     def __init__(self, db_path: Optional[str] = None):
@@ -139,10 +237,20 @@ class Database:
         """
         db_path = db_path or os.getenv("DB_PATH", "db.sqlite3")
         self.db_url = f"sqlite:///{db_path}"
-        self.engine = create_engine(self.db_url, echo=False)
+        self.engine = create_sqlite_engine(self.db_url)
+        with self.engine.connect() as conn:
+            # Persistent for the file: readers no longer block the writer
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
         SQLModel.metadata.create_all(self.engine)
         self._ensure_fact_evidence_column()
         self._ensure_artifact_columns()
+        self._ensure_log_columns()
+        self._ensure_indexes()
+        if db_path == ":memory:":
+            # Every connection to :memory: is a separate database
+            self.read_engine = self.engine
+        else:
+            self.read_engine = create_sqlite_engine(self.db_url, read_only=True)
 
     def _ensure_fact_evidence_column(self) -> None:
         """Ensure the fact table has the evidence_id column for backward compatibility."""
@@ -162,6 +270,31 @@ class Database:
             if "extra_json" not in column_names:
                 conn.exec_driver_sql("ALTER TABLE artifact ADD COLUMN extra_json TEXT")
 
+    def _ensure_log_columns(self) -> None:
+        """Add logentry.ts_epoch and backfill rows written before it existed.
+
+        The backfill also runs when the column was added by the Alembic
+        migration, which leaves existing rows NULL.
+        """
+        with self.engine.begin() as conn:
+            columns = conn.exec_driver_sql("PRAGMA table_info(logentry)").fetchall()
+            if "ts_epoch" not in {row[1] for row in columns}:
+                conn.exec_driver_sql("ALTER TABLE logentry ADD COLUMN ts_epoch REAL")
+            rows = conn.exec_driver_sql(
+                "SELECT id, ts FROM logentry WHERE ts IS NOT NULL AND ts_epoch IS NULL"
+            ).fetchall()
+            # Unparseable timestamps stay NULL
+            updates = [(epoch, log_id) for log_id, ts in rows if (epoch := log_ts_epoch(ts)) is not None]
+            if updates:
+                conn.exec_driver_sql("UPDATE logentry SET ts_epoch = ? WHERE id = ?", updates)
+
+    def _ensure_indexes(self) -> None:
+        """Create lookup indexes missing from databases created before they were declared."""
+        with self.engine.begin() as conn:
+            for table in SQLModel.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+
     def add_artifact(self, artifact: Dict) -> str:
         """Add a new artifact to the database.
 
@@ -204,22 +337,20 @@ class Database:
             s.add(row)
             s.commit()
 
-    def add_fact(self, fact: Dict):
-        metrics_json = json.dumps(fact.get("metrics", {}), ensure_ascii=False)
-        row = Fact(
+    @staticmethod
+    def _fact_row(fact: Dict) -> Fact:
+        return Fact(
             id=fact["id"],
             artifact_id=fact.get("artifact_id", ""),
             report_week=fact.get("report_week"),
             entity=fact.get("entity"),
-            metrics_json=metrics_json,
+            metrics_json=json.dumps(fact.get("metrics", {}), ensure_ascii=False),
             evidence_id=fact.get("evidence_id"),
         )
-        with Session(self.engine) as s:
-            s.add(row)
-            s.commit()
 
-    def add_evidence(self, evidence: Dict):
-        row = Evidence(
+    @staticmethod
+    def _evidence_row(evidence: Dict) -> Evidence:
+        return Evidence(
             id=evidence["id"],
             artifact_id=evidence.get("artifact_id", ""),
             locator=evidence.get("locator"),
@@ -228,9 +359,37 @@ class Database:
             coordinates_json=json.dumps(evidence.get("coordinates")) if evidence.get("coordinates") is not None else None,
             full_data_json=json.dumps(evidence.get("full_data")) if evidence.get("full_data") is not None else None,
         )
+
+    def _add_rows(self, rows: List[SQLModel]) -> int:
+        """Insert ``rows`` in a single transaction (one commit)."""
+        if not rows:
+            return 0
         with Session(self.engine) as s:
-            s.add(row)
+            s.add_all(rows)
             s.commit()
+        return len(rows)
+
+    def add_fact(self, fact: Dict):
+        self._add_rows([self._fact_row(fact)])
+
+    def add_facts(self, facts: List[Dict]) -> int:
+        """Insert many facts in one transaction.
+
+        Returns:
+            Number of facts written.
+        """
+        return self._add_rows([self._fact_row(f) for f in facts])
+
+    def add_evidence(self, evidence: Dict):
+        self._add_rows([self._evidence_row(evidence)])
+
+    def add_evidence_many(self, evidence: List[Dict]) -> int:
+        """Insert many evidence rows in one transaction.
+
+        Returns:
+            Number of evidence rows written.
+        """
+        return self._add_rows([self._evidence_row(e) for e in evidence])
 
     def store_summary(self, summary: Dict) -> str:
         payload = SummaryRow(
@@ -265,7 +424,7 @@ class Database:
         return result_id
 
     def get_summary(self, scope_key: str, style: str) -> Optional[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             stmt = (
                 select(SummaryRow)
                 .where(SummaryRow.scope_key == scope_key)
@@ -283,7 +442,7 @@ class Database:
         scope: Optional[str] = None,
         style: Optional[str] = None,
     ) -> List[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             stmt = select(SummaryRow)
             if scope:
                 stmt = stmt.where(SummaryRow.scope == scope)
@@ -307,75 +466,114 @@ class Database:
             "created_at": row.created_at,
         }
 
+    @staticmethod
+    def _fact_to_dict(f: Fact) -> Dict:
+        return {
+            "id": f.id,
+            "artifact_id": f.artifact_id,
+            "report_week": f.report_week,
+            "entity": f.entity,
+            "metrics": json.loads(f.metrics_json or "{}"),
+            "evidence_id": f.evidence_id,
+        }
+
+    @staticmethod
+    def _evidence_to_dict(e: Evidence, include_full_data: bool = True) -> Dict:
+        item = {
+            "id": e.id,
+            "artifact_id": e.artifact_id,
+            "locator": e.locator,
+            "preview": e.preview,
+            "content_type": e.content_type,
+            "coordinates": json.loads(e.coordinates_json) if e.coordinates_json else None,
+        }
+        if include_full_data:
+            item["full_data"] = json.loads(e.full_data_json) if e.full_data_json else None
+        return item
+
+    @staticmethod
+    def _artifact_to_dict(row: Artifact) -> Dict:
+        data = row.model_dump()
+        extra_payload = data.pop("extra_json", None)
+        if extra_payload:
+            try:
+                data["extras"] = json.loads(extra_payload)
+            except json.JSONDecodeError:
+                data["extras"] = extra_payload
+        else:
+            data["extras"] = None
+        return data
+
     def get_facts(self, report_week: Optional[str] = None) -> List[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             if report_week:
                 rows = s.exec(select(Fact).where(Fact.report_week == report_week)).all()
             else:
                 rows = s.exec(select(Fact)).all()
-        out: List[Dict] = []
-        for f in rows:
-            out.append(
-                {
-                    "id": f.id,
-                    "artifact_id": f.artifact_id,
-                    "report_week": f.report_week,
-                    "entity": f.entity,
-                    "metrics": json.loads(f.metrics_json or "{}"),
-                    "evidence_id": f.evidence_id,
-                }
-            )
-        return out
+        return [self._fact_to_dict(f) for f in rows]
+
+    def get_facts_for_artifact(self, artifact_id: str, report_week: Optional[str] = None) -> List[Dict]:
+        """Facts extracted from one artifact, optionally limited to a report week."""
+        with Session(self.read_engine) as s:
+            query = select(Fact).where(Fact.artifact_id == artifact_id)
+            if report_week:
+                query = query.where(Fact.report_week == report_week)
+            rows = s.exec(query).all()
+        return [self._fact_to_dict(f) for f in rows]
 
     def get_evidence(self, evidence_id: str) -> Optional[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             e = s.get(Evidence, evidence_id)
         if not e:
             return None
-        return {
-            "id": e.id,
-            "artifact_id": e.artifact_id,
-            "locator": e.locator,
-            "preview": e.preview,
-            "content_type": e.content_type,
-            "coordinates": json.loads(e.coordinates_json) if e.coordinates_json else None,
-            "full_data": json.loads(e.full_data_json) if e.full_data_json else None,
-        }
+        return self._evidence_to_dict(e)
 
     def get_all_evidence(self) -> List[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             rows = s.exec(select(Evidence)).all()
-        out: List[Dict] = []
-        for e in rows:
-            out.append(
-                {
-                    "id": e.id,
-                    "artifact_id": e.artifact_id,
-                    "locator": e.locator,
-                    "preview": e.preview,
-                    "content_type": e.content_type,
-                    "coordinates": json.loads(e.coordinates_json) if e.coordinates_json else None,
-                    "full_data": json.loads(e.full_data_json) if e.full_data_json else None,
-                }
-            )
+        return [self._evidence_to_dict(e) for e in rows]
+
+    def get_evidence_for_artifact(self, artifact_id: str, include_full_data: bool = False) -> List[Dict]:
+        """Evidence of one artifact.
+
+        ``full_data_json`` is deferred and never read unless ``include_full_data``
+        is set; without it the returned items carry no ``full_data`` key.
+        """
+        with Session(self.read_engine) as s:
+            query = select(Evidence).where(Evidence.artifact_id == artifact_id)
+            if not include_full_data:
+                query = query.options(defer(Evidence.full_data_json))
+            rows = s.exec(query).all()
+            return [self._evidence_to_dict(e, include_full_data) for e in rows]
+
+    def count_evidence_by_type(self, artifact_id: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Evidence counts per artifact and content type, computed with GROUP BY.
+
+        Returns:
+            ``{artifact_id: {content_type: count}}``; a missing content type is
+            reported as an empty string.
+        """
+        query = select(Evidence.artifact_id, Evidence.content_type, func.count()).group_by(
+            Evidence.artifact_id, Evidence.content_type
+        )
+        if artifact_id:
+            query = query.where(Evidence.artifact_id == artifact_id)
+        with Session(self.read_engine) as s:
+            rows = s.exec(query).all()
+        out: Dict[str, Dict[str, int]] = {}
+        for art_id, content_type, n in rows:
+            out.setdefault(art_id, {})[content_type or ""] = n
         return out
 
     def get_artifacts(self) -> List[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             rows = s.exec(select(Artifact)).all()
-        items: List[Dict] = []
-        for row in rows:
-            data = row.model_dump()
-            extra_payload = data.pop("extra_json", None)
-            if extra_payload:
-                try:
-                    data["extras"] = json.loads(extra_payload)
-                except json.JSONDecodeError:
-                    data["extras"] = extra_payload
-            else:
-                data["extras"] = None
-            items.append(data)
-        return items
+        return [self._artifact_to_dict(row) for row in rows]
+
+    def get_artifact(self, artifact_id: str) -> Optional[Dict]:
+        with Session(self.read_engine) as s:
+            row = s.get(Artifact, artifact_id)
+        return self._artifact_to_dict(row) if row else None
 
     def reset(self) -> None:
         """
@@ -410,6 +608,10 @@ class Database:
     def store_search_chunks(self, chunks: List[Dict]) -> None:
         return None
 
+    def delete_search_chunks(self, ids: List[str]) -> None:
+        """No-op for SQLite backend; Supabase variant overrides."""
+        return None
+
 # -------- Extended schema for LMS_DOCS --------
 
 class Document(SQLModel, table=True):
@@ -423,7 +625,7 @@ class Document(SQLModel, table=True):
 
 class Section(SQLModel, table=True):
     id: str = Field(primary_key=True)
-    document_id: str
+    document_id: str = Field(index=True)
     order: int
     text: str
     page: int | None = None
@@ -432,14 +634,14 @@ class Section(SQLModel, table=True):
 
 class DocTable(SQLModel, table=True):
     id: str = Field(primary_key=True)
-    document_id: str
+    document_id: str = Field(index=True)
     order: int
     table_content_json: str  # rows/cells JSON
 
 
 class APIEndpoint(SQLModel, table=True):
     id: str = Field(primary_key=True)
-    document_id: str
+    document_id: str = Field(index=True)
     name: str | None = None
     method: str
     path: str
@@ -453,7 +655,7 @@ class DocumentEntity(SQLModel, table=True):
     __tablename__ = "document_entities"
 
     id: str = Field(primary_key=True)
-    document_id: str
+    document_id: str = Field(index=True)
     label: str
     text: str
     start_char: int | None = None
@@ -474,7 +676,7 @@ class DocumentMetricHit(SQLModel, table=True):
     __tablename__ = "document_metric_hits"
 
     id: str = Field(primary_key=True)
-    document_id: str
+    document_id: str = Field(index=True)
     type: str
     value: str | None = None
     metric_context: str | None = None
@@ -485,10 +687,11 @@ class DocumentMetricHit(SQLModel, table=True):
 
 class LogEntry(SQLModel, table=True):
     id: str = Field(primary_key=True)
-    document_id: str
+    document_id: str = Field(index=True)
     ts: str | None = None
-    level: str | None = None
-    code: str | None = None
+    ts_epoch: float | None = Field(default=None, index=True)  # ts normalized by log_ts_epoch
+    level: str | None = Field(default=None, index=True)
+    code: str | None = Field(default=None, index=True)
     component: str | None = None
     message: str | None = None
     attrs_json: str | None = None
@@ -496,7 +699,7 @@ class LogEntry(SQLModel, table=True):
 
 class TagRow(SQLModel, table=True):
     id: str = Field(primary_key=True)
-    document_id: str
+    document_id: str = Field(index=True)
     tag: str
     score: float | None = None
     source_ptr: str | None = None
@@ -505,7 +708,7 @@ class TagRow(SQLModel, table=True):
 
 class TagPrompt(SQLModel, table=True):
     id: str = Field(primary_key=True)
-    document_id: str
+    document_id: str = Field(index=True)
     prompt_text: str
     examples_json: str | None = None
     created_at: str | None = None
@@ -519,11 +722,11 @@ class CipherMemory(SQLModel, table=True):
     __tablename__ = "cipher_memory"
 
     id: str = Field(primary_key=True)
-    category: str
+    category: str = Field(index=True)
     content_json: str  # JSONB
     context_json: str | None = None  # JSONB
     user_id: str | None = None  # Maps to auth.uid() for RLS scoping
-    created_at: str | None = None
+    created_at: str | None = Field(default=None, index=True)
 
 
 class UserPref(SQLModel, table=True):
@@ -554,6 +757,44 @@ class ExtendedDatabase(Database):
     def __init__(self, db_path: Optional[str] = None):
         super().__init__(db_path)
         _ensure_extended(self.engine)
+        self._log_fts = self._ensure_log_fts()
+
+    def _ensure_log_fts(self) -> bool:
+        """Maintain a trigram FTS5 index of log messages for ``list_logs(q=...)``.
+
+        The index is kept in sync by triggers and joined back on ``id``.
+
+        Returns:
+            False when SQLite lacks FTS5 or the trigram tokenizer; ``q`` then
+            falls back to LIKE.
+        """
+        try:
+            with self.engine.begin() as conn:
+                exists = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'logentry_fts'"
+                ).fetchone()
+                if exists:
+                    return True
+                conn.exec_driver_sql(
+                    "CREATE VIRTUAL TABLE logentry_fts USING fts5(id UNINDEXED, message, tokenize='trigram')"
+                )
+                conn.exec_driver_sql(
+                    "CREATE TRIGGER IF NOT EXISTS logentry_fts_ai AFTER INSERT ON logentry BEGIN "
+                    "INSERT INTO logentry_fts (id, message) VALUES (new.id, new.message); END"
+                )
+                conn.exec_driver_sql(
+                    "CREATE TRIGGER IF NOT EXISTS logentry_fts_ad AFTER DELETE ON logentry BEGIN "
+                    "DELETE FROM logentry_fts WHERE id = old.id; END"
+                )
+                conn.exec_driver_sql(
+                    "CREATE TRIGGER IF NOT EXISTS logentry_fts_au AFTER UPDATE OF message ON logentry BEGIN "
+                    "DELETE FROM logentry_fts WHERE id = old.id; "
+                    "INSERT INTO logentry_fts (id, message) VALUES (new.id, new.message); END"
+                )
+                conn.exec_driver_sql("INSERT INTO logentry_fts (id, message) SELECT id, message FROM logentry")
+            return True
+        except OperationalError:
+            return False
 
     # ---- document helpers ----
     def add_document(self, doc: Dict) -> str:
@@ -564,32 +805,45 @@ class ExtendedDatabase(Database):
         return doc["id"]
 
     def add_section(self, section: Dict):
-        with Session(self.engine) as s:
-            s.add(Section(**section))
-            s.commit()
+        self._add_rows([Section(**section)])
+
+    def add_sections(self, sections: List[Dict]) -> int:
+        return self._add_rows([Section(**row) for row in sections])
+
+    @staticmethod
+    def _table_row(table: Dict) -> DocTable:
+        t_data = dict(table)
+        if "json" in t_data:
+            t_data["table_content_json"] = t_data.pop("json")
+        return DocTable(**t_data)
 
     def add_table(self, table: Dict):
-        with Session(self.engine) as s:
-            t_data = dict(table)
-            if "json" in t_data:
-                t_data["table_content_json"] = t_data.pop("json")
-            s.add(DocTable(**t_data))
-            s.commit()
+        self._add_rows([self._table_row(table)])
+
+    def add_tables(self, tables: List[Dict]) -> int:
+        return self._add_rows([self._table_row(row) for row in tables])
 
     def add_api(self, api: Dict):
-        with Session(self.engine) as s:
-            s.add(APIEndpoint(**api))
-            s.commit()
+        self._add_rows([APIEndpoint(**api)])
+
+    def add_apis(self, apis: List[Dict]) -> int:
+        return self._add_rows([APIEndpoint(**row) for row in apis])
+
+    @staticmethod
+    def _log_row(log: Dict) -> LogEntry:
+        return LogEntry(**{**log, "ts_epoch": log_ts_epoch(log.get("ts"))})
 
     def add_log(self, log: Dict):
-        with Session(self.engine) as s:
-            s.add(LogEntry(**log))
-            s.commit()
+        self._add_rows([self._log_row(log)])
+
+    def add_logs(self, logs: List[Dict]) -> int:
+        return self._add_rows([self._log_row(row) for row in logs])
 
     def add_tag(self, tag: Dict):
-        with Session(self.engine) as s:
-            s.add(TagRow(**tag))
-            s.commit()
+        self._add_rows([TagRow(**tag)])
+
+    def add_tags(self, tags: List[Dict]) -> int:
+        return self._add_rows([TagRow(**row) for row in tags])
 
     def store_entities(self, document_id: str, entities: List[Dict]) -> None:
         with Session(self.engine) as s:
@@ -638,7 +892,7 @@ class ExtendedDatabase(Database):
             s.commit()
 
     def list_entities(self, document_id: str | None = None, label: str | None = None) -> List[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             stmt = select(DocumentEntity)
             if document_id:
                 stmt = stmt.where(DocumentEntity.document_id == document_id)
@@ -661,14 +915,14 @@ class ExtendedDatabase(Database):
         ]
 
     def get_structure(self, document_id: str) -> Optional[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             row = s.get(DocumentStructureRow, document_id)
         if not row or not row.hierarchy_json:
             return None
         return json.loads(row.hierarchy_json)
 
     def list_metric_hits(self, document_id: str | None = None, metric_type: str | None = None) -> List[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             stmt = select(DocumentMetricHit)
             if document_id:
                 stmt = stmt.where(DocumentMetricHit.document_id == document_id)
@@ -691,51 +945,46 @@ class ExtendedDatabase(Database):
 
     def list_logs(self, level: str | None = None, code: str | None = None, q: str | None = None,
                   ts_from: str | None = None, ts_to: str | None = None,
-                  document_id: str | None = None) -> List[Dict]:
-        with Session(self.engine) as s:
-            stmt = select(LogEntry)
-            if level:
-                stmt = stmt.where(LogEntry.level == level)
-            if code:
-                stmt = stmt.where(LogEntry.code == code)
-            if document_id:
-                stmt = stmt.where(LogEntry.document_id == document_id)
+                  document_id: str | None = None, limit: int | None = None,
+                  offset: int = 0) -> List[Dict]:
+        """List log entries matching all given filters, in insertion order.
+
+        ``q`` is a case-insensitive substring of the message. The
+        ``ts_from``/``ts_to`` window is inclusive; entries whose timestamp
+        cannot be parsed are kept.
+        """
+        stmt = select(LogEntry)
+        if level:
+            stmt = stmt.where(LogEntry.level == level)
+        if code:
+            stmt = stmt.where(LogEntry.code == code)
+        if document_id:
+            stmt = stmt.where(LogEntry.document_id == document_id)
+        if q:
+            if self._log_fts and len(q) >= 3:
+                # A trigram phrase match is a substring match, served by the FTS index
+                stmt = stmt.where(
+                    text("logentry.id IN (SELECT id FROM logentry_fts WHERE logentry_fts MATCH :log_q)")
+                    .bindparams(log_q='"' + q.replace('"', '""') + '"')
+                )
+            else:
+                pattern = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                stmt = stmt.where(LogEntry.message.ilike(f"%{pattern}%", escape="\\"))
+        t_from = log_ts_epoch(ts_from)
+        if t_from is not None:
+            stmt = stmt.where(or_(LogEntry.ts_epoch.is_(None), LogEntry.ts_epoch >= t_from))
+        t_to = log_ts_epoch(ts_to)
+        if t_to is not None:
+            stmt = stmt.where(or_(LogEntry.ts_epoch.is_(None), LogEntry.ts_epoch <= t_to))
+        stmt = stmt.order_by(text("logentry.rowid"))
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if offset:
+            stmt = stmt.offset(offset)
+        with Session(self.read_engine) as s:
             rows = s.exec(stmt).all()
-        out = []
-        # parse time bounds once
-        from datetime import datetime
-        t_from = None
-        t_to = None
-        def parse_ts(sval: str | None):
-            if not sval:
-                return None
-            # try common formats
-            for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
-                try:
-                    return datetime.strptime(sval[:len(fmt)], fmt)
-                except Exception:
-                    continue
-            return None
-        if ts_from:
-            t_from = parse_ts(ts_from)
-        if ts_to:
-            t_to = parse_ts(ts_to)
-        for e in rows:
-            # apply q filter
-            if q and (q.lower() not in (e.message or '').lower()):
-                continue
-            # apply time window if possible
-            if t_from or t_to:
-                et = parse_ts(e.ts)
-                if et is None:
-                    # skip when we can't compare
-                    pass
-                else:
-                    if t_from and et < t_from:
-                        continue
-                    if t_to and et > t_to:
-                        continue
-            out.append({
+        return [
+            {
                 "id": e.id,
                 "document_id": e.document_id,
                 "ts": e.ts,
@@ -744,12 +993,22 @@ class ExtendedDatabase(Database):
                 "component": e.component,
                 "message": e.message,
                 "attrs": json.loads(e.attrs_json) if e.attrs_json else None,
-            })
-        return out
+            }
+            for e in rows
+        ]
 
-    def list_apis(self, tag: str | None = None, method: str | None = None, path_like: str | None = None) -> List[Dict]:
-        with Session(self.engine) as s:
-            rows = s.exec(select(APIEndpoint)).all()
+    def list_apis(
+        self,
+        tag: str | None = None,
+        method: str | None = None,
+        path_like: str | None = None,
+        document_id: str | None = None,
+    ) -> List[Dict]:
+        stmt = select(APIEndpoint)
+        if document_id:
+            stmt = stmt.where(APIEndpoint.document_id == document_id)
+        with Session(self.read_engine) as s:
+            rows = s.exec(stmt).all()
         out = []
         for a in rows:
             if method and a.method.lower() != method.lower():
@@ -772,7 +1031,7 @@ class ExtendedDatabase(Database):
         return out
 
     def list_tags(self, document_id: str | None = None, q: str | None = None) -> List[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             rows = s.exec(select(TagRow)).all()
         out = []
         for t in rows:
@@ -794,7 +1053,7 @@ class ExtendedDatabase(Database):
         return out
 
     def has_tag(self, document_id: str, tag: str) -> bool:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             rows = s.exec(select(TagRow).where(TagRow.document_id == document_id)).all()
         for r in rows:
             if r.tag.strip().lower() == tag.strip().lower():
@@ -819,7 +1078,7 @@ class ExtendedDatabase(Database):
         return row.id
 
     def get_latest_tag_prompt(self, document_id: str) -> Optional[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             rows = s.exec(select(TagPrompt).where(TagPrompt.document_id == document_id)).all()
         if not rows:
             return None
@@ -836,7 +1095,7 @@ class ExtendedDatabase(Database):
         }
 
     def list_tag_prompt_history(self, document_id: str, limit: int = 20) -> List[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             rows = s.exec(select(TagPrompt).where(TagPrompt.document_id == document_id)).all()
         rows.sort(key=lambda r: r.created_at or "", reverse=True)
         out: List[Dict] = []
@@ -853,7 +1112,7 @@ class ExtendedDatabase(Database):
         return out
 
     def list_documents(self, type: str | None = None) -> List[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             stmt = select(Document)
             if type:
                 stmt = stmt.where(Document.type == type)
@@ -861,7 +1120,7 @@ class ExtendedDatabase(Database):
         return [r.model_dump() for r in rows]
 
     def list_log_messages(self, document_id: str) -> List[str]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             rows = s.exec(select(LogEntry).where(LogEntry.document_id == document_id)).all()
         return [r.message for r in rows if r.message]
 
@@ -895,7 +1154,7 @@ class ExtendedDatabase(Database):
         q: Optional[str] = None,
         user_id: Optional[str] = None
     ) -> List[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             stmt = select(CipherMemory)
             if category:
                 stmt = stmt.where(CipherMemory.category == category)
@@ -929,7 +1188,7 @@ class ExtendedDatabase(Database):
         return results
 
     def get_user_prefs(self, user_id: str) -> Dict:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             row = s.get(UserPref, user_id)
         if row and row.preferences_json:
             return json.loads(row.preferences_json)
@@ -994,7 +1253,7 @@ class ExtendedDatabase(Database):
         return target_id
 
     def list_skills(self, enabled_only: bool = True) -> List[Dict]:
-        with Session(self.engine) as s:
+        with Session(self.read_engine) as s:
             stmt = select(SkillRegistry)
             if enabled_only:
                 stmt = stmt.where(SkillRegistry.enabled == True)
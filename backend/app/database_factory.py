@@ -27,17 +27,25 @@ LOGGER = logging.getLogger(__name__)
 WRITE_METHODS = {
     "add_artifact",
     "add_fact",
+    "add_facts",
     "add_evidence",
+    "add_evidence_many",
     "add_document",
     "add_section",
+    "add_sections",
     "add_table",
+    "add_tables",
     "add_api",
+    "add_apis",
     "add_log",
+    "add_logs",
     "add_tag",
+    "add_tags",
     "save_tag_prompt",
     "reset",
     "reset_search_chunks",
     "store_search_chunks",
+    "delete_search_chunks",
     "store_entities",
     "store_structure",
     "store_metric_hits",
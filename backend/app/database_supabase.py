@@ -7,6 +7,8 @@ import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from app.database import log_ts_epoch
+
 try:  # pragma: no cover - supabase client optional during tests
     from supabase import Client, ClientOptions, create_client  # type: ignore
 except Exception:  # pragma: no cover - package may be absent in local/offline envs
@@ -17,6 +19,9 @@ except Exception:  # pragma: no cover - package may be absent in local/offline e
 
 LOGGER = logging.getLogger(__name__)
 
+# Evidence columns returned when full_data is not requested
+_EVIDENCE_SUMMARY_COLUMNS = "id,artifact_id,locator,preview,content_type,coordinates"
+
 
 class SupabaseUnavailable(RuntimeError):
     """Raised when Supabase credentials or SDK are missing."""
@@ -58,6 +63,7 @@ class SupabaseDatabase:
             if timeout is not None
             else int(os.getenv("SUPABASE_TIMEOUT", "10"))
         )
+        self.batch_size = max(1, int(os.getenv("SUPABASE_BATCH_SIZE", "500")))
 
     # ------------------------------------------------------------------ helpers
     def _table(self, name: str):
@@ -81,6 +87,22 @@ class SupabaseDatabase:
     def _now_iso(self) -> str:
         return datetime.utcnow().isoformat(timespec="seconds") + "Z"
 
+    def _upsert_many(self, table: str, rows: List[Dict[str, Any]], *, operation: str) -> int:
+        """Upsert ``rows`` in chunks of ``batch_size`` (one request per chunk)."""
+        # PostgREST bulk upserts send one column list per request and write NULL
+        # for a column a row lacks. Grouping rows by key set keeps an upsert
+        # from clearing existing columns the caller never set.
+        groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(frozenset(row), []).append(row)
+        for group in groups.values():
+            for start in range(0, len(group), self.batch_size):
+                self._run(
+                    self._table(table).upsert(group[start:start + self.batch_size], on_conflict="id"),
+                    operation=operation,
+                )
+        return len(rows)
+
     # ----------------------------------------------------------------- mutations
     def add_artifact(self, artifact: Dict) -> str:
         self._run(
@@ -119,21 +141,36 @@ class SupabaseDatabase:
             operation="update_artifact",
         )
 
-    def add_fact(self, fact: Dict) -> None:
-        payload = {**fact, "metrics": fact.get("metrics", {})}
-        self._run(self._table("facts").upsert(payload, on_conflict="id"), operation="add_fact")
+    @staticmethod
+    def _fact_payload(fact: Dict) -> Dict[str, Any]:
+        return {**fact, "metrics": fact.get("metrics", {})}
 
-    def add_evidence(self, evidence: Dict) -> None:
+    @staticmethod
+    def _evidence_payload(evidence: Dict) -> Dict[str, Any]:
         payload = evidence.copy()
         if isinstance(payload.get("coordinates"), (dict, list)):
             payload.setdefault("coordinates", payload["coordinates"])
         if "full_data" in payload and payload["full_data"] is None:
             payload.pop("full_data", None)
+        return payload
+
+    def add_fact(self, fact: Dict) -> None:
+        self._run(self._table("facts").upsert(self._fact_payload(fact), on_conflict="id"), operation="add_fact")
+
+    def add_facts(self, facts: List[Dict]) -> int:
+        return self._upsert_many("facts", [self._fact_payload(f) for f in facts], operation="add_facts")
+
+    def add_evidence(self, evidence: Dict) -> None:
         self._run(
-            self._table("evidence").upsert(payload, on_conflict="id"),
+            self._table("evidence").upsert(self._evidence_payload(evidence), on_conflict="id"),
             operation="add_evidence",
         )
 
+    def add_evidence_many(self, evidence: List[Dict]) -> int:
+        return self._upsert_many(
+            "evidence", [self._evidence_payload(e) for e in evidence], operation="add_evidence_many"
+        )
+
     def add_document(self, doc: Dict) -> str:
         self._run(self._table("documents").upsert(doc, on_conflict="id"), operation="add_document")
         return doc["id"]
@@ -141,10 +178,17 @@ class SupabaseDatabase:
     def add_section(self, section: Dict) -> None:
         self._run(self._table("document_sections").upsert(section, on_conflict="id"), operation="add_section")
 
+    def add_sections(self, sections: List[Dict]) -> int:
+        return self._upsert_many("document_sections", list(sections), operation="add_sections")
+
     def add_table(self, table: Dict) -> None:
         self._run(self._table("document_tables").upsert(table, on_conflict="id"), operation="add_table")
 
-    def add_api(self, api: Dict) -> None:
+    def add_tables(self, tables: List[Dict]) -> int:
+        return self._upsert_many("document_tables", list(tables), operation="add_tables")
+
+    @staticmethod
+    def _api_payload(api: Dict) -> Dict[str, Any]:
         payload = api.copy()
         # Handle tags_json -> tags mapping (SQLite uses tags_json, Supabase uses tags)
         if "tags_json" in payload:
@@ -160,9 +204,16 @@ class SupabaseDatabase:
                     payload["tags"] = tags_value
         if isinstance(payload.get("tags"), list):
             payload["tags"] = payload["tags"]
-        self._run(self._table("api_endpoints").upsert(payload, on_conflict="id"), operation="add_api")
+        return payload
 
-    def add_log(self, log: Dict) -> None:
+    def add_api(self, api: Dict) -> None:
+        self._run(self._table("api_endpoints").upsert(self._api_payload(api), on_conflict="id"), operation="add_api")
+
+    def add_apis(self, apis: List[Dict]) -> int:
+        return self._upsert_many("api_endpoints", [self._api_payload(a) for a in apis], operation="add_apis")
+
+    @staticmethod
+    def _log_payload(log: Dict) -> Dict[str, Any]:
         payload = log.copy()
         # Handle attrs_json -> attrs mapping (SQLite uses attrs_json, Supabase uses attrs)
         if "attrs_json" in payload:
@@ -171,11 +222,20 @@ class SupabaseDatabase:
                 payload["attrs"] = attrs_value
         if isinstance(payload.get("attrs"), (dict, list)):
             payload["attrs"] = payload["attrs"]
-        self._run(self._table("log_entries").upsert(payload, on_conflict="id"), operation="add_log")
+        return payload
+
+    def add_log(self, log: Dict) -> None:
+        self._run(self._table("log_entries").upsert(self._log_payload(log), on_conflict="id"), operation="add_log")
+
+    def add_logs(self, logs: List[Dict]) -> int:
+        return self._upsert_many("log_entries", [self._log_payload(r) for r in logs], operation="add_logs")
 
     def add_tag(self, tag: Dict) -> None:
         self._run(self._table("tags").upsert(tag, on_conflict="id"), operation="add_tag")
 
+    def add_tags(self, tags: List[Dict]) -> int:
+        return self._upsert_many("tags", list(tags), operation="add_tags")
+
     def save_tag_prompt(
         self,
         document_id: str,
@@ -336,12 +396,52 @@ class SupabaseDatabase:
         )
         return rows[0] if rows else None
 
+    def get_facts_for_artifact(self, artifact_id: str, report_week: Optional[str] = None) -> List[Dict]:
+        query = self._table("facts").select("*").eq("artifact_id", artifact_id)
+        if report_week:
+            query = query.eq("report_week", report_week)
+        rows = self._run(query, operation="get_facts_for_artifact")
+        for row in rows:
+            metrics = row.get("metrics")
+            if isinstance(metrics, str):
+                try:
+                    row["metrics"] = json.loads(metrics)
+                except Exception:
+                    row["metrics"] = {}
+        return rows
+
     def get_all_evidence(self) -> List[Dict]:
         return self._run(self._table("evidence").select("*"), operation="get_all_evidence")
 
+    def get_evidence_for_artifact(self, artifact_id: str, include_full_data: bool = False) -> List[Dict]:
+        columns = "*" if include_full_data else _EVIDENCE_SUMMARY_COLUMNS
+        return self._run(
+            self._table("evidence").select(columns).eq("artifact_id", artifact_id),
+            operation="get_evidence_for_artifact",
+        )
+
+    def count_evidence_by_type(self, artifact_id: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        # PostgREST has no GROUP BY; fetch only the two key columns and count here.
+        query = self._table("evidence").select("artifact_id,content_type")
+        if artifact_id:
+            query = query.eq("artifact_id", artifact_id)
+        out: Dict[str, Dict[str, int]] = {}
+        for row in self._run(query, operation="count_evidence_by_type"):
+            bucket = out.setdefault(row.get("artifact_id"), {})
+            ctype = row.get("content_type") or ""
+            bucket[ctype] = bucket.get(ctype, 0) + 1
+        return out
+
     def get_artifacts(self) -> List[Dict]:
         return self._run(self._table("artifacts").select("*"), operation="get_artifacts")
 
+    def get_artifact(self, artifact_id: str) -> Optional[Dict]:
+        rows = self._run(
+            self._table("artifacts").select("*").eq("id", artifact_id),
+            operation="get_artifact",
+        )
+        return rows[0] if rows else None
+
     def list_entities(self, document_id: Optional[str] = None, label: Optional[str] = None) -> List[Dict]:
         query = self._table("document_entities").select("*")
         if document_id:
@@ -416,6 +516,14 @@ class SupabaseDatabase:
             operation="store_search_chunks",
         )
 
+    def delete_search_chunks(self, ids: List[str]) -> None:
+        if not ids:
+            return
+        self._run(
+            self._table("search_chunks").delete().in_("id", list(ids)),
+            operation="delete_search_chunks",
+        )
+
     def list_documents(self, type: Optional[str] = None) -> List[Dict]:
         query = self._table("documents").select("*")
         if type:
@@ -430,7 +538,14 @@ class SupabaseDatabase:
         ts_from: Optional[str] = None,
         ts_to: Optional[str] = None,
         document_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> List[Dict]:
+        """List log entries matching all given filters, ordered by id.
+
+        Same rules as ``Database.list_logs``: the ``ts_from``/``ts_to`` window
+        is inclusive, and entries whose timestamp cannot be parsed are kept.
+        """
         query = self._table("log_entries").select("*")
         if level:
             query = query.eq("level", level)
@@ -438,46 +553,44 @@ class SupabaseDatabase:
             query = query.eq("code", code)
         if document_id:
             query = query.eq("document_id", document_id)
-        rows = self._run(query, operation="list_logs")
-
-        def _matches(row: Dict) -> bool:
-            msg = (row.get("message") or "").lower()
-            if q and q.lower() not in msg:
-                return False
-            if not (ts_from or ts_to):
-                return True
-            ts_value = row.get("ts")
-            if not ts_value:
-                return False
-            try:
-                parsed = datetime.fromisoformat(ts_value.replace("Z", "+00:00"))
-            except Exception:
-                return False
-            if ts_from:
-                try:
-                    if parsed < datetime.fromisoformat(ts_from.replace("Z", "+00:00")):
-                        return False
-                except Exception:
-                    pass
-            if ts_to:
-                try:
-                    if parsed > datetime.fromisoformat(ts_to.replace("Z", "+00:00")):
-                        return False
-                except Exception:
-                    pass
-            return True
-
-        return [row for row in rows if _matches(row)]
+        if q:
+            # Served by the pg_trgm index from migrations/supabase/002_log_search.sql
+            pattern = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            query = query.ilike("message", f"%{pattern}%")
+        query = query.order("id")
+        t_from = log_ts_epoch(ts_from)
+        t_to = log_ts_epoch(ts_to)
+        if t_from is None and t_to is None:
+            if limit is not None:
+                query = query.range(offset, offset + limit - 1)
+            elif offset:
+                query = query.range(offset, 2**31 - 1)
+            return self._run(query, operation="list_logs")
+
+        # ts is free-form text here, so the window is applied after normalizing
+        rows = []
+        for row in self._run(query, operation="list_logs"):
+            epoch = log_ts_epoch(row.get("ts"))
+            if epoch is not None and (
+                (t_from is not None and epoch < t_from) or (t_to is not None and epoch > t_to)
+            ):
+                continue
+            rows.append(row)
+        end = None if limit is None else offset + limit
+        return rows[offset:end]
 
     def list_apis(
         self,
         tag: Optional[str] = None,
         method: Optional[str] = None,
         path_like: Optional[str] = None,
+        document_id: Optional[str] = None,
     ) -> List[Dict]:
         query = self._table("api_endpoints").select("*")
         if method:
             query = query.eq("method", method.upper())
+        if document_id:
+            query = query.eq("document_id", document_id)
         rows = self._run(query, operation="list_apis")
         out: List[Dict] = []
         for row in rows:
@@ -0,0 +1,253 @@
+"""Persistent on-disk embedding cache.
+
+Embeddings are keyed by ``(provider, model, sha256(text))`` and stored as
+float32 blobs in a small SQLite database so that index rebuilds and process
+restarts only embed text that has not been seen before.
+
+Lookups only read. The ``last_used`` stamps of cache hits are buffered in
+memory and written in one batch with the next insert (before eviction picks
+its victims), once the buffer is large, or on close.
+
+Configuration (environment):
+    EMBEDDING_CACHE_ENABLED: Set to false to disable the cache (default: true)
+    EMBEDDING_CACHE_PATH: SQLite file location (default: artifacts/embedding_cache.sqlite3)
+    EMBEDDING_CACHE_MAX_ENTRIES: Size cap; least recently used rows are evicted (default: 200000)
+
+Classes:
+    EmbeddingCache: SQLite-backed cache with LRU eviction and hit/miss counters
+
+Functions:
+    get_embedding_cache: Return the shared cache for the configured path
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path("artifacts") / "embedding_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 200_000
+
+# SQLite limits the number of bound parameters per statement.
+_QUERY_BATCH = 500
+# Buffered last_used updates written by a lookup at most once per this many keys
+_TOUCH_FLUSH = 4096
+
+
+def text_hash(text: str) -> str:
+    """Return the sha256 hex digest used as the cache key for ``text``."""
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache with LRU eviction.
+
+    Attributes:
+        path: Location of the SQLite database file
+        max_entries: Maximum number of cached vectors before eviction
+        hits: Number of texts served from the cache
+        misses: Number of texts that had to be embedded
+        evictions: Number of rows evicted to respect ``max_entries``
+    """
+
+    def __init__(self, path: Path | str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # (provider, model, text_hash) -> last_used not yet written
+        self._touched: Dict[tuple, float] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (provider, model, text_hash)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, provider: str, model: str, texts: Sequence[str]) -> Dict[int, np.ndarray]:
+        """Look up cached vectors for ``texts``.
+
+        Returns:
+            Mapping of position in ``texts`` to its cached vector; missing
+            positions were not cached.
+        """
+        positions: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            positions.setdefault(text_hash(text), []).append(i)
+        found: Dict[int, np.ndarray] = {}
+        keys = list(positions)
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), _QUERY_BATCH):
+                batch = keys[start:start + _QUERY_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, dim, vector FROM embeddings "
+                    f"WHERE provider = ? AND model = ? AND text_hash IN ({marks})",
+                    (provider, model, *batch),
+                ).fetchall()
+                for digest, dim, blob in rows:
+                    vec = np.frombuffer(blob, dtype=np.float32, count=dim)
+                    for i in positions[digest]:
+                        found[i] = vec
+                    self._touched[(provider, model, digest)] = now
+            if len(self._touched) >= _TOUCH_FLUSH:
+                self._flush_touches_locked()
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return found
+
+    def put_many(self, provider: str, model: str, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """Store vectors for ``texts`` and evict least recently used rows over the cap."""
+        if not len(texts):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        now = time.time()
+        rows = [
+            (provider, model, text_hash(text), int(vec.shape[0]), vec.tobytes(), now)
+            for text, vec in zip(texts, vectors)
+        ]
+        with self._lock:
+            # Eviction below must see the recency of recent hits
+            self._flush_touches_locked()
+            added = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (provider, model, text_hash, dim, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            ).rowcount
+            if added < len(rows):
+                # Some keys were already cached (re-embedded text); overwrite them
+                self._conn.executemany(
+                    "UPDATE embeddings SET dim = ?, vector = ?, last_used = ? "
+                    "WHERE provider = ? AND model = ? AND text_hash = ?",
+                    [(dim, blob, used, prov, mod, digest) for prov, mod, digest, dim, blob, used in rows],
+                )
+            self._count += added
+            overflow = self._count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN "
+                    "(SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+                self._count -= overflow
+            self._conn.commit()
+
+    def _flush_touches_locked(self) -> None:
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE provider = ? AND model = ? AND text_hash = ?",
+            [(used, *key) for key, used in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def flush(self) -> None:
+        """Write buffered ``last_used`` updates."""
+        with self._lock:
+            self._flush_touches_locked()
+            self._conn.commit()
+
+    def encode(
+        self,
+        provider: str,
+        model: str,
+        texts: Sequence[str],
+        encoder: Callable[[List[str]], np.ndarray],
+    ) -> np.ndarray:
+        """Return vectors for ``texts``, calling ``encoder`` only for cache misses."""
+        texts = list(texts)
+        if not texts:
+            return encoder(texts)
+        cached = self.get_many(provider, model, texts)
+        missing = [i for i in range(len(texts)) if i not in cached]
+        if not missing:
+            return np.vstack([cached[i] for i in range(len(texts))]).astype(np.float32)
+        fresh = np.asarray(encoder([texts[i] for i in missing]), dtype=np.float32)
+        self.put_many(provider, model, [texts[i] for i in missing], fresh)
+        out = np.empty((len(texts), fresh.shape[1]), dtype=np.float32)
+        for row, i in enumerate(missing):
+            out[i] = fresh[row]
+        for i, vec in cached.items():
+            out[i] = vec
+        return out
+
+    def stats(self) -> Dict[str, object]:
+        """Return counters and size information for metrics endpoints."""
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "entries": self._count,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Drop every cached vector."""
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._count = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touches_locked()
+            self._conn.commit()
+            self._conn.close()
+
+
+_CACHES: Dict[str, EmbeddingCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the shared cache for ``EMBEDDING_CACHE_PATH``, or None when disabled."""
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in {"0", "false", "no", "off"}:
+        return None
+    path = os.getenv("EMBEDDING_CACHE_PATH") or str(DEFAULT_CACHE_PATH)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(path)
+        if cache is None:
+            try:
+                max_entries = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
+            except ValueError:
+                max_entries = DEFAULT_MAX_ENTRIES
+            try:
+                cache = EmbeddingCache(path, max_entries=max_entries)
+            except (sqlite3.Error, OSError) as exc:
+                LOGGER.warning("Embedding cache unavailable at %s: %s", path, exc)
+                return None
+            _CACHES[path] = cache
+    return cache
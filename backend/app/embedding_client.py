@@ -0,0 +1,286 @@
+"""Concurrent Ollama embedding client.
+
+Sends ``/v1/embeddings`` requests from a shared ``httpx.AsyncClient`` that
+lives on a dedicated background event loop, so connections are pooled
+across calls and synchronous callers (index rebuilds running in worker
+threads) never block the FastAPI event loop.
+
+- Batches are sized by an estimated token budget rather than a fixed count
+- At most ``max_concurrency`` batches are in flight at once
+- Transient failures (transport errors, 408/429/5xx) are retried with
+  exponential backoff and jitter
+- A per-provider circuit breaker fails fast after repeated failures and
+  lets a probe request through once its cool-down has elapsed
+
+Configuration (environment):
+    OLLAMA_EMBED_CONCURRENCY: In-flight batches (default: 4)
+    OLLAMA_EMBED_BATCH_TOKENS: Estimated tokens per batch (default: 8192)
+    OLLAMA_EMBED_BATCH_SIZE: Maximum texts per batch (default: 64)
+    OLLAMA_EMBED_RETRIES: Retries per batch after the first attempt (default: 3)
+    OLLAMA_BREAKER_THRESHOLD: Consecutive failures that open the breaker (default: 5)
+    OLLAMA_BREAKER_RESET_SECONDS: Open-state cool-down (default: 30)
+
+Classes:
+    EmbeddingProviderUnavailable: Raised when the provider cannot serve a request
+    CircuitBreaker: Closed/open/half-open failure tracker
+    OllamaEmbeddingClient: Pooled, batched, retrying embedding client
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+LOGGER = logging.getLogger(__name__)
+
+_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class EmbeddingProviderUnavailable(RuntimeError):
+    """The embedding provider failed or its circuit breaker is open."""
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for batch sizing."""
+    return len(text) // 4 + 1
+
+
+def token_batches(texts: Sequence[str], max_tokens: int, max_items: int) -> List[List[int]]:
+    """Group text positions into batches bounded by estimated tokens and count.
+
+    A single text larger than ``max_tokens`` forms its own batch.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    budget = 0
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if current and (budget + cost > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, budget = [], 0
+        current.append(i)
+        budget += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+class CircuitBreaker:
+    """Track consecutive failures for one provider.
+
+    closed: requests flow; ``failure_threshold`` consecutive failures open it.
+    open: requests fail fast until ``reset_timeout`` seconds have passed.
+    half-open: one probe is allowed; success closes, failure re-opens.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Return True if a request may be attempted now."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class OllamaEmbeddingClient:
+    """Embed texts through Ollama's OpenAI-compatible embeddings endpoint.
+
+    Attributes:
+        base_url: Ollama service URL
+        model: Embedding model name
+        breaker: Circuit breaker guarding this provider
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        max_concurrency: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
+        max_batch_items: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: float = 0.5,
+        timeout: Optional[httpx.Timeout] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.max_concurrency = max(1, int(max_concurrency or _env_number("OLLAMA_EMBED_CONCURRENCY", 4)))
+        self.max_batch_tokens = max(1, int(max_batch_tokens or _env_number("OLLAMA_EMBED_BATCH_TOKENS", 8192)))
+        self.max_batch_items = max(1, int(max_batch_items or _env_number("OLLAMA_EMBED_BATCH_SIZE", 64)))
+        self.max_retries = int(max_retries if max_retries is not None else _env_number("OLLAMA_EMBED_RETRIES", 3))
+        self.backoff_base = backoff_base
+        # 5 min read timeout for large embedding batches
+        self.timeout = timeout or httpx.Timeout(300.0, connect=10.0)
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=int(_env_number("OLLAMA_BREAKER_THRESHOLD", 5)),
+            reset_timeout=_env_number("OLLAMA_BREAKER_RESET_SECONDS", 30.0),
+        )
+        self._transport = transport
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._start_lock = threading.Lock()
+
+    # ------------------------------------------------------------ event loop
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="embedding-client", daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Only called on the background loop, so no locking is needed.
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency * 2,
+                max_keepalive_connections=self.max_concurrency,
+            )
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=limits, transport=self._transport)
+        return self._client
+
+    def embed_sync(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed ``texts`` from synchronous code, blocking only the caller's thread."""
+        future = asyncio.run_coroutine_threadsafe(self.embed(list(texts)), self._ensure_loop())
+        return future.result()
+
+    def close(self) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+        self._loop = None
+
+    # -------------------------------------------------------------- embedding
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed ``texts`` with bounded concurrency; must run on the client loop.
+
+        Raises:
+            EmbeddingProviderUnavailable: The breaker is open or a batch
+                failed after all retries.
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        if not self.breaker.allow():
+            raise EmbeddingProviderUnavailable(f"Ollama circuit breaker is {self.breaker.state}")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batches = token_batches(texts, self.max_batch_tokens, self.max_batch_items)
+
+        async def run(batch: List[int]) -> List[List[float]]:
+            async with semaphore:
+                return await self._post_with_retry([texts[i] for i in batch])
+
+        tasks = [asyncio.ensure_future(run(batch)) for batch in batches]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        out: List[Optional[List[float]]] = [None] * len(texts)
+        for batch, vectors in zip(batches, results):
+            for i, vec in zip(batch, vectors):
+                out[i] = vec
+        return np.asarray(out, dtype=np.float32)
+
+    async def _post_with_retry(self, batch: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                vectors = await self._post(batch)
+                self.breaker.record_success()
+                return vectors
+            except (httpx.TransportError, _RetryableStatus) as exc:
+                if attempt >= self.max_retries:
+                    self.breaker.record_failure()
+                    raise EmbeddingProviderUnavailable(f"Ollama embedding failed after {attempt + 1} attempts: {exc}") from exc
+                delay = self.backoff_base * (2 ** attempt) * (1 + random.random() / 2)
+                LOGGER.warning("Ollama embedding attempt %d failed (%s); retrying in %.2fs", attempt + 1, exc, delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+            except Exception as exc:
+                self.breaker.record_failure()
+                raise EmbeddingProviderUnavailable(f"Ollama embedding failed: {exc}") from exc
+
+    async def _post(self, batch: List[str]) -> List[List[float]]:
+        response = await self._get_client().post(
+            f"{self.base_url}/v1/embeddings",
+            json={"model": self.model, "input": batch},
+            headers={"Content-Type": "application/json"},
+        )
+        if response.status_code in _RETRYABLE_STATUS:
+            raise _RetryableStatus(f"HTTP {response.status_code}: {response.text[:200]}")
+        response.raise_for_status()
+        result = response.json()
+
+        # Handle OpenAI-compatible response format
+        data = result.get("data") if isinstance(result, dict) else None
+        if isinstance(data, list):
+            # Sort by index to ensure correct order
+            data_sorted = sorted(data, key=lambda x: x.get("index", 0))
+            vectors = [item["embedding"] for item in data_sorted]
+        elif isinstance(data, dict):
+            vectors = [data["embedding"]]
+        else:
+            LOGGER.warning("Unexpected Ollama response format: %s", result)
+            raise ValueError("Unexpected response format from Ollama")
+        if len(vectors) != len(batch):
+            raise ValueError(f"Ollama returned {len(vectors)} embeddings for {len(batch)} inputs")
+        return vectors
+
+
+class _RetryableStatus(Exception):
+    """HTTP status that is worth retrying (timeouts, throttling, server errors)."""
@@ -0,0 +1,279 @@
+"""Out-of-line storage for large evidence row payloads.
+
+CSV/XLSX sheets and extracted tables used to be stored whole in
+``Evidence.full_data_json``, which is re-parsed every time the evidence is
+read. Payloads with at least ``min_rows`` rows are instead written to a file
+under ``artifacts/evidence/`` (Parquet when ``pyarrow`` is installed, JSON
+Lines otherwise) and ``full_data`` keeps a small reference::
+
+    {"columns": [...], "rows_ref": {"path": "<id>.parquet", "format": "parquet",
+                                    "row_count": 500000, "columns": [...]}}
+
+Other keys of a dict payload (pages, header_info, statement, ...) stay inline.
+``read_rows`` pages through either representation, so callers do not need
+to know where the rows live. Streaming ingesters append rows in batches
+through ``open_writer`` instead of building the payload in memory.
+
+Configuration (environment):
+    EVIDENCE_STORE_DIR: Directory for payload files (default: artifacts/evidence)
+    EVIDENCE_OFFLOAD_MIN_ROWS: Row count from which payloads are moved out of line (default: 1000)
+
+Classes:
+    EvidencePayloadStore: File-backed store for evidence rows
+    PayloadWriter: Incremental writer for one out-of-line payload
+
+Functions:
+    get_payload_store: Return the shared store for the configured directory
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:  # pragma: no cover - optional columnar backend
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except Exception:  # pragma: no cover - fall back to JSON Lines
+    pa = None  # type: ignore
+    pq = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = Path("artifacts") / "evidence"
+DEFAULT_MIN_ROWS = 1000
+ROWS_REF_KEY = "rows_ref"
+
+# Parquet row group size; range reads decode only the groups they overlap
+_ROW_GROUP_SIZE = 10_000
+
+
+def _payload_rows(full_data: Any) -> Optional[List[Any]]:
+    """Row list of a payload: a list of records or a dict with a ``rows`` list."""
+    if isinstance(full_data, list):
+        return full_data
+    if isinstance(full_data, dict) and isinstance(full_data.get("rows"), list):
+        return full_data["rows"]
+    return None
+
+
+class EvidencePayloadStore:
+    """File-backed store for evidence rows.
+
+    Attributes:
+        root: Directory holding one payload file per evidence id
+        min_rows: Payloads with fewer rows stay inline
+        format: ``"parquet"`` or ``"jsonl"``
+    """
+
+    def __init__(
+        self,
+        root: Path | str = DEFAULT_STORE_DIR,
+        min_rows: int = DEFAULT_MIN_ROWS,
+        format: Optional[str] = None,
+    ):
+        self.root = Path(root)
+        self.min_rows = int(min_rows)
+        self.format = format or ("parquet" if pq is not None else "jsonl")
+
+    def offload(self, evidence: Dict[str, Any]) -> Dict[str, Any]:
+        """Return ``evidence`` with large row payloads replaced by a reference.
+
+        The input dict is not modified. Evidence without a row payload, or
+        with fewer than ``min_rows`` rows, is returned unchanged.
+        """
+        full_data = evidence.get("full_data")
+        rows = _payload_rows(full_data)
+        if rows is None or len(rows) < self.min_rows or not all(isinstance(row, dict) for row in rows):
+            return evidence
+        writer = self.open_writer(evidence["id"])
+        writer.write(rows)
+        ref = writer.close()
+        if isinstance(full_data, dict) and full_data.get("columns"):
+            ref["columns"] = [str(c) for c in full_data["columns"]]
+        columns = ref["columns"]
+        stub: Dict[str, Any] = {k: v for k, v in full_data.items() if k != "rows"} if isinstance(full_data, dict) else {}
+        stub.setdefault("columns", columns)
+        stub[ROWS_REF_KEY] = ref
+        return {**evidence, "full_data": stub}
+
+    def open_writer(self, evidence_id: str) -> "PayloadWriter":
+        """Start an out-of-line payload that is filled batch by batch."""
+        return PayloadWriter(self, evidence_id)
+
+    @staticmethod
+    def row_count(full_data: Any) -> Optional[int]:
+        """Number of rows in a payload, without reading out-of-line rows."""
+        if isinstance(full_data, dict) and isinstance(full_data.get(ROWS_REF_KEY), dict):
+            return int(full_data[ROWS_REF_KEY].get("row_count") or 0)
+        rows = _payload_rows(full_data)
+        return len(rows) if rows is not None else None
+
+    def read_rows(self, full_data: Any, offset: int = 0, limit: Optional[int] = None) -> List[Any]:
+        """Rows ``offset`` .. ``offset + limit`` of an inline or out-of-line payload."""
+        offset = max(0, int(offset))
+        stop = None if limit is None else offset + max(0, int(limit))
+        ref = full_data.get(ROWS_REF_KEY) if isinstance(full_data, dict) else None
+        if not isinstance(ref, dict):
+            return list((_payload_rows(full_data) or [])[offset:stop])
+        path = self.root / Path(str(ref.get("path", ""))).name
+        if ref.get("format") == "parquet":
+            return self._read_parquet(path, offset, stop)
+        with path.open("r", encoding="utf-8") as fh:
+            return [json.loads(line) for line in itertools.islice(fh, offset, stop)]
+
+    def read_page(self, full_data: Any, offset: int = 0, limit: int = 100) -> Optional[Dict[str, Any]]:
+        """One page of rows with the column list and paging cursor.
+
+        Returns:
+            None if the payload has no rows; otherwise ``columns``, ``total``,
+            ``offset``, ``limit``, ``rows`` and ``next_offset`` (None on the
+            last page).
+        """
+        total = self.row_count(full_data)
+        if total is None:
+            return None
+        rows = self.read_rows(full_data, offset=offset, limit=limit)
+        columns = full_data.get("columns") if isinstance(full_data, dict) else None
+        if not columns and rows and isinstance(rows[0], dict):
+            columns = list(rows[0].keys())
+        end = offset + len(rows)
+        return {
+            "columns": columns or [],
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "rows": rows,
+            "next_offset": end if end < total else None,
+        }
+
+    @staticmethod
+    def _read_parquet(path: Path, offset: int, stop: Optional[int]) -> List[Dict[str, Any]]:
+        if pq is None:
+            raise RuntimeError("pyarrow is required to read Parquet evidence payloads")
+        pf = pq.ParquetFile(path)
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        for i in range(pf.num_row_groups):
+            if stop is not None and start >= stop:
+                break
+            n = pf.metadata.row_group(i).num_rows
+            if start + n > offset:
+                lo = max(0, offset - start)
+                hi = n if stop is None else min(n, stop - start)
+                rows.extend(pf.read_row_group(i).slice(lo, hi - lo).to_pylist())
+            start += n
+        return rows
+
+    def delete(self, evidence_id: str) -> None:
+        for suffix in (".parquet", ".jsonl"):
+            (self.root / f"{evidence_id}{suffix}").unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Remove every stored payload (used by ``/reset``)."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class PayloadWriter:
+    """Incremental writer for one out-of-line payload.
+
+    Parquet batches must share the schema inferred from the first batch; when
+    a later batch does not fit (a column changes type), the rows written so far
+    are converted to JSON Lines and the payload continues in that format.
+
+    Attributes:
+        row_count: Rows written so far
+        columns: Column names, taken from the first row
+    """
+
+    def __init__(self, store: EvidencePayloadStore, evidence_id: str):
+        store.root.mkdir(parents=True, exist_ok=True)
+        self._root = store.root
+        self._evidence_id = evidence_id
+        self.format = "parquet" if store.format == "parquet" and pq is not None else "jsonl"
+        self.row_count = 0
+        self.columns: List[str] = []
+        self._parquet: Any = None
+        self._jsonl: Any = None
+
+    @property
+    def path(self) -> Path:
+        return self._root / f"{self._evidence_id}.{self.format}"
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        # Keys become strings, as they would in full_data_json
+        rows = [{str(k): v for k, v in row.items()} for row in rows]
+        if not self.columns:
+            self.columns = list(rows[0].keys())
+        if self.format == "parquet":
+            try:
+                schema = self._parquet.schema if self._parquet is not None else None
+                table = pa.Table.from_pylist(rows, schema=schema)
+                if self._parquet is None:
+                    self._parquet = pq.ParquetWriter(self.path, table.schema)
+                self._parquet.write_table(table, row_group_size=_ROW_GROUP_SIZE)
+                self.row_count += len(rows)
+                return
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as exc:
+                # Mixed-type object columns have no Arrow schema; keep them as JSON
+                LOGGER.debug("evidence %s not representable as Arrow (%s); writing JSON Lines", self._evidence_id, exc)
+                self._spill_to_jsonl()
+        if self._jsonl is None:
+            self._jsonl = self.path.open("w", encoding="utf-8")
+        for row in rows:
+            self._jsonl.write(json.dumps(row, ensure_ascii=False, default=str))
+            self._jsonl.write("\n")
+        self.row_count += len(rows)
+
+    def _spill_to_jsonl(self) -> None:
+        parquet_path = self.path
+        self.format = "jsonl"
+        self._jsonl = self.path.open("w", encoding="utf-8")
+        if self._parquet is None:
+            return
+        self._parquet.close()
+        self._parquet = None
+        pf = pq.ParquetFile(parquet_path)
+        for i in range(pf.num_row_groups):
+            for row in pf.read_row_group(i).to_pylist():
+                self._jsonl.write(json.dumps(row, ensure_ascii=False, default=str))
+                self._jsonl.write("\n")
+        parquet_path.unlink(missing_ok=True)
+
+    def close(self) -> Dict[str, Any]:
+        """Finish the file and return its reference for ``full_data``."""
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self._jsonl is None and self.format == "jsonl":
+            self.path.touch()
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+        return {"path": self.path.name, "format": self.format, "row_count": self.row_count, "columns": self.columns}
+
+
+_STORE: Optional[EvidencePayloadStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_payload_store() -> EvidencePayloadStore:
+    """Return the process-wide payload store, creating it on first use."""
+    global _STORE
+    root = os.getenv("EVIDENCE_STORE_DIR", str(DEFAULT_STORE_DIR))
+    with _STORE_LOCK:
+        if _STORE is None or str(_STORE.root) != str(Path(root)):
+            try:
+                min_rows = int(os.getenv("EVIDENCE_OFFLOAD_MIN_ROWS", str(DEFAULT_MIN_ROWS)))
+            except ValueError:
+                min_rows = DEFAULT_MIN_ROWS
+            _STORE = EvidencePayloadStore(root, min_rows=min_rows)
+        return _STORE
@@ -15,7 +15,10 @@ Globals:
     HRM_ENABLED: Whether Halting Reasoning Module is enabled
     HRM_CFG: HRM configuration parameters
     HRM_STATS: HRM metrics collector
-    TASKS: In-memory task registry for background jobs
+    TASKS: Persistent task registry for background jobs
+    EVIDENCE_PAYLOADS: Out-of-line storage for large evidence row payloads
+    INGEST_REGISTRY: Content-hash registry used to skip re-ingesting identical files
+    ingestion_scheduler: Bounded worker pools for background ingestion jobs
     START_TIME: Application startup timestamp
 """
 
@@ -28,6 +31,10 @@ from app.qa_engine import QAEngine
 from app.search import SearchIndex
 from app.analysis.summarization import SummarizationService
 from app.hrm import HRMConfig, HRMMetrics
+from app.ingestion.scheduler import IngestionScheduler
+from app.task_store import get_task_store
+from app.evidence_store import get_payload_store
+from app.ingest_registry import get_ingest_registry
 
 load_dotenv()
 
@@ -53,11 +60,15 @@ HRM_CFG = HRMConfig(
 HRM_STATS = HRMMetrics()
 
 # Global State
-TASKS: dict[str, dict] = {}
+TASKS = get_task_store()
+EVIDENCE_PAYLOADS = get_payload_store()
+INGEST_REGISTRY = get_ingest_registry()
+ingestion_scheduler = IngestionScheduler()
 START_TIME = time.time()
 
 # Constants
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # uploads are written to disk 1MB at a time
 AUDIO_SUFFIXES = {".mp3", ".wav", ".m4a", ".ogg", ".flac", ".aac"}
 VIDEO_SUFFIXES = {".mp4", ".mov", ".mkv", ".webm", ".avi"}
 IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp"}
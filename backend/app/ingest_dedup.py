@@ -0,0 +1,105 @@
+"""Upload helpers around the content-addressed ingest registry.
+
+Uploads are streamed to disk while their SHA-256 is computed. The digest is
+then claimed in the registry (see ``app.ingest_registry``) for the new
+artifact. A ready match is reported as a ``duplicate`` of the earlier
+artifact. A pending match means the same bytes are still being ingested; the
+caller is told to retry later rather than being handed a result that may
+never exist if that ingestion fails.
+
+Functions:
+    save_upload: Stream an upload to disk, returning its SHA-256 and size
+    claim_content: Claim a digest for a new artifact, or find its earlier owner
+    duplicate_result: Upload result for content that matched an earlier ingestion
+    ingest_outputs: Derived export files of an ingested upload
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+from fastapi import UploadFile
+
+from app.globals import (
+    ARTIFACTS_DIR, INGEST_REGISTRY, MAX_FILE_SIZE, UPLOAD_CHUNK_SIZE, db, env_flag,
+)
+
+
+async def save_upload(file: UploadFile, file_path: Path) -> tuple[str, int] | None:
+    """Stream an upload to ``file_path`` in ``UPLOAD_CHUNK_SIZE`` pieces.
+
+    The SHA-256 of the content is computed as the chunks are written.
+
+    Returns:
+        ``(sha256 hex digest, size)``, or None, after removing the partial
+        file, if it exceeds MAX_FILE_SIZE.
+    """
+    digest = hashlib.sha256()
+    written = 0
+    with file_path.open("wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if written > MAX_FILE_SIZE:
+                break
+            digest.update(chunk)
+            buffer.write(chunk)
+    if written > MAX_FILE_SIZE:
+        file_path.unlink(missing_ok=True)
+        return None
+    return digest.hexdigest(), written
+
+
+def claim_content(
+    digest: str, size: int, suffix: str, artifact_id: str, filename: str | None, force: bool = False
+) -> dict | None:
+    """Claim ``digest`` for a new artifact, or find the artifact that already has it.
+
+    Returns:
+        The registry entry (plus ``artifact``) of a live earlier ingestion of
+        the same bytes, or None when the new artifact should be processed.
+        The entry's ``status`` is ``pending`` while that ingestion still runs.
+    """
+    if not env_flag("INGEST_DEDUP", True):
+        return None
+    existing = INGEST_REGISTRY.claim(digest, suffix, artifact_id, size=size, filename=filename, replace=force)
+    if existing is None:
+        return None
+    artifact = db.get_artifact(existing["artifact_id"])
+    if artifact and artifact.get("status") not in ("error", "cancelled"):
+        return {**existing, "artifact": artifact}
+    # The earlier artifact is gone or failed; the new one takes over the content
+    INGEST_REGISTRY.claim(digest, suffix, artifact_id, size=size, filename=filename, replace=True)
+    return None
+
+
+def duplicate_result(filename: str | None, entry: dict) -> dict:
+    """Upload result for a file whose content matched ``entry``.
+
+    A pending match is a ``conflict``: the upload was discarded and should be
+    retried once the earlier ingestion finished (or failed).
+    """
+    if entry["status"] == "pending":
+        return {
+            "filename": filename,
+            "status": "conflict",
+            "artifact_id": entry["artifact_id"],
+            "error": "Identical content is still being ingested; retry later",
+        }
+    return {
+        "filename": filename,
+        "status": "duplicate",
+        "artifact_id": entry["artifact_id"],
+        "ingest_status": entry["status"],
+        "outputs": entry["outputs"],
+    }
+
+
+def ingest_outputs(file_path: Path) -> dict:
+    """Derived export files of an ingested upload, relative to ARTIFACTS_DIR."""
+    outputs = {}
+    for kind, ext in (("markdown", ".md"), ("json", ".json"), ("text_units", ".text_units.json")):
+        name = f"{file_path.stem}{ext}"
+        if (ARTIFACTS_DIR / name).exists():
+            outputs[kind] = name
+    return outputs
@@ -0,0 +1,206 @@
+"""Content-addressed registry of ingested files.
+
+Every upload and watch-folder drop is hashed (SHA-256) while it is written
+to ``uploads/``. The hash is claimed for the new artifact before processing
+starts. When the same bytes arrive again, the caller finds the earlier
+artifact and links to it instead of converting the file a second time. The
+earlier artifact's facts, evidence, embeddings and exports (Markdown, JSON,
+text units) stay valid as they are. Callers can force reprocessing, which
+moves the hash to the new artifact.
+
+An entry is ``pending`` while its artifact is processed and ``ready`` once
+ingestion finished. Failed ingestions release their entry, so the next copy
+of the file is processed normally. Pending entries older than
+``pending_ttl_seconds`` are treated as abandoned, for example after a worker
+was killed.
+
+Configuration (environment):
+    INGEST_REGISTRY_PATH: SQLite file location (default: artifacts/ingest_registry.sqlite3)
+    INGEST_DEDUP: Set to false to disable deduplication (default: true)
+
+Classes:
+    IngestRegistry: SQLite-backed map from content hash to artifact
+
+Functions:
+    copy_with_digest: Copy a file in chunks, returning its SHA-256 and size
+    get_ingest_registry: Return the shared registry for the configured path
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+DEFAULT_REGISTRY_PATH = Path("artifacts") / "ingest_registry.sqlite3"
+DEFAULT_PENDING_TTL_SECONDS = 6 * 3600
+COPY_CHUNK_SIZE = 1024 * 1024
+
+_COLUMNS = "digest, filetype, artifact_id, status, size, filename, outputs_json, created_at, updated_at"
+
+
+def copy_with_digest(src: Path, dst: Path, chunk_size: int = COPY_CHUNK_SIZE) -> Tuple[str, int]:
+    """Copy ``src`` to ``dst`` in chunks; returns ``(sha256 hex, size)``."""
+    digest = hashlib.sha256()
+    size = 0
+    with src.open("rb") as reader, dst.open("wb") as writer:
+        while chunk := reader.read(chunk_size):
+            digest.update(chunk)
+            writer.write(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class IngestRegistry:
+    """SQLite-backed map from content hash to artifact.
+
+    Entries are keyed by ``(digest, filetype)`` because the suffix decides
+    which ingester runs.
+
+    Attributes:
+        path: Location of the SQLite database file (``":memory:"`` for tests)
+        pending_ttl_seconds: Age after which a pending entry is considered abandoned
+    """
+
+    def __init__(
+        self,
+        path: Path | str = DEFAULT_REGISTRY_PATH,
+        pending_ttl_seconds: float = DEFAULT_PENDING_TTL_SECONDS,
+    ):
+        self.path = str(path)
+        self.pending_ttl_seconds = float(pending_ttl_seconds)
+        self._lock = threading.RLock()
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ingested (
+                digest TEXT NOT NULL,
+                filetype TEXT NOT NULL,
+                artifact_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                size INTEGER,
+                filename TEXT,
+                outputs_json TEXT NOT NULL DEFAULT '{}',
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (digest, filetype)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_ingested_artifact ON ingested (artifact_id)")
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE makes claim() atomic across workers sharing the file
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "digest": row["digest"],
+            "filetype": row["filetype"],
+            "artifact_id": row["artifact_id"],
+            "status": row["status"],
+            "size": row["size"],
+            "filename": row["filename"],
+            "outputs": json.loads(row["outputs_json"] or "{}"),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    def _live(self, row: Optional[sqlite3.Row], now: float) -> bool:
+        if row is None:
+            return False
+        return row["status"] == "ready" or now - row["updated_at"] < self.pending_ttl_seconds
+
+    def lookup(self, digest: str, filetype: str) -> Optional[Dict[str, Any]]:
+        """The live entry for this content, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM ingested WHERE digest = ? AND filetype = ?", (digest, filetype)
+            ).fetchone()
+        return self._to_dict(row) if self._live(row, time.time()) else None
+
+    def claim(
+        self,
+        digest: str,
+        filetype: str,
+        artifact_id: str,
+        size: Optional[int] = None,
+        filename: Optional[str] = None,
+        replace: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """Register ``artifact_id`` as the pending owner of this content.
+
+        Returns:
+            The existing live entry, which is left untouched, when the content
+            is already registered and ``replace`` is False. Otherwise None,
+            after the claim has been recorded.
+        """
+        now = time.time()
+        with self._write() as conn:
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM ingested WHERE digest = ? AND filetype = ?", (digest, filetype)
+            ).fetchone()
+            if not replace and self._live(row, now):
+                return self._to_dict(row)
+            conn.execute(
+                "INSERT OR REPLACE INTO ingested (digest, filetype, artifact_id, status, size, filename, "
+                "outputs_json, created_at, updated_at) VALUES (?, ?, ?, 'pending', ?, ?, '{}', ?, ?)",
+                (digest, filetype, artifact_id, size, filename, now, now),
+            )
+        return None
+
+    def complete(self, artifact_id: str, outputs: Optional[Dict[str, Any]] = None) -> bool:
+        """Mark the artifact's content as ingested, recording its derived outputs."""
+        with self._write() as conn:
+            return conn.execute(
+                "UPDATE ingested SET status = 'ready', outputs_json = ?, updated_at = ? WHERE artifact_id = ?",
+                (json.dumps(outputs or {}, default=str), time.time(), artifact_id),
+            ).rowcount > 0
+
+    def release(self, artifact_id: str) -> bool:
+        """Drop the artifact's entries (failed or deleted ingestion)."""
+        with self._write() as conn:
+            return conn.execute("DELETE FROM ingested WHERE artifact_id = ?", (artifact_id,)).rowcount > 0
+
+    def clear(self) -> None:
+        """Remove every entry (used by ``/reset``)."""
+        with self._write() as conn:
+            conn.execute("DELETE FROM ingested")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_REGISTRY: Optional[IngestRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_ingest_registry() -> IngestRegistry:
+    """Return the process-wide registry, creating it on first use."""
+    global _REGISTRY
+    path = os.getenv("INGEST_REGISTRY_PATH", str(DEFAULT_REGISTRY_PATH))
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None or _REGISTRY.path != path:
+            _REGISTRY = IngestRegistry(path)
+        return _REGISTRY
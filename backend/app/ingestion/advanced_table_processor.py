@@ -26,12 +26,18 @@ class AdvancedTableProcessor:
         list of dict
             Each dictionary contains the merged dataframe plus metadata describing
             the pages and bounding boxes that contributed to the final table.
+            ``tables`` and ``frames`` hold the source Docling table and its own
+            dataframe for every segment, so callers can analyse segments
+            without exporting them again.
         """
 
         tables: List[Dict[str, Any]] = []
         self._previous_entry = None
 
         pages: Iterable[Any] = getattr(doc, "pages", []) or []
+        if isinstance(pages, dict):
+            # DoclingDocument keys pages by number; tables hang off doc.tables
+            pages = self._pages_from_provenance(doc)
         # Fallback to doc.tables when Docling skips page objects (rare but possible)
         if not pages and getattr(doc, "tables", None):
             pages = [type("Page", (), {"tables": getattr(doc, "tables", [])})()]
@@ -51,6 +57,8 @@ class AdvancedTableProcessor:
                     "segments": [segment],
                     "merged": False,
                     "header_detected": self._detect_header(df),
+                    "tables": [table],
+                    "frames": [df],
                 }
 
                 if self._previous_entry and self._is_continuation(self._previous_entry, df, page_idx):
@@ -59,6 +67,8 @@ class AdvancedTableProcessor:
                     )
                     self._previous_entry["pages"].append(page_idx)
                     self._previous_entry["segments"].append(segment)
+                    self._previous_entry["tables"].append(table)
+                    self._previous_entry["frames"].append(df)
                     self._previous_entry["merged"] = True
                 else:
                     tables.append(entry)
@@ -66,6 +76,27 @@ class AdvancedTableProcessor:
 
         return tables
 
+    def _pages_from_provenance(self, doc: Any) -> List[Any]:
+        """Group ``doc.tables`` by provenance page, one entry per page from page 1.
+
+        Empty pages are kept so a gap still breaks table continuity.
+        """
+        by_page: Dict[int, List[Any]] = {}
+        for table in getattr(doc, "tables", []) or []:
+            prov = getattr(table, "prov", None)
+            page_no = getattr(prov[0], "page_no", None) if prov else None
+            if isinstance(page_no, int) and page_no >= 1:
+                by_page.setdefault(page_no, []).append(table)
+        if not by_page:
+            return []
+        page_type = type("Page", (), {})
+        pages = []
+        for page_no in range(1, max(by_page) + 1):
+            page = page_type()
+            page.tables = by_page.get(page_no, [])
+            pages.append(page)
+        return pages
+
     def _table_to_dataframe(self, table: Any) -> Optional[pd.DataFrame]:
         try:
             df = table.export_to_dataframe()
@@ -0,0 +1,140 @@
+"""Pool of warm Docling converters keyed by their effective pipeline options.
+
+Constructing a ``DocumentConverter`` is cheap, but its first ``convert``
+loads the layout and table-structure models, which dominates latency for
+small PDFs. The pool keeps converters (and therefore their loaded models)
+alive across documents. Each key gets at most ``max_per_key`` converters;
+concurrent callers beyond that wait for one to be checked back in rather
+than loading another copy of the models.
+
+Configuration (environment):
+    DOCLING_CONVERTER_POOL_SIZE: Converters per option set (default: 1)
+
+Classes:
+    ConverterKey: Hashable description of the options a converter was built with
+    ConverterPool: Thread-safe checkout/checkin of warm converters
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+@dataclass(frozen=True)
+class ConverterKey:
+    """Options that change which models a converter loads."""
+
+    ocr: bool = False
+    picture_description: bool = False
+    vlm_repo: Optional[str] = None
+    device: Optional[str] = None
+    num_threads: Optional[int] = None
+
+
+def _pool_size_from_env() -> int:
+    try:
+        return max(1, int(os.getenv("DOCLING_CONVERTER_POOL_SIZE", "1")))
+    except ValueError:
+        return 1
+
+
+class ConverterPool:
+    """Reuse converters per :class:`ConverterKey`.
+
+    Attributes:
+        factory: Builds a new converter for a key
+        warmer: Loads a converter's models ahead of its first document
+        max_per_key: Upper bound on converters per key
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[ConverterKey], Any],
+        warmer: Optional[Callable[[Any], None]] = None,
+        max_per_key: Optional[int] = None,
+    ):
+        self.factory = factory
+        self.warmer = warmer
+        self.max_per_key = max(1, int(max_per_key or _pool_size_from_env()))
+        self._idle: Dict[ConverterKey, List[Any]] = {}
+        self._created: Dict[ConverterKey, int] = {}
+        self._cond = threading.Condition()
+        self.checkouts = 0
+        self.reused = 0
+        self.waits = 0
+
+    def _acquire(self, key: ConverterKey) -> Any:
+        with self._cond:
+            self.checkouts += 1
+            waited = False
+            while True:
+                idle = self._idle.get(key)
+                if idle:
+                    self.reused += 1
+                    return idle.pop()
+                if self._created.get(key, 0) < self.max_per_key:
+                    self._created[key] = self._created.get(key, 0) + 1
+                    break
+                if not waited:
+                    self.waits += 1
+                    waited = True
+                self._cond.wait()
+        # Build outside the lock so other keys are not blocked by model loading.
+        try:
+            return self.factory(key)
+        except BaseException:
+            with self._cond:
+                self._created[key] -= 1
+                self._cond.notify_all()
+            raise
+
+    def _release(self, key: ConverterKey, converter: Any) -> None:
+        with self._cond:
+            self._idle.setdefault(key, []).append(converter)
+            self._cond.notify_all()
+
+    @contextmanager
+    def checkout(self, key: ConverterKey) -> Iterator[Any]:
+        """Borrow a converter for ``key``; it is returned to the pool on exit."""
+        converter = self._acquire(key)
+        try:
+            yield converter
+        finally:
+            self._release(key, converter)
+
+    def warm(self, key: ConverterKey) -> float:
+        """Build a converter for ``key`` and load its models.
+
+        Returns:
+            Seconds spent warming.
+        """
+        t0 = time.perf_counter()
+        with self.checkout(key) as converter:
+            if self.warmer is not None:
+                self.warmer(converter)
+        return time.perf_counter() - t0
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "keys": len(self._created),
+                "converters": sum(self._created.values()),
+                "idle": sum(len(v) for v in self._idle.values()),
+                "max_per_key": self.max_per_key,
+                "checkouts": self.checkouts,
+                "reused": self.reused,
+                "waits": self.waits,
+            }
+
+    def clear(self) -> None:
+        """Drop idle converters so their models can be freed."""
+        with self._cond:
+            for key, idle in self._idle.items():
+                self._created[key] = self._created.get(key, 0) - len(idle)
+            self._idle.clear()
+            self._cond.notify_all()
@@ -1,49 +1,48 @@
 from pathlib import Path
 import pandas as pd
 import uuid
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
-def process_csv(file_path: Path, report_week: str) -> Tuple[List[Dict], List[Dict]]:
-    """Process CSV file and extract facts"""
-    df = pd.read_csv(file_path)
-    
+from app.analysis.table_metrics import CSV_METRIC_PATTERNS, ColumnClassifier, add_derived_metrics
+from app.evidence_store import EvidencePayloadStore
+from app.ingestion.tabular_stream import TableAccumulator, chunk_rows
+
+_CLASSIFIER = ColumnClassifier(CSV_METRIC_PATTERNS)
+
+def process_csv(
+    file_path: Path,
+    report_week: str,
+    payload_store: Optional[EvidencePayloadStore] = None,
+) -> Tuple[List[Dict], List[Dict]]:
+    """Process CSV file and extract facts.
+
+    The file is read in chunks; with a ``payload_store`` large files stream
+    their rows to an out-of-line payload so memory stays bounded.
+    """
     facts = []
     evidence = []
     evidence_id = str(uuid.uuid4())
-    
+
+    table = TableAccumulator(evidence_id, payload_store)
+    for chunk in pd.read_csv(file_path, chunksize=chunk_rows()):
+        table.add(chunk)
+
     # Calculate totals
     metrics = {}
-    numeric_cols = df.select_dtypes(include=['number']).columns
-    
-    for col in numeric_cols:
-        col_lower = col.lower()
-        if any(x in col_lower for x in ['spend', 'cost']):
-            metrics['spend'] = float(df[col].sum())
-        elif 'revenue' in col_lower:
-            metrics['revenue'] = float(df[col].sum())
-        elif 'conversion' in col_lower:
-            metrics['conversions'] = float(df[col].sum())
-        elif 'click' in col_lower:
-            metrics['clicks'] = float(df[col].sum())
-        elif 'impression' in col_lower:
-            metrics['impressions'] = float(df[col].sum())
+    for col, total in table.numeric_totals().items():
+        metric = _CLASSIFIER.metric_for(col)
+        if metric:
+            metrics[metric] = total
     
     # Calculate derived metrics
-    if 'clicks' in metrics and 'impressions' in metrics and metrics['impressions'] > 0:
-        metrics['ctr'] = metrics['clicks'] / metrics['impressions']
-    
-    if 'spend' in metrics and 'conversions' in metrics and metrics['conversions'] > 0:
-        metrics['cpa'] = metrics['spend'] / metrics['conversions']
-    
-    if 'revenue' in metrics and 'spend' in metrics and metrics['spend'] > 0:
-        metrics['roas'] = metrics['revenue'] / metrics['spend']
+    add_derived_metrics(metrics)
     
     evidence.append({
         "id": evidence_id,
         "locator": f"{file_path.name}#data",
-        "preview": df.head(10).to_string(),
+        "preview": table.preview(),
         "content_type": "csv",
-        "full_data": df.to_dict('records')
+        "full_data": table.full_data()
     })
     
     facts.append({
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
-import re
+import time
 import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -18,6 +19,7 @@ from docling.datamodel.pipeline_options import (
 from docling.document_converter import DocumentConverter, PdfFormatOption
 
 from app.analysis import BusinessMetricExtractor, DocumentStructureProcessor, NERProcessor
+from app.analysis.metric_extractor import METRIC_ENGINE, MetricMatch, first_metric_values
 
 try:  # pragma: no cover - accelerator options are optional
     from docling.datamodel.accelerator_options import AcceleratorOptions
@@ -26,14 +28,20 @@ except ImportError:  # pragma: no cover - CPU-only installs may omit this
 
 from .advanced_table_processor import AdvancedTableProcessor
 from .chart_processor import ChartProcessor
+from .converter_pool import ConverterKey, ConverterPool
+from .pdf_sharding import convert_sharded, count_pdf_pages, shard_settings
+from .stage_graph import StageGraph
 from .formula_processor import FormulaProcessor
 
 
-NER_PROCESSOR = NERProcessor()
+LOGGER = logging.getLogger(__name__)
+
+NER_PROCESSOR = NERProcessor.from_env()
 STRUCTURE_PROCESSOR = DocumentStructureProcessor()
 METRIC_EXTRACTOR = BusinessMetricExtractor()
 
 from app.analysis.financial_statement_detector import FinancialStatementDetector
+from app.analysis.table_metrics import add_derived_metrics, column_metric_totals
 from app.ingestion.complex_table_processor import ComplexTableProcessor
 
 def _torch_cuda_available() -> bool:
@@ -45,10 +53,7 @@ def _torch_cuda_available() -> bool:
         return False
 
 
-def _build_accelerator_options() -> AcceleratorOptions | None:
-    if AcceleratorOptions is None:
-        return None
-
+def _resolve_accelerator() -> Tuple[str, Optional[int]]:
     desired = (os.getenv("DOCLING_DEVICE") or "").strip().lower()
     if not desired or desired == "auto":
         desired = "cuda" if _torch_cuda_available() else "cpu"
@@ -62,13 +67,92 @@ def _build_accelerator_options() -> AcceleratorOptions | None:
             num_threads = max(1, int(threads_env))
         except ValueError:
             num_threads = None
+    return desired, num_threads
+
 
+def _build_accelerator_options(key: ConverterKey) -> AcceleratorOptions | None:
+    if AcceleratorOptions is None:
+        return None
     try:
-        return AcceleratorOptions(device=desired, num_threads=num_threads)
+        return AcceleratorOptions(device=key.device, num_threads=key.num_threads)
     except Exception:  # pragma: no cover - docling validates arguments
         return None
 
 
+def converter_key_from_env() -> ConverterKey:
+    """Resolve the Docling options the next conversion would use."""
+    vlm_repo = os.getenv("DOCLING_VLM_REPO") or None
+    picture_enabled = (
+        os.getenv("PDF_PICTURE_DESCRIPTION", "false").lower() == "true" and bool(vlm_repo)
+    )
+    device, num_threads = _resolve_accelerator()
+    return ConverterKey(
+        ocr=os.getenv("PDF_OCR_ENABLED", "false").lower() == "true",
+        picture_description=picture_enabled,
+        vlm_repo=vlm_repo if picture_enabled else None,
+        device=device,
+        num_threads=num_threads,
+    )
+
+
+def build_converter(key: ConverterKey) -> DocumentConverter:
+    """Construct a DocumentConverter for ``key`` (models load on first use)."""
+    pipeline_options = PdfPipelineOptions()
+    pipeline_options.do_table_structure = True
+    pipeline_options.do_ocr = key.ocr
+    pipeline_options.do_picture_description = key.picture_description
+    if key.picture_description:
+        pipeline_options.picture_description_options = PictureDescriptionVlmOptions(
+            repo_id=key.vlm_repo  # type: ignore[arg-type]
+        )
+    accelerator_options = _build_accelerator_options(key)
+    if accelerator_options and hasattr(pipeline_options, "accelerator_options"):
+        pipeline_options.accelerator_options = accelerator_options
+
+    return DocumentConverter(
+        format_options={
+            InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
+        }
+    )
+
+
+def _initialize_converter(converter: DocumentConverter) -> None:
+    converter.initialize_pipeline(InputFormat.PDF)
+
+
+# Warm converters shared by every conversion in this process
+CONVERTER_POOL = ConverterPool(build_converter, warmer=_initialize_converter)
+
+
+def warm_converter() -> float:
+    """Load the Docling models for the current options; returns seconds spent."""
+    return CONVERTER_POOL.warm(converter_key_from_env())
+
+
+def _convert_document(file_path: Path, key: ConverterKey) -> Any:
+    """Convert a PDF, sharding large files across worker processes when enabled."""
+    workers, min_pages, pages_per_shard = shard_settings()
+    if workers > 1:
+        num_pages = count_pdf_pages(file_path)
+        if num_pages and num_pages >= min_pages:
+            try:
+                return convert_sharded(
+                    file_path,
+                    key,
+                    build_converter,
+                    _initialize_converter,
+                    workers=workers,
+                    pages_per_shard=pages_per_shard,
+                    num_pages=num_pages,
+                )
+            except Exception as exc:
+                LOGGER.warning("Sharded conversion of %s failed (%s); converting serially", file_path.name, exc)
+
+    # Reuse a warm converter so layout/table models are loaded once per process
+    with CONVERTER_POOL.checkout(key) as converter:
+        return converter.convert(str(file_path)).document
+
+
 def process_pdf(
     file_path: Path,
     report_week: str,
@@ -81,51 +165,96 @@ def process_pdf(
     is synchronous. Calling this from async code should use asyncio.to_thread() or
     loop.run_in_executor(). FastAPI background tasks run in thread pools, so they
     can call this directly without wrapping.
+
+    After conversion the enrichment stages run as a ``StageGraph`` (see
+    ``stage_graph``). ``analysis_results["stage_timings"]`` holds the seconds
+    spent converting and in each stage.
     """
 
     artifacts_dir.mkdir(parents=True, exist_ok=True)
 
-    vlm_repo = os.getenv("DOCLING_VLM_REPO")
-    use_vlm = bool(vlm_repo)
-    ocr_enabled = os.getenv("PDF_OCR_ENABLED", "false").lower() == "true"
-    picture_enabled = (
-        os.getenv("PDF_PICTURE_DESCRIPTION", "false").lower() == "true" and use_vlm
+    key = converter_key_from_env()
+    ocr_enabled = key.ocr
+
+    convert_started = time.perf_counter()
+    doc = _convert_document(file_path, key)
+    convert_seconds = time.perf_counter() - convert_started
+
+    enable_financials = os.getenv("PDF_FINANCIAL_ANALYSIS", "true").strip().lower() != "false"
+    text_elements = [
+        item
+        for item in getattr(doc, "texts", []) or []
+        if (getattr(item, "text", "") or "").strip()
+    ]
+
+    # Post-conversion enrichment: every stage reads ``doc``; only metric hits
+    # need another stage's output (the per-text metric matches).
+    graph = StageGraph()
+    graph.add("exports", lambda _: _export_stage(doc, file_path, artifacts_dir))
+    graph.add("tables", lambda _: _table_stage(doc, file_path, report_week, enable_financials))
+    graph.add("text", lambda _: _text_stage(doc, file_path, report_week))
+    graph.add("charts", lambda _: _chart_stage(doc, file_path, report_week, artifacts_dir, ocr_enabled))
+    graph.add("formulas", lambda _: _formula_stage(doc, file_path, report_week))
+    graph.add("structure", lambda _: _structure_stage(doc))
+    graph.add("entities", lambda _: _entity_stage(text_elements))
+    graph.add(
+        "metric_hits",
+        lambda deps: _metric_hit_stage(text_elements, deps["text"]["matches"]),
+        deps=("text",),
     )
-    accelerator_options = _build_accelerator_options()
+    results, stage_seconds = graph.run()
 
-    pipeline_options = PdfPipelineOptions()
-    pipeline_options.do_table_structure = True
-    pipeline_options.do_ocr = ocr_enabled
-    pipeline_options.do_picture_description = picture_enabled
-    if picture_enabled:
-        pipeline_options.picture_description_options = PictureDescriptionVlmOptions(
-            repo_id=vlm_repo  # type: ignore[arg-type]
-        )
-    if accelerator_options and hasattr(pipeline_options, "accelerator_options"):
-        pipeline_options.accelerator_options = accelerator_options
+    # Evidence and facts keep the serial order: tables, text, charts, formulas
+    facts: List[Dict[str, Any]] = []
+    evidence: List[Dict[str, Any]] = []
+    for name in ("tables", "text", "charts", "formulas"):
+        facts.extend(results[name]["facts"])
+        evidence.extend(results[name]["evidence"])
 
-    converter = DocumentConverter(
-        format_options={
-            InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
+    analysis_results: Dict[str, Any] = {
+        "document_reference": artifact_id or file_path.name,
+        "entities": results["entities"],
+        "structure": results["structure"],
+        "metric_hits": results["metric_hits"],
+        "tables": results["tables"]["analysis"],
+        "charts": results["charts"]["analysis"],
+        "formulas": results["formulas"]["analysis"],
+        "stage_timings": {"convert": convert_seconds, **stage_seconds},
+    }
+
+    # Add document-level summary fact (captures document structure even if no metrics)
+    doc_pages = getattr(doc, "pages", {}) or {}
+    doc_texts = getattr(doc, "texts", []) or []
+    doc_tables = getattr(doc, "tables", []) or []
+    facts.append(
+        {
+            "id": str(uuid.uuid4()),
+            "report_week": report_week,
+            "entity": "document_summary",
+            "metrics": {
+                "pages": len(doc_pages) if isinstance(doc_pages, (dict, list)) else 1,
+                "text_sections": len(doc_texts),
+                "tables": len(doc_tables),
+                "charts": len(analysis_results.get("charts", [])),
+                "formulas": len(analysis_results.get("formulas", [])),
+                "total_evidence": len(evidence),
+                "total_facts": len(facts),  # Count before this summary
+            },
+            "evidence_id": None,
         }
     )
-    result = converter.convert(str(file_path))
-    doc = result.document
 
-    table_processor = AdvancedTableProcessor()
-    chart_processor = ChartProcessor(enable_ocr=ocr_enabled)
-    formula_processor = FormulaProcessor()
+    return facts, evidence, analysis_results
+
 
-    # Persist Docling exports for downstream inspection/search
+def _export_stage(doc: Any, file_path: Path, artifacts_dir: Path) -> None:
+    """Persist Docling exports for downstream inspection/search."""
     markdown_path = artifacts_dir / f"{file_path.stem}.md"
     json_path = artifacts_dir / f"{file_path.stem}.json"
     text_units_path = artifacts_dir / f"{file_path.stem}.text_units.json"
 
-    markdown_content = doc.export_to_markdown()
-    markdown_path.write_text(markdown_content, encoding="utf-8")
-
-    doc_dict = doc.export_to_dict()
-    json_path.write_text(json.dumps(doc_dict, indent=2), encoding="utf-8")
+    markdown_path.write_text(doc.export_to_markdown(), encoding="utf-8")
+    json_path.write_text(json.dumps(doc.export_to_dict(), indent=2), encoding="utf-8")
 
     try:
         text_units: List[Dict[str, Any]] = []
@@ -133,14 +262,7 @@ def process_pdf(
             text = (getattr(item, "text", "") or "").strip()
             if not text:
                 continue
-            page = None
-            provenance = getattr(item, "prov", None)
-            if provenance:
-                try:
-                    page = getattr(provenance[0], "page", None)
-                except Exception:
-                    page = None
-            text_units.append({"text": text, "page": page})
+            text_units.append({"text": text, "page": _item_page(item)})
         if text_units:
             text_units_path.write_text(
                 json.dumps(text_units, ensure_ascii=False, indent=2),
@@ -150,127 +272,106 @@ def process_pdf(
         # Text units are optional; failures should not abort ingestion.
         pass
 
-    facts: List[Dict[str, Any]] = []
-    evidence: List[Dict[str, Any]] = []
-    analysis_results: Dict[str, Any] = {
-        "document_reference": artifact_id or file_path.name,
-        "entities": [],
-        "structure": None,
-        "metric_hits": [],
-        "tables": [],
-        "charts": [],
-        "formulas": [],
-    }
 
-    # --------------------------- tables ---------------------------
-    analysis_results["document_reference"] = artifact_id or file_path.name
-    
-    table_normalizer = ComplexTableProcessor()
-    statement_detector = FinancialStatementDetector()
-    enable_financials = os.getenv("PDF_FINANCIAL_ANALYSIS", "true").strip().lower() != "false"
+def _item_page(item: Any) -> Optional[int]:
+    provenance = getattr(item, "prov", None)
+    if provenance:
+        try:
+            return getattr(provenance[0], "page", None)
+        except Exception:
+            return None
+    return None
 
-    # Process tables
-    for table_idx, table in enumerate(doc.tables):
-        evidence_id = str(uuid.uuid4())
 
-        # Convert table to pandas DataFrame for analysis
-        normalized_df, header_info = table_normalizer.normalize_table(table)
-        df = normalized_df
+def _table_statement(
+    normalizer: ComplexTableProcessor,
+    detector: FinancialStatementDetector,
+    entry: Dict[str, Any],
+    enable_financials: bool,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Statement analysis and header info for a (possibly merged) table.
 
-        table_analysis = {
-            "type": "unknown",
-            "confidence": 0.0,
-            "summary": {},
-        }
-        if enable_financials and not df.empty:
-            table_analysis = statement_detector.analyze_table(df, header_info)
+    Segments are normalized one at a time until one is recognised as a
+    financial statement. Segments without cell metadata reuse the dataframe
+    the span detector already exported.
+    """
+    statement: Dict[str, Any] = {"type": "unknown", "confidence": 0.0, "summary": {}}
+    header_info: Dict[str, Any] = {}
+    for seg_idx, (table, frame) in enumerate(zip(entry.get("tables", []), entry.get("frames", []))):
+        source = table if getattr(table, "cells", None) else frame
+        normalized_df, seg_header_info = normalizer.normalize_table(source)
+        if seg_idx == 0:
+            header_info = seg_header_info
+        if not enable_financials:
+            break
+        if normalized_df.empty:
+            continue
+        analysis = detector.analyze_table(normalized_df, seg_header_info)
+        if analysis.get("type") not in (None, "", "unknown"):
+            return analysis, seg_header_info
+    return statement, header_info
 
-        # Extract metrics from table
-        metrics = extract_metrics_from_table(df)
-        if table_analysis.get("summary"):
-            for key, value in table_analysis["summary"].items():
-                if value is not None:
-                    metrics.setdefault(key, value)
 
-        should_persist = bool(metrics) or (
-            table_analysis.get("type") not in (None, "", "unknown")
-        )
+def _table_stage(doc: Any, file_path: Path, report_week: str, enable_financials: bool) -> Dict[str, Any]:
+    """One pass over the (multi-page aware) tables.
 
-        if should_persist:
-            # Get table location - handle different Docling API versions
-            bbox = None
-            if hasattr(table, 'prov') and table.prov:
-                prov = table.prov[0]
-                # Try different attribute names for page number (API changed between versions)
-                page_num = getattr(prov, 'page', None) or getattr(prov, 'page_no', None)
-                bbox_tuple = None
-                if hasattr(prov, 'bbox'):
-                    bbox_tuple = prov.bbox.as_tuple() if hasattr(prov.bbox, 'as_tuple') else None
-                bbox = {
-                    'page': page_num,
-                    'bbox': bbox_tuple
-                }
-            
-            preview_df = df.head(5)
-            preview_str = preview_df.to_string(index=False)
-            if table_analysis.get("type") and table_analysis["type"] != "unknown":
-                preview_str = (
-                    f"{table_analysis['type'].replace('_', ' ').title()}"
-                    f" (confidence {table_analysis['confidence']:.2f})\n"
-                    f"{preview_str}"
-                )
+    Each merged table yields a single evidence row carrying its rows, page
+    span and statement analysis, and a fact with its metrics (or its shape
+    when no metrics are found).
+    """
+    normalizer = ComplexTableProcessor()
+    detector = FinancialStatementDetector()
+    evidence: List[Dict[str, Any]] = []
+    facts: List[Dict[str, Any]] = []
+    analysis: List[Dict[str, Any]] = []
 
-            content_type = "financial_table" if table_analysis.get("type") not in (None, "", "unknown") else "table"
-            serialized_rows = _dataframe_to_records(df)
-            evidence.append({
-                "id": evidence_id,
-                "locator": f"{file_path.name}#table{table_idx}",
-                "preview": preview_str,
-                "content_type": content_type,
-                "coordinates": bbox,
-                "full_data": {
-                    "columns": [str(col) for col in df.columns],
-                    "rows": serialized_rows,
-                    "header_info": header_info,
-                    "statement": table_analysis,
-                },
-            })
-
-    # Process tables (multi-page aware)
-    merged_tables = table_processor.detect_spanning_tables(doc)
+    merged_tables = AdvancedTableProcessor().detect_spanning_tables(doc)
     for table_idx, table_entry in enumerate(merged_tables):
         df = table_entry.get("dataframe")
         if df is None or df.empty:
             continue
 
-        evidence_id = str(uuid.uuid4())
+        statement, header_info = _table_statement(normalizer, detector, table_entry, enable_financials)
         metrics = extract_metrics_from_table(df)
+        for key, value in (statement.get("summary") or {}).items():
+            if value is not None:
+                metrics.setdefault(key, value)
+        is_financial = statement.get("type") not in (None, "", "unknown")
 
-        coordinates = table_entry.get("segments") or []
+        evidence_id = str(uuid.uuid4())
+        locator = f"{file_path.name}#table{table_idx}"
         preview = df.head(5).to_string(index=False)
+        if is_financial:
+            preview = (
+                f"{statement['type'].replace('_', ' ').title()}"
+                f" (confidence {statement['confidence']:.2f})\n"
+                f"{preview}"
+            )
         full_payload: Dict[str, Any] = {
-            "rows": df.to_dict("records"),
+            "rows": _dataframe_to_records(df),
             "pages": table_entry.get("pages", []),
             "merged": table_entry.get("merged", False),
             "header_detected": table_entry.get("header_detected", False),
             "columns": [str(col) for col in df.columns],
+            "header_info": header_info,
+            "statement": statement,
         }
 
         evidence.append(
             {
                 "id": evidence_id,
-                "locator": f"{file_path.name}#table{table_idx}",
+                "locator": locator,
                 "preview": preview,
-                "content_type": "table",
-                "coordinates": coordinates,
+                "content_type": "financial_table" if is_financial else "table",
+                "coordinates": table_entry.get("segments") or [],
                 "full_data": full_payload,
             }
         )
 
-        analysis_results["tables"].append(
+        analysis.append(
             {
                 "evidence_id": evidence_id,
-                "locator": f"{file_path.name}#table{table_idx}",
+                "locator": locator,
                 "pages": list(full_payload["pages"]),
                 "header_detected": full_payload["header_detected"],
                 "row_count": int(df.shape[0]),
@@ -294,18 +395,32 @@ def process_pdf(
             }
         )
 
-    # --------------------------- text metrics ---------------------------
-    # NOTE: Asymmetric evidence/fact behavior by design:
-    # - Evidence is ALWAYS created for non-empty text sections (preserves full text)
-    # - Facts are ONLY created when metrics are extracted (avoids empty fact rows)
-    # This differs from tables where facts are always created since tables have
-    # inherent structure (row/column counts) even without extracted metrics.
+    return {"evidence": evidence, "facts": facts, "analysis": analysis}
+
+
+def _text_stage(doc: Any, file_path: Path, report_week: str) -> Dict[str, Any]:
+    """Evidence per text section and facts for the sections stating metrics.
+
+    NOTE: Asymmetric evidence/fact behavior by design:
+    - Evidence is ALWAYS created for non-empty text sections (preserves full text)
+    - Facts are ONLY created when metrics are extracted (avoids empty fact rows)
+    This differs from tables where facts are always created since tables have
+    inherent structure (row/column counts) even without extracted metrics.
+
+    Each text is scanned once for every metric family; ``matches`` (keyed by
+    ``id(item)``) is reused by the metric hits stage.
+    """
+    evidence: List[Dict[str, Any]] = []
+    facts: List[Dict[str, Any]] = []
+    text_matches: Dict[int, List[MetricMatch]] = {}
     for section_idx, item in enumerate(getattr(doc, "texts", []) or []):
         text = getattr(item, "text", "") or ""
         if not text.strip():
             continue
 
-        metrics = extract_metrics_from_text(text)
+        matches = METRIC_ENGINE.scan(text)
+        text_matches[id(item)] = matches
+        metrics = extract_metrics_from_text(text, matches)
 
         # Always create evidence for text sections
         evidence_id = str(uuid.uuid4())
@@ -345,9 +460,17 @@ def process_pdf(
                 }
             )
 
-    # --------------------------- charts ---------------------------
-    chart_results = chart_processor.process_charts(doc, artifacts_dir, file_path.stem)
-    vlm_enabled = bool(vlm_repo)
+    return {"evidence": evidence, "facts": facts, "matches": text_matches}
+
+
+def _chart_stage(
+    doc: Any, file_path: Path, report_week: str, artifacts_dir: Path, ocr_enabled: bool
+) -> Dict[str, Any]:
+    evidence: List[Dict[str, Any]] = []
+    facts: List[Dict[str, Any]] = []
+    analysis: List[Dict[str, Any]] = []
+    chart_results = ChartProcessor(enable_ocr=ocr_enabled).process_charts(doc, artifacts_dir, file_path.stem)
+    vlm_enabled = bool(os.getenv("DOCLING_VLM_REPO"))
     for chart_idx, chart in enumerate(chart_results):
         evidence_id = str(uuid.uuid4())
         preview = chart.get("caption") or chart.get("extracted_text") or f"Chart {chart_idx}"
@@ -367,7 +490,7 @@ def process_pdf(
             }
         )
 
-        analysis_results["charts"].append(
+        analysis.append(
             {"evidence_id": evidence_id, "locator": f"{file_path.name}#chart{chart_idx}", **chart_payload}
         )
 
@@ -392,8 +515,14 @@ def process_pdf(
                 }
             )
 
-    # --------------------------- formulas ---------------------------
-    formulas = formula_processor.extract_formulas(doc)
+    return {"evidence": evidence, "facts": facts, "analysis": analysis}
+
+
+def _formula_stage(doc: Any, file_path: Path, report_week: str) -> Dict[str, Any]:
+    evidence: List[Dict[str, Any]] = []
+    facts: List[Dict[str, Any]] = []
+    analysis: List[Dict[str, Any]] = []
+    formulas = FormulaProcessor().extract_formulas(doc)
     for formula_idx, formula in enumerate(formulas):
         evidence_id = str(uuid.uuid4())
         preview = formula.get("latex") or formula.get("content") or f"Formula {formula_idx}"
@@ -412,7 +541,7 @@ def process_pdf(
             }
         )
 
-        analysis_results["formulas"].append(
+        analysis.append(
             {"evidence_id": evidence_id, "locator": f"{file_path.name}#formula{formula_idx}", **formula}
         )
 
@@ -435,35 +564,30 @@ def process_pdf(
                 }
             )
 
-    # --------------------------- analysis outputs ---------------------------
-    text_elements = [
-        item
-        for item in getattr(doc, "texts", []) or []
-        if (getattr(item, "text", "") or "").strip()
-    ]
+    return {"evidence": evidence, "facts": facts, "analysis": analysis}
+
 
+def _structure_stage(doc: Any) -> Optional[Dict[str, Any]]:
     try:
-        analysis_results["structure"] = STRUCTURE_PROCESSOR.build_hierarchy(doc)
+        return STRUCTURE_PROCESSOR.build_hierarchy(doc)
     except Exception:  # pragma: no cover - best-effort enrichment
-        analysis_results["structure"] = None
+        return None
+
 
+def _entity_stage(text_elements: List[Any]) -> List[Dict[str, Any]]:
     try:
-        analysis_results["entities"] = NER_PROCESSOR.extract_entities(text_elements)
+        return NER_PROCESSOR.extract_entities(text_elements)
     except Exception:  # pragma: no cover - spaCy optional in CI
-        analysis_results["entities"] = []
+        return []
+
 
+def _metric_hit_stage(text_elements: List[Any], text_matches: Dict[int, List[MetricMatch]]) -> List[Dict[str, Any]]:
     metric_hits: List[Dict[str, Any]] = []
     for idx, item in enumerate(text_elements):
-        hits = METRIC_EXTRACTOR.extract_metrics(getattr(item, "text", ""))
+        hits = METRIC_EXTRACTOR.extract_metrics(getattr(item, "text", ""), matches=text_matches.get(id(item)))
         if not hits:
             continue
-        page = None
-        provenance = getattr(item, "prov", None)
-        if provenance:
-            try:
-                page = getattr(provenance[0], "page", None)
-            except Exception:
-                page = None
+        page = _item_page(item)
         for hit in hits:
             metric_hits.append(
                 {
@@ -472,112 +596,27 @@ def process_pdf(
                     "source_index": idx,
                 }
             )
-    analysis_results["metric_hits"] = metric_hits
-
-    # Add document-level summary fact (captures document structure even if no metrics)
-    doc_pages = getattr(doc, "pages", {}) or {}
-    doc_texts = getattr(doc, "texts", []) or []
-    doc_tables = getattr(doc, "tables", []) or []
-    facts.append(
-        {
-            "id": str(uuid.uuid4()),
-            "report_week": report_week,
-            "entity": "document_summary",
-            "metrics": {
-                "pages": len(doc_pages) if isinstance(doc_pages, (dict, list)) else 1,
-                "text_sections": len(doc_texts),
-                "tables": len(doc_tables),
-                "charts": len(analysis_results.get("charts", [])),
-                "formulas": len(analysis_results.get("formulas", [])),
-                "total_evidence": len(evidence),
-                "total_facts": len(facts),  # Count before this summary
-            },
-            "evidence_id": None,
-        }
-    )
-
-    return facts, evidence, analysis_results
+    return metric_hits
 
 
 def extract_metrics_from_table(df: pd.DataFrame) -> Dict[str, float]:
     """Extract totals for common marketing metrics from a table."""
 
-    metrics: Dict[str, float] = {}
-
-    metric_patterns = {
-        "spend": ["spend", "cost", "budget"],
-        "revenue": ["revenue", "sales", "income"],
-        "conversions": ["conversions", "leads", "sales"],
-        "clicks": ["clicks"],
-        "impressions": ["impressions", "views"],
-        "ctr": ["ctr", "click rate"],
-        "cpa": ["cpa", "cost per"],
-        "roas": ["roas", "return on"],
-    }
+    return add_derived_metrics(column_metric_totals(df))
 
-    for metric_name, patterns in metric_patterns.items():
-        for col in df.columns:
-            col_lower = str(col).lower()
-            if any(p in col_lower for p in patterns):
-                try:
-                    numeric_values = pd.to_numeric(df[col], errors="coerce")
-                    total = numeric_values.sum()
-                    if not pd.isna(total):
-                        metrics[metric_name] = float(total)
-                except Exception:
-                    continue
-
-    if (
-        "clicks" in metrics
-        and "impressions" in metrics
-        and metrics["impressions"] > 0
-    ):
-        metrics["ctr"] = metrics["clicks"] / metrics["impressions"]
-
-    if (
-        "spend" in metrics
-        and "conversions" in metrics
-        and metrics["conversions"] > 0
-    ):
-        metrics["cpa"] = metrics["spend"] / metrics["conversions"]
-
-    if "revenue" in metrics and "spend" in metrics and metrics["spend"] > 0:
-        metrics["roas"] = metrics["revenue"] / metrics["spend"]
-
-    return metrics
-
-
-def extract_metrics_from_text(text: str) -> Dict[str, float]:
-    """Extract numeric metrics from free-form text using regex patterns."""
-
-    metrics: Dict[str, float] = {}
-    haystack = text or ""
-
-    patterns = {
-        "roas": r"ROAS[:\s]+([0-9.]+)",
-        "cpa": r"CPA[:\s]+\$?\s*([0-9,.]+)",
-        "ctr": r"CTR[:\s]+([0-9.]+)\s*%?",
-        "revenue": r"revenue[:\s]+\$?\s*([0-9,]+(?:\.[0-9]+)?)",
-        "spend": r"spend[:\s]+\$?\s*([0-9,]+(?:\.[0-9]+)?)",
-        "conversions": r"conversions?[:\s]+([0-9,]+)",
-        "clicks": r"clicks?[:\s]+([0-9,]+)",
-        "impressions": r"impressions?[:\s]+([0-9,]+)",
-    }
 
-    for metric, pattern in patterns.items():
-        match = re.search(pattern, haystack, re.IGNORECASE)
-        if not match:
-            continue
-        value_str = match.group(1).replace(",", "")
-        try:
-            metrics[metric] = float(value_str)
-        except ValueError:
-            continue
+def extract_metrics_from_text(text: str, matches: Optional[List[MetricMatch]] = None) -> Dict[str, float]:
+    """Extract numeric metrics from free-form text using regex patterns.
+
+    ``matches`` may be a previous ``METRIC_ENGINE.scan(text)`` result.
+    """
 
-    return metrics
+    if matches is None:
+        matches = METRIC_ENGINE.scan(text, families=("marketing",))
+    return first_metric_values(matches, "marketing")
 
 
-__all__ = ["process_pdf", "extract_metrics_from_table", "extract_metrics_from_text"]
+__all__ = ["process_pdf", "warm_converter", "extract_metrics_from_table", "extract_metrics_from_text"]
 
 def _dataframe_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
     records: List[Dict[str, Any]] = []
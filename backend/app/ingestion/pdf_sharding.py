@@ -0,0 +1,166 @@
+"""Sharded Docling conversion of large PDFs across a process pool.
+
+A long filing is split into contiguous page ranges that are converted in
+parallel by worker processes, each holding its own warm converter, and the
+per-shard documents are concatenated back into one ``DoclingDocument``.
+Docling keeps absolute page numbers for ``page_range`` conversions and
+``DoclingDocument.concatenate`` preserves them for contiguous shards, so
+provenance on the merged document matches a serial conversion. Tables that
+continue across a shard boundary end up on adjacent pages of the merged
+document, where ``AdvancedTableProcessor.detect_spanning_tables`` joins them.
+
+Configuration (environment):
+    PDF_SHARD_WORKERS: Worker processes; 0 or 1 disables sharding (default: 0)
+    PDF_SHARD_MIN_PAGES: Only shard PDFs with at least this many pages (default: 40)
+    PDF_SHARD_PAGES: Pages per shard (default: 16)
+
+Functions:
+    count_pdf_pages: Page count of a PDF, or None when it cannot be read
+    page_ranges: Split a page count into 1-based inclusive ranges
+    convert_sharded: Convert a PDF shard-by-shard and merge the results
+    shutdown_executors: Stop the worker pools (app shutdown and interpreter exit)
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# Per-process converter, created by the pool initializer
+_WORKER_CONVERTER: Any = None
+
+_EXECUTORS: Dict[Any, ProcessPoolExecutor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def shard_settings() -> Tuple[int, int, int]:
+    """Return (workers, min_pages, pages_per_shard) from the environment."""
+    return (
+        max(0, _env_int("PDF_SHARD_WORKERS", 0)),
+        max(1, _env_int("PDF_SHARD_MIN_PAGES", 40)),
+        max(1, _env_int("PDF_SHARD_PAGES", 16)),
+    )
+
+
+def count_pdf_pages(file_path: Path) -> Optional[int]:
+    try:
+        import pypdfium2  # type: ignore
+    except ImportError:  # pragma: no cover - installed with docling
+        return None
+    try:
+        pdf = pypdfium2.PdfDocument(str(file_path))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except Exception:
+        return None
+
+
+def page_ranges(num_pages: int, pages_per_shard: int) -> List[Tuple[int, int]]:
+    """Split ``num_pages`` into consecutive 1-based inclusive (start, end) ranges."""
+    step = max(1, pages_per_shard)
+    return [(start, min(start + step - 1, num_pages)) for start in range(1, num_pages + 1, step)]
+
+
+def _init_worker(factory: Callable[[Any], Any], warmer: Optional[Callable[[Any], None]], key: Any) -> None:
+    global _WORKER_CONVERTER
+    _WORKER_CONVERTER = factory(key)
+    if warmer is not None:
+        warmer(_WORKER_CONVERTER)
+
+
+def _convert_range(file_path: str, start: int, end: int) -> Dict[str, Any]:
+    result = _WORKER_CONVERTER.convert(file_path, page_range=(start, end))
+    # Plain dicts cross the process boundary more cheaply than pydantic models
+    return result.document.export_to_dict()
+
+
+def _get_executor(
+    key: Any,
+    workers: int,
+    factory: Callable[[Any], Any],
+    warmer: Optional[Callable[[Any], None]],
+) -> ProcessPoolExecutor:
+    """Long-lived pool per converter key so worker models stay loaded."""
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get((key, workers))
+        if executor is None:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                # spawn: forking a process that holds torch/OpenMP threads is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(factory, warmer, key),
+            )
+            _EXECUTORS[(key, workers)] = executor
+        return executor
+
+
+def shutdown_executors(wait: bool = False) -> None:
+    """Cancel queued shards and stop every worker pool; later calls start new pools."""
+    with _EXECUTORS_LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Spawned workers hold warm Docling models; do not leave them behind.
+atexit.register(shutdown_executors)
+
+
+def convert_sharded(
+    file_path: Path,
+    key: Any,
+    factory: Callable[[Any], Any],
+    warmer: Optional[Callable[[Any], None]] = None,
+    workers: Optional[int] = None,
+    pages_per_shard: Optional[int] = None,
+    num_pages: Optional[int] = None,
+) -> Any:
+    """Convert ``file_path`` in parallel page ranges and merge the documents.
+
+    Args:
+        file_path: PDF to convert.
+        key: Converter options, passed to ``factory`` in each worker.
+        factory: Picklable callable building a converter from ``key``.
+        warmer: Optional picklable callable loading a converter's models.
+        workers: Worker processes (default: PDF_SHARD_WORKERS).
+        pages_per_shard: Pages per range (default: PDF_SHARD_PAGES).
+        num_pages: Page count if already known.
+
+    Returns:
+        The merged ``DoclingDocument``.
+    """
+    from docling_core.types.doc import DoclingDocument
+
+    env_workers, _, env_pages = shard_settings()
+    workers = max(1, workers or env_workers)
+    num_pages = num_pages or count_pdf_pages(file_path)
+    if not num_pages:
+        raise ValueError(f"Cannot determine page count of {file_path}")
+    ranges = page_ranges(num_pages, pages_per_shard or env_pages)
+    executor = _get_executor(key, workers, factory, warmer)
+    futures = [executor.submit(_convert_range, str(file_path), start, end) for start, end in ranges]
+    # Results are collected in page order; concatenate relies on it.
+    shards = [DoclingDocument.model_validate(f.result()) for f in futures]
+    LOGGER.info("Converted %s in %d shards across %d workers", file_path.name, len(ranges), workers)
+    merged = DoclingDocument.concatenate(shards)
+    merged.name = file_path.stem
+    return merged
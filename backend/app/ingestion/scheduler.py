@@ -0,0 +1,325 @@
+"""Bounded, prioritised ingestion job scheduler.
+
+Replaces per-upload ``BackgroundTasks`` and per-file watcher threads with a
+fixed number of workers, so a bulk drop of files queues up instead of
+starting one conversion per file.
+
+- Two lanes: ``heavy`` (Docling PDF conversion) and ``light`` (CSV/XLSX,
+  XML, OpenAPI/Postman parsers), each with its own worker threads. Heavy
+  workers only bound how many conversions run at once; the conversion itself
+  may fan out to the Docling shard process pool (see ``pdf_sharding``).
+- Each lane has a bounded priority queue. Interactive uploads are served
+  before watch-folder and backfill jobs; equal priorities run FIFO.
+- ``submit`` raises :class:`QueueFullError` when a lane is full (the upload
+  API turns this into HTTP 429), or blocks until space frees up when
+  ``block=True`` (the watch folder).
+- Queued jobs can be cancelled; running jobs are left to finish.
+- Queue depth, wait time and service time are tracked per file type.
+
+Configuration (environment):
+    INGEST_HEAVY_WORKERS: Concurrent PDF conversions (default: 2)
+    INGEST_LIGHT_WORKERS: Concurrent light parser jobs (default: 4)
+    INGEST_MAX_QUEUE: Queued jobs per lane before rejecting (default: 200)
+
+Classes:
+    QueueFullError: Raised when a lane's queue is at capacity
+    IngestionJob: One scheduled unit of work
+    IngestionScheduler: Worker pools, priority queues and metrics
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_WATCH = 10
+PRIORITY_BACKFILL = 20
+
+LANES = ("heavy", "light")
+
+# Finished jobs are forgotten once this many are tracked
+_MAX_TRACKED_JOBS = 10_000
+
+
+class QueueFullError(RuntimeError):
+    """The lane's queue is at capacity; retry later."""
+
+    def __init__(self, lane: str, depth: int, retry_after: int = 5):
+        super().__init__(f"Ingestion queue '{lane}' is full ({depth} jobs queued)")
+        self.lane = lane
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+@dataclass
+class IngestionJob:
+    """A queued call of ``fn(*args)``.
+
+    Attributes:
+        id: Job identifier (the task id when one exists)
+        lane: "heavy" or "light"
+        file_type: File suffix used for per-type metrics, e.g. ".pdf"
+        priority: Lower runs first
+        status: queued, running, completed, error or cancelled
+    """
+
+    id: str
+    lane: str
+    file_type: str
+    priority: int
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...] = ()
+    status: str = "queued"
+    enqueued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+
+def _env_count(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ[name]))
+    except (KeyError, ValueError):
+        return default
+
+
+class _TypeStats:
+    __slots__ = ("queued", "running", "completed", "failed", "cancelled",
+                 "wait_sum", "wait_max", "service_sum", "service_max", "started")
+
+    def __init__(self) -> None:
+        self.queued = self.running = self.completed = self.failed = self.cancelled = 0
+        self.started = 0
+        self.wait_sum = self.wait_max = self.service_sum = self.service_max = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "queue_depth": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "wait_seconds_sum": round(self.wait_sum, 6),
+            "wait_seconds_max": round(self.wait_max, 6),
+            "wait_seconds_avg": round(self.wait_sum / self.started, 6) if self.started else 0.0,
+            "service_seconds_sum": round(self.service_sum, 6),
+            "service_seconds_max": round(self.service_max, 6),
+            "service_seconds_avg": round(self.service_sum / finished, 6) if finished else 0.0,
+        }
+
+
+class IngestionScheduler:
+    """Run ingestion jobs on fixed-size worker pools with bounded queues.
+
+    Attributes:
+        workers: Worker count per lane
+        max_queue: Queue capacity per lane
+    """
+
+    def __init__(
+        self,
+        heavy_workers: Optional[int] = None,
+        light_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+    ):
+        self.workers = {
+            "heavy": heavy_workers or _env_count("INGEST_HEAVY_WORKERS", 2),
+            "light": light_workers or _env_count("INGEST_LIGHT_WORKERS", 4),
+        }
+        self.max_queue = max_queue or _env_count("INGEST_MAX_QUEUE", 200)
+        self._queues: Dict[str, List[Tuple[int, int, IngestionJob]]] = {lane: [] for lane in LANES}
+        self._depth: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._stats: Dict[str, _TypeStats] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+
+    # ---------------------------------------------------------------- workers
+    def _ensure_workers(self) -> None:
+        if self._threads:
+            return
+        for lane in LANES:
+            for n in range(self.workers[lane]):
+                t = threading.Thread(target=self._worker, args=(lane,), name=f"ingest-{lane}-{n}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _type_stats(self, file_type: str) -> _TypeStats:
+        stats = self._stats.get(file_type)
+        if stats is None:
+            stats = self._stats[file_type] = _TypeStats()
+        return stats
+
+    def _worker(self, lane: str) -> None:
+        queue = self._queues[lane]
+        while True:
+            with self._cond:
+                while not self._stopping and not queue:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                _, _, job = heapq.heappop(queue)
+                if job.status == "cancelled":
+                    # Already accounted for by cancel()
+                    continue
+                self._depth[lane] -= 1
+                job.status = "running"
+                job.started_at = time.monotonic()
+                wait = job.started_at - job.enqueued_at
+                stats = self._type_stats(job.file_type)
+                stats.queued -= 1
+                stats.running += 1
+                stats.started += 1
+                stats.wait_sum += wait
+                stats.wait_max = max(stats.wait_max, wait)
+                # A slot opened up for blocked submitters
+                self._cond.notify_all()
+            try:
+                job.fn(*job.args)
+                status, error = "completed", None
+            except Exception as exc:
+                LOGGER.exception("Ingestion job %s (%s) failed", job.id, job.file_type)
+                status, error = "error", str(exc)
+            with self._cond:
+                job.status = status
+                job.error = error
+                job.finished_at = time.monotonic()
+                service = job.finished_at - job.started_at
+                stats = self._type_stats(job.file_type)
+                stats.running -= 1
+                stats.service_sum += service
+                stats.service_max = max(stats.service_max, service)
+                if status == "completed":
+                    stats.completed += 1
+                else:
+                    stats.failed += 1
+
+    # ------------------------------------------------------------------- API
+    def has_capacity(self, lane: str, count: int = 1) -> bool:
+        with self._cond:
+            return self._depth[lane] + count <= self.max_queue
+
+    def submit(
+        self,
+        job_id: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        lane: str = "heavy",
+        file_type: str = "",
+        priority: int = PRIORITY_INTERACTIVE,
+        block: bool = False,
+        timeout: Optional[float] = None,
+    ) -> IngestionJob:
+        """Queue ``fn(*args)``.
+
+        Raises:
+            QueueFullError: The lane is full and ``block`` is False, or it
+                stayed full for ``timeout`` seconds.
+        """
+        if lane not in LANES:
+            raise ValueError(f"Unknown ingestion lane {lane!r}")
+        job = IngestionJob(id=job_id, lane=lane, file_type=file_type or "other", priority=priority, fn=fn, args=args)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._depth[lane] >= self.max_queue:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if not block or (remaining is not None and remaining <= 0):
+                    raise QueueFullError(lane, self._depth[lane])
+                self._cond.wait(remaining)
+            self._ensure_workers()
+            if len(self._jobs) >= _MAX_TRACKED_JOBS:
+                self.forget_finished(older_than=0.0)
+            job.enqueued_at = time.monotonic()
+            heapq.heappush(self._queues[lane], (priority, next(self._seq), job))
+            self._depth[lane] += 1
+            self._jobs[job.id] = job
+            self._type_stats(job.file_type).queued += 1
+            self._cond.notify_all()
+        return job
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a queued job.
+
+        Returns:
+            The job's resulting status ("cancelled", or its current status if it
+            already started), or None for an unknown job.
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status != "queued":
+                return job.status
+            job.status = "cancelled"
+            job.finished_at = time.monotonic()
+            self._depth[job.lane] -= 1
+            stats = self._type_stats(job.file_type)
+            stats.queued -= 1
+            stats.cancelled += 1
+            self._cond.notify_all()
+            return job.status
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def forget_finished(self, older_than: float = 3600.0) -> int:
+        """Drop bookkeeping for jobs that finished more than ``older_than`` seconds ago."""
+        cutoff = time.monotonic() - older_than
+        with self._cond:
+            stale = [jid for jid, job in self._jobs.items() if job.finished_at is not None and job.finished_at < cutoff]
+            for jid in stale:
+                del self._jobs[jid]
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth per lane plus wait/service statistics per file type."""
+        with self._cond:
+            return {
+                "lanes": {
+                    lane: {"queue_depth": self._depth[lane], "workers": self.workers[lane], "max_queue": self.max_queue}
+                    for lane in LANES
+                },
+                "file_types": {ft: s.as_dict() for ft, s in sorted(self._stats.items())},
+            }
+
+    def prometheus_lines(self) -> List[str]:
+        """Render :meth:`stats` as Prometheus text-format samples."""
+        snap = self.stats()
+        lines = [
+            f'pmoves_ingest_lane_queue_depth{{lane="{lane}"}} {info["queue_depth"]}'
+            for lane, info in snap["lanes"].items()
+        ]
+        for ft, s in snap["file_types"].items():
+            label = f'{{file_type="{ft}"}}'
+            lines += [
+                f"pmoves_ingest_queue_depth{label} {s['queue_depth']}",
+                f"pmoves_ingest_running{label} {s['running']}",
+                f"pmoves_ingest_completed_total{label} {s['completed']}",
+                f"pmoves_ingest_failed_total{label} {s['failed']}",
+                f"pmoves_ingest_cancelled_total{label} {s['cancelled']}",
+                f"pmoves_ingest_wait_seconds_sum{label} {s['wait_seconds_sum']}",
+                f"pmoves_ingest_service_seconds_sum{label} {s['service_seconds_sum']}",
+            ]
+        return lines
+
+    def shutdown(self) -> None:
+        """Stop workers after their current job; queued jobs are abandoned."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads = []
@@ -0,0 +1,120 @@
+"""Small dependency graph for running document enrichment stages.
+
+After conversion, ``process_pdf`` extracts tables, text metrics, charts,
+formulas, structure, entities and metric hits. Most of these only read the
+converted document and do not depend on each other. Each one is registered
+as a stage with the stages it needs, and independent stages run
+concurrently on a thread pool. Threads rather than processes are used
+because every stage reads the same in-memory ``DoclingDocument``. The heavy
+parts (pandas, OCR subprocesses, spaCy) release the GIL for much of their
+work.
+
+Every stage is timed, so the task record can show where a document spent
+its time.
+
+Configuration (environment):
+    PDF_STAGE_WORKERS: Threads for independent stages; 0 or 1 runs them in
+        the calling thread in registration order (default: 4)
+
+Classes:
+    StageGraph: Register stages with dependencies and run them
+
+Functions:
+    stage_workers: Configured worker count
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+DEFAULT_STAGE_WORKERS = 4
+
+StageFn = Callable[[Mapping[str, Any]], Any]
+
+
+def stage_workers() -> int:
+    """Threads for independent stages, from ``PDF_STAGE_WORKERS``."""
+    try:
+        return max(0, int(os.getenv("PDF_STAGE_WORKERS", str(DEFAULT_STAGE_WORKERS))))
+    except ValueError:
+        return DEFAULT_STAGE_WORKERS
+
+
+@dataclass(frozen=True)
+class _Stage:
+    name: str
+    fn: StageFn
+    deps: Tuple[str, ...]
+
+
+class StageGraph:
+    """Register stages with dependencies and run them.
+
+    A stage function receives a mapping with the results of its
+    dependencies and returns its own result. If a stage raises, no new
+    stages are started and the exception propagates from ``run`` once the
+    stages already running have finished.
+    """
+
+    def __init__(self) -> None:
+        self._stages: Dict[str, _Stage] = {}
+
+    def add(self, name: str, fn: StageFn, deps: Tuple[str, ...] = ()) -> "StageGraph":
+        if name in self._stages:
+            raise ValueError(f"duplicate stage: {name}")
+        missing = [dep for dep in deps if dep not in self._stages]
+        if missing:
+            # Dependencies must be registered first, which also rules out cycles
+            raise ValueError(f"stage {name} depends on unknown stages: {', '.join(missing)}")
+        self._stages[name] = _Stage(name, fn, tuple(deps))
+        return self
+
+    def run(self, max_workers: Optional[int] = None) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Run every stage; returns ``(results, seconds)`` keyed by stage name."""
+        workers = stage_workers() if max_workers is None else max(0, max_workers)
+        results: Dict[str, Any] = {}
+        seconds: Dict[str, float] = {}
+        if workers <= 1:
+            for stage in self._stages.values():
+                results[stage.name] = self._call(stage, results, seconds)
+            return results, seconds
+
+        pending = dict(self._stages)
+        running: Dict[Future, str] = {}
+        error: Optional[BaseException] = None
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-stage") as pool:
+            while pending or running:
+                if error is None:
+                    ready = [s for s in pending.values() if all(dep in results for dep in s.deps)]
+                    for stage in ready:
+                        del pending[stage.name]
+                        deps = {dep: results[dep] for dep in stage.deps}
+                        running[pool.submit(self._call, stage, deps, seconds)] = stage.name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except BaseException as exc:  # re-raised after running stages drain
+                        error = error or exc
+        if error is not None:
+            raise error
+        return results, seconds
+
+    @staticmethod
+    def _call(stage: _Stage, available: Mapping[str, Any], seconds: Dict[str, float]) -> Any:
+        deps = {dep: available[dep] for dep in stage.deps}
+        started = time.perf_counter()
+        try:
+            return stage.fn(deps)
+        finally:
+            seconds[stage.name] = time.perf_counter() - started
+
+
+__all__ = ["StageGraph", "stage_workers"]
@@ -0,0 +1,106 @@
+"""Chunked aggregation shared by the CSV and XLSX processors.
+
+Tabular files are read in chunks of ``TABULAR_CHUNK_ROWS`` rows (default
+50000). Each chunk updates running column totals and is then either kept
+inline (small files) or appended to an out-of-line evidence payload, so peak
+memory depends on the chunk size rather than the file size.
+
+Classes:
+    TableAccumulator: Running totals, preview and row payload for one table
+
+Functions:
+    chunk_rows: Configured rows per chunk
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from app.evidence_store import ROWS_REF_KEY, EvidencePayloadStore, PayloadWriter
+
+DEFAULT_CHUNK_ROWS = 50_000
+PREVIEW_ROWS = 10
+
+
+def chunk_rows() -> int:
+    """Rows per chunk, from ``TABULAR_CHUNK_ROWS``."""
+    try:
+        return max(1, int(os.getenv("TABULAR_CHUNK_ROWS", str(DEFAULT_CHUNK_ROWS))))
+    except ValueError:
+        return DEFAULT_CHUNK_ROWS
+
+
+class TableAccumulator:
+    """Running totals, preview and row payload for one table.
+
+    Without a payload store every row is kept for an inline ``full_data``.
+    With one, rows are buffered only until they reach the store's
+    ``min_rows`` threshold and are streamed to a payload file after that.
+
+    Attributes:
+        evidence_id: Id of the evidence the payload belongs to
+        columns: Column labels in file order
+        row_count: Rows seen so far
+    """
+
+    def __init__(self, evidence_id: str, payload_store: Optional[EvidencePayloadStore] = None):
+        self.evidence_id = evidence_id
+        self.payload_store = payload_store
+        self.columns: List[Any] = []
+        self.row_count = 0
+        self._totals: Dict[Any, float] = {}
+        self._non_numeric: set = set()
+        self._preview: Optional[pd.DataFrame] = None
+        self._rows: List[Dict[str, Any]] = []
+        self._writer: Optional[PayloadWriter] = None
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        if not self.columns:
+            self.columns = list(chunk.columns)
+        if self._preview is None:
+            self._preview = chunk.head(PREVIEW_ROWS)
+        elif len(self._preview) < PREVIEW_ROWS:
+            self._preview = pd.concat(
+                [self._preview, chunk.head(PREVIEW_ROWS - len(self._preview))], ignore_index=True
+            )
+
+        # A column counts as numeric only if it is numeric in every chunk,
+        # which is what a single read of the whole file would infer.
+        numeric = set(chunk.select_dtypes(include=["number"]).columns)
+        for col in chunk.columns:
+            if col in self._non_numeric:
+                continue
+            if col in numeric:
+                self._totals[col] = self._totals.get(col, 0.0) + float(chunk[col].sum())
+            else:
+                self._non_numeric.add(col)
+                self._totals.pop(col, None)
+
+        records = chunk.to_dict("records")
+        self.row_count += len(records)
+        if self._writer is not None:
+            self._writer.write(records)
+            return
+        self._rows.extend(records)
+        if self.payload_store is not None and len(self._rows) >= self.payload_store.min_rows:
+            self._writer = self.payload_store.open_writer(self.evidence_id)
+            self._writer.write(self._rows)
+            self._rows = []
+
+    def numeric_totals(self) -> Dict[Any, float]:
+        """Column sums for the numeric columns, in file order."""
+        return {col: self._totals[col] for col in self.columns if col in self._totals}
+
+    def preview(self) -> str:
+        frame = self._preview if self._preview is not None else pd.DataFrame(columns=self.columns)
+        return frame.to_string()
+
+    def full_data(self) -> Any:
+        """Inline records, or a reference to the payload file."""
+        if self._writer is None:
+            return self._rows
+        ref = self._writer.close()
+        return {"columns": ref["columns"], ROWS_REF_KEY: ref}
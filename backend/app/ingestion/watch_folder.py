@@ -0,0 +1,514 @@
+"""Watch-folder ingestion with per-file debounce and batched dispatch.
+
+The watcher thread only tracks files. Every added or modified file gets its
+own debounce timer, which restarts whenever the file's size or mtime
+changes. A file is ready once it has been stable for the debounce interval.
+Many files settle at the same time, so a bulk drop of 1,000 files is picked
+up after one debounce interval rather than one interval per file. Ready
+files are grouped into batches. The batches run on a small thread pool,
+which copies each file into ``uploads/`` and queues it on the ingestion
+scheduler. The scheduler's blocking submit throttles these threads, not the
+watcher.
+
+Ingested files are recorded in a SQLite checkpoint with their size and
+mtime. A handler that only queues the file returns a ticket instead; the
+file is checkpointed as pending and ``resolve(ticket)`` is polled until the
+ingestion completed (the file is then checkpointed as done) or failed.
+Pending tickets survive a restart and are resolved again. On start-up the
+folder is scanned. Files the checkpoint does not know, or that changed since
+they were recorded, are ingested, so drops made while the service was down
+are not lost and nothing is ingested twice.
+
+Failed files are observed again after a backoff that starts at
+``WATCH_RETRY_MS`` and doubles with every failure up to
+``WATCH_RETRY_MAX_MS``.
+
+Changes are detected by polling ``watchgod``'s directory watcher every
+``WATCH_POLL_MS``.
+
+Configuration (environment):
+    WATCH_DEBOUNCE_MS: Time a file must stay unchanged before ingestion (default: 1000)
+    WATCH_MIN_BYTES: Smaller files are ignored (default: 1)
+    WATCH_POLL_MS: Interval between directory checks (default: 250)
+    WATCH_BATCH_SIZE: Files per dispatched batch (default: 32)
+    WATCH_WORKERS: Threads handing batches to the scheduler (default: 4)
+    WATCH_RETRY_MS: Delay before a failed file is retried (default: 5000)
+    WATCH_RETRY_MAX_MS: Upper bound of the doubling retry delay (default: 300000)
+    WATCH_CHECKPOINT_PATH: SQLite file location (default: artifacts/watch_checkpoint.sqlite3)
+
+Classes:
+    StabilityTracker: Per-file debounce timers
+    WatchCheckpoint: SQLite record of ingested and pending files
+    WatchFolder: Scan, track and dispatch files from a directory
+
+Functions:
+    active_watch_folder: The running watcher, if any
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    from watchgod import Change, DefaultDirWatcher
+except Exception:
+    Change = None  # type: ignore
+    DefaultDirWatcher = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = Path("artifacts") / "watch_checkpoint.sqlite3"
+
+# (size, mtime_ns) of a file; a change in either restarts its debounce timer
+Signature = Tuple[int, int]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _signature(path: Path) -> Optional[Signature]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class StabilityTracker:
+    """Per-file debounce timers.
+
+    Attributes:
+        debounce_seconds: Time a file must stay unchanged before it is ready
+        min_bytes: Files smaller than this are never ready
+    """
+
+    def __init__(self, debounce_seconds: float, min_bytes: int = 1):
+        self.debounce_seconds = float(debounce_seconds)
+        self.min_bytes = int(min_bytes)
+        self._pending: Dict[Path, Tuple[Signature, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def observe(self, path: Path, now: Optional[float] = None) -> None:
+        """Start or restart ``path``'s timer if its size or mtime changed."""
+        now = time.monotonic() if now is None else now
+        sig = _signature(path)
+        if sig is None:
+            self._pending.pop(path, None)
+            return
+        current = self._pending.get(path)
+        if current is None or current[0] != sig:
+            self._pending[path] = (sig, now)
+
+    def forget(self, path: Path) -> None:
+        self._pending.pop(path, None)
+
+    def pop_ready(self, now: Optional[float] = None) -> List[Tuple[Path, Signature]]:
+        """Files unchanged for the debounce interval, removed from tracking.
+
+        Each candidate is stat'ed once more so a write that the watcher has
+        not reported yet still restarts the timer.
+        """
+        now = time.monotonic() if now is None else now
+        ready: List[Tuple[Path, Signature]] = []
+        for path, (sig, since) in list(self._pending.items()):
+            if now - since < self.debounce_seconds:
+                continue
+            current = _signature(path)
+            if current is None:
+                del self._pending[path]
+            elif current != sig:
+                self._pending[path] = (current, now)
+            else:
+                del self._pending[path]
+                if sig[0] >= self.min_bytes:
+                    ready.append((path, sig))
+        ready.sort(key=lambda item: str(item[0]))
+        return ready
+
+
+class WatchCheckpoint:
+    """SQLite record of ingested files and of files whose ingestion is pending.
+
+    A row with a ``ticket`` is pending; the ticket is cleared once the
+    ingestion completed.
+
+    Attributes:
+        path: Location of the SQLite database file (``":memory:"`` for tests)
+    """
+
+    def __init__(self, path: Path | str = DEFAULT_CHECKPOINT_PATH):
+        self.path = str(path)
+        self._lock = threading.RLock()
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS watched_files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                processed_at REAL NOT NULL
+            )
+            """
+        )
+        try:
+            self._conn.execute("ALTER TABLE watched_files ADD COLUMN ticket TEXT")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def is_processed(self, path: Path, sig: Signature) -> bool:
+        """True if ``path`` was ingested with exactly this size and mtime."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, ticket FROM watched_files WHERE path = ?", (str(path),)
+            ).fetchone()
+        return row is not None and row[2] is None and (row[0], row[1]) == tuple(sig)
+
+    def mark(self, entries: Iterable[Tuple[Path, Signature]]) -> None:
+        """Record ingested files in one transaction."""
+        self._upsert((path, sig, None) for path, sig in entries)
+
+    def mark_pending(self, entries: Iterable[Tuple[Path, Signature, str]]) -> None:
+        """Record queued files with the ticket their ingestion is resolved by."""
+        self._upsert(entries)
+
+    def _upsert(self, entries: Iterable[Tuple[Path, Signature, Optional[str]]]) -> None:
+        now = time.time()
+        rows = [(str(path), sig[0], sig[1], now, ticket) for path, sig, ticket in entries]
+        if not rows:
+            return
+        with self._write() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO watched_files (path, size, mtime_ns, processed_at, ticket) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def pending(self) -> List[Tuple[Path, Signature, str]]:
+        """Files whose ingestion had not been resolved yet."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size, mtime_ns, ticket FROM watched_files WHERE ticket IS NOT NULL"
+            ).fetchall()
+        return [(Path(row[0]), (row[1], row[2]), row[3]) for row in rows]
+
+    def discard(self, paths: Iterable[Path]) -> None:
+        """Forget files, e.g. pending ones whose ingestion failed."""
+        rows = [(str(path),) for path in paths]
+        if not rows:
+            return
+        with self._write() as conn:
+            conn.executemany("DELETE FROM watched_files WHERE path = ?", rows)
+
+    def count(self) -> int:
+        """Number of ingested files (pending ones excluded)."""
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM watched_files WHERE ticket IS NULL").fetchone()[0])
+
+    def clear(self) -> None:
+        with self._write() as conn:
+            conn.execute("DELETE FROM watched_files")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class WatchFolder:
+    """Scan, track and dispatch files from a directory.
+
+    ``handler(path)`` ingests one file. It returns True once the file is
+    ingested, or a ticket string once it is queued, or False when it failed.
+    ``resolve(ticket)`` reports a queued ingestion as completed (True),
+    failed (False) or still running (None); without ``resolve`` a ticket
+    counts as ingested. Failed files are retried after ``retry_seconds``,
+    doubling up to ``max_retry_seconds``. With ``workers`` 0 batches run in
+    the calling thread (tests).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        handler: Callable[[Path], Any],
+        suffixes: Iterable[str],
+        checkpoint: WatchCheckpoint,
+        debounce_seconds: float = 1.0,
+        min_bytes: int = 1,
+        batch_size: int = 32,
+        workers: int = 4,
+        poll_seconds: float = 0.25,
+        resolve: Optional[Callable[[str], Optional[bool]]] = None,
+        retry_seconds: float = 5.0,
+        max_retry_seconds: float = 300.0,
+    ):
+        self.root = Path(root).resolve()
+        self.handler = handler
+        self.suffixes = {s.lower() for s in suffixes}
+        self.checkpoint = checkpoint
+        self.tracker = StabilityTracker(debounce_seconds, min_bytes)
+        self.batch_size = max(1, int(batch_size))
+        self.workers = max(0, int(workers))
+        self.poll_seconds = max(0.01, float(poll_seconds))
+        self._backlog: Deque[Tuple[Path, Signature]] = deque()
+        self._in_flight: Set[Path] = set()
+        self._lock = threading.Lock()
+        # At most two batches per worker are queued ahead of the pool
+        self._slots = threading.BoundedSemaphore(max(1, self.workers) * 2)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.resolve = resolve
+        self.retry_seconds = max(0.0, float(retry_seconds))
+        self.max_retry_seconds = max(self.retry_seconds, float(max_retry_seconds))
+        # Queued files awaiting resolve(ticket), including those of a previous run
+        self._pending: Dict[Path, Tuple[Signature, str]] = {}
+        if resolve is not None:
+            self._pending = {path: (sig, ticket) for path, sig, ticket in checkpoint.pending()}
+        # Failed files: (failures so far, when to observe them again)
+        self._retries: Dict[Path, Tuple[int, Optional[float]]] = {}
+        self._counts = {"dispatched": 0, "ingested": 0, "failed": 0}
+
+    @classmethod
+    def from_env(
+        cls,
+        root: Path,
+        handler: Callable[[Path], Any],
+        suffixes: Iterable[str],
+        checkpoint: Optional[WatchCheckpoint] = None,
+        resolve: Optional[Callable[[str], Optional[bool]]] = None,
+    ) -> "WatchFolder":
+        """Build a watcher configured from the ``WATCH_*`` environment variables."""
+        if checkpoint is None:
+            checkpoint = WatchCheckpoint(os.getenv("WATCH_CHECKPOINT_PATH", str(DEFAULT_CHECKPOINT_PATH)))
+        return cls(
+            root,
+            handler,
+            suffixes,
+            checkpoint,
+            debounce_seconds=_env_int("WATCH_DEBOUNCE_MS", 1000) / 1000.0,
+            min_bytes=_env_int("WATCH_MIN_BYTES", 1),
+            batch_size=_env_int("WATCH_BATCH_SIZE", 32),
+            workers=_env_int("WATCH_WORKERS", 4),
+            poll_seconds=_env_int("WATCH_POLL_MS", 250) / 1000.0,
+            resolve=resolve,
+            retry_seconds=_env_int("WATCH_RETRY_MS", 5000) / 1000.0,
+            max_retry_seconds=_env_int("WATCH_RETRY_MAX_MS", 300000) / 1000.0,
+        )
+
+    def _wanted(self, path: Path) -> bool:
+        return path.suffix.lower() in self.suffixes and not path.name.startswith(".")
+
+    def scan(self, now: Optional[float] = None) -> int:
+        """Track every matching file already in the folder; returns how many."""
+        found = 0
+        for dirpath, _dirnames, filenames in os.walk(self.root):
+            for name in filenames:
+                path = Path(dirpath) / name
+                if self._wanted(path):
+                    self.tracker.observe(path, now)
+                    found += 1
+        return found
+
+    def poll(self, changes: Iterable[Tuple[Any, str]] = (), now: Optional[float] = None) -> int:
+        """Apply watcher changes, then dispatch the files that became ready.
+
+        Returns:
+            The number of files moved to the dispatch backlog.
+        """
+        for change, raw in changes:
+            path = Path(raw)
+            if not self._wanted(path):
+                continue
+            if Change is not None and change == Change.deleted:
+                self.tracker.forget(path)
+                with self._lock:
+                    self._retries.pop(path, None)
+            else:
+                self.tracker.observe(path, now)
+        self._reconcile()
+        self._retry_due(now)
+        queued = 0
+        for path, sig in self.tracker.pop_ready(now):
+            with self._lock:
+                busy = path in self._in_flight or path in self._pending
+            if busy:
+                # Rewritten while it is ingested; look again afterwards
+                self.tracker.observe(path, now)
+                continue
+            if self.checkpoint.is_processed(path, sig):
+                continue
+            with self._lock:
+                self._in_flight.add(path)
+            self._backlog.append((path, sig))
+            queued += 1
+        self._dispatch()
+        return queued
+
+    def _dispatch(self) -> None:
+        while self._backlog:
+            # A full batch, or whatever is left once the backlog is short
+            if not self._slots.acquire(blocking=False):
+                return
+            batch = [self._backlog.popleft() for _ in range(min(self.batch_size, len(self._backlog)))]
+            with self._lock:
+                self._counts["dispatched"] += len(batch)
+            if self.workers == 0:
+                self._run_batch(batch)
+            else:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="watch-batch")
+                self._pool.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[Path, Signature]]) -> None:
+        done: List[Tuple[Path, Signature]] = []
+        queued: List[Tuple[Path, Signature, str]] = []
+        failed: List[Path] = []
+        try:
+            for path, sig in batch:
+                try:
+                    result = self.handler(path)
+                except Exception:
+                    LOGGER.exception("watch: ingesting %s failed", path)
+                    result = False
+                if isinstance(result, str) and self.resolve is not None:
+                    queued.append((path, sig, result))
+                elif result:
+                    done.append((path, sig))
+                else:
+                    failed.append(path)
+            self.checkpoint.mark(done)
+            self.checkpoint.mark_pending(queued)
+        finally:
+            with self._lock:
+                self._pending.update((path, (sig, ticket)) for path, sig, ticket in queued)
+                self._in_flight.difference_update(path for path, _ in batch)
+                self._finish(done, failed)
+            self._slots.release()
+
+    def _finish(self, done: List[Tuple[Path, Signature]], failed: List[Path]) -> None:
+        # Called with self._lock held; failed files wait for poll() to set their retry time
+        for path, _ in done:
+            self._retries.pop(path, None)
+        for path in failed:
+            failures = self._retries.get(path, (0, None))[0]
+            self._retries[path] = (failures + 1, None)
+        self._counts["ingested"] += len(done)
+        self._counts["failed"] += len(failed)
+
+    def _reconcile(self) -> None:
+        """Checkpoint pending files whose ingestion completed; retry failed ones."""
+        if self.resolve is None:
+            return
+        with self._lock:
+            pending = list(self._pending.items())
+        done: List[Tuple[Path, Signature]] = []
+        failed: List[Path] = []
+        for path, (sig, ticket) in pending:
+            try:
+                outcome = self.resolve(ticket)
+            except Exception:
+                LOGGER.exception("watch: resolving %s failed", path)
+                continue
+            if outcome is True:
+                done.append((path, sig))
+            elif outcome is False:
+                LOGGER.warning("watch: ingestion of %s failed; it will be retried", path)
+                failed.append(path)
+        if not done and not failed:
+            return
+        self.checkpoint.mark(done)
+        self.checkpoint.discard(failed)
+        with self._lock:
+            for path in [path for path, _ in done] + failed:
+                self._pending.pop(path, None)
+            self._finish(done, failed)
+
+    def _retry_due(self, now: Optional[float]) -> None:
+        """Schedule new failures and observe failed files whose backoff expired."""
+        now = time.monotonic() if now is None else now
+        due: List[Path] = []
+        with self._lock:
+            for path, (failures, at) in list(self._retries.items()):
+                if at is None:
+                    delay = min(self.max_retry_seconds, self.retry_seconds * 2 ** (failures - 1))
+                    self._retries[path] = (failures, now + delay)
+                elif at <= now:
+                    # Keep the failure count so the next delay doubles
+                    self._retries[path] = (failures, float("inf"))
+                    due.append(path)
+        for path in due:
+            self.tracker.observe(path, now)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tracking": len(self.tracker),
+                "backlog": len(self._backlog),
+                "in_flight": len(self._in_flight),
+                "pending": len(self._pending),
+                "retrying": len(self._retries),
+                "checkpointed": self.checkpoint.count(),
+                **self._counts,
+            }
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Watch until ``stop`` is set (or forever)."""
+        global _ACTIVE
+        if DefaultDirWatcher is None:
+            LOGGER.warning("watch: watchgod is not installed; watch folder disabled")
+            return
+        stop = stop or threading.Event()
+        watcher = DefaultDirWatcher(str(self.root))
+        _ACTIVE = self
+        try:
+            # Files dropped while the service was down
+            self.scan()
+            while not stop.is_set():
+                try:
+                    self.poll(watcher.check())
+                except Exception:
+                    LOGGER.exception("watch: poll of %s failed", self.root)
+                stop.wait(self.poll_seconds)
+        finally:
+            if _ACTIVE is self:
+                _ACTIVE = None
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+
+
+_ACTIVE: Optional[WatchFolder] = None
+
+
+def active_watch_folder() -> Optional[WatchFolder]:
+    """The watcher started by the application, if it is running."""
+    return _ACTIVE
+
+
+__all__ = ["StabilityTracker", "WatchCheckpoint", "WatchFolder", "active_watch_folder"]
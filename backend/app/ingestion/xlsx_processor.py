@@ -1,39 +1,120 @@
 from pathlib import Path
 import pandas as pd
 import uuid
-from typing import List, Dict, Tuple
+from typing import Any, Iterator, List, Dict, Optional, Tuple
 
-def process_xlsx(file_path: Path, report_week: str) -> Tuple[List[Dict], List[Dict]]:
-    """Process Excel file and extract facts"""
-    xls = pd.ExcelFile(file_path)
-    
+from app.analysis.table_metrics import XLSX_METRIC_PATTERNS, ColumnClassifier
+from app.evidence_store import EvidencePayloadStore
+from app.ingestion.tabular_stream import TableAccumulator, chunk_rows
+
+_CLASSIFIER = ColumnClassifier(XLSX_METRIC_PATTERNS)
+
+def _header_labels(header: Tuple[Any, ...]) -> List[Any]:
+    """Column labels as ``pandas.read_excel`` names them."""
+    cells = list(header)
+    while cells and cells[-1] is None:
+        cells.pop()
+    labels: List[Any] = []
+    seen: Dict[Any, int] = {}
+    for idx, value in enumerate(cells):
+        label = f"Unnamed: {idx}" if value is None else value
+        if label in seen:
+            seen[label] += 1
+            label = f"{label}.{seen[label]}"
+        else:
+            seen[label] = 0
+        labels.append(label)
+    return labels
+
+def _frame(batch: List[Tuple[Any, ...]], columns: List[Any]) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(batch, columns=columns)
+    # Cells that are empty throughout a chunk come back as None objects;
+    # read_excel would see NaN there, which keeps numeric columns numeric.
+    for col in frame.columns[frame.isna().all().to_numpy()]:
+        frame[col] = frame[col].astype(float)
+    return frame
+
+def _iter_sheet_chunks(worksheet: Any, size: int) -> Iterator[pd.DataFrame]:
+    """Yield a read-only worksheet as DataFrames of at most ``size`` rows.
+
+    Blank rows are only emitted once a later row has data, so trailing blank
+    (formatted but empty) rows are dropped as ``read_excel`` does.
+    """
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    columns = _header_labels(header) if header is not None else []
+    width = len(columns)
+    batch: List[Tuple[Any, ...]] = []
+    blank_run = 0
+    emitted = False
+    for values in rows:
+        values = tuple(values[:width]) + (None,) * (width - len(values))
+        if all(v is None for v in values):
+            blank_run += 1
+            continue
+        for _ in range(blank_run):
+            batch.append((None,) * width)
+            if len(batch) >= size:
+                yield _frame(batch, columns)
+                batch, emitted = [], True
+        blank_run = 0
+        batch.append(values)
+        if len(batch) >= size:
+            yield _frame(batch, columns)
+            batch, emitted = [], True
+    if batch or not emitted:
+        yield _frame(batch, columns)
+
+def _iter_sheets(file_path: Path, size: int) -> Iterator[Tuple[str, Iterator[pd.DataFrame]]]:
+    if file_path.suffix.lower() == ".xls":
+        # openpyxl cannot read the legacy binary format
+        xls = pd.ExcelFile(file_path)
+        for sheet_name in xls.sheet_names:
+            yield sheet_name, iter([xls.parse(sheet_name)])
+        return
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            yield worksheet.title, _iter_sheet_chunks(worksheet, size)
+    finally:
+        workbook.close()
+
+def process_xlsx(
+    file_path: Path,
+    report_week: str,
+    payload_store: Optional[EvidencePayloadStore] = None,
+) -> Tuple[List[Dict], List[Dict]]:
+    """Process Excel file and extract facts.
+
+    ``.xlsx`` workbooks are read with openpyxl in read-only mode, one chunk of
+    rows at a time; with a ``payload_store`` large sheets stream their rows
+    to an out-of-line payload so memory stays bounded.
+    """
     facts = []
     evidence = []
     
     # Process each sheet
-    for sheet_name in xls.sheet_names:
-        df = xls.parse(sheet_name)
+    for sheet_name, chunks in _iter_sheets(file_path, chunk_rows()):
         evidence_id = str(uuid.uuid4())
+        table = TableAccumulator(evidence_id, payload_store)
+        for chunk in chunks:
+            table.add(chunk)
         
         # Calculate totals
         metrics = {}
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        
-        for col in numeric_cols:
-            col_lower = col.lower()
-            if any(x in col_lower for x in ['spend', 'cost']):
-                metrics['spend'] = metrics.get('spend', 0) + float(df[col].sum())
-            elif 'revenue' in col_lower:
-                metrics['revenue'] = metrics.get('revenue', 0) + float(df[col].sum())
-            elif 'conversion' in col_lower or 'lead' in col_lower:
-                metrics['conversions'] = metrics.get('conversions', 0) + float(df[col].sum())
+        for col, total in table.numeric_totals().items():
+            metric = _CLASSIFIER.metric_for(col)
+            if metric:
+                metrics[metric] = metrics.get(metric, 0) + total
         
         evidence.append({
             "id": evidence_id,
             "locator": f"{file_path.name}#{sheet_name}",
-            "preview": df.head(10).to_string(),
+            "preview": table.preview(),
             "content_type": "xlsx",
-            "full_data": df.to_dict('records')
+            "full_data": table.full_data()
         })
         
         if metrics:
@@ -0,0 +1,142 @@
+"""In-memory BM25 inverted index used next to the vector index.
+
+Dense embeddings are weak at exact identifiers (API paths, error codes,
+tag strings). ``BM25Index`` keeps term postings per chunk id so keyword
+queries are answered from the postings of the query terms only, without
+scanning rows or calling an embedding model.
+
+Classes:
+    BM25Index: Incrementally maintained BM25 (Okapi) index keyed by chunk id
+
+Functions:
+    tokenize: Split text into lowercase word and identifier tokens
+    reciprocal_rank_fusion: Fuse several ranked id lists with RRF
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Collection, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+_WORD_RE = re.compile(r"\w+")
+# Identifiers such as "/v1/users", "ERR-404", "api.status" are also kept whole
+_IDENT_RE = re.compile(r"\w[\w\-./:]*\w")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens plus whole compound identifiers."""
+    text = text.lower()
+    tokens = _WORD_RE.findall(text)
+    tokens.extend(m for m in _IDENT_RE.findall(text) if not _WORD_RE.fullmatch(m))
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over chunk texts, updated per chunk id.
+
+    Attributes:
+        k1: Term frequency saturation
+        b: Document length normalisation
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Hashable, int]] = {}
+        self._doc_terms: Dict[Hashable, Counter] = {}
+        self._doc_len: Dict[Hashable, int] = {}
+        self._total_len = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_len.clear()
+            self._total_len = 0
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        """Index ``text`` under ``doc_id``, replacing any previous text."""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove_locked(doc_id)
+            self._doc_terms[doc_id] = terms
+            self._doc_len[doc_id] = sum(terms.values())
+            self._total_len += self._doc_len[doc_id]
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+
+    def add_many(self, docs: Iterable[Tuple[Hashable, str]]) -> None:
+        for doc_id, text in docs:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id: Hashable) -> None:
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: Hashable) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_len -= self._doc_len.pop(doc_id)
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        allowed: Optional[Collection[Hashable]] = None,
+    ) -> List[Tuple[Hashable, float]]:
+        """Return up to ``k`` (doc_id, score) pairs, best first.
+
+        Args:
+            query: Keyword query.
+            k: Maximum number of hits.
+            allowed: Optional set of doc ids the hits must belong to.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._doc_terms)
+            if not n or not terms:
+                return []
+            avg_len = self._total_len / n
+            scores: Dict[Hashable, float] = {}
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1.0 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    if allowed is not None and doc_id not in allowed:
+                        continue
+                    norm = 1.0 - self.b + self.b * self._doc_len[doc_id] / avg_len
+                    denom = tf + self.k1 * norm
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / denom
+        # Ties are broken by id so every k sees the same order
+        return heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], str(item[0])))
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = 60) -> List[Tuple[Hashable, float]]:
+    """Fuse ranked id lists: score(d) = sum over lists of 1 / (k + rank(d)).
+
+    Returns:
+        (id, fused score) pairs, best first.
+    """
+    fused: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Query, Form, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Form, Depends
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
@@ -21,6 +21,9 @@ import re
 from pydantic import BaseModel
 from app.hrm import HRMConfig, HRMMetrics, refine_sort_digits
 from app.api.routers import documents, analysis, system, cipher, models, graph, a2a, orchestration
+from app.api.routers.documents import (
+    WATCH_SUFFIXES, ingest_file_from_watch, queue_pdf, require_pdf_capacity, watch_task_outcome,
+)
 from app.security import SecurityMiddleware
 # JWT Authentication (replaces CORS)
 from app.auth import get_current_user, optional_auth
@@ -39,7 +42,8 @@ app.include_router(a2a.router)
 # Orchestration router for multi-agent task coordination
 app.include_router(orchestration.router)
 
-from app.ingestion.pdf_processor import process_pdf
+from app.ingestion.pdf_processor import process_pdf, warm_converter
+from app.ingestion.pdf_sharding import count_pdf_pages, shutdown_executors
 from app.ingestion.csv_processor import process_csv
 from app.ingestion.xlsx_processor import process_xlsx
 from app.ingestion.xml_ingestion import process_xml
@@ -48,14 +52,18 @@ from app.ingestion.postman_ingestion import process_postman
 from app.ingestion.web_ingestion import ingest_web_url
 from app.ingestion.media_transcriber import transcribe_media
 from app.ingestion.image_ocr import extract_text_from_image
-from app.database_factory import init_database
+from app.ingestion.watch_folder import WatchFolder, active_watch_folder
+from app.ingestion.scheduler import PRIORITY_BACKFILL, QueueFullError
+from app.task_store import get_task_store
+from app.evidence_store import get_payload_store
+from app.ingest_dedup import claim_content, duplicate_result, ingest_outputs, save_upload
+from app.ingest_registry import get_ingest_registry
 from app.config import get_deployment_info
-from app.qa_engine import QAEngine
 from app.extraction.langextract_adapter import run_langextract, write_visualization
 from app.chr_pipeline import run_chr, pca_plot
-from app.search import SearchIndex
+from app.search import SearchResult, iter_search_batches, parse_fields, project_fields, search_page
+from app.embedding_client import EmbeddingProviderUnavailable
 from app.export_poml import build_poml
-from app.analysis.summarization import SummarizationService
 import yaml
 try:
     from watchgod import watch
@@ -150,10 +158,8 @@ ARTIFACTS_DIR.mkdir(exist_ok=True)
 # Security settings
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB limit for file uploads
 
-db, DB_BACKEND_META = init_database()
-qa_engine = QAEngine(db)
-search_index = SearchIndex(db)
-summary_service = SummarizationService(db)
+# One database, search index and ingestion scheduler for the whole app; the routers share them
+from app.globals import db, DB_BACKEND_META, ingestion_scheduler, qa_engine, search_index, summary_service
 # HRM config/metrics (optional features)
 HRM_ENABLED = os.getenv("HRM_ENABLED", "false").lower() == "true"
 HRM_CFG = HRMConfig(
@@ -178,57 +184,22 @@ def _env_flag(name: str, default: bool = False) -> bool:
         return default
     return val.lower() in {"1", "true", "yes", "on"}
 
-# Simple in-memory task registry
-TASKS: dict[str, dict] = {}
+# Persistent task registry, shared with the routers
+TASKS = get_task_store()
+EVIDENCE_PAYLOADS = get_payload_store()
+INGEST_REGISTRY = get_ingest_registry()
 START_TIME = time.time()
 
 
-def _ingest_file_from_watch(src: Path, report_week: str = ""):
+def _refresh_search_index(artifact_id: str | None = None, document_id: str | None = None) -> None:
+    """Apply an incremental search index update for newly stored content."""
     try:
-        if not src.exists() or not src.is_file():
-            return
-        file_id = str(uuid.uuid4())
-        dst = UPLOAD_DIR / f"{file_id}_{src.name}"
-        shutil.copy2(src, dst)
-        suffix = dst.suffix.lower()
-        artifact_id = db.add_artifact({
-            "id": file_id,
-            "filename": src.name,
-            "filepath": str(dst),
-            "filetype": suffix,
-            "report_week": report_week,
-            "status": "processing" if suffix == ".pdf" else "processed"
-        })
-        if suffix == ".pdf":
-            task_id = str(uuid.uuid4())
-            TASKS[task_id] = {"status": "queued", "filename": src.name, "artifact_id": artifact_id}
-            # schedule background processing using the same helper
-            _thread = threading.Thread(target=_process_and_store, args=(dst, report_week, artifact_id, suffix, task_id), daemon=True)
-            _thread.start()
-        elif suffix in (".csv", ".xlsx", ".xls"):
-            _process_and_store(dst, report_week, artifact_id, suffix, None)
-        elif suffix == ".xml":
-            doc, rows = process_xml(dst)
-            db.add_document(doc)
-            for row in rows:
-                db.add_log(row)
-        elif suffix in (".yaml", ".yml", ".json"):
-            # Try OpenAPI then Postman
-            try:
-                doc, rows = process_openapi(dst)
-                db.add_document(doc)
-                for row in rows:
-                    db.add_api(row)
-            except Exception:
-                try:
-                    doc, rows = process_postman(dst)
-                    db.add_document(doc)
-                    for row in rows:
-                        db.add_api(row)
-                except Exception:
-                    pass
-    except Exception:
-        pass
+        if artifact_id:
+            search_index.index_artifact(artifact_id)
+        if document_id:
+            search_index.index_document(document_id)
+    except Exception as exc:
+        _log.warning("Incremental search index update failed: %s", exc)
 
 
 def _watch_loop():
@@ -238,8 +209,6 @@ def _watch_loop():
     if not enabled:
         return
     watch_dir = Path(os.getenv("WATCH_DIR", "/app/watch"))
-    debounce_ms = int(os.getenv("WATCH_DEBOUNCE_MS", "1000"))
-    min_bytes = int(os.getenv("WATCH_MIN_BYTES", "1"))
     try:
         watch_dir.mkdir(parents=True, exist_ok=True)
     except PermissionError:
@@ -247,37 +216,30 @@ def _watch_loop():
         watch_dir = Path("./uploads/watch")
         watch_dir.mkdir(parents=True, exist_ok=True)
         print(f"Watch folder: using fallback path {watch_dir}")
-    exts = {".pdf", ".csv", ".xlsx", ".xls"}
+    WatchFolder.from_env(watch_dir, ingest_file_from_watch, WATCH_SUFFIXES, resolve=watch_task_outcome).run()
 
-    def ready(p: Path) -> bool:
-        try:
-            if not p.exists() or not p.is_file():
-                return False
-            if p.suffix.lower() not in exts:
-                return False
-            if p.stat().st_size < min_bytes:
-                return False
-            s1 = p.stat().st_size
-            time.sleep(debounce_ms / 1000.0)
-            s2 = p.stat().st_size
-            return s1 == s2
-        except Exception:
-            return False
-
-    seen: set[str] = set()
-    for changes in watch(str(watch_dir)):
-        for _evt, path_str in changes:
-            p = Path(path_str)
-            key = str(p.resolve())
-            if key in seen:
-                continue
-            if ready(p):
-                seen.add(key)
-                _ingest_file_from_watch(p)
+
+def _fail_interrupted_tasks() -> None:
+    """Mark tasks left queued or running by a previous process as errors."""
+    try:
+        interrupted = TASKS.fail_interrupted()
+    except Exception as e:
+        print(f"[STARTUP] Task recovery failed: {e}")
+        return
+    for task in interrupted:
+        artifact_id = task.get("artifact_id")
+        if artifact_id:
+            db.update_artifact(artifact_id, status="error")
+            INGEST_REGISTRY.release(artifact_id)
+    if interrupted:
+        print(f"[STARTUP] Marked {len(interrupted)} interrupted task(s) as failed")
 
 
 @app.on_event("startup")
 async def _startup_watch():
+    # Tasks from before a restart would otherwise look in flight forever
+    _fail_interrupted_tasks()
+
     # Start watcher thread
     t = threading.Thread(target=_watch_loop, daemon=True)
     t.start()
@@ -295,16 +257,17 @@ async def _startup_watch():
     except Exception as e:
         print(f"[STARTUP] Integration health check failed: {e}")
 
-    # Rebuild search index in background with timeout to prevent startup hang
+    # Load the search index snapshot (or rebuild) in background with timeout
+    # to prevent startup hang.
     # Note: Using ThreadPoolExecutor instead of signal.alarm() because signals
     # only work in the main thread, not background threads
     def _rebuild_with_timeout():
         from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
         try:
             with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(search_index.rebuild)
-                future.result(timeout=30)  # 30 second timeout
-            print("[STARTUP] Search index rebuild completed")
+                future = executor.submit(search_index.warm_start)
+                info = future.result(timeout=30)  # 30 second timeout
+            print(f"[STARTUP] Search index ready ({info.get('snapshot')}, {info.get('items')} items)")
         except FuturesTimeoutError:
             print("[STARTUP] Search index rebuild timed out, continuing without full index")
         except Exception as e:
@@ -314,6 +277,17 @@ async def _startup_watch():
     rebuild_thread = threading.Thread(target=_rebuild_with_timeout, daemon=True)
     rebuild_thread.start()
 
+    # Load Docling layout/table models once so the first upload is not cold
+    if not _env_flag("FAST_PDF_MODE", False) and _env_flag("DOCLING_WARMUP", True):
+        def _warm_docling():
+            try:
+                seconds = warm_converter()
+                print(f"[STARTUP] Docling converter warmed in {seconds:.1f}s")
+            except Exception as e:
+                print(f"[STARTUP] Docling warm-up failed: {e}")
+
+        threading.Thread(target=_warm_docling, daemon=True).start()
+
     # Connect to NATS Geometry Bus (non-blocking)
     try:
         from app.services.chit_service import chit_service
@@ -323,6 +297,20 @@ async def _startup_watch():
     except Exception as e:
         print(f"Failed to initiate NATS connection: {e}")
 
+@app.on_event("shutdown")
+def _shutdown_search_index():
+    # Write any snapshot still waiting in the coalescing window
+    try:
+        search_index.flush_snapshot()
+    except Exception as e:
+        print(f"[SHUTDOWN] Search snapshot flush failed: {e}")
+
+
+@app.on_event("shutdown")
+def _shutdown_pdf_shard_pools():
+    # Stop the spawned Docling shard workers with the app, not at interpreter exit
+    shutdown_executors()
+
 @app.get("/")
 async def root():
     return {"message": "PMOVES-DoX API", "status": "running"}
@@ -367,20 +355,24 @@ async def config():
 
 
 @app.get("/tasks")
-async def list_tasks():
-    # Return a lightweight summary including counts and queued items
-    items = [
-        {"id": k, **v} for k, v in TASKS.items()
-    ]
-    queued = [t for t in items if t.get("status") == "queued"]
-    completed = [t for t in items if t.get("status") == "completed"]
-    errored = [t for t in items if t.get("status") == "error"]
+async def list_tasks(
+    status: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    # Counts come from the status index; items are paged newest first
+    counts = TASKS.counts(kind="ingest")
+    items = TASKS.list(status=status, kind="ingest", limit=limit + 1, offset=offset)
     return {
-        "total": len(items),
-        "queued": len(queued),
-        "completed": len(completed),
-        "errored": len(errored),
-        "queued_items": queued,
+        "total": sum(counts.values()),
+        "queued": counts.get("queued", 0),
+        "running": counts.get("running", 0),
+        "completed": counts.get("completed", 0),
+        "errored": counts.get("error", 0),
+        "cancelled": counts.get("cancelled", 0),
+        "queued_items": TASKS.list(status="queued", kind="ingest", limit=limit),
+        "items": items[:limit],
+        "next_offset": offset + limit if len(items) > limit else None,
     }
 
 
@@ -404,68 +396,42 @@ async def health_legacy():
     return RedirectResponse(url="/healthz", status_code=301)
 
 
+# content_type -> per-artifact counter reported by /artifacts
+_EVIDENCE_COUNT_KEYS = {
+    "table": "table_evidence",
+    "chart": "chart_evidence",
+    "formula": "formula_evidence",
+    "media_transcript": "media_transcripts",
+    "audio_transcript": "media_transcripts",
+    "video_transcript": "media_transcripts",
+    "media_metadata": "media_metadata",
+    "web_page": "web_pages",
+    "image_ocr": "image_ocr",
+}
+
+
 @app.get("/artifacts")
 async def list_artifacts():
     artifacts = db.get_artifacts()
-    evidence = db.get_all_evidence()
-    summary: dict[str, dict[str, int]] = {}
-    for ev in evidence:
-        art_id = ev.get("artifact_id")
-        if not art_id:
-            continue
-        bucket = summary.setdefault(
-            art_id,
-            {
-                "table_evidence": 0,
-                "chart_evidence": 0,
-                "formula_evidence": 0,
-                "media_transcripts": 0,
-                "media_metadata": 0,
-                "web_pages": 0,
-                "image_ocr": 0,
-            },
-        )
-        ctype = (ev.get("content_type") or "").lower()
-        if ctype == "table":
-            bucket["table_evidence"] += 1
-        elif ctype == "chart":
-            bucket["chart_evidence"] += 1
-        elif ctype == "formula":
-            bucket["formula_evidence"] += 1
-        elif ctype in {"media_transcript", "audio_transcript", "video_transcript"}:
-            bucket["media_transcripts"] += 1
-        elif ctype == "media_metadata":
-            bucket["media_metadata"] += 1
-        elif ctype == "web_page":
-            bucket["web_pages"] += 1
-        elif ctype == "image_ocr":
-            bucket["image_ocr"] += 1
-
+    type_counts = db.count_evidence_by_type()
     enriched = []
     for art in artifacts:
-        counts = summary.get(
-            art.get("id"),
-            {
-                "table_evidence": 0,
-                "chart_evidence": 0,
-                "formula_evidence": 0,
-                "media_transcripts": 0,
-                "media_metadata": 0,
-                "web_pages": 0,
-                "image_ocr": 0,
-            },
-        )
+        counts = dict.fromkeys(_EVIDENCE_COUNT_KEYS.values(), 0)
+        for ctype, n in type_counts.get(art.get("id"), {}).items():
+            key = _EVIDENCE_COUNT_KEYS.get(ctype.lower())
+            if key:
+                counts[key] += n
         enriched.append({**art, **counts})
     return {"artifacts": enriched}
 
 @app.get("/artifacts/{artifact_id}")
 async def artifact_detail(artifact_id: str):
-    arts = db.get_artifacts()
-    art = next((a for a in arts if a.get("id") == artifact_id), None)
+    art = db.get_artifact(artifact_id)
     if not art:
         raise HTTPException(404, "Artifact not found")
-    facts = [f for f in db.get_facts() if f.get("artifact_id") == artifact_id]
-    evidence = [e for e in db.get_all_evidence() if e.get("artifact_id") == artifact_id]
+    facts = db.get_facts_for_artifact(artifact_id)
+    # The detail view renders transcript and metadata payloads
+    evidence = db.get_evidence_for_artifact(artifact_id, include_full_data=True)
     return {"artifact": art, "facts": facts, "evidence": evidence}
 
 
@@ -526,12 +492,11 @@ async def get_analysis_entities(document_id: str | None = None, label: str | Non
 
 @app.get("/analysis/artifacts/{artifact_id}")
 async def get_artifact_analysis(artifact_id: str):
-    arts = db.get_artifacts()
-    art = next((a for a in arts if a.get("id") == artifact_id), None)
+    art = db.get_artifact(artifact_id)
     if not art:
         raise HTTPException(404, "Artifact not found")
 
-    evidence = [e for e in db.get_all_evidence() if e.get("artifact_id") == artifact_id]
+    evidence = db.get_evidence_for_artifact(artifact_id, include_full_data=True)
 
     tables: list[dict] = []
     charts: list[dict] = []
@@ -548,7 +513,6 @@ async def get_artifact_analysis(artifact_id: str):
         full = ev.get("full_data") or {}
 
         if ctype == "table":
-            rows = list(full.get("rows") or [])
             tables.append(
                 {
                     **base,
@@ -556,8 +520,8 @@ async def get_artifact_analysis(artifact_id: str):
                     "merged": full.get("merged", False),
                     "header_detected": full.get("header_detected", False),
                     "columns": full.get("columns", []),
-                    "row_count": len(rows),
-                    "rows": rows[:20],
+                    "row_count": EVIDENCE_PAYLOADS.row_count(full) or 0,
+                    "rows": EVIDENCE_PAYLOADS.read_rows(full, limit=20),
                 }
             )
         elif ctype == "chart":
@@ -629,8 +593,8 @@ async def ingest_xml(file: UploadFile = File(...)):
         shutil.copyfileobj(file.file, f)
     doc, rows = process_xml(tmp)
     db.add_document(doc)
-    for row in rows:
-        db.add_log(row)
+    db.add_logs(rows)
+    await asyncio.to_thread(_refresh_search_index, document_id=doc["id"])
     return {"status": "ok", "document_id": doc["id"], "rows": len(rows)}
 
 
@@ -641,8 +605,8 @@ async def ingest_openapi(file: UploadFile = File(...)):
         shutil.copyfileobj(file.file, f)
     doc, rows = process_openapi(tmp)
     db.add_document(doc)
-    for row in rows:
-        db.add_api(row)
+    db.add_apis(rows)
+    await asyncio.to_thread(_refresh_search_index, document_id=doc["id"])
     return {"status": "ok", "document_id": doc["id"], "rows": len(rows)}
 
 
@@ -653,8 +617,8 @@ async def ingest_postman(file: UploadFile = File(...)):
         shutil.copyfileobj(file.file, f)
     doc, rows = process_postman(tmp)
     db.add_document(doc)
-    for row in rows:
-        db.add_api(row)
+    db.add_apis(rows)
+    await asyncio.to_thread(_refresh_search_index, document_id=doc["id"])
     return {"status": "ok", "document_id": doc["id"], "rows": len(rows)}
 
 
@@ -662,10 +626,15 @@ async def ingest_postman(file: UploadFile = File(...)):
 @app.get("/logs")
 async def get_logs(level: str | None = None, code: str | None = None, q: str | None = None,
                    ts_from: str | None = None, ts_to: str | None = None,
-                   document_id: str | None = None):
+                   document_id: str | None = None,
+                   limit: int | None = Query(None, ge=1, le=10000),
+                   offset: int = Query(0, ge=0)):
     items = db.list_logs(level=level, code=code, q=q, ts_from=ts_from, ts_to=ts_to,
-                         document_id=document_id)
-    return {"logs": items}
+                         document_id=document_id, limit=None if limit is None else limit + 1,
+                         offset=offset)
+    if limit is None:
+        return {"logs": items}
+    return {"logs": items[:limit], "next_offset": offset + limit if len(items) > limit else None}
 
 
 @app.get("/logs/export")
@@ -1085,6 +1054,8 @@ async def extract_tags(req: ExtractTagsRequest, user_id: str = Depends(get_curre
                 "hrm_steps": steps if (HRM_ENABLED and req.use_hrm) else None,
             })
             saved += 1
+    if saved:
+        await asyncio.to_thread(_refresh_search_index, document_id=req.document_id)
     resp = {"status": "ok", "document_id": req.document_id, "tags_saved": saved, "tags": extracted}
     if HRM_ENABLED and req.use_hrm:
         resp["hrm"] = {"enabled": True, "steps": steps}
@@ -1183,12 +1154,16 @@ async def save_tag_prompt(document_id: str, req: TagPromptSaveRequest):
 
 @app.get("/watch")
 async def watch_status():
+    watcher = active_watch_folder()
     return {
         "enabled": os.getenv("WATCH_ENABLED", "true").lower() == "true",
         "dir": os.getenv("WATCH_DIR", "/app/watch"),
         "debounce_ms": int(os.getenv("WATCH_DEBOUNCE_MS", "1000")),
         "min_bytes": int(os.getenv("WATCH_MIN_BYTES", "1")),
+        "batch_size": int(os.getenv("WATCH_BATCH_SIZE", "32")),
+        "workers": int(os.getenv("WATCH_WORKERS", "4")),
         "available": bool(watch),
+        "watcher": watcher.stats() if watcher else None,
     }
 
 
@@ -1302,76 +1277,151 @@ async def generate_summary(req: SummaryGenerateRequest):
 # ---------------- Vector Search ----------------
 class SearchRequest(BaseModel):
     q: str
-    k: int | None = 10
+    k: int | None = 10  # page size
     types: list[str] | None = None  # subset of ['pdf','api','log','tag']
+    artifact_id: str | None = None
+    document_id: str | None = None
+    page: int | None = None
+    mode: str | None = None  # 'hybrid' | 'vector' | 'lexical'; default SEARCH_MODE
+    cursor: str | None = None  # next_cursor of the previous page
+    fields: str | None = None  # projection, e.g. "score,id,meta.type,meta.deeplink"
 
 
-@app.post("/search")
-async def search(req: SearchRequest):
-    t0 = time.time()
+def _search_hit_payload(hit) -> dict:
+    meta = dict(hit.meta or {})
+    entry_type = (meta.get("type") or "").lower()
+
+    if entry_type == "pdf":
+        deeplink = {
+            "panel": "workspace",
+            "artifact_id": meta.get("artifact_id"),
+            "chunk": meta.get("chunk"),
+        }
+        page = meta.get("page")
+        if page is not None:
+            deeplink["page"] = page
+    elif entry_type == "api":
+        deeplink = {"panel": "apis", "api_id": meta.get("id")}
+    elif entry_type == "log":
+        deeplink = {
+            "panel": "logs",
+            "document_id": meta.get("document_id"),
+            "code": meta.get("code"),
+        }
+    elif entry_type == "tag":
+        deeplink = {
+            "panel": "tags",
+            "document_id": meta.get("document_id"),
+            "q": meta.get("tag") or meta.get("text"),
+        }
+    else:
+        deeplink = {}
+
+    return {
+        "score": hit.score,
+        "rank": hit.rank,
+        "id": hit.id,
+        "text": hit.text,
+        "meta": {**meta, "deeplink": deeplink},
+    }
+
+
+def _search_filters(req: SearchRequest) -> dict:
     types = {t.lower() for t in (req.types or []) if t}
+    return {
+        "types": sorted(types) or None,
+        "artifact_id": req.artifact_id,
+        "document_id": req.document_id,
+        "page": req.page,
+        "mode": req.mode,
+    }
+
+
+async def _search_in_thread(fn, *args, **kwargs):
+    # Query embedding runs off the event loop so it never stalls other requests.
+    try:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    except EmbeddingProviderUnavailable as exc:
+        raise HTTPException(503, f"Embedding provider unavailable: {exc}")
+    except ValueError as exc:
+        raise HTTPException(400, str(exc)) from exc
+
+
+def _ui_test_page(req: SearchRequest) -> tuple[list, str | None]:
+    # Keep parity with UI smoke path while supporting type filters
+    types = _search_filters(req)["types"]
+    if types and "api" not in types:
+        return [], None
+    return [SearchResult(score=1.0, text="UI Test Result", meta={"type": "api"}, rank=1)], None
 
-    results_payload: list[dict] = []
+
+async def _run_search(req: SearchRequest) -> tuple[list, str | None]:
+    """Rank one page of hits for ``req``; returns (hits, next_cursor)."""
     if (req.q or "").strip() == "__ui_test__":
-        # Keep parity with UI smoke path while supporting type filters
-        results_payload = [{
-            "score": 1.0,
-            "text": "UI Test Result",
-            "meta": {"type": "api", "deeplink": {"panel": "apis"}},
-        }]
-        if types and "api" not in types:
-            results_payload = []
-    else:
-        hits = search_index.search(req.q or "", k=req.k or 10)
-        for hit in hits:
-            meta = dict(hit.meta or {})
-            entry_type = (meta.get("type") or "").lower()
-            if types and entry_type not in types:
-                continue
+        return _ui_test_page(req)
+    # Filters are applied inside the index probe, so k matching hits come back.
+    return await _search_in_thread(
+        search_page, search_index, req.q or "", limit=req.k or 10, cursor=req.cursor, **_search_filters(req)
+    )
 
-            if entry_type == "pdf":
-                deeplink = {
-                    "panel": "workspace",
-                    "artifact_id": meta.get("artifact_id"),
-                    "chunk": meta.get("chunk"),
-                }
-                page = meta.get("page")
-                if page is not None:
-                    deeplink["page"] = page
-            elif entry_type == "api":
-                deeplink = {"panel": "apis", "api_id": meta.get("id")}
-            elif entry_type == "log":
-                deeplink = {
-                    "panel": "logs",
-                    "document_id": meta.get("document_id"),
-                    "code": meta.get("code"),
-                }
-            elif entry_type == "tag":
-                deeplink = {
-                    "panel": "tags",
-                    "document_id": meta.get("document_id"),
-                    "q": meta.get("tag") or meta.get("text"),
-                }
-            else:
-                deeplink = {}
 
-            results_payload.append({
-                "score": hit.score,
-                "text": hit.text,
-                "meta": {**meta, "deeplink": deeplink},
-            })
+@app.post("/search")
+async def search(req: SearchRequest):
+    t0 = time.time()
+    hits, next_cursor = await _run_search(req)
+    fields = parse_fields(req.fields)
+    results_payload = [project_fields(_search_hit_payload(hit), fields) for hit in hits]
 
     elapsed_ms = max(0, int((time.time() - t0) * 1000))
     return {
         "took_ms": elapsed_ms,
         "count": len(results_payload),
         "results": results_payload,
+        "next_cursor": next_cursor,
     }
 
 
+@app.post("/search/stream")
+async def search_stream(req: SearchRequest):
+    """NDJSON variant of /search: one hit per line, then a summary line.
+
+    Hits are ranked in growing batches, so the first lines go out before the
+    whole page has been ranked.
+    """
+    t0 = time.time()
+    fields = parse_fields(req.fields)
+    if (req.q or "").strip() == "__ui_test__":
+        batches = iter([_ui_test_page(req)])
+    else:
+        batches = iter_search_batches(
+            search_index, req.q or "", limit=req.k or 10, cursor=req.cursor, **_search_filters(req)
+        )
+    # Rank the first batch before responding so a bad request still gets its status code
+    first = await _search_in_thread(next, batches, None)
+
+    def gen():
+        summary = {"done": True, "count": 0, "next_cursor": None}
+        batch = first
+        while batch is not None:
+            hits, summary["next_cursor"] = batch
+            for hit in hits:
+                yield json.dumps(project_fields(_search_hit_payload(hit), fields), default=str) + "\n"
+            summary["count"] += len(hits)
+            try:
+                batch = next(batches, None)
+            except Exception as exc:
+                _log.warning("Search stream stopped early: %s", exc)
+                summary["error"] = str(exc)
+                break
+        summary["took_ms"] = max(0, int((time.time() - t0) * 1000))
+        yield json.dumps(summary) + "\n"
+
+    return StreamingResponse(gen(), media_type="application/x-ndjson")
+
+
 @app.post("/search/rebuild")
 async def search_rebuild():
-    info = search_index.rebuild()
+    info = await asyncio.to_thread(search_index.rebuild)
     return {"status": "ok", **info}
 
 
@@ -1986,10 +2036,20 @@ _log = logging.getLogger(__name__)
 def _process_and_store(file_path: Path, report_week: str, artifact_id: str, suffix: str, task_id: str | None = None):
     print(f"[DEBUG-STDERR] _process_and_store called for {file_path}", file=sys.stderr, flush=True)
     try:
+        if task_id:
+            # Atomic with respect to DELETE /tasks/{id}: a cancel either wins here or sees "running"
+            if not TASKS.start(task_id):
+                INGEST_REGISTRY.release(artifact_id)
+                return
+            TASKS.set_progress(task_id, stage="convert")
+        stage_started = time.perf_counter()
         analysis_payload: dict | None = None
         facts: list[dict]
         evidence: list[dict]
         if suffix == ".pdf":
+            pages_total = count_pdf_pages(file_path)
+            if task_id:
+                TASKS.set_progress(task_id, pages_done=0, pages_total=pages_total)
             # PDF is async-capable but can be used sync too
             fast_mode = _env_flag("FAST_PDF_MODE", False)
             print(f"[DEBUG-STDERR] FAST_PDF_MODE={fast_mode}", file=sys.stderr, flush=True)
@@ -2012,6 +2072,14 @@ def _process_and_store(file_path: Path, report_week: str, artifact_id: str, suff
                     _log.error(traceback.format_exc())
                     _log.warning("[DEBUG] Falling back to _process_pdf_fast")
                     facts, evidence, analysis_payload = _process_pdf_fast(file_path, ARTIFACTS_DIR)
+            # Per-stage PDF timings go to the task record, not the analysis tables
+            pdf_timings = (analysis_payload or {}).pop("stage_timings", None) or {}
+            if task_id:
+                TASKS.set_progress(
+                    task_id,
+                    pages_done=pages_total,
+                    stage_seconds={f"pdf.{name}": seconds for name, seconds in pdf_timings.items()},
+                )
             # Ensure a PDF document row exists for deeplinks/open
             try:
                 db.add_document({
@@ -2024,9 +2092,9 @@ def _process_and_store(file_path: Path, report_week: str, artifact_id: str, suff
             except Exception:
                 pass
         elif suffix == ".csv":
-            facts, evidence = process_csv(file_path, report_week)
+            facts, evidence = process_csv(file_path, report_week, EVIDENCE_PAYLOADS)
         elif suffix in [".xlsx", ".xls"]:
-            facts, evidence = process_xlsx(file_path, report_week)
+            facts, evidence = process_xlsx(file_path, report_week, EVIDENCE_PAYLOADS)
         elif suffix in MEDIA_SUFFIXES:
             facts = []
             media_payload = transcribe_media(file_path, ARTIFACTS_DIR, artifact_id)
@@ -2102,12 +2170,17 @@ def _process_and_store(file_path: Path, report_week: str, artifact_id: str, suff
         else:
             raise HTTPException(400, f"Unsupported file type: {suffix}")
 
+        if task_id:
+            TASKS.set_progress(task_id, stage="store", stage_seconds={"convert": time.perf_counter() - stage_started})
+        stage_started = time.perf_counter()
         for fact in facts:
             fact["artifact_id"] = artifact_id
-            db.add_fact(fact)
         for ev in evidence:
             ev["artifact_id"] = artifact_id
-            db.add_evidence(ev)
+        # Large row payloads go to artifacts/evidence; evidence keeps a reference
+        evidence = [EVIDENCE_PAYLOADS.offload(ev) for ev in evidence]
+        db.add_facts(facts)
+        db.add_evidence_many(evidence)
 
         if analysis_payload and suffix == ".pdf":
             try:
@@ -2172,16 +2245,19 @@ def _process_and_store(file_path: Path, report_week: str, artifact_id: str, suff
                 pass
 
         if task_id:
-            TASKS[task_id].update({
-                "status": "completed",
-                "facts_count": len(facts),
-                "evidence_count": len(evidence)
-            })
+            TASKS.set_progress(task_id, stage="index", stage_seconds={"store": time.perf_counter() - stage_started})
+        stage_started = time.perf_counter()
+        _refresh_search_index(artifact_id=artifact_id)
+        INGEST_REGISTRY.complete(artifact_id, ingest_outputs(file_path))
+        if task_id:
+            TASKS.set_progress(task_id, stage="done", stage_seconds={"index": time.perf_counter() - stage_started})
+            TASKS.update(task_id, status="completed", facts_count=len(facts), evidence_count=len(evidence))
     except Exception as e:
+        INGEST_REGISTRY.release(artifact_id)
         if task_id:
-            TASKS[task_id].update({"status": "error", "error": str(e)})
-        else:
-            raise
+            TASKS.update(task_id, status="error", error=str(e))
+        # The scheduler counts the job as failed
+        raise
 
 
 @app.get("/tasks/{task_id}")
@@ -2192,8 +2268,25 @@ async def get_task_status(task_id: str):
     return task
 
 
+
+@app.delete("/tasks/{task_id}")
+async def cancel_task(task_id: str):
+    task = TASKS.get(task_id)
+    if not task:
+        raise HTTPException(404, "Task not found")
+    status = ingestion_scheduler.cancel(task_id)
+    if status is None and TASKS.cancel_queued(task_id):
+        # Queued by another worker; its job checks the flag before starting
+        status = "cancelled"
+    if status != "cancelled":
+        raise HTTPException(409, f"Task cannot be cancelled (status: {status or task.get('status')})")
+    TASKS.update(task_id, status="cancelled")
+    if task.get("artifact_id"):
+        db.update_artifact(task["artifact_id"], status="cancelled")
+    return TASKS.get(task_id)
+
 @app.post("/load_samples")
-async def load_samples(background_tasks: BackgroundTasks, report_week: str = "", async_pdf: bool = True):
+async def load_samples(report_week: str = "", async_pdf: bool = True):
     """Server-side ingestion of sample files from SAMPLE_DIR."""
     sample_dir = Path(os.getenv("SAMPLE_DIR", "/app/samples"))
     if not sample_dir.exists():
@@ -2226,14 +2319,12 @@ async def load_samples(background_tasks: BackgroundTasks, report_week: str = "",
             })
 
             if async_pdf and suffix == ".pdf":
-                task_id = str(uuid.uuid4())
-                TASKS[task_id] = {"status": "queued", "filename": p.name, "artifact_id": artifact_id}
-                background_tasks.add_task(_process_and_store, file_path, report_week, artifact_id, suffix, task_id)
+                task_id = queue_pdf(file_path, report_week, artifact_id, suffix, p.name, priority=PRIORITY_BACKFILL)
                 results.append({"filename": p.name, "status": "queued", "task_id": task_id})
             else:
                 _process_and_store(file_path, report_week, artifact_id, suffix, None)
-                facts_count = len([f for f in db.get_facts(report_week) if f.get("artifact_id") == artifact_id])
-                evidence_count = len([e for e in db.get_all_evidence() if e.get("artifact_id") == artifact_id])
+                facts_count = len(db.get_facts_for_artifact(artifact_id, report_week))
+                evidence_count = sum(db.count_evidence_by_type(artifact_id).get(artifact_id, {}).values())
                 results.append({
                     "filename": p.name,
                     "status": "success",
@@ -2325,7 +2416,7 @@ async def get_financial_statements(artifact_id: str | None = None):
                 "confidence": statement.get("confidence"),
                 "summary": statement.get("summary") or {},
                 "columns": full_data.get("columns", []),
-                "rows": full_data.get("rows", []),
+                "rows": EVIDENCE_PAYLOADS.read_rows(full_data),
                 "header_info": full_data.get("header_info"),
             }
         )
@@ -2348,6 +2439,21 @@ async def get_evidence(evidence_id: str):
         raise HTTPException(404, "Evidence not found")
     return evidence
 
+@app.get("/evidence/{evidence_id}/rows")
+async def get_evidence_rows(evidence_id: str, offset: int = Query(0, ge=0),
+                            limit: int = Query(100, ge=1, le=5000)):
+    """Page through the rows of a table, CSV or spreadsheet evidence payload"""
+    evidence = db.get_evidence(evidence_id)
+    if not evidence:
+        raise HTTPException(404, "Evidence not found")
+    try:
+        page = EVIDENCE_PAYLOADS.read_page(evidence.get("full_data"), offset=offset, limit=limit)
+    except OSError:
+        raise HTTPException(404, "Evidence payload file not found")
+    if page is None:
+        raise HTTPException(404, "Evidence has no rows")
+    return {"evidence_id": evidence_id, **page}
+
 @app.post("/ask")
 async def ask_question(
     question: str,
@@ -2380,6 +2486,8 @@ async def ask_question(
 async def reset_database():
     """Clear all data"""
     db.reset()
+    EVIDENCE_PAYLOADS.clear()
+    INGEST_REGISTRY.clear()
     return {"status": "Database reset"}
 
 # ------------ HRM experiment & metrics endpoints ------------
@@ -2444,6 +2552,7 @@ def metrics_prometheus():
         f"pmoves_hrm_avg_steps {snap['avg_steps']}",
         f"pmoves_hrm_avg_latency_ms {snap['avg_latency_ms']}",
     ]
+    lines += ingestion_scheduler.prometheus_lines()
     return ("\n".join(lines) + "\n", 200, {"Content-Type": "text/plain; version=0.0.4"})
 @app.get("/open/pdf")
 async def open_pdf(artifact_id: str, page: int | None = None):
@@ -2488,16 +2597,24 @@ WebUrlForm = Annotated[List[str] | None, Form()]
 
 @app.post("/upload")
 async def upload_files(
-    background_tasks: BackgroundTasks,
     files: List[UploadFile] | None = File(default=None),
     report_week: str = "",
     async_pdf: bool = True,
     web_urls: WebUrlForm = None,
+    force: bool = False,
 ):
-    """Upload and process documents."""
+    """Upload and process documents.
+
+    Files whose exact content was ingested before are not processed again;
+    their result has status ``duplicate`` and the existing ``artifact_id``.
+    Content still being ingested gets status ``conflict``; retry it later.
+    Pass ``force=true`` to reprocess them.
+    """
 
     results: List[Dict] = []
     incoming_files = files or []
+    if async_pdf:
+        require_pdf_capacity(sum(1 for f in incoming_files if (f.filename or "").lower().endswith(".pdf")))
 
     for file in incoming_files:
         file_id = str(uuid.uuid4())
@@ -2509,9 +2626,9 @@ async def upload_files(
 
         file_path = UPLOAD_DIR / f"{file_id}_{safe_filename}"
 
-        # Read file content and check size
-        file_content = await file.read()
-        if len(file_content) > MAX_FILE_SIZE:
+        # Stream to disk, enforcing the size limit as chunks arrive
+        saved = await save_upload(file, file_path)
+        if saved is None:
             results.append({
                 "filename": file.filename,
                 "status": "error",
@@ -2519,12 +2636,13 @@ async def upload_files(
             })
             continue
 
-        # Write file to disk
-        with file_path.open("wb") as buffer:
-            buffer.write(file_content)
-
         try:
             suffix = file_path.suffix.lower()
+            duplicate = claim_content(*saved, suffix, file_id, file.filename, force=force)
+            if duplicate:
+                file_path.unlink(missing_ok=True)
+                results.append(duplicate_result(file.filename, duplicate))
+                continue
             artifact_id = db.add_artifact(
                 {
                     "id": file_id,
@@ -2536,14 +2654,16 @@ async def upload_files(
                 }
             )
             if async_pdf and suffix == ".pdf":
-                task_id = str(uuid.uuid4())
-                TASKS[task_id] = {"status": "queued", "filename": file.filename, "artifact_id": artifact_id}
-                background_tasks.add_task(_process_and_store, file_path, report_week, artifact_id, suffix, task_id)
+                try:
+                    task_id = queue_pdf(file_path, report_week, artifact_id, suffix, file.filename)
+                except QueueFullError as exc:
+                    results.append({"filename": file.filename, "status": "rejected", "error": str(exc)})
+                    continue
                 results.append({"filename": file.filename, "status": "queued", "task_id": task_id})
             else:
                 _process_and_store(file_path, report_week, artifact_id, suffix, None)
-                facts_count = len([f for f in db.get_facts(report_week) if f.get("artifact_id") == artifact_id])
-                evidence_count = len([e for e in db.get_all_evidence() if e.get("artifact_id") == artifact_id])
+                facts_count = len(db.get_facts_for_artifact(artifact_id, report_week))
+                evidence_count = sum(db.count_evidence_by_type(artifact_id).get(artifact_id, {}).values())
                 results.append(
                     {
                         "filename": file.filename,
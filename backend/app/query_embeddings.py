@@ -0,0 +1,134 @@
+"""Query-side embedding helpers for SearchIndex.
+
+Classes:
+    QueryVectorCache: In-process LRU of query -> vector with TTL and size limits
+    MicroBatcher: Coalesces concurrent query embeddings into one provider call
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so trivially different spellings share a cache entry."""
+    return " ".join(query.split())
+
+
+class QueryVectorCache:
+    """Thread-safe LRU mapping of query keys to vectors, with per-entry TTL.
+
+    Attributes:
+        max_size: Maximum number of cached queries
+        ttl: Seconds an entry stays valid
+        hits: Lookups served from the cache
+        misses: Lookups that required an embedding call
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 600.0):
+        self.max_size = max(1, int(max_size))
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, vector: np.ndarray) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            size = len(self._entries)
+        return {"size": size, "max_size": self.max_size, "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+class MicroBatcher:
+    """Coalesce texts submitted within ``window`` seconds into one encode call.
+
+    The first caller of a window waits ``window`` seconds and then embeds
+    everything queued meanwhile; the caller that fills a batch to
+    ``max_batch`` flushes immediately. Every caller blocks only until its
+    own vector is ready. Duplicate texts in a batch are embedded once.
+
+    Attributes:
+        window: Seconds to wait for more texts before flushing
+        max_batch: Queue length that triggers an immediate flush
+        batches: Number of encode calls issued
+        submitted: Number of texts submitted
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], window: float = 0.005, max_batch: int = 32):
+        self._encode = encode
+        self.window = window
+        self.max_batch = max(1, int(max_batch))
+        self.batches = 0
+        self.submitted = 0
+        self._pending: List[Tuple[str, Future]] = []
+        self._waiting = False
+        self._lock = threading.Lock()
+
+    def encode(self, text: str) -> np.ndarray:
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((text, future))
+            self.submitted += 1
+            flush_now = len(self._pending) >= self.max_batch
+            lead = not flush_now and not self._waiting
+            if lead:
+                self._waiting = True
+        if lead:
+            time.sleep(self.window)
+            with self._lock:
+                self._waiting = False
+            self._flush()
+        elif flush_now:
+            self._flush()
+        return future.result()
+
+    def _flush(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        unique: Dict[str, int] = {}
+        for text, _ in batch:
+            unique.setdefault(text, len(unique))
+        try:
+            vectors = self._encode(list(unique))
+            self.batches += 1
+        except BaseException as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        for text, future in batch:
+            future.set_result(vectors[unique[text]])
+
+    def stats(self) -> Dict[str, int]:
+        return {"batches": self.batches, "submitted": self.submitted}
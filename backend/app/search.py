@@ -2,48 +2,177 @@
 
 Provides semantic search across documents, APIs, logs, and tags using
 Ollama embeddings (primary) or SentenceTransformer fallback.
-Supports both FAISS-accelerated and numpy-based vector search.
+Supports both FAISS-accelerated and numpy-based vector search, plus a
+BM25 keyword index over the same chunks for hybrid and lexical-only search.
 
 Classes:
     SearchResult: Search result with score, text, and metadata
-    SearchIndex: Vector search engine with rebuild and query methods
+    SearchIndex: Vector search engine with rebuild, incremental update and query methods
 """
 
 from __future__ import annotations
 
 import os
 import json
+import time
+import base64
 import uuid
 import logging
+import threading
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Optional
 from pathlib import Path
 
 import numpy as np
 
+from app.embedding_cache import get_embedding_cache, text_hash as _content_hash
+
 try:
     import faiss  # type: ignore
 except Exception:  # pragma: no cover
     faiss = None  # type: ignore
 
-import httpx
+from app.embedding_client import EmbeddingProviderUnavailable, OllamaEmbeddingClient
+from app.lexical_index import BM25Index, reciprocal_rank_fusion
+from app.query_embeddings import MicroBatcher, QueryVectorCache, normalize_query
 
 
 Chunk = Dict[str, Any]
 
+SNAPSHOT_VERSION = 2
+
 
 @dataclass
 class SearchResult:
     """Result from a vector similarity search.
 
     Attributes:
-        score: Similarity score (higher is more similar)
+        score: Relevance, higher is better. Cosine similarity in vector mode,
+            BM25 in lexical mode; in hybrid mode the reciprocal rank fusion
+            score scaled to (0, 1], where 1.0 means first in every ranking
         text: Matching text content
         meta: Metadata including source type, artifact_id, etc.
+        id: Chunk ID, used as the tie-breaker in pagination cursors
+        rank: 1-based position in the query's (fused) ranking
     """
     score: float
     text: str
     meta: Dict[str, Any]
+    id: Optional[str] = None
+    rank: Optional[int] = None
+
+
+def _rank_key(hit: SearchResult) -> Tuple[float, str]:
+    """Total order of results: score descending, then chunk id."""
+    return (-hit.score, hit.id or "")
+
+
+def encode_cursor(hit: SearchResult) -> str:
+    """Opaque cursor pointing just after ``hit`` in ranked order."""
+    raw = json.dumps([hit.score, hit.id or ""], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """Inverse of :func:`encode_cursor`.
+
+    Raises:
+        ValueError: Malformed cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, chunk_id = json.loads(raw)
+        return float(score), str(chunk_id)
+    except Exception as exc:
+        raise ValueError(f"Invalid search cursor: {cursor!r}") from exc
+
+
+def search_page(
+    index: Any,
+    query: str,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    max_results: Optional[int] = None,
+    **kwargs: Any,
+) -> Tuple[List[SearchResult], Optional[str]]:
+    """Return one page of results after ``cursor`` and the cursor for the next.
+
+    Results are ordered by (score desc, id). The index is probed with a k
+    just large enough to fill the page, doubling while the cursor skips past
+    the head of the ranking, up to ``max_results`` (SEARCH_MAX_RESULTS,
+    default 1000), the deepest result a cursor can reach.
+
+    Returns:
+        Tuple of (page of results, next cursor or None when exhausted).
+    """
+    max_results = max_results or _env_int("SEARCH_MAX_RESULTS", 1000) or 1000
+    after = decode_cursor(cursor) if cursor else None
+    after_key = (-after[0], after[1]) if after is not None else None
+    k = min(limit + 1 if after is None else 2 * (limit + 1), max_results)
+    while True:
+        hits = index.search(query, k=k, **kwargs)
+        ranked = sorted(hits, key=_rank_key)
+        if after_key is not None:
+            ranked = [h for h in ranked if _rank_key(h) > after_key]
+        if len(ranked) > limit or len(hits) < k or k >= max_results:
+            break
+        k = min(k * 2, max_results)
+    page = ranked[:limit]
+    next_cursor = encode_cursor(page[-1]) if page and len(ranked) > limit else None
+    return page, next_cursor
+
+
+def iter_search_batches(
+    index: Any,
+    query: str,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    **kwargs: Any,
+) -> Iterator[Tuple[List[SearchResult], Optional[str]]]:
+    """Yield the page :func:`search_page` would return, in growing ranked batches.
+
+    The first batch probes the index for only ``batch_size`` hits
+    (SEARCH_STREAM_BATCH, default 4), so a streaming response can send them
+    before the rest of the page is ranked. Each later batch doubles in size
+    and continues from the previous batch's cursor, so the batches follow the
+    same order as cursor pagination and never repeat a hit.
+
+    Yields:
+        Tuples of (batch of results, cursor after the batch or None when exhausted).
+    """
+    size = max(1, min(batch_size or _env_int("SEARCH_STREAM_BATCH", 4) or 1, limit))
+    remaining = limit
+    while remaining > 0:
+        batch, cursor = search_page(index, query, limit=min(size, remaining), cursor=cursor, **kwargs)
+        remaining -= len(batch)
+        yield batch, cursor
+        if cursor is None:
+            return
+        size *= 2
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a ``fields=score,id,meta.type`` projection; None keeps everything."""
+    names = [f.strip() for f in (fields or "").split(",") if f.strip()]
+    return names or None
+
+
+def project_fields(entry: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only ``fields`` of a result dict; ``meta.<key>`` selects one meta key."""
+    if not fields:
+        return entry
+    out: Dict[str, Any] = {}
+    for name in fields:
+        head, _, sub = name.partition(".")
+        if head not in entry:
+            continue
+        if sub and isinstance(entry[head], dict):
+            if sub in entry[head]:
+                out.setdefault(head, {})[sub] = entry[head][sub]
+        else:
+            out[head] = entry[head]
+    return out
 
 
 def _normalize(v: np.ndarray) -> np.ndarray:
@@ -59,28 +188,221 @@ def _normalize(v: np.ndarray) -> np.ndarray:
     return v / norms
 
 
+def _top_k(sims: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest similarities, best first.
+
+    Uses ``np.argpartition`` so only the selected candidates are sorted,
+    O(N + k log k) instead of a full O(N log N) argsort.
+    """
+    k = min(k, len(sims))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(sims):
+        cand = np.argpartition(-sims, k - 1)[:k]
+    else:
+        cand = np.arange(len(sims))
+    return cand[np.argsort(-sims[cand], kind="stable")]
+
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+SEARCH_MODES = ("hybrid", "vector", "lexical")
+
+# Filtered searches over at most this many chunks scan the matching rows
+# exactly instead of probing the (approximate) FAISS index with a selector.
+FILTER_EXACT_MAX = 20_000
+
+# Incremental updates patch the FAISS index in place. IVF indexes (and ones
+# that fell back to a simpler type) are rebuilt once the corpus grows or
+# shrinks by this factor from the size they were trained on; HNSW, which
+# cannot remove entries, is rebuilt once this fraction of it is tombstoned.
+RETRAIN_GROWTH = 2.0
+MAX_TOMBSTONE_FRACTION = 0.25
+
+# FAISS warns below ~39 training points per k-means centroid; that applies to
+# IVF cells and to the 256 centroids of each 8-bit PQ codebook.
+_MIN_POINTS_PER_CENTROID = 39
+_MIN_PQ_TRAINING_POINTS = 256 * _MIN_POINTS_PER_CENTROID
+
+
+def build_faiss_index(
+    vectors: np.ndarray,
+    index_type: str = "flat",
+    nlist: Optional[int] = None,
+    pq_m: int = 16,
+    hnsw_m: int = 32,
+    ef_construction: int = 80,
+    ids: Optional[np.ndarray] = None,
+) -> Tuple[Any, str]:
+    """Build (and train, where needed) an inner-product FAISS index.
+
+    Args:
+        vectors: Normalized float32 matrix to index.
+        index_type: One of ``INDEX_TYPES``.
+        nlist: IVF cell count; defaults to ``4 * sqrt(N)``.
+        pq_m: Target PQ sub-quantizer count (largest divisor of dim not above it is used).
+        hnsw_m: HNSW graph degree.
+        ef_construction: HNSW build-time beam width.
+        ids: Optional int64 label per row. Labelled indexes support
+            ``add_with_ids`` (and ``remove_ids`` except for HNSW); flat and
+            HNSW indexes are wrapped in an ``IndexIDMap2`` for this.
+
+    Returns:
+        Tuple of (faiss index, effective index type). Corpora too small to
+        train the requested structure fall back to a smaller one, ending at flat.
+    """
+    if faiss is None:
+        raise RuntimeError("faiss is not installed")
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n, dim = vectors.shape
+    metric = faiss.METRIC_INNER_PRODUCT
+    index_type = index_type if index_type in INDEX_TYPES else "flat"
+    labels = None if ids is None else np.ascontiguousarray(ids, dtype="int64")
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m, metric)
+        index.hnsw.efConstruction = ef_construction
+        return _add_labelled(index, vectors, labels), "hnsw"
+
+    if index_type in ("ivf_flat", "ivf_pq"):
+        cells = nlist or int(4 * np.sqrt(n))
+        cells = min(cells, n // _MIN_POINTS_PER_CENTROID)
+        if cells >= 2:
+            if index_type == "ivf_pq" and n >= _MIN_PQ_TRAINING_POINTS:
+                m = max(d for d in range(1, min(pq_m, dim) + 1) if dim % d == 0)
+                index = faiss.index_factory(dim, f"IVF{cells},PQ{m}", metric)
+                effective = "ivf_pq"
+            else:
+                index = faiss.index_factory(dim, f"IVF{cells},Flat", metric)
+                effective = "ivf_flat"
+            index.train(vectors)
+            if labels is None:
+                index.add(vectors)
+            else:
+                index.add_with_ids(vectors, labels)
+            return index, effective
+
+    return _add_labelled(faiss.IndexFlatIP(dim), vectors, labels), "flat"
+
+
+def _add_labelled(index: Any, vectors: np.ndarray, labels: Optional[np.ndarray]) -> Any:
+    """Add ``vectors`` to a flat or HNSW index, keyed by ``labels`` if given."""
+    if labels is None:
+        index.add(vectors)
+        return index
+    wrapped = faiss.IndexIDMap2(index)
+    wrapped.add_with_ids(vectors, labels)
+    return wrapped
+
+
+def _unwrap_index(index: Any) -> Any:
+    """The index inside an ``IndexIDMap`` wrapper, or ``index`` itself."""
+    if faiss is not None and isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def apply_search_params(index: Any, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+    """Set query-time recall/latency knobs on IVF (nprobe) or HNSW (efSearch) indexes."""
+    if faiss is None or index is None:
+        return
+    if nprobe:
+        try:
+            faiss.extract_index_ivf(index).nprobe = int(nprobe)
+        except Exception:
+            pass
+    base = _unwrap_index(index)
+    if ef_search and hasattr(base, "hnsw"):
+        base.hnsw.efSearch = int(ef_search)
+
+
+def _faiss_index_type(index: Any) -> str:
+    """Map a FAISS index instance back to its ``INDEX_TYPES`` name."""
+    if hasattr(_unwrap_index(index), "hnsw"):
+        return "hnsw"
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except Exception:
+        return "flat"
+    return "ivf_pq" if isinstance(ivf, faiss.IndexIVFPQ) else "ivf_flat"
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    try:
+        return int(os.environ[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def _chunk_source(chunk: Chunk) -> Optional[str]:
+    """Return the artifact/document id a chunk was derived from."""
+    meta = chunk.get("meta") or {}
+    return meta.get("artifact_id") or meta.get("document_id")
+
+
 LOGGER = logging.getLogger(__name__)
 
 
+@dataclass
+class _IndexPatch:
+    """In-place FAISS changes for one incremental update."""
+    index: Any
+    labels: np.ndarray
+    tombstones: frozenset
+    next_label: int
+    remove: np.ndarray
+    add_rows: np.ndarray
+    add_labels: np.ndarray
+
+
 class SearchIndex:
     """Lightweight vector index across PDFs (markdown), APIs, logs, and tags.
 
     - Embeddings: Ollama (qwen3-embedding:8b via GPU) or SentenceTransformer fallback
     - Vector store: FAISS (IP) if available, else numpy linear scan fallback
+    - Snapshots: vectors, ids and payloads are written to SEARCH_INDEX_DIR
+      after each build and memory-mapped on startup when the corpus manifest
+      still matches, so a restart does not re-embed anything. Incremental
+      updates are coalesced and written by a background thread
+    - Embedding cache: persistent (provider, model, text hash) cache so
+      restarts and rebuilds only embed unseen text
+    - Incremental updates: chunks are upserted/deleted per artifact or document
+      by chunk id; a sha256 of each chunk's text lets unchanged chunks keep
+      their existing vectors instead of being re-embedded, and the FAISS
+      index is patched by label rather than rebuilt until it drifts too far
+      from the corpus it was trained on
+    - Lexical index: BM25 postings over the same chunk ids; hybrid queries
+      fuse the vector and keyword rankings with reciprocal rank fusion, and
+      lexical-only mode keeps search working without an embedding provider
 
     Environment Variables:
     - OLLAMA_BASE_URL: Ollama service URL (default: http://ollama:11434)
     - OLLAMA_EMBEDDING_MODEL: Model name (default: qwen3-embedding:8b)
     - SEARCH_MODEL: sentence-transformers fallback model (default: all-MiniLM-L6-v2)
     - SEARCH_DEVICE: "cuda", "cpu", or "auto" (for sentence_transformers fallback only)
+    - SEARCH_EMBEDDING_PROVIDER: "ollama" (default) or "sentence_transformers"
+    - SEARCH_QUERY_CACHE_SIZE / SEARCH_QUERY_CACHE_TTL: query vector LRU size and TTL seconds (1024/600)
+    - SEARCH_QUERY_BATCH_WINDOW_MS / SEARCH_QUERY_BATCH_SIZE: query micro-batching window and flush size (5/32)
+    - SEARCH_INDEX_DIR: snapshot directory (default: artifacts/search_index)
+    - SEARCH_SNAPSHOT_DELAY_MS: how long incremental updates are coalesced before a snapshot is written (default 5000)
+    - SEARCH_INDEX_TYPE: flat (default), ivf_flat, ivf_pq or hnsw (FAISS only)
+    - SEARCH_IVF_NLIST / SEARCH_NPROBE: IVF cell count (default 4*sqrt(N)) and cells probed per query (default 8)
+    - SEARCH_PQ_M: PQ sub-quantizers (default 16)
+    - SEARCH_HNSW_M / SEARCH_EF_CONSTRUCTION / SEARCH_EF_SEARCH: HNSW degree and beam widths (32/80/64)
+    - SEARCH_MODE: default query mode, hybrid (default), vector or lexical
+    - SEARCH_RRF_K: reciprocal rank fusion constant (default 60)
+    - SEARCH_MAX_RESULTS: deepest result a cursor reaches; hybrid mode fuses this many candidates per side (default 1000)
 
     Attributes:
         db: Database instance for chunk retrieval
         ollama_base_url: Ollama service URL
         ollama_model: Ollama embedding model name
         faiss_index: FAISS index or numpy array fallback
+        vectors: Normalized float32 embedding matrix aligned with ``ids``
         ids: List of chunk IDs indexed
         payloads: List of chunk payloads indexed
+        hashes: Content hash per chunk ID, used to skip unchanged chunks
+        lexical: BM25 index over the same chunk IDs
     """
 
     def __init__(self, db):
@@ -107,11 +429,75 @@ class SearchIndex:
         self.model: Optional[Any] = None  # SentenceTransformer fallback
 
         self.faiss_index = None
+        self.vectors: Optional[np.ndarray] = None
         self.ids: List[str] = []
         self.payloads: List[Chunk] = []
+        self.hashes: Dict[str, str] = {}
+        self._positions: Dict[str, int] = {}
+        # FAISS label of each row of ``vectors``. Deletes shift positions but
+        # not labels, so the index can be patched instead of rebuilt.
+        self._labels: Optional[np.ndarray] = None
+        self._label_pos: Dict[int, int] = {}
+        self._next_label = 0
+        # Labels of deleted or replaced HNSW entries, which FAISS cannot remove
+        self._tombstones: frozenset = frozenset()
+        self._tombstone_params: Optional[Any] = None
+        # Row count the current index was built (and trained) on
+        self._trained_size = 0
+        # (field, value) -> positions, built lazily for filtered search
+        self._facets: Optional[Dict[Tuple[str, Any], np.ndarray]] = None
+        self._lock = threading.RLock()
+        self._write_lock = threading.RLock()
         self._loaded = False
-        self._http_client: Optional[httpx.Client] = None
-        self._use_ollama = True  # Flag to track if Ollama is available
+        self.embedding_client = OllamaEmbeddingClient(self.ollama_base_url, self.ollama_model)
+        # Provider for the current index; falls back to SentenceTransformer only
+        # when a full rebuild cannot reach Ollama, and retries Ollama on the
+        # next rebuild once its circuit breaker lets requests through again.
+        self.prefer_ollama = os.getenv("SEARCH_EMBEDDING_PROVIDER", "ollama").lower() != "sentence_transformers"
+        self._use_ollama = self.prefer_ollama
+        self._index_key: Optional[Tuple[str, str]] = None
+        self._rebuilding = False
+        self.snapshot_dir = Path(os.getenv("SEARCH_INDEX_DIR", str(Path("artifacts") / "search_index")))
+        self._index_mmapped = False
+        self.snapshot_delay = (_env_int("SEARCH_SNAPSHOT_DELAY_MS", 5000) or 0) / 1000.0
+        # Serialises snapshot writers; taken before _write_lock, never after it
+        self._snapshot_io_lock = threading.Lock()
+        self._snapshot_cond = threading.Condition()
+        self._snapshot_due: Optional[float] = None
+        self._snapshot_thread: Optional[threading.Thread] = None
+
+        # ANN index configuration (FAISS only; the numpy fallback is always exact)
+        self.index_type = os.getenv("SEARCH_INDEX_TYPE", "flat").lower()
+        if self.index_type not in INDEX_TYPES:
+            LOGGER.warning("Unknown SEARCH_INDEX_TYPE %r, using flat", self.index_type)
+            self.index_type = "flat"
+        self.ivf_nlist = _env_int("SEARCH_IVF_NLIST", None)
+        self.nprobe = _env_int("SEARCH_NPROBE", 8)
+        self.pq_m = _env_int("SEARCH_PQ_M", 16) or 16
+        self.hnsw_m = _env_int("SEARCH_HNSW_M", 32) or 32
+        self.ef_construction = _env_int("SEARCH_EF_CONSTRUCTION", 80) or 80
+        self.ef_search = _env_int("SEARCH_EF_SEARCH", 64)
+        self.effective_index_type = "flat"
+
+        # Keyword index kept in step with the vector index
+        self.lexical = BM25Index()
+        self.search_mode = os.getenv("SEARCH_MODE", "hybrid").lower()
+        if self.search_mode not in SEARCH_MODES:
+            LOGGER.warning("Unknown SEARCH_MODE %r, using hybrid", self.search_mode)
+            self.search_mode = "hybrid"
+        self.rrf_k = _env_int("SEARCH_RRF_K", 60) or 60
+        self.hybrid_depth = _env_int("SEARCH_MAX_RESULTS", 1000) or 1000
+
+        # Query embeddings: LRU with TTL, and coalescing of concurrent queries
+        self.query_cache = QueryVectorCache(
+            max_size=_env_int("SEARCH_QUERY_CACHE_SIZE", 1024) or 1,
+            ttl=float(_env_int("SEARCH_QUERY_CACHE_TTL", 600) or 0),
+        )
+        self._query_batcher = MicroBatcher(
+            self._encode_queries,
+            window=(_env_int("SEARCH_QUERY_BATCH_WINDOW_MS", 5) or 0) / 1000.0,
+            max_batch=_env_int("SEARCH_QUERY_BATCH_SIZE", 32) or 1,
+        )
 
     def _resolve_device(self) -> str:
         """Resolve the device for SentenceTransformer embeddings.
@@ -136,69 +522,17 @@ class SearchIndex:
             from sentence_transformers import SentenceTransformer
             self.model = SentenceTransformer(self.st_model_name, device=self.device)
 
-    def _get_http_client(self) -> httpx.Client:
-        """Get or create HTTP client for Ollama API calls."""
-        if self._http_client is None:
-            timeout = httpx.Timeout(300.0, connect=10.0)  # 5 min timeout for embedding generation
-            self._http_client = httpx.Client(timeout=timeout)
-        return self._http_client
-
     def _encode_ollama(self, texts: List[str]) -> np.ndarray:
         """Encode texts using Ollama embeddings API.
 
         Ollama provides an OpenAI-compatible /v1/embeddings endpoint.
-        Uses qwen3-embedding:8b model with GPU acceleration.
-        """
-        client = self._get_http_client()
-        embeddings = []
-
-        # Process in batches to avoid payload limits
-        batch_size = 32
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            try:
-                response = client.post(
-                    f"{self.ollama_base_url}/v1/embeddings",
-                    json={
-                        "model": self.ollama_model,
-                        "input": batch
-                    },
-                    headers={"Content-Type": "application/json"}
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                # Handle OpenAI-compatible response format
-                if "data" in result:
-                    data = result["data"]
-                    if isinstance(data, list):
-                        # Sort by index to ensure correct order
-                        data_sorted = sorted(data, key=lambda x: x.get("index", 0))
-                        batch_embeddings = [item["embedding"] for item in data_sorted]
-                        embeddings.extend(batch_embeddings)
-                    else:
-                        # Single embedding response
-                        embeddings.append(data["embedding"])
-                else:
-                    LOGGER.warning("Unexpected Ollama response format: %s", result)
-                    raise ValueError("Unexpected response format from Ollama")
-
-            except httpx.HTTPStatusError as e:
-                LOGGER.error("Ollama HTTP error %s: %s", e.response.status_code, e.response.text)
-                # Fall back to SentenceTransformer on HTTP errors
-                self._use_ollama = False
-                self._load_model()
-                return self._encode_sentence_transformers(texts)
-            except Exception as e:
-                LOGGER.warning("Ollama embedding failed: %s. Falling back to SentenceTransformer.", e)
-                self._use_ollama = False
-                self._load_model()
-                return self._encode_sentence_transformers(texts)
+        Uses qwen3-embedding:8b model with GPU acceleration. Requests go
+        through the pooled async client with token-sized, concurrent batches.
 
-        if not embeddings:
-            raise RuntimeError("Failed to get embeddings from Ollama")
-
-        return np.array(embeddings, dtype=np.float32)
+        Raises:
+            EmbeddingProviderUnavailable: Ollama failed or its breaker is open.
+        """
+        return self.embedding_client.embed_sync(texts)
 
     def _encode_sentence_transformers(self, texts: List[str]) -> np.ndarray:
         """Encode texts using SentenceTransformer (fallback when Ollama unavailable)."""
@@ -206,157 +540,894 @@ class SearchIndex:
             self._load_model()
         return self.model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
 
-    def _encode(self, texts: List[str]) -> np.ndarray:
-        """Encode texts using Ollama (primary) or SentenceTransformer (fallback)."""
+    def _embedding_key(self) -> Tuple[str, str]:
+        """Return the (provider, model) pair currently used for embeddings."""
         if self._use_ollama:
-            return self._encode_ollama(texts)
-        else:
-            return self._encode_sentence_transformers(texts)
+            return "ollama", self.ollama_model
+        return "sentence_transformers", self.st_model_name
 
-    def _gather_chunks(self) -> List[Chunk]:
-        chunks: List[Chunk] = []
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        if self._use_ollama:
+            try:
+                return self._encode_ollama(texts)
+            except EmbeddingProviderUnavailable as exc:
+                # Vectors from different models are not comparable, so only
+                # switch providers while (re)building the whole index.
+                if not (self._rebuilding or self.vectors is None):
+                    raise
+                LOGGER.warning("Ollama embedding unavailable (%s); rebuilding with SentenceTransformer.", exc)
+                self._use_ollama = False
+                self._load_model()
+        return self._encode_sentence_transformers(texts)
 
-        # PDFs → artifacts markdown
-        artifacts = self.db.get_artifacts()
-        for a in artifacts:
-            fp = Path(a.get("filepath", ""))
-            if fp.suffix.lower() != ".pdf":
-                continue
-            # Prefer text units with page map if available
-            tu = Path("artifacts") / f"{fp.stem}.text_units.json"
-            if tu.exists():
-                try:
-                    units = json.loads(tu.read_text(encoding="utf-8", errors="ignore"))
-                    if isinstance(units, list):
-                        for i, u in enumerate(units):
-                            txt = (u.get("text") or "").strip()
-                            if not txt:
-                                continue
-                            page = u.get("page")
-                            chunks.append({
-                                "id": f"md:{a.get('id')}:{i}",
-                                "text": txt[:2000],
-                                "meta": {
-                                    "type": "pdf",
-                                    "artifact_id": a.get("id"),
-                                    "filename": a.get("filename"),
-                                    "chunk": i,
-                                    **({"page": int(page)} if isinstance(page, (int, float)) else {}),
-                                }
-                            })
-                        continue
-                except Exception:
-                    pass
-            md = Path("artifacts") / f"{fp.stem}.md"
-            if not md.exists():
-                continue
-            text = md.read_text(encoding="utf-8", errors="ignore")
-            # Simple chunking by headers or paragraphs (fallback)
-            parts = [p.strip() for p in text.split("\n\n") if p.strip()]
-            for i, p in enumerate(parts):
-                chunks.append({
-                    "id": f"md:{a.get('id')}:{i}",
-                    "text": p[:2000],
-                    "meta": {
-                        "type": "pdf",
-                        "artifact_id": a.get("id"),
-                        "filename": a.get("filename"),
-                        "chunk": i,
-                    }
-                })
-
-        # APIs
-        for api in self.db.list_apis(tag=None, method=None, path_like=None):
-            txt = " ".join([
-                api.get("method") or "",
-                api.get("path") or "",
-                api.get("summary") or "",
-                ", ".join(api.get("tags") or [])
-            ]).strip()
-            if not txt:
-                continue
-            chunks.append({
-                "id": f"api:{api.get('id')}",
-                "text": txt[:2000],
-                "meta": {"type": "api", **api}
-            })
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts using Ollama (primary) or SentenceTransformer (fallback).
 
-        # Logs
-        for log in self.db.list_logs(level=None, code=None, q=None, ts_from=None, ts_to=None):
-            msg = (log.get("message") or "").strip()
-            if not msg:
-                continue
-            chunks.append({
-                "id": f"log:{log.get('id')}",
-                "text": msg[:2000],
-                "meta": {"type": "log", **{k: log.get(k) for k in ("level","code","component","ts","document_id")}},
-            })
+        Vectors are served from the persistent embedding cache when the same
+        text was already embedded by the same provider and model.
+        """
+        cache = get_embedding_cache()
+        if cache is None or not texts:
+            return self._encode_uncached(texts)
+        provider, model = self._embedding_key()
+        cached = cache.get_many(provider, model, texts)
+        missing = [i for i in range(len(texts)) if i not in cached]
+        if not missing:
+            return np.vstack([cached[i] for i in range(len(texts))]).astype(np.float32)
+        fresh = np.asarray(self._encode_uncached([texts[i] for i in missing]), dtype=np.float32)
+        if self._embedding_key() != (provider, model):
+            # Ollama failed mid-call and the fallback model produced these
+            # vectors; cache them under its key and re-resolve so every vector
+            # returned comes from the same model.
+            cache.put_many(*self._embedding_key(), [texts[i] for i in missing], fresh)
+            return self._encode(texts)
+        cache.put_many(provider, model, [texts[i] for i in missing], fresh)
+        out = np.empty((len(texts), fresh.shape[1]), dtype=np.float32)
+        for row, i in enumerate(missing):
+            out[i] = fresh[row]
+        for i, vec in cached.items():
+            out[i] = vec
+        return out
 
-        # Tags
-        for t in self.db.list_tags(document_id=None, q=None):
-            tag = (t.get("tag") or "").strip()
-            if not tag:
-                continue
+    def _chunks_for_artifact(self, artifact: Dict[str, Any]) -> List[Chunk]:
+        """Build PDF chunks for one artifact from its text units or markdown."""
+        fp = Path(artifact.get("filepath", ""))
+        if fp.suffix.lower() != ".pdf":
+            return []
+        chunks: List[Chunk] = []
+        # Prefer text units with page map if available
+        tu = Path("artifacts") / f"{fp.stem}.text_units.json"
+        if tu.exists():
+            try:
+                units = json.loads(tu.read_text(encoding="utf-8", errors="ignore"))
+                if isinstance(units, list):
+                    for i, u in enumerate(units):
+                        txt = (u.get("text") or "").strip()
+                        if not txt:
+                            continue
+                        page = u.get("page")
+                        chunks.append({
+                            "id": f"md:{artifact.get('id')}:{i}",
+                            "text": txt[:2000],
+                            "meta": {
+                                "type": "pdf",
+                                "artifact_id": artifact.get("id"),
+                                "filename": artifact.get("filename"),
+                                "chunk": i,
+                                **({"page": int(page)} if isinstance(page, (int, float)) else {}),
+                            }
+                        })
+                    return chunks
+            except Exception:
+                pass
+        md = Path("artifacts") / f"{fp.stem}.md"
+        if not md.exists():
+            return chunks
+        text = md.read_text(encoding="utf-8", errors="ignore")
+        # Simple chunking by headers or paragraphs (fallback)
+        parts = [p.strip() for p in text.split("\n\n") if p.strip()]
+        for i, p in enumerate(parts):
             chunks.append({
-                "id": f"tag:{t.get('id')}",
-                "text": tag,
-                "meta": {"type": "tag", **t}
+                "id": f"md:{artifact.get('id')}:{i}",
+                "text": p[:2000],
+                "meta": {
+                    "type": "pdf",
+                    "artifact_id": artifact.get("id"),
+                    "filename": artifact.get("filename"),
+                    "chunk": i,
+                }
             })
+        return chunks
+
+    @staticmethod
+    def _chunk_for_api(api: Dict[str, Any]) -> Optional[Chunk]:
+        txt = " ".join([
+            api.get("method") or "",
+            api.get("path") or "",
+            api.get("summary") or "",
+            ", ".join(api.get("tags") or [])
+        ]).strip()
+        if not txt:
+            return None
+        return {
+            "id": f"api:{api.get('id')}",
+            "text": txt[:2000],
+            "meta": {"type": "api", **api}
+        }
+
+    @staticmethod
+    def _chunk_for_log(log: Dict[str, Any]) -> Optional[Chunk]:
+        msg = (log.get("message") or "").strip()
+        if not msg:
+            return None
+        return {
+            "id": f"log:{log.get('id')}",
+            "text": msg[:2000],
+            "meta": {"type": "log", **{k: log.get(k) for k in ("level","code","component","ts","document_id")}},
+        }
+
+    @staticmethod
+    def _chunk_for_tag(tag_row: Dict[str, Any]) -> Optional[Chunk]:
+        tag = (tag_row.get("tag") or "").strip()
+        if not tag:
+            return None
+        return {
+            "id": f"tag:{tag_row.get('id')}",
+            "text": tag,
+            "meta": {"type": "tag", **tag_row}
+        }
+
+    def _gather_chunks(self) -> List[Chunk]:
+        chunks: List[Chunk] = []
+
+        # PDFs → artifacts markdown
+        for a in self.db.get_artifacts():
+            chunks.extend(self._chunks_for_artifact(a))
+
+        # APIs, logs, tags
+        rows = (
+            (self._chunk_for_api, self.db.list_apis(tag=None, method=None, path_like=None)),
+            (self._chunk_for_log, self.db.list_logs(level=None, code=None, q=None, ts_from=None, ts_to=None)),
+            (self._chunk_for_tag, self.db.list_tags(document_id=None, q=None)),
+        )
+        for build, items in rows:
+            for item in items:
+                chunk = build(item)
+                if chunk is not None:
+                    chunks.append(chunk)
+
+        return chunks
 
+    def _gather_document_chunks(self, document_id: str) -> List[Chunk]:
+        """Gather API, log and tag chunks belonging to a single document."""
+        chunks: List[Chunk] = []
+        rows = (
+            (self._chunk_for_api, self.db.list_apis(document_id=document_id)),
+            (self._chunk_for_log, self.db.list_logs(document_id=document_id)),
+            (self._chunk_for_tag, self.db.list_tags(document_id=document_id, q=None)),
+        )
+        for build, items in rows:
+            for item in items:
+                chunk = build(item)
+                if chunk is not None:
+                    chunks.append(chunk)
         return chunks
 
     def rebuild(self) -> Dict[str, Any]:
         """Rebuild the search index from all available content.
 
-        Gathers chunks from PDFs, APIs, logs, and tags, generates embeddings,
-        and builds a new FAISS or numpy index.
+        Gathers chunks from PDFs, APIs, logs, and tags and builds a new FAISS
+        or numpy index. Chunks whose id and content hash match the current
+        index reuse their stored vectors; only new or changed text is embedded.
+        Embedding and index construction run outside the query lock; queries
+        keep using the previous index until the new one is swapped in.
 
         Returns:
             Dictionary with items count, backend type, and embedding provider.
         """
-        self._load_model()
-        chunks = self._gather_chunks()
-        if not chunks:
-            # reset
-            self.faiss_index = None
-            self.ids = []
-            self.payloads = []
-            self._loaded = True
-            return {"items": 0}
-
-        texts = [c["text"] for c in chunks]
-        emb = self._encode(texts)
-        emb = _normalize(emb.astype("float32"))
-
-        self.ids = [c["id"] for c in chunks]
-        self.payloads = chunks
-
-        if faiss is not None:
-            dim = emb.shape[1]
-            index = faiss.IndexFlatIP(dim)
-            index.add(emb)
-            self.faiss_index = index
-        else:
-            # fallback uses numpy arrays
-            self.faiss_index = emb
-
+        with self._write_lock:
+            if self.prefer_ollama and not self._use_ollama and self.embedding_client.breaker.state != "open":
+                # Previous build fell back; give Ollama another chance.
+                self._use_ollama = True
+            self._load_model()
+            chunks = self._gather_chunks()
+            if not chunks:
+                # reset
+                with self._lock:
+                    self._reset_index()
+                    self._loaded = True
+                return {"items": 0}
+
+            self._rebuilding = True
+            try:
+                emb, reused = self._embed_chunks(chunks)
+            except Exception as exc:
+                # No embedding provider at all: keep keyword search available.
+                LOGGER.warning("Embedding failed (%s); building a lexical-only search index.", exc)
+                self._replace_index(chunks, None)
+                return {
+                    "items": len(chunks),
+                    "embedded": 0,
+                    "reused": 0,
+                    "backend": "bm25",
+                    "index_type": None,
+                    "embedding_provider": None,
+                }
+            finally:
+                self._rebuilding = False
+            self._replace_index(chunks, emb)
+
+        self.save_snapshot()
         self._sync_remote_embeddings(chunks, emb)
 
-        self._loaded = True
         return {
             "items": len(chunks),
+            "embedded": len(chunks) - reused,
+            "reused": reused,
             "backend": "faiss" if faiss is not None else "numpy",
+            "index_type": self.effective_index_type if faiss is not None else "flat",
             "embedding_provider": "ollama" if self._use_ollama else "sentence_transformers"
         }
 
-    def _sync_remote_embeddings(self, chunks: List[Chunk], embeddings: np.ndarray) -> None:
+    # ------------------------------------------------------------ index storage
+    # Writers (rebuild, upserts, deletes, snapshot loads) are serialised by
+    # ``_write_lock`` and may read the index state without ``_lock``. They
+    # never mutate the arrays and lists a query may be reading: new state is
+    # built on the side and swapped in under ``_lock``, which queries hold.
+
+    def _reset_index(self) -> None:
+        self.faiss_index = None
+        self.vectors = None
+        self._index_key = None
+        self.ids = []
+        self.payloads = []
+        self.hashes = {}
+        self._positions = {}
+        self._facets = None
+        self.lexical = BM25Index()
+        self._set_vector_index(None, "flat", None)
+
+    def _embed_chunks(self, chunks: List[Chunk]) -> Tuple[np.ndarray, int]:
+        """Return normalized vectors for chunks, reusing unchanged ones.
+
+        Called with ``_write_lock`` held, so the index state it reads is stable.
+
+        Returns:
+            Tuple of (vectors aligned with ``chunks``, number of reused vectors).
+        """
+        key = self._embedding_key()
+        reusable = self.vectors is not None and self._index_key == key
+        out: List[Optional[np.ndarray]] = [None] * len(chunks)
+        pending: List[int] = []
+        for i, chunk in enumerate(chunks):
+            pos = self._positions.get(chunk["id"])
+            if (
+                reusable
+                and pos is not None
+                and self.hashes.get(chunk["id"]) == _content_hash(chunk["text"])
+            ):
+                out[i] = self.vectors[pos]
+            else:
+                pending.append(i)
+        if pending:
+            fresh = _normalize(self._encode([chunks[i]["text"] for i in pending]).astype("float32"))
+            if self._embedding_key() != key:
+                # Provider fell back while embedding; existing vectors no longer match.
+                return self._embed_chunks(chunks)
+            for row, i in enumerate(pending):
+                out[i] = fresh[row]
+        return np.vstack(out).astype("float32"), len(chunks) - len(pending)
+
+    def _replace_index(self, chunks: List[Chunk], emb: Optional[np.ndarray]) -> None:
+        """Install ``chunks`` as the corpus; ``emb`` None builds a lexical-only index."""
+        vectors = np.ascontiguousarray(emb, dtype="float32") if emb is not None else None
+        ids = [c["id"] for c in chunks]
+        lexical = BM25Index()
+        lexical.add_many((c["id"], c["text"]) for c in chunks)
+        rebuilt = self._new_vector_index(vectors)
+        with self._lock:
+            self._index_key = self._embedding_key() if emb is not None else None
+            self.vectors = vectors
+            self.ids = ids
+            self.payloads = list(chunks)
+            self._facets = None
+            self.hashes = {c["id"]: _content_hash(c["text"]) for c in chunks}
+            self._positions = {cid: i for i, cid in enumerate(ids)}
+            self.lexical = lexical
+            self._set_vector_index(*rebuilt)
+            self._loaded = True
+
+    def _new_vector_index(self, vectors: Optional[np.ndarray]) -> Tuple[Any, str, Optional[np.ndarray]]:
+        """Build the search structure over ``vectors`` without installing it.
+
+        Returns:
+            Tuple of (index, effective index type, row labels).
+        """
+        if vectors is None or not len(vectors):
+            return None, "flat", None
+        labels = np.arange(len(vectors), dtype="int64")
+        if faiss is not None:
+            index, effective = build_faiss_index(
+                vectors,
+                self.index_type,
+                nlist=self.ivf_nlist,
+                pq_m=self.pq_m,
+                hnsw_m=self.hnsw_m,
+                ef_construction=self.ef_construction,
+                ids=labels,
+            )
+            return index, effective, labels
+        # fallback uses numpy arrays
+        return vectors, "flat", labels
+
+    def _set_vector_index(
+        self,
+        index: Any,
+        effective: str,
+        labels: Optional[np.ndarray],
+        tombstones: frozenset = frozenset(),
+        trained_size: Optional[int] = None,
+    ) -> None:
+        self.faiss_index = index
+        self.effective_index_type = effective
+        self._index_mmapped = False
+        self._trained_size = len(labels) if trained_size is None and labels is not None else int(trained_size or 0)
+        self._set_labels(labels, tombstones)
+        self._next_label = int(labels.max()) + 1 if labels is not None and len(labels) else 0
+        if tombstones:
+            self._next_label = max(self._next_label, max(tombstones) + 1)
+
+    def _set_labels(self, labels: Optional[np.ndarray], tombstones: frozenset) -> None:
+        self._labels = labels
+        self._label_pos = {} if labels is None else {label: i for i, label in enumerate(labels.tolist())}
+        if tombstones != self._tombstones:
+            self._tombstones = tombstones
+            self._tombstone_params = None
+
+    def _can_patch_index(self) -> bool:
+        """Whether the current FAISS index can take in-place adds and removes."""
+        return (
+            faiss is not None
+            and isinstance(self.faiss_index, faiss.Index)  # type: ignore
+            and self._labels is not None
+        )
+
+    def _writable_index(self) -> Any:
+        """The live FAISS index, or an in-memory copy of a memory-mapped one."""
+        if not self._index_mmapped:
+            return self.faiss_index
+        # Memory-mapped IVF lists can be neither modified, cloned nor
+        # serialized; the snapshot file holds the same index.
+        return faiss.read_index(str(self.snapshot_dir / "index.faiss"))
+
+    def _needs_retrain(self, live: int, tombstones: int) -> bool:
+        """Whether an index patched to ``live`` rows should be rebuilt instead."""
+        if tombstones > MAX_TOMBSTONE_FRACTION * (live + tombstones):
+            return True
+        if self.effective_index_type == self.index_type and not self.effective_index_type.startswith("ivf"):
+            return False
+        return live > RETRAIN_GROWTH * self._trained_size or live * RETRAIN_GROWTH < self._trained_size
+
+    # ------------------------------------------------------- incremental updates
+    def upsert_chunks(self, chunks: Iterable[Chunk]) -> Dict[str, int]:
+        """Insert or update chunks by id, embedding only new or changed text.
+
+        New text is embedded before the query lock is taken; queries only wait
+        for the new vectors and ids to be swapped in.
+
+        Args:
+            chunks: Chunk dicts with ``id``, ``text`` and ``meta`` keys.
+
+        Returns:
+            Counts of added, updated and unchanged chunks.
+        """
+        chunks = list(chunks)
+        stats = {"added": 0, "updated": 0, "unchanged": 0}
+        if not chunks:
+            return stats
+        with self._write_lock:
+            emb: Optional[np.ndarray] = None
+            # A lexical-only index (no vectors) stays lexical-only until the next rebuild.
+            if self.vectors is not None or not self.ids:
+                try:
+                    emb = self._embed_chunks(chunks)[0]
+                except Exception:
+                    if self.vectors is not None:
+                        raise
+                    LOGGER.warning("Embedding unavailable; indexing %d chunks for keyword search only.", len(chunks))
+            payloads = list(self.payloads)
+            hashes = dict(self.hashes)
+            appended: List[int] = []
+            updated: List[Tuple[int, int]] = []
+            changed: List[Chunk] = []
+            for i, chunk in enumerate(chunks):
+                cid = chunk["id"]
+                digest = _content_hash(chunk["text"])
+                pos = self._positions.get(cid)
+                if pos is None:
+                    appended.append(i)
+                    stats["added"] += 1
+                    changed.append(chunk)
+                    continue
+                # Payload metadata may change even when the text does not.
+                payloads[pos] = chunk
+                if hashes.get(cid) == digest:
+                    stats["unchanged"] += 1
+                    continue
+                updated.append((pos, i))
+                stats["updated"] += 1
+                changed.append(chunk)
+                hashes[cid] = digest
+
+            vectors = self.vectors
+            if emb is not None and updated:
+                # Copy rather than write into arrays a query may be scanning
+                # (or a read-only snapshot memory map).
+                vectors = np.array(vectors, dtype="float32")
+                for pos, i in updated:
+                    vectors[pos] = emb[i]
+            ids = list(self.ids)
+            positions = dict(self._positions)
+            for i in appended:
+                chunk = chunks[i]
+                positions[chunk["id"]] = len(ids)
+                ids.append(chunk["id"])
+                payloads.append(chunk)
+                hashes[chunk["id"]] = _content_hash(chunk["text"])
+            index_key = self._index_key
+            if appended and emb is not None:
+                new_rows = emb[appended]
+                if vectors is None or not len(vectors):
+                    index_key = self._embedding_key()
+                    vectors = np.ascontiguousarray(new_rows, dtype="float32")
+                else:
+                    vectors = np.vstack([vectors, new_rows]).astype("float32")
+
+            for chunk in changed:
+                self.lexical.add(chunk["id"], chunk["text"])
+            rebuilt = None
+            patch = None
+            if emb is None:
+                changed = []
+            elif changed:
+                if self._can_patch_index():
+                    patch = self._plan_upsert(updated, appended, emb)
+                if patch is None:
+                    rebuilt = self._new_vector_index(vectors)
+
+            with self._lock:
+                self._index_key = index_key
+                self.vectors = vectors
+                self.ids = ids
+                self.payloads = payloads
+                self.hashes = hashes
+                self._positions = positions
+                self._facets = None
+                if rebuilt is not None:
+                    self._set_vector_index(*rebuilt)
+                elif patch is not None:
+                    self._apply_patch(patch)
+                self._loaded = True
+            changed_vecs = vectors[[positions[c["id"]] for c in changed]] if changed else None  # type: ignore[index]
+
+        if changed:
+            self._sync_remote_embeddings(changed, changed_vecs, reset=False)
+        return stats
+
+    def delete_chunks(self, chunk_ids: Iterable[str]) -> int:
+        """Remove chunks by id from the index and the remote store.
+
+        Returns:
+            Number of chunks removed.
+        """
+        with self._write_lock:
+            drop = {cid for cid in chunk_ids if cid in self._positions}
+            if not drop:
+                return 0
+            keep = [i for i, cid in enumerate(self.ids) if cid not in drop]
+            vectors = self.vectors[keep] if self.vectors is not None and keep else None
+            ids = [self.ids[i] for i in keep]
+            payloads = [self.payloads[i] for i in keep]
+            hashes = {cid: h for cid, h in self.hashes.items() if cid not in drop}
+            patch = None
+            if vectors is not None and self._can_patch_index():
+                patch = self._plan_delete(keep)
+            rebuilt = self._new_vector_index(vectors) if patch is None else None
+            with self._lock:
+                self.vectors = vectors
+                self.ids = ids
+                self.payloads = payloads
+                self.hashes = hashes
+                self._positions = {cid: i for i, cid in enumerate(ids)}
+                self._facets = None
+                if patch is not None:
+                    self._apply_patch(patch)
+                else:
+                    self._set_vector_index(*rebuilt)
+            for cid in drop:
+                self.lexical.remove(cid)
+
+        remove = getattr(self.db, "delete_search_chunks", None)
+        if callable(remove):
+            try:
+                remove(sorted(drop))
+            except Exception as exc:  # pragma: no cover - remote sync should not break local search
+                LOGGER.warning("Failed to delete search embeddings from remote store: %s", exc)
+        return len(drop)
+
+    def _plan_upsert(
+        self, updated: List[Tuple[int, int]], appended: List[int], emb: np.ndarray
+    ) -> Optional[_IndexPatch]:
+        """Plan the FAISS adds and removes for changed (``updated``) and new rows.
+
+        Returns:
+            The patch, or None when the index should be rebuilt instead.
+        """
+        hnsw = self.effective_index_type == "hnsw"
+        labels = np.array(self._labels, dtype="int64")
+        next_label = self._next_label
+        tombstones = set(self._tombstones)
+        remove: List[int] = []
+        rows: List[int] = []
+        for pos, i in updated:
+            if hnsw:
+                # The old entry stays in the graph but is never returned.
+                tombstones.add(int(labels[pos]))
+                labels[pos] = next_label
+                next_label += 1
+            else:
+                remove.append(int(labels[pos]))
+            rows.append(i)
+        fresh = np.arange(next_label, next_label + len(appended), dtype="int64")
+        next_label += len(appended)
+        add_labels = np.concatenate([labels[[pos for pos, _ in updated]], fresh])
+        labels = np.concatenate([labels, fresh])
+        if self._needs_retrain(len(labels), len(tombstones)):
+            return None
+        return _IndexPatch(
+            index=self._writable_index(),
+            labels=labels,
+            tombstones=frozenset(tombstones),
+            next_label=next_label,
+            remove=np.asarray(remove, dtype="int64"),
+            add_rows=np.ascontiguousarray(emb[rows + appended], dtype="float32"),
+            add_labels=add_labels,
+        )
+
+    def _plan_delete(self, keep: List[int]) -> Optional[_IndexPatch]:
+        """Plan removing every row not in ``keep``; None means rebuild instead."""
+        labels = self._labels[keep]  # type: ignore[index]
+        dropped = np.setdiff1d(self._labels, labels)  # type: ignore[arg-type]
+        tombstones = self._tombstones
+        remove = dropped
+        if self.effective_index_type == "hnsw":
+            tombstones = tombstones | frozenset(dropped.tolist())
+            remove = dropped[:0]
+        if self._needs_retrain(len(labels), len(tombstones)):
+            return None
+        dim = self.vectors.shape[1]  # type: ignore[union-attr]
+        return _IndexPatch(
+            index=self._writable_index(),
+            labels=labels,
+            tombstones=tombstones,
+            next_label=self._next_label,
+            remove=remove,
+            add_rows=np.empty((0, dim), dtype="float32"),
+            add_labels=np.empty(0, dtype="int64"),
+        )
+
+    def _apply_patch(self, patch: _IndexPatch) -> None:
+        """Apply a planned patch to the live index; called with ``_lock`` held."""
+        if len(patch.remove):
+            patch.index.remove_ids(patch.remove)
+        if len(patch.add_labels):
+            patch.index.add_with_ids(patch.add_rows, patch.add_labels)
+        if patch.index is not self.faiss_index:
+            self.faiss_index = patch.index
+            self._index_mmapped = False
+        self._set_labels(patch.labels, patch.tombstones)
+        self._next_label = patch.next_label
+
+    def _replace_source(self, source_id: str, chunks: List[Chunk], types: Iterable[str]) -> Dict[str, int]:
+        """Make the indexed chunks of ``source_id`` (for ``types``) equal ``chunks``."""
+        wanted = set(types)
+        keep_ids = {c["id"] for c in chunks}
+        with self._write_lock:
+            stale = [
+                ch["id"]
+                for ch in self.payloads
+                if _chunk_source(ch) == source_id
+                and (ch.get("meta") or {}).get("type") in wanted
+                and ch["id"] not in keep_ids
+            ]
+            stats = self.upsert_chunks(chunks)
+            stats["deleted"] = self.delete_chunks(stale)
+        return stats
+
+    def index_artifact(self, artifact_id: str) -> Dict[str, int]:
+        """Incrementally (re)index the PDF chunks for one artifact.
+
+        Cost is proportional to the artifact's own size; unchanged chunks are
+        skipped via their content hash. A no-op until the index has been built
+        once, since the first search triggers a full build anyway.
+        """
+        if not self._loaded:
+            return {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        artifact = next((a for a in self.db.get_artifacts() if a.get("id") == artifact_id), None)
+        chunks = self._chunks_for_artifact(artifact) if artifact else []
+        stats = self._replace_source(artifact_id, chunks, types=("pdf",))
+        self._save_snapshot_if_changed(stats)
+        return stats
+
+    def index_document(self, document_id: str) -> Dict[str, int]:
+        """Incrementally (re)index the API, log and tag chunks of one document."""
+        if not self._loaded:
+            return {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        chunks = self._gather_document_chunks(document_id)
+        stats = self._replace_source(document_id, chunks, types=("api", "log", "tag"))
+        self._save_snapshot_if_changed(stats)
+        return stats
+
+    def remove_source(self, source_id: str) -> int:
+        """Drop every chunk derived from an artifact or document."""
+        with self._lock:
+            ids = [ch["id"] for ch in self.payloads if _chunk_source(ch) == source_id]
+        return self.delete_chunks(ids)
+
+    # ---------------------------------------------------------------- snapshots
+    @staticmethod
+    def _corpus_digest(ids: List[str], hashes: Dict[str, str]) -> str:
+        """Digest of the ordered (id, content hash) pairs describing a corpus."""
+        return _content_hash("\n".join(f"{cid}\t{hashes.get(cid, '')}" for cid in ids))
+
+    def _save_snapshot_if_changed(self, stats: Dict[str, int]) -> None:
+        if stats.get("added") or stats.get("updated") or stats.get("deleted"):
+            self.schedule_snapshot()
+
+    def schedule_snapshot(self) -> None:
+        """Ask the background writer for a snapshot.
+
+        Requests arriving within ``snapshot_delay`` of the first pending one
+        are coalesced into a single write, so a burst of uploads serializes
+        the corpus once.
+        """
+        if self.snapshot_delay <= 0:
+            self.save_snapshot()
+            return
+        with self._snapshot_cond:
+            if self._snapshot_due is None:
+                self._snapshot_due = time.monotonic() + self.snapshot_delay
+            if self._snapshot_thread is None or not self._snapshot_thread.is_alive():
+                self._snapshot_thread = threading.Thread(
+                    target=self._snapshot_worker, name="search-snapshot", daemon=True
+                )
+                self._snapshot_thread.start()
+            self._snapshot_cond.notify_all()
+
+    def _snapshot_worker(self) -> None:
+        while True:
+            with self._snapshot_cond:
+                while self._snapshot_due is None:
+                    if not self._snapshot_cond.wait(timeout=60.0):
+                        self._snapshot_thread = None
+                        return
+                delay = self._snapshot_due - time.monotonic()
+                if delay > 0:
+                    self._snapshot_cond.wait(timeout=delay)
+                    continue
+                self._snapshot_due = None
+            self.save_snapshot()
+
+    def flush_snapshot(self) -> Optional[Path]:
+        """Write a pending snapshot now (shutdown, tests); None if none was pending."""
+        with self._snapshot_cond:
+            pending = self._snapshot_due is not None
+            self._snapshot_due = None
+        return self.save_snapshot() if pending else None
+
+    def save_snapshot(self) -> Optional[Path]:
+        """Write vectors, ids, payloads and a corpus manifest to ``snapshot_dir``.
+
+        The arrays and lists of the index are replaced, never mutated, by
+        writers, so references taken under the query lock form a consistent
+        copy. Only the FAISS index, which incremental updates patch in place,
+        is serialized in memory under the writer lock. The files are then written without holding either lock, so
+        neither queries nor updates wait for the disk.
+
+        Files are written to temporary names and atomically renamed, so a
+        concurrently memory-mapped snapshot stays valid until it is reopened.
+
+        Returns:
+            Path of the written manifest, or None if there was nothing to save.
+        """
+        with self._snapshot_io_lock:
+            with self._write_lock:
+                with self._lock:
+                    vectors, ids, payloads, hashes = self.vectors, self.ids, self.payloads, self.hashes
+                    index, index_key = self.faiss_index, self._index_key
+                    mmapped = self._index_mmapped
+                    labels = self._labels
+                    index_meta = {"tombstones": sorted(self._tombstones), "trained_size": self._trained_size}
+                if vectors is None or not ids:
+                    return None
+                index_bytes = None
+                # A memory-mapped index is unchanged since it was loaded from index.faiss
+                if faiss is not None and isinstance(index, faiss.Index) and not mmapped:  # type: ignore
+                    try:
+                        index_bytes = faiss.serialize_index(index)
+                    except Exception as exc:  # pragma: no cover - index file is optional
+                        LOGGER.warning("Failed to serialize search index: %s", exc)
+            return self._write_snapshot(
+                vectors, ids, payloads, hashes, index_key, index_bytes, labels, index_meta, keep_index=mmapped
+            )
+
+    def _write_snapshot(
+        self,
+        vectors: np.ndarray,
+        ids: List[str],
+        payloads: List[Chunk],
+        hashes: Dict[str, str],
+        index_key: Optional[Tuple[str, str]],
+        index_bytes: Optional[np.ndarray],
+        labels: Optional[np.ndarray],
+        index_meta: Dict[str, Any],
+        keep_index: bool = False,
+    ) -> Optional[Path]:
+        try:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            provider, model = index_key or self._embedding_key()
+            manifest = {
+                "version": SNAPSHOT_VERSION,
+                "provider": provider,
+                "model": model,
+                "dim": int(vectors.shape[1]),
+                "count": len(ids),
+                "index_type": self.index_type,
+                "corpus_digest": self._corpus_digest(ids, hashes),
+                "created_at": time.time(),
+                **index_meta,
+            }
+            tmp = self.snapshot_dir / f".vectors.{uuid.uuid4().hex}.npy"
+            np.save(tmp, np.ascontiguousarray(vectors, dtype="float32"))
+            os.replace(tmp, self.snapshot_dir / "vectors.npy")
+            chunks = [{**ch, "hash": hashes.get(ch["id"])} for ch in payloads]
+            if labels is not None:
+                for ch, label in zip(chunks, labels.tolist()):
+                    ch["label"] = label
+            self._write_atomic("chunks.json", json.dumps(chunks, separators=(",", ":"), default=str))
+            index_path = self.snapshot_dir / "index.faiss"
+            if index_bytes is not None:
+                tmp = self.snapshot_dir / f".index.{uuid.uuid4().hex}.faiss"
+                tmp.write_bytes(np.asarray(index_bytes).tobytes())
+                os.replace(tmp, index_path)
+            elif index_path.exists() and not keep_index:
+                # A stale index file must not be paired with the new vectors
+                index_path.unlink()
+            # Manifest last: it is what marks the snapshot as complete.
+            return self._write_atomic("manifest.json", json.dumps(manifest, indent=2))
+        except Exception as exc:  # pragma: no cover - snapshots are an optimisation
+            LOGGER.warning("Failed to save search index snapshot: %s", exc)
+            return None
+
+    def _write_atomic(self, name: str, content: str) -> Path:
+        target = self.snapshot_dir / name
+        tmp = self.snapshot_dir / f".{name}.{uuid.uuid4().hex}"
+        tmp.write_text(content, encoding="utf-8")
+        os.replace(tmp, target)
+        return target
+
+    def load_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Memory-map the saved snapshot into the index.
+
+        The snapshot is only used when it was built with an embedding model
+        this instance is configured for; its provider is adopted so query
+        vectors are comparable.
+
+        Returns:
+            The snapshot manifest, or None if no usable snapshot exists.
+        """
+        manifest_path = self.snapshot_dir / "manifest.json"
+        if not manifest_path.exists():
+            return None
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("version") != SNAPSHOT_VERSION:
+                return None
+            provider, model = manifest.get("provider"), manifest.get("model")
+            if (provider, model) not in {
+                ("ollama", self.ollama_model),
+                ("sentence_transformers", self.st_model_name),
+            }:
+                LOGGER.info("Ignoring search index snapshot built with %s/%s", provider, model)
+                return None
+            vectors = np.load(self.snapshot_dir / "vectors.npy", mmap_mode="r")
+            chunks = json.loads((self.snapshot_dir / "chunks.json").read_text(encoding="utf-8"))
+            if len(chunks) != len(vectors) or len(chunks) != manifest.get("count"):
+                return None
+            labels = [ch.pop("label", None) for ch in chunks]
+            tombstones = frozenset(manifest.get("tombstones") or ())
+            index = None
+            faiss_path = self.snapshot_dir / "index.faiss"
+            if (
+                faiss is not None
+                and faiss_path.exists()
+                and manifest.get("index_type", "flat") == self.index_type
+                and None not in labels
+            ):
+                try:
+                    index = faiss.read_index(str(faiss_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                    if index.ntotal != len(chunks) + len(tombstones):
+                        index = None
+                except Exception:
+                    index = None
+        except Exception as exc:
+            LOGGER.warning("Failed to load search index snapshot: %s", exc)
+            return None
+
+        hashes = {ch["id"]: ch.pop("hash", None) or _content_hash(ch["text"]) for ch in chunks}
+        ids = [ch["id"] for ch in chunks]
+        lexical = BM25Index()
+        lexical.add_many((ch["id"], ch["text"]) for ch in chunks)
+        with self._write_lock:
+            rebuilt = None if index is not None else self._new_vector_index(vectors)
+            with self._lock:
+                self._use_ollama = provider == "ollama"
+                self._index_key = (provider, model)
+                self.vectors = vectors
+                self.hashes = hashes
+                self.payloads = chunks
+                self._facets = None
+                self.ids = ids
+                self._positions = {cid: i for i, cid in enumerate(ids)}
+                self.lexical = lexical
+                if index is not None:
+                    self._set_vector_index(
+                        index,
+                        _faiss_index_type(index),
+                        np.asarray(labels, dtype="int64"),
+                        tombstones,
+                        trained_size=manifest.get("trained_size"),
+                    )
+                    # Read-only: the first incremental update rebuilds it in memory
+                    self._index_mmapped = True
+                else:
+                    self._set_vector_index(*rebuilt)
+        return manifest
+
+    def warm_start(self) -> Dict[str, Any]:
+        """Load the index, preferring the on-disk snapshot over re-embedding.
+
+        If the snapshot manifest matches the current corpus the snapshot is
+        served as-is. Otherwise it seeds :meth:`rebuild`, which then only
+        embeds chunks that are new or changed since the snapshot was taken.
+
+        Returns:
+            Dictionary with items count and whether the snapshot was used.
+        """
+        manifest = self.load_snapshot()
+        if manifest is not None:
+            chunks = self._gather_chunks()
+            ids = [c["id"] for c in chunks]
+            hashes = {c["id"]: _content_hash(c["text"]) for c in chunks}
+            if self._corpus_digest(ids, hashes) == manifest.get("corpus_digest"):
+                with self._write_lock, self._lock:
+                    # Pick up metadata-only changes without touching vectors.
+                    self.payloads = chunks
+                    self._facets = None
+                    self._loaded = True
+                return {"items": len(chunks), "snapshot": "loaded"}
+        info = self.rebuild()
+        info["snapshot"] = "rebuilt" if manifest is None else "refreshed"
+        return info
+
+    def _sync_remote_embeddings(self, chunks: List[Chunk], embeddings: np.ndarray, reset: bool = True) -> None:
         store = getattr(self.db, "store_search_chunks", None)
         if not callable(store):
             return
-        reset = getattr(self.db, "reset_search_chunks", None)
+        reset_fn = getattr(self.db, "reset_search_chunks", None) if reset else None
         try:
-            if callable(reset):
-                reset()
+            if callable(reset_fn):
+                reset_fn()
             vectors = embeddings.tolist()
             records: List[Dict[str, Any]] = []
             for chunk, vector in zip(chunks, vectors):
@@ -376,64 +1447,242 @@ class SearchIndex:
         except Exception as exc:  # pragma: no cover - remote sync should not break local search
             LOGGER.warning("Failed to sync search embeddings to remote store: %s", exc)
 
-    def search(self, query: str, k: int = 10, threshold: float = 0.0) -> List[SearchResult]:
-        """Search for similar chunks using vector similarity.
+    # ----------------------------------------------------------- query vectors
+    def _encode_queries(self, texts: List[str]) -> np.ndarray:
+        self._load_model()
+        return _normalize(self._encode(texts).astype("float32"))
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Return the normalized (1, d) query vector, cached and micro-batched."""
+        text = normalize_query(query)
+        key = (*self._embedding_key(), text)
+        vec = self.query_cache.get(key)
+        if vec is None:
+            vec = self._query_batcher.encode(text)
+            self.query_cache.put(key, vec)
+        return vec[None, :]
+
+    # ---------------------------------------------------------- filtered search
+    def _build_facets(self) -> Dict[Tuple[str, Any], np.ndarray]:
+        """Group chunk positions by type, artifact, document and page."""
+        groups: Dict[Tuple[str, Any], List[int]] = {}
+        for pos, ch in enumerate(self.payloads):
+            meta = ch.get("meta") or {}
+            keys = [("type", (meta.get("type") or "").lower())]
+            if meta.get("artifact_id") is not None:
+                keys.append(("artifact_id", meta.get("artifact_id")))
+            source = _chunk_source(ch)
+            if source is not None:
+                keys.append(("document_id", source))
+            if meta.get("page") is not None:
+                keys.append(("page", meta.get("page")))
+            for key in keys:
+                groups.setdefault(key, []).append(pos)
+        return {key: np.asarray(rows, dtype=np.int64) for key, rows in groups.items()}
+
+    def _filter_positions(
+        self,
+        types: Optional[Iterable[str]] = None,
+        artifact_id: Optional[str] = None,
+        document_id: Optional[str] = None,
+        page: Optional[int] = None,
+    ) -> Optional[np.ndarray]:
+        """Sorted positions matching every given filter, or None when unfiltered.
+
+        ``types`` matches any of the listed chunk types; ``document_id``
+        matches a chunk's document or, for PDFs, its artifact id.
+        """
+        if self._facets is None:
+            self._facets = self._build_facets()
+        empty = np.empty(0, dtype=np.int64)
+        selected: Optional[np.ndarray] = None
+        type_set = {t.lower() for t in (types or []) if t}
+        if type_set:
+            selected = np.unique(np.concatenate(
+                [self._facets.get(("type", t), empty) for t in type_set]
+            ))
+        for field, value in (("artifact_id", artifact_id), ("document_id", document_id), ("page", page)):
+            if value is None:
+                continue
+            rows = self._facets.get((field, value), empty)
+            selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+        return selected
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        threshold: float = 0.0,
+        types: Optional[Iterable[str]] = None,
+        artifact_id: Optional[str] = None,
+        document_id: Optional[str] = None,
+        page: Optional[int] = None,
+        mode: Optional[str] = None,
+    ) -> List[SearchResult]:
+        """Search for matching chunks by vector similarity, BM25 or both.
+
+        Filters are applied inside the index probe, so up to ``k`` matching
+        results come back without over-fetching and post-filtering.
+
+        In ``hybrid`` mode both rankings are fused with reciprocal rank
+        fusion. The fused score is divided by its maximum, so a chunk ranked
+        first by every contributing ranking scores 1.0; it is not comparable
+        to a cosine similarity. If the embedding provider is unreachable the
+        query degrades to keyword-only results.
 
         Args:
             query: Search query text.
             k: Maximum number of results to return.
-            threshold: Minimum similarity score to include in results (default: 0.0).
+            threshold: Minimum vector similarity for vector candidates (default: 0.0).
+            types: Restrict to these chunk types (pdf, api, log, tag).
+            artifact_id: Restrict to chunks of one artifact.
+            document_id: Restrict to chunks of one document (or PDF artifact).
+            page: Restrict to PDF chunks from this page.
+            mode: "hybrid", "vector" or "lexical" (default: SEARCH_MODE).
 
         Returns:
-            List of SearchResult objects sorted by similarity score.
+            List of SearchResult objects sorted by score.
+
+        Raises:
+            ValueError: Unknown ``mode``.
+            EmbeddingProviderUnavailable: Vector mode and no provider is reachable.
         """
+        mode = (mode or self.search_mode).lower()
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {mode!r}; expected one of {', '.join(SEARCH_MODES)}")
         if not self._loaded:
-            self.rebuild()
+            self.warm_start()
         if not query.strip() or not self.payloads:
             return []
 
-        self._load_model()
-        q = self._encode([query])
-        q = _normalize(q.astype("float32"))
+        q: Optional[np.ndarray] = None
+        if mode != "lexical" and self.faiss_index is not None:
+            try:
+                q = self._embed_query(query)
+            except EmbeddingProviderUnavailable as exc:
+                if mode == "vector":
+                    raise
+                LOGGER.warning("Query embedding unavailable (%s); using keyword search only.", exc)
+
+        # Hybrid fusion probes a fixed depth so a hit's fused score does not
+        # depend on k, which keeps cursor pages consistent.
+        fetch = max(self.hybrid_depth, k) if mode == "hybrid" else k
+        with self._lock:
+            if not self.payloads:
+                return []
+            allowed = self._filter_positions(types, artifact_id, document_id, page)
+            if allowed is not None and not len(allowed):
+                return []
+            vector_hits: List[Tuple[int, float]] = []
+            if q is not None and self.faiss_index is not None:
+                vector_hits = [(i, s) for i, s in self._vector_probe(q, fetch, allowed) if s >= threshold]
+            lexical_hits: List[Tuple[int, float]] = []
+            if mode != "vector":
+                lexical_hits = self._lexical_probe(query, fetch, allowed)
+            payloads = self.payloads
+
+        if mode == "hybrid":
+            rankings = [[i for i, _ in hits] for hits in (vector_hits, lexical_hits) if hits]
+            best = len(rankings) / (self.rrf_k + 1) if rankings else 1.0
+            fused = reciprocal_rank_fusion(rankings, k=self.rrf_k)
+            # Cut at k in cursor order (score desc, chunk id)
+            fused.sort(key=lambda item: (-item[1], payloads[item[0]]["id"]))
+            ranked = [(i, score / best) for i, score in fused[:k]]
+        else:
+            ranked = vector_hits if mode == "vector" else lexical_hits
+        out: List[SearchResult] = []
+        for idx, score in ranked:
+            ch = payloads[idx]
+            out.append(SearchResult(score=float(score), text=ch["text"], meta=ch["meta"], id=ch["id"]))
+        # Same order as pagination cursors, so ranks increase down every page
+        out.sort(key=_rank_key)
+        for rank, hit in enumerate(out, start=1):
+            hit.rank = rank
+        return out
 
-        if faiss is not None and isinstance(self.faiss_index, faiss.Index):  # type: ignore
-            D, I = self.faiss_index.search(q, min(k, len(self.payloads)))
+    def _vector_probe(self, q: np.ndarray, k: int, allowed: Optional[np.ndarray]) -> List[Tuple[int, float]]:
+        """Top-``k`` (position, similarity) pairs for query vector ``q``."""
+        if allowed is not None and len(allowed) <= FILTER_EXACT_MAX:
+            # Small partitions: exact scan over just the matching rows.
+            sims = (self.vectors[allowed] @ q.T).ravel()  # type: ignore[index]
+            top = _top_k(sims, k)
+            idxs = allowed[top]
+            scores = sims[top]
+        elif faiss is not None and isinstance(self.faiss_index, faiss.Index):  # type: ignore
+            params = self._faiss_search_params(allowed)
+            if params is None and self.effective_index_type != "flat":
+                apply_search_params(self.faiss_index, self.nprobe, self.ef_search)
+            n = len(self.payloads) if allowed is None else len(allowed)
+            if params is not None:
+                D, I = self.faiss_index.search(q, min(k, n), params=params)
+            else:
+                D, I = self.faiss_index.search(q, min(k, n))
             scores = D[0]
-            idxs = I[0]
+            # FAISS returns labels; -1 (no result) and tombstones map to -1.
+            idxs = np.array([self._label_pos.get(label, -1) for label in I[0].tolist()], dtype="int64")
         else:
             # cosine similarity via dot product with normalized embeddings
             emb = self.faiss_index  # type: ignore
-            sims = (emb @ q.T).ravel()
-            idxs = np.argsort(-sims)[: min(k, len(sims))]
-            scores = sims[idxs]
-
-        out: List[SearchResult] = []
-        for score, idx in zip(scores.tolist(), idxs.tolist()):
-            if idx < 0 or idx >= len(self.payloads):
-                continue
-            if score < threshold:
-                continue
-            ch = self.payloads[idx]
-            out.append(SearchResult(score=float(score), text=ch["text"], meta=ch["meta"]))
-        return out
+            if allowed is None:
+                sims = (emb @ q.T).ravel()
+                idxs = _top_k(sims, k)
+                scores = sims[idxs]
+            else:
+                sims = (emb[allowed] @ q.T).ravel()
+                top = _top_k(sims, k)
+                idxs = allowed[top]
+                scores = sims[top]
+        return [
+            (idx, score)
+            for idx, score in zip(idxs.tolist(), scores.tolist())
+            if 0 <= idx < len(self.payloads)
+        ]
+
+    def _lexical_probe(self, query: str, k: int, allowed: Optional[np.ndarray]) -> List[Tuple[int, float]]:
+        """Top-``k`` (position, BM25 score) pairs for ``query``."""
+        allowed_ids = None if allowed is None else {self.ids[i] for i in allowed.tolist()}
+        hits = self.lexical.search(query, k, allowed=allowed_ids)
+        return [(self._positions[cid], score) for cid, score in hits if cid in self._positions]
+
+    def _faiss_search_params(self, allowed: Optional[np.ndarray]) -> Any:
+        """FAISS SearchParameters restricting the probe to ``allowed`` positions.
+
+        Without a filter, tombstoned HNSW entries still have to be excluded;
+        those parameters are cached until the tombstones change.
+        """
+        if allowed is not None:
+            return self._selector_params(faiss.IDSelectorBatch(self._labels[allowed]))  # type: ignore[index]
+        if not self._tombstones:
+            return None
+        if self._tombstone_params is None:
+            dead = faiss.IDSelectorBatch(np.fromiter(self._tombstones, dtype="int64", count=len(self._tombstones)))
+            self._tombstone_params = self._selector_params(faiss.IDSelectorNot(dead))
+            self._tombstone_params._dead = dead
+        return self._tombstone_params
+
+    def _selector_params(self, sel: Any) -> Any:
+        if self.effective_index_type in ("ivf_flat", "ivf_pq"):
+            params = faiss.SearchParametersIVF(sel=sel, nprobe=self.nprobe or 1)
+        elif self.effective_index_type == "hnsw":
+            params = faiss.SearchParametersHNSW(sel=sel, efSearch=self.ef_search or 16)
+        else:
+            params = faiss.SearchParameters(sel=sel)
+        # The selector must outlive the search call.
+        params._sel = sel
+        return params
 
     def get_embeddings_for_document(self, document_id: str) -> List[List[float]]:
         """Retrieve all embedding vectors for chunks belonging to a document."""
         if not self._loaded:
-            self.rebuild()
+            self.warm_start()
 
         vectors: List[List[float]] = []
-        for i, ch in enumerate(self.payloads):
-            meta = ch.get("meta") or {}
-            # Match strict ID or artifact ID
-            if meta.get("artifact_id") == document_id or meta.get("document_id") == document_id:
-                vec: Optional[np.ndarray] = None
-                if faiss is not None and hasattr(self.faiss_index, "reconstruct"):
-                    # FAISS reconstruct returns numpy array
-                    vec = self.faiss_index.reconstruct(i)
-                elif isinstance(self.faiss_index, np.ndarray):
-                    vec = self.faiss_index[i]
-
-                if vec is not None:
-                    vectors.append(vec.tolist())
+        with self._lock:
+            if self.vectors is None:
+                return vectors
+            for i, ch in enumerate(self.payloads):
+                meta = ch.get("meta") or {}
+                # Match strict ID or artifact ID
+                if meta.get("artifact_id") == document_id or meta.get("document_id") == document_id:
+                    vectors.append(self.vectors[i].tolist())
         return vectors
@@ -8,6 +8,7 @@ ML Embeddings Configuration:
 - Set CHIT_USE_LOCAL_EMBEDDINGS=true to enable local SentenceTransformer embeddings
 - Embeddings are loaded lazily on first use to minimize startup time
 - Falls back to search_index embeddings if local model unavailable
+- Generated vectors are reused through the persistent embedding cache
 """
 
 import json
@@ -19,6 +20,8 @@ from typing import Dict, Any, Optional, Callable, List
 import nats
 from nats.js.api import StreamConfig, RetentionPolicy
 
+from app.embedding_cache import get_embedding_cache
+
 # Check for NumPy
 try:
     import numpy as np
@@ -124,7 +127,16 @@ class ChitService:
             return []
 
         try:
-            embeddings = model.encode(texts, convert_to_numpy=True)
+            cache = get_embedding_cache()
+            if cache is not None and texts:
+                embeddings = cache.encode(
+                    "sentence_transformers",
+                    self._embedding_model_name,
+                    texts,
+                    lambda batch: model.encode(batch, convert_to_numpy=True),
+                )
+            else:
+                embeddings = model.encode(texts, convert_to_numpy=True)
             return embeddings.tolist()
         except Exception as e:
             logger.error(f"Failed to generate embeddings: {e}")
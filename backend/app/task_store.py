@@ -0,0 +1,349 @@
+"""Persistent registry of background task state.
+
+Task rows live in a small SQLite database (WAL mode) instead of a
+module-level dict, so task state survives restarts and every uvicorn worker
+sharing the file can answer ``/tasks/{id}`` for a job queued by another
+worker. Finished tasks are compacted after a TTL so the table stays bounded.
+
+Each task has a status, an optional error, free-form fields (filename,
+artifact id, result counts, ...) and progress: pages done/total, the current
+stage and per-stage timings in seconds.
+
+Rows also record the process that queued or runs them. After a restart,
+:meth:`TaskStore.fail_interrupted` marks queued and running tasks whose
+process is gone as errors, so they do not look in flight forever.
+
+Configuration (environment):
+    TASK_STORE_PATH: SQLite file location (default: artifacts/tasks.sqlite3)
+    TASK_TTL_SECONDS: Age after which finished tasks are deleted (default: 604800)
+
+Classes:
+    TaskStore: SQLite-backed task registry
+
+Functions:
+    get_task_store: Return the shared store for the configured path
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_STORE_PATH = Path("artifacts") / "tasks.sqlite3"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+FINISHED_STATUSES = ("completed", "error", "cancelled")
+ACTIVE_STATUSES = ("queued", "running")
+
+INTERRUPTED_ERROR = "interrupted: the server restarted before the task finished"
+
+# Tells this process apart from an earlier one that had the same pid
+_BOOT_ID = uuid.uuid4().hex[:12]
+
+# Compact at most this often (seconds) as a side effect of writes
+_COMPACT_INTERVAL = 300.0
+
+_COLUMNS = "id, kind, status, error, data_json, pages_done, pages_total, stage, stage_timings_json, created_at, updated_at"
+
+
+class TaskStore:
+    """SQLite-backed task registry.
+
+    Attributes:
+        path: Location of the SQLite database file (``":memory:"`` for tests)
+        ttl_seconds: Age after which finished tasks are deleted
+    """
+
+    def __init__(self, path: Path | str = DEFAULT_STORE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.path = str(path)
+        self.ttl_seconds = float(ttl_seconds)
+        self._lock = threading.RLock()
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; multi-statement updates use explicit transactions.
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                data_json TEXT NOT NULL DEFAULT '{}',
+                pages_done INTEGER,
+                pages_total INTEGER,
+                stage TEXT,
+                stage_timings_json TEXT NOT NULL DEFAULT '{}',
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        if "owner" not in columns:
+            try:
+                self._conn.execute("ALTER TABLE tasks ADD COLUMN owner TEXT")
+            except sqlite3.OperationalError:
+                pass  # another worker added it first
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_tasks_status_created ON tasks (status, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_tasks_kind_created ON tasks (kind, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_tasks_updated ON tasks (updated_at)")
+        self._last_compact = 0.0
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock up front so read-modify-write
+        # of the JSON columns is atomic across processes.
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        task: Dict[str, Any] = json.loads(row["data_json"] or "{}")
+        task.update(
+            {
+                "id": row["id"],
+                "kind": row["kind"],
+                "status": row["status"],
+                "created_at": row["created_at"],
+                "updated_at": row["updated_at"],
+                "progress": {
+                    "pages_done": row["pages_done"],
+                    "pages_total": row["pages_total"],
+                    "stage": row["stage"],
+                    "stage_timings": json.loads(row["stage_timings_json"] or "{}"),
+                },
+            }
+        )
+        if row["error"] is not None:
+            task["error"] = row["error"]
+        return task
+
+    def create(self, task_id: str, status: str = "queued", kind: str = "ingest", **fields: Any) -> Dict[str, Any]:
+        """Insert (or replace) a task with the given extra ``fields``."""
+        now = time.time()
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tasks (id, kind, status, data_json, owner, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (task_id, kind, status, json.dumps(fields, default=str), _owner(), now, now),
+            )
+        self._maybe_compact(now)
+        return self.get(task_id)  # type: ignore[return-value]
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def __contains__(self, task_id: object) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM tasks WHERE id = ?", (task_id,)).fetchone() is not None
+
+    def update(self, task_id: str, status: Optional[str] = None, error: Optional[str] = None, **fields: Any) -> bool:
+        """Set ``status``/``error`` and merge ``fields`` into the task.
+
+        Returns:
+            False if the task does not exist.
+        """
+        now = time.time()
+        with self._write() as conn:
+            row = conn.execute("SELECT data_json FROM tasks WHERE id = ?", (task_id,)).fetchone()
+            if row is None:
+                return False
+            data = json.loads(row["data_json"] or "{}")
+            data.update(fields)
+            conn.execute(
+                "UPDATE tasks SET status = COALESCE(?, status), error = COALESCE(?, error), "
+                "data_json = ?, updated_at = ? WHERE id = ?",
+                (status, error, json.dumps(data, default=str), now, task_id),
+            )
+        return True
+
+    def start(self, task_id: str) -> bool:
+        """Mark a task running unless it was cancelled, in one conditional UPDATE.
+
+        Returns:
+            False if the task was cancelled (or does not exist); the caller
+            must not run it.
+        """
+        with self._write() as conn:
+            return conn.execute(
+                "UPDATE tasks SET status = 'running', owner = ?, updated_at = ? WHERE id = ? AND status != 'cancelled'",
+                (_owner(), time.time(), task_id),
+            ).rowcount > 0
+
+    def cancel_queued(self, task_id: str) -> bool:
+        """Cancel a task only if it is still queued; False if it already started."""
+        with self._write() as conn:
+            return conn.execute(
+                "UPDATE tasks SET status = 'cancelled', updated_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), task_id),
+            ).rowcount > 0
+
+    def fail_interrupted(self, error: str = INTERRUPTED_ERROR) -> List[Dict[str, Any]]:
+        """Mark queued and running tasks whose owning process has exited as errors.
+
+        Tasks owned by another live process sharing the database (another
+        uvicorn worker) are left alone.
+
+        Returns:
+            The tasks that were marked, after the update.
+        """
+        marks = ",".join("?" * len(ACTIVE_STATUSES))
+        with self._write() as conn:
+            rows = conn.execute(
+                f"SELECT id, owner FROM tasks WHERE status IN ({marks})", ACTIVE_STATUSES
+            ).fetchall()
+            dead = [row["id"] for row in rows if not _owner_alive(row["owner"])]
+            conn.executemany(
+                "UPDATE tasks SET status = 'error', error = ?, updated_at = ? WHERE id = ?",
+                [(error, time.time(), task_id) for task_id in dead],
+            )
+        return [task for task in (self.get(task_id) for task_id in dead) if task]
+
+    def set_progress(
+        self,
+        task_id: str,
+        pages_done: Optional[int] = None,
+        pages_total: Optional[int] = None,
+        stage: Optional[str] = None,
+        stage_seconds: Optional[Dict[str, float]] = None,
+    ) -> bool:
+        """Record progress; ``stage_seconds`` is merged into the stage timings."""
+        now = time.time()
+        with self._write() as conn:
+            row = conn.execute("SELECT stage_timings_json FROM tasks WHERE id = ?", (task_id,)).fetchone()
+            if row is None:
+                return False
+            timings = json.loads(row["stage_timings_json"] or "{}")
+            for name, seconds in (stage_seconds or {}).items():
+                timings[name] = round(float(seconds), 6)
+            conn.execute(
+                "UPDATE tasks SET pages_done = COALESCE(?, pages_done), pages_total = COALESCE(?, pages_total), "
+                "stage = COALESCE(?, stage), stage_timings_json = ?, updated_at = ? WHERE id = ?",
+                (pages_done, pages_total, stage, json.dumps(timings), now, task_id),
+            )
+        return True
+
+    def delete(self, task_id: str) -> bool:
+        with self._write() as conn:
+            return conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount > 0
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        kind: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Tasks newest first, optionally filtered by status and kind."""
+        where, params = self._filters(status=status, kind=kind)
+        params += [max(0, int(limit)), max(0, int(offset))]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM tasks{where} ORDER BY created_at DESC, id LIMIT ? OFFSET ?",
+                params,
+            ).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def counts(self, kind: Optional[str] = None) -> Dict[str, int]:
+        """Number of tasks per status."""
+        where, params = self._filters(kind=kind)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT status, COUNT(*) FROM tasks{where} GROUP BY status", params).fetchall()
+        return {status: n for status, n in rows}
+
+    @staticmethod
+    def _filters(**columns: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses = [f"{name} = ?" for name, value in columns.items() if value]
+        params: List[Any] = [value for value in columns.values() if value]
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def compact(self, ttl_seconds: Optional[float] = None) -> int:
+        """Delete finished tasks last updated more than ``ttl_seconds`` ago.
+
+        Returns:
+            Number of tasks deleted.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        cutoff = time.time() - ttl
+        marks = ",".join("?" * len(FINISHED_STATUSES))
+        with self._write() as conn:
+            return conn.execute(
+                f"DELETE FROM tasks WHERE status IN ({marks}) AND updated_at < ?",
+                (*FINISHED_STATUSES, cutoff),
+            ).rowcount
+
+    def _maybe_compact(self, now: float) -> None:
+        if now - self._last_compact < _COMPACT_INTERVAL:
+            return
+        self._last_compact = now
+        self.compact()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _owner() -> str:
+    return f"{os.getpid()}:{_BOOT_ID}"
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """Whether the process recorded as ``owner`` may still be running the task."""
+    if not owner:
+        return False
+    if owner == _owner():
+        return True
+    pid_text, _, _ = owner.partition(":")
+    try:
+        pid = int(pid_text)
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        # Same pid but another boot id: an earlier incarnation of this process
+        return False
+    if os.name == "nt":  # pragma: no cover - signal 0 is not a probe on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_STORE: Optional[TaskStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_task_store() -> TaskStore:
+    """Return the process-wide task store, creating it on first use."""
+    global _STORE
+    path = os.getenv("TASK_STORE_PATH", str(DEFAULT_STORE_PATH))
+    with _STORE_LOCK:
+        if _STORE is None or _STORE.path != path:
+            try:
+                ttl = float(os.getenv("TASK_TTL_SECONDS", str(DEFAULT_TTL_SECONDS)))
+            except ValueError:
+                ttl = DEFAULT_TTL_SECONDS
+            _STORE = TaskStore(path, ttl_seconds=ttl)
+        return _STORE
@@ -0,0 +1,9 @@
+-- Index log messages for case-insensitive substring search (list_logs q=...,
+-- issued as `message ILIKE '%q%'`).
+create extension if not exists pg_trgm;
+
+create index if not exists idx_log_entries_message_trgm
+  on log_entries using gin (message gin_trgm_ops);
+
+create index if not exists idx_log_entries_document on log_entries(document_id);
+create index if not exists idx_log_entries_level on log_entries(level);
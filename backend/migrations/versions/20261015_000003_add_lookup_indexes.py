@@ -0,0 +1,49 @@
+"""add lookup indexes for per-artifact and per-document queries
+
+Revision ID: 20261015_000003
+Revises: 20251003_000002
+Create Date: 2026-10-15 00:00:03
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261015_000003'
+down_revision = '20251003_000002'
+branch_labels = None
+depends_on = None
+
+
+# (table, column); index names follow SQLModel's ix_<table>_<column>
+INDEXES = [
+    ('evidence', 'artifact_id'),
+    ('fact', 'artifact_id'),
+    ('section', 'document_id'),
+    ('doctable', 'document_id'),
+    ('apiendpoint', 'document_id'),
+    ('logentry', 'document_id'),
+    ('logentry', 'level'),
+    ('logentry', 'code'),
+    ('tagrow', 'document_id'),
+    ('tagprompt', 'document_id'),
+    ('document_entities', 'document_id'),
+    ('document_metric_hits', 'document_id'),
+    ('cipher_memory', 'category'),
+    ('cipher_memory', 'created_at'),
+]
+
+
+def upgrade() -> None:
+    # Some tables are created lazily by the app rather than by earlier revisions
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, column in INDEXES:
+        if table in existing:
+            op.create_index(f'ix_{table}_{column}', table, [column], if_not_exists=True)
+
+
+def downgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, column in INDEXES:
+        if table in existing:
+            op.drop_index(f'ix_{table}_{column}', table_name=table, if_exists=True)
@@ -0,0 +1,37 @@
+"""add logentry.ts_epoch for SQL-side time-window filtering
+
+Revision ID: 20261015_000004
+Revises: 20261015_000003
+Create Date: 2026-10-15 00:00:04
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261015_000004'
+down_revision = '20261015_000003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'logentry' not in inspector.get_table_names():
+        return
+    if 'ts_epoch' not in {c['name'] for c in inspector.get_columns('logentry')}:
+        op.add_column('logentry', sa.Column('ts_epoch', sa.Float(), nullable=True))
+    op.create_index('ix_logentry_ts_epoch', 'logentry', ['ts_epoch'], if_not_exists=True)
+    # Existing rows (ts_epoch IS NULL) are backfilled by
+    # Database._ensure_log_columns on every startup, which shares the
+    # timestamp parser with the write path.
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if 'logentry' not in sa.inspect(bind).get_table_names():
+        return
+    op.drop_index('ix_logentry_ts_epoch', table_name='logentry', if_exists=True)
+    with op.batch_alter_table('logentry') as batch:
+        batch.drop_column('ts_epoch')
@@ -0,0 +1,30 @@
+"""add evidence (artifact_id, content_type) index for per-artifact counts
+
+Revision ID: 20261015_000005
+Revises: 20261015_000004
+Create Date: 2026-10-15 00:00:05
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261015_000005'
+down_revision = '20261015_000004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if 'evidence' in sa.inspect(op.get_bind()).get_table_names():
+        op.create_index(
+            'ix_evidence_artifact_content_type',
+            'evidence',
+            ['artifact_id', 'content_type'],
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    if 'evidence' in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_index('ix_evidence_artifact_content_type', table_name='evidence', if_exists=True)
@@ -76,3 +76,81 @@ def test_ner_processor_with_custom_model():
     assert {"ORG", "PERSON"}.issubset(labels)
     assert all(ent.get("context") for ent in entities)
     assert any(ent.get("page") == 2 for ent in entities)
+
+
+def test_ner_processor_batches_texts_and_bounds_context():
+    class FakeEnt:
+        def __init__(self, text: str, start: int):
+            self.text = text
+            self.label_ = "ORG"
+            self.start_char = start
+            self.end_char = start + len(text)
+
+    class FakeNLP:
+        pipe_names = ["tok2vec", "tagger", "parser", "ner", "lemmatizer"]
+
+        def __init__(self):
+            self.calls = []
+
+        def pipe(self, texts, batch_size, n_process, disable):
+            self.calls.append({"count": len(texts), "batch_size": batch_size, "n_process": n_process, "disable": disable})
+            for text in texts:
+                pos = text.find("Acme")
+                yield SimpleNamespace(ents=[FakeEnt("Acme", pos)] if pos >= 0 else [])
+
+    nlp = FakeNLP()
+    processor = NERProcessor(nlp=nlp, batch_size=2, context_chars=10)
+    long_text = "x" * 500 + " Acme " + "y" * 500
+    elements = [
+        DummyText("Acme Labs", "paragraph", page=1),
+        DummyText("   ", "paragraph"),
+        DummyText("No entities here", "paragraph"),
+        DummyText(long_text, "paragraph", page=3),
+    ]
+    entities = processor.extract_entities(elements)
+
+    assert nlp.calls == [{"count": 3, "batch_size": 2, "n_process": 1, "disable": ["tagger", "parser", "lemmatizer"]}]
+    assert [(ent["source_index"], ent["page"]) for ent in entities] == [(0, 1), (3, 3)]
+    assert entities[0]["context"] == "Acme Labs"
+    far = entities[1]
+    assert far["context"] == long_text[far["start_char"] - 10:far["end_char"] + 10]
+    assert len(far["context"]) == 24
+
+
+def test_metric_engine_matches_per_pattern_finditer():
+    import re
+
+    from app.analysis.metric_extractor import (
+        BUSINESS_METRIC_PATTERNS,
+        METRIC_ENGINE,
+        _required_literal,
+    )
+    from app.ingestion.pdf_processor import extract_metrics_from_text
+
+    assert _required_literal(r"increase[d]?\s+by\s+([0-9.]+)%") == "increase"
+    assert _required_literal(r"clicks?[:\s]+([0-9,]+)") == "click"
+    assert _required_literal(r"(a|b)c|d") is None
+
+    text = (
+        "Sales: $4.5M in Q3. Revenue reached $12M with 15% growth: 20% YoY, "
+        "net income: 1,200 and 35% margin. ROAS: 3.2, Spend: $1,000, "
+        "Clicks: 2,500, CTR: 1.5%, Conversions: n/a"
+    )
+    expected = [
+        (metric_type, m.group(1), m.start())
+        for metric_type, patterns in BUSINESS_METRIC_PATTERNS.items()
+        for pattern in patterns
+        for m in re.finditer(pattern, text, re.IGNORECASE)
+    ]
+    hits = BusinessMetricExtractor().extract_metrics(text)
+    assert [(h["type"], h["value"], h["position"]) for h in hits] == expected
+
+    shared = METRIC_ENGINE.scan(text)
+    assert BusinessMetricExtractor().extract_metrics(text, matches=shared) == hits
+    assert extract_metrics_from_text(text) == extract_metrics_from_text(text, shared) == {
+        "roas": 3.2,
+        "spend": 1000.0,
+        "clicks": 2500.0,
+        "ctr": 1.5,
+    }
+    assert METRIC_ENGINE.scan("Nothing to see here.") == []
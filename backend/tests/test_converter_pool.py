@@ -0,0 +1,83 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.ingestion.converter_pool import ConverterKey, ConverterPool
+
+
+class FakeConverter:
+    def __init__(self, key):
+        self.key = key
+        self.warmed = False
+
+
+def test_checkout_reuses_converter_per_key():
+    built = []
+
+    def factory(key):
+        built.append(key)
+        return FakeConverter(key)
+
+    pool = ConverterPool(factory, warmer=lambda c: setattr(c, "warmed", True), max_per_key=2)
+    cpu = ConverterKey(device="cpu")
+    ocr = ConverterKey(ocr=True, device="cpu")
+
+    pool.warm(cpu)
+    with pool.checkout(cpu) as first:
+        assert first.warmed is True
+    with pool.checkout(cpu) as second:
+        assert second is first
+    with pool.checkout(ocr) as other:
+        assert other.key == ocr
+
+    assert built == [cpu, ocr]
+    assert pool.stats()["reused"] == 2
+
+
+def test_concurrent_checkouts_wait_instead_of_loading_duplicates():
+    built = []
+    pool = ConverterPool(lambda key: built.append(key) or FakeConverter(key), max_per_key=1)
+    key = ConverterKey()
+    active = []
+    peak = []
+
+    def convert():
+        with pool.checkout(key):
+            active.append(1)
+            peak.append(len(active))
+            time.sleep(0.01)
+            active.pop()
+
+    threads = [threading.Thread(target=convert) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(built) == 1
+    assert max(peak) == 1
+    assert pool.stats()["waits"] >= 1
+
+
+def test_failed_build_frees_its_slot():
+    attempts = []
+
+    def factory(key):
+        attempts.append(key)
+        if len(attempts) == 1:
+            raise RuntimeError("model download failed")
+        return FakeConverter(key)
+
+    pool = ConverterPool(factory, max_per_key=1)
+    with pytest.raises(RuntimeError):
+        with pool.checkout(ConverterKey()):
+            pass
+    with pool.checkout(ConverterKey()) as converter:
+        assert isinstance(converter, FakeConverter)
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import ExtendedDatabase
+
+
+def _seed(db):
+    for art_id in ("a1", "a2"):
+        db.add_artifact({"id": art_id, "filename": f"{art_id}.pdf", "filepath": f"/tmp/{art_id}.pdf", "filetype": "pdf"})
+    db.add_evidence_many([
+        {"id": "e1", "artifact_id": "a1", "locator": "p1", "preview": "t", "content_type": "table",
+         "full_data": {"rows": [[1, 2]]}},
+        {"id": "e2", "artifact_id": "a1", "locator": "p2", "preview": "t", "content_type": "table"},
+        {"id": "e3", "artifact_id": "a1", "locator": "p3", "preview": "c", "content_type": "chart"},
+        {"id": "e4", "artifact_id": "a2", "locator": "p1", "preview": "x", "content_type": None},
+    ])
+    db.add_facts([
+        {"id": "f1", "artifact_id": "a1", "report_week": "2024-W01", "entity": "x", "metrics": {"m": 1}},
+        {"id": "f2", "artifact_id": "a1", "report_week": "2024-W02", "entity": "y", "metrics": {}},
+        {"id": "f3", "artifact_id": "a2", "report_week": "2024-W01", "entity": "z", "metrics": {}},
+    ])
+
+
+def test_per_artifact_queries(tmp_path):
+    db = ExtendedDatabase(str(tmp_path / "db.sqlite3"))
+    _seed(db)
+
+    assert db.get_artifact("a1")["filename"] == "a1.pdf"
+    assert db.get_artifact("missing") is None
+
+    light = db.get_evidence_for_artifact("a1")
+    assert sorted(e["id"] for e in light) == ["e1", "e2", "e3"]
+    assert all("full_data" not in e for e in light)
+    full = {e["id"]: e for e in db.get_evidence_for_artifact("a1", include_full_data=True)}
+    assert full["e1"]["full_data"] == {"rows": [[1, 2]]}
+    assert full["e2"]["full_data"] is None
+
+    assert db.count_evidence_by_type() == {"a1": {"table": 2, "chart": 1}, "a2": {"": 1}}
+    assert db.count_evidence_by_type("a2") == {"a2": {"": 1}}
+
+    assert sorted(f["id"] for f in db.get_facts_for_artifact("a1")) == ["f1", "f2"]
+    assert [f["id"] for f in db.get_facts_for_artifact("a1", "2024-W01")] == ["f1"]
@@ -0,0 +1,97 @@
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import event
+
+from app.database import ExtendedDatabase
+from app.database_supabase import SupabaseDatabase
+
+
+def test_sqlite_bulk_writes_commit_once_per_batch(tmp_path):
+    db = ExtendedDatabase(str(tmp_path / "bulk.sqlite3"))
+    commits = []
+    event.listen(db.engine, "commit", lambda conn: commits.append(1))
+
+    evidence = [
+        {"id": f"e{i}", "artifact_id": "a1", "locator": f"p{i}", "full_data": {"n": i}}
+        for i in range(200)
+    ]
+    facts = [
+        {"id": f"f{i}", "artifact_id": "a1", "metrics": {"value": i}, "evidence_id": f"e{i}"}
+        for i in range(200)
+    ]
+    logs = [{"id": f"l{i}", "document_id": "d1", "message": f"line {i}", "level": "INFO"} for i in range(50)]
+
+    assert db.add_evidence_many(evidence) == 200
+    assert db.add_facts(facts) == 200
+    assert db.add_logs(logs) == 50
+    assert db.add_facts([]) == 0
+    assert len(commits) == 3
+
+    stored = {f["id"]: f for f in db.get_facts()}
+    assert len(stored) == 200
+    assert stored["f7"]["metrics"] == {"value": 7}
+    assert db.get_evidence("e3")["full_data"] == {"n": 3}
+    assert len(db.list_logs(document_id="d1")) == 50
+
+
+
+def test_sqlite_list_apis_filters_by_document(tmp_path):
+    db = ExtendedDatabase(str(tmp_path / "apis.sqlite3"))
+    db.add_apis([
+        {"id": f"api{i}", "document_id": f"d{i % 2}", "method": "GET", "path": f"/v{i}", "tags": ["x"]}
+        for i in range(6)
+    ])
+
+    assert sorted(a["id"] for a in db.list_apis(document_id="d1")) == ["api1", "api3", "api5"]
+    assert [a["id"] for a in db.list_apis(document_id="d0", path_like="/v2")] == ["api2"]
+
+
+class _FakeQuery:
+    def __init__(self, calls, table, rows):
+        self.calls, self.table, self.rows = calls, table, rows
+
+    def execute(self):
+        self.calls.append((self.table, self.rows))
+        return type("Response", (), {"data": self.rows, "error": None})()
+
+
+class _FakeTable:
+    def __init__(self, calls, name):
+        self.calls, self.name = calls, name
+
+    def upsert(self, rows, on_conflict=None):
+        return _FakeQuery(self.calls, self.name, rows)
+
+
+class _FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def table(self, name):
+        return _FakeTable(self.calls, name)
+
+
+def test_supabase_bulk_writes_are_chunked_by_column_set():
+    db = SupabaseDatabase.__new__(SupabaseDatabase)
+    db.client = _FakeClient()
+    db.batch_size = 2
+
+    evidence = [
+        {"id": "e1", "artifact_id": "a1", "full_data": {"x": 1}},
+        {"id": "e2", "artifact_id": "a1", "full_data": None},
+        {"id": "e3", "artifact_id": "a1"},
+    ]
+    assert db.add_evidence_many(evidence) == 3
+    db.add_logs([{"id": "l1", "attrs_json": {"k": "v"}}])
+
+    calls = db.client.calls
+    assert [(table, len(rows)) for table, rows in calls] == [("evidence", 1), ("evidence", 2), ("log_entries", 1)]
+    # Rows without full_data go in their own request instead of sending full_data=None
+    assert calls[0][1] == [{"id": "e1", "artifact_id": "a1", "full_data": {"x": 1}}]
+    assert calls[1][1] == [{"id": "e2", "artifact_id": "a1"}, {"id": "e3", "artifact_id": "a1"}]
+    assert calls[2][1] == [{"id": "l1", "attrs": {"k": "v"}}]
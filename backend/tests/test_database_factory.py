@@ -54,3 +54,27 @@ def test_init_database_supabase_unavailable(monkeypatch):
 
     assert isinstance(db, ExtendedDatabase)
     assert meta["dual_write"] is False
+
+
+def test_dual_database_mirrors_bulk_writes():
+    class Recorder:
+        backend = "recorder"
+
+        def __init__(self):
+            self.calls = []
+
+        def add_facts(self, facts):
+            self.calls.append(("add_facts", len(facts)))
+            return len(facts)
+
+        def add_logs(self, logs):
+            self.calls.append(("add_logs", len(logs)))
+            return len(logs)
+
+    primary, secondary = Recorder(), Recorder()
+    dual = database_factory.DualDatabase(primary, secondary)
+
+    assert dual.add_facts([{"id": "f1"}, {"id": "f2"}]) == 2
+    dual.add_logs([{"id": "l1"}])
+
+    assert primary.calls == secondary.calls == [("add_facts", 2), ("add_logs", 1)]
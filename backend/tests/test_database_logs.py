@@ -0,0 +1,103 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import ExtendedDatabase
+from app.database_supabase import SupabaseDatabase
+
+
+LOGS = [
+        {"id": "l1", "document_id": "d1", "ts": "2024-01-01T10:00:00Z", "level": "ERROR",
+         "code": "E1", "message": "Upstream TIMEOUT after 30s"},
+        {"id": "l2", "document_id": "d1", "ts": "2024-01-02 08:30:00", "level": "INFO",
+         "code": "I1", "message": "retry ok: 100% done"},
+        {"id": "l3", "document_id": "d2", "ts": "2024-01-03", "level": "ERROR",
+         "code": "E2", "message": "disk_full on /var"},
+        {"id": "l4", "document_id": "d2", "ts": "yesterday", "level": "WARN",
+         "code": "W1", "message": "clock skew timeout"},
+]
+
+
+def _seed(db):
+    db.add_logs([dict(row) for row in LOGS])
+
+
+def test_filters_search_and_time_window(tmp_path):
+    db = ExtendedDatabase(str(tmp_path / "logs.sqlite3"))
+    _seed(db)
+
+    ids = lambda rows: [r["id"] for r in rows]  # noqa: E731
+    assert ids(db.list_logs(q="timeout")) == ["l1", "l4"]
+    assert ids(db.list_logs(q="TimeOut", level="ERROR")) == ["l1"]
+    # Short queries and LIKE wildcards are matched literally
+    assert ids(db.list_logs(q="0%")) == ["l2"]
+    assert ids(db.list_logs(q="_f")) == ["l3"]
+    assert ids(db.list_logs(document_id="d2", code="E2")) == ["l3"]
+
+    # Entries whose timestamp cannot be parsed are not dropped by a window
+    window = db.list_logs(ts_from="2024-01-02T00:00:00", ts_to="2024-01-02T23:59:59")
+    assert ids(window) == ["l2", "l4"]
+    assert ids(db.list_logs(ts_from="2024-01-02T10:00:00+02:00")) == ["l2", "l3", "l4"]
+
+    assert ids(db.list_logs(limit=2)) == ["l1", "l2"]
+    assert ids(db.list_logs(limit=2, offset=2)) == ["l3", "l4"]
+
+
+
+def test_rows_without_ts_epoch_are_backfilled_on_startup(tmp_path):
+    path = tmp_path / "logs.sqlite3"
+    _seed(ExtendedDatabase(str(path)))
+    # The Alembic migration adds the column without filling it
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE logentry SET ts_epoch = NULL")
+
+    db = ExtendedDatabase(str(path))
+    assert [r["id"] for r in db.list_logs(ts_from="2024-01-02T00:00:00")] == ["l2", "l3", "l4"]
+
+
+class _LogQuery:
+    """Stands in for a PostgREST query; the time window is applied client-side anyway."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return type("Response", (), {"data": [dict(row) for row in LOGS], "error": None})()
+
+
+def test_supabase_time_window_matches_sqlite(tmp_path):
+    sqlite_db = ExtendedDatabase(str(tmp_path / "logs.sqlite3"))
+    _seed(sqlite_db)
+    supabase_db = SupabaseDatabase.__new__(SupabaseDatabase)
+    supabase_db.client = type("Client", (), {"table": lambda self, name: _LogQuery()})()
+
+    for window in (
+        {"ts_from": "2024-01-02T00:00:00", "ts_to": "2024-01-02T23:59:59"},
+        {"ts_from": "2024-01-02T10:00:00+02:00"},
+        {"ts_to": "2024-01-01T12:00:00Z"},
+    ):
+        expected = [r["id"] for r in sqlite_db.list_logs(**window)]
+        assert [r["id"] for r in supabase_db.list_logs(**window)] == expected
+
+
+def test_existing_log_table_is_upgraded(tmp_path):
+    path = tmp_path / "legacy.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE logentry (id VARCHAR PRIMARY KEY, document_id VARCHAR NOT NULL, ts VARCHAR, "
+        "level VARCHAR, code VARCHAR, component VARCHAR, message VARCHAR, attrs_json VARCHAR)"
+    )
+    conn.execute(
+        "INSERT INTO logentry (id, document_id, ts, level, message) VALUES "
+        "('old', 'd0', '2024-05-01T00:00:00Z', 'ERROR', 'legacy failure')"
+    )
+    conn.commit()
+    conn.close()
+
+    db = ExtendedDatabase(str(path))
+    assert [r["id"] for r in db.list_logs(q="failure", ts_from="2024-04-30")] == ["old"]
+    assert db.list_logs(ts_to="2024-04-30") == []
@@ -0,0 +1,52 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import ExtendedDatabase
+
+
+def test_tuned_profile_and_read_write_split(tmp_path):
+    db = ExtendedDatabase(str(tmp_path / "profile.sqlite3"))
+    with db.engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() > 0
+    with db.read_engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA query_only").scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.exec_driver_sql("DELETE FROM evidence")
+
+    db.add_evidence_many([{"id": "e1", "artifact_id": "a1"}])
+    assert db.get_evidence("e1")["artifact_id"] == "a1"
+
+
+def test_indexes_added_to_existing_database(tmp_path):
+    path = tmp_path / "legacy.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE evidence (id TEXT PRIMARY KEY, artifact_id TEXT NOT NULL, locator TEXT, "
+                 "preview TEXT, content_type TEXT, coordinates_json TEXT, full_data_json TEXT)")
+    conn.commit()
+    conn.close()
+
+    ExtendedDatabase(str(path))
+
+    conn = sqlite3.connect(path)
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    plan = " ".join(str(r) for r in conn.execute("EXPLAIN QUERY PLAN SELECT * FROM evidence WHERE artifact_id = 'a1'"))
+    conn.close()
+    assert {"ix_evidence_artifact_id", "ix_logentry_document_id", "ix_tagrow_document_id"} <= names
+    assert "ix_evidence_artifact_id" in plan
+
+
+def test_in_memory_database_uses_single_engine():
+    db = ExtendedDatabase(":memory:")
+    db.add_artifact({"id": "a1", "filename": "a.csv", "filepath": "/tmp/a.csv", "filetype": "csv"})
+    assert db.read_engine is db.engine
+    assert db.get_artifact("a1")["filename"] == "a.csv"
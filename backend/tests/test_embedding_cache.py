@@ -0,0 +1,84 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.embedding_cache import EmbeddingCache, get_embedding_cache, text_hash
+
+
+def test_encode_only_embeds_misses_and_counts(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3")
+    calls = []
+
+    def encoder(texts):
+        calls.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+    first = cache.encode("ollama", "m", ["a", "bb"], encoder)
+    second = cache.encode("ollama", "m", ["bb", "ccc", "a"], encoder)
+
+    assert calls == [["a", "bb"], ["ccc"]]
+    assert second.tolist() == [[2.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+    assert first.dtype == np.float32
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+    assert stats["entries"] == 3
+
+
+def test_keys_are_scoped_by_provider_and_model(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3")
+    cache.put_many("ollama", "m1", ["x"], np.ones((1, 2), dtype=np.float32))
+
+    assert cache.get_many("ollama", "m2", ["x"]) == {}
+    assert cache.get_many("sentence_transformers", "m1", ["x"]) == {}
+    assert 0 in cache.get_many("ollama", "m1", ["x"])
+
+
+def test_lru_eviction_respects_cap_and_persists(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = EmbeddingCache(path, max_entries=2)
+    vec = np.ones((1, 2), dtype=np.float32)
+    cache.put_many("p", "m", ["old"], vec)
+    cache.put_many("p", "m", ["mid"], vec)
+    cache.get_many("p", "m", ["old"])  # refresh "old"
+    cache.put_many("p", "m", ["new"], vec)
+
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+    reopened = EmbeddingCache(path, max_entries=2)
+    assert sorted(reopened.get_many("p", "m", ["old", "mid", "new"])) == [0, 2]
+    assert reopened.stats()["entries"] == 2
+
+
+def test_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_CACHE_ENABLED", "false")
+    assert get_embedding_cache() is None
+
+
+def test_lookups_do_not_write_and_count_is_tracked(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = EmbeddingCache(path)
+    vec = np.ones((2, 2), dtype=np.float32)
+    cache.put_many("p", "m", ["a", "b"], vec)
+    cache.put_many("p", "m", ["b", "c"], vec * 2)  # "b" re-embedded
+
+    writes = cache._conn.total_changes
+    assert sorted(cache.get_many("p", "m", ["a", "b", "c"])) == [0, 1, 2]
+    assert cache._conn.total_changes == writes
+    assert cache.stats()["entries"] == 3
+    assert cache.get_many("p", "m", ["b"])[0].tolist() == [2.0, 2.0]
+
+    # Buffered last_used stamps are written on close
+    cache.close()
+    conn = sqlite3.connect(str(path))
+    stamps = dict(conn.execute("SELECT text_hash, last_used FROM embeddings").fetchall())
+    conn.close()
+    assert stamps[text_hash("a")] >= stamps[text_hash("c")]
+    assert EmbeddingCache(path).stats()["entries"] == 3
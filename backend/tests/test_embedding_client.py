@@ -0,0 +1,110 @@
+import json
+import sys
+import threading
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.embedding_client import (
+    CircuitBreaker,
+    EmbeddingProviderUnavailable,
+    OllamaEmbeddingClient,
+    token_batches,
+)
+
+
+def _embedding_response(request: httpx.Request) -> httpx.Response:
+    inputs = json.loads(request.content)["input"]
+    data = [{"index": i, "embedding": [float(len(t)), 1.0]} for i, t in enumerate(inputs)]
+    # Out-of-order data must be re-sorted by index
+    return httpx.Response(200, json={"data": list(reversed(data))})
+
+
+def test_token_batches_respect_token_and_item_limits():
+    texts = ["a" * 40, "b" * 40, "c" * 400, "d"]
+    assert token_batches(texts, max_tokens=25, max_items=10) == [[0, 1], [2], [3]]
+    assert token_batches(texts, max_tokens=10_000, max_items=3) == [[0, 1, 2], [3]]
+
+
+def test_embed_sync_batches_concurrently_and_preserves_order():
+    seen = []
+    lock = threading.Lock()
+
+    def handler(request):
+        with lock:
+            seen.append(len(json.loads(request.content)["input"]))
+        return _embedding_response(request)
+
+    client = OllamaEmbeddingClient(
+        "http://ollama", "m", max_batch_items=2, transport=httpx.MockTransport(handler)
+    )
+    try:
+        vecs = client.embed_sync(["x", "yy", "zzz", "wwww", "v"])
+    finally:
+        client.close()
+
+    assert sorted(seen) == [1, 2, 2]
+    assert vecs[:, 0].tolist() == [1.0, 2.0, 3.0, 4.0, 1.0]
+    assert vecs.dtype == np.float32
+
+
+def test_retries_transient_errors_then_succeeds():
+    calls = {"n": 0}
+
+    def handler(request):
+        calls["n"] += 1
+        if calls["n"] < 3:
+            return httpx.Response(503, text="loading model")
+        return _embedding_response(request)
+
+    client = OllamaEmbeddingClient(
+        "http://ollama", "m", max_retries=3, backoff_base=0.001, transport=httpx.MockTransport(handler)
+    )
+    try:
+        assert client.embed_sync(["hello"]).shape == (1, 2)
+    finally:
+        client.close()
+    assert calls["n"] == 3
+    assert client.breaker.state == "closed"
+
+
+def test_circuit_breaker_opens_and_fails_fast():
+    calls = {"n": 0}
+
+    def handler(request):
+        calls["n"] += 1
+        raise httpx.ConnectError("refused", request=request)
+
+    client = OllamaEmbeddingClient(
+        "http://ollama",
+        "m",
+        max_retries=0,
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+        transport=httpx.MockTransport(handler),
+    )
+    try:
+        for _ in range(2):
+            with pytest.raises(EmbeddingProviderUnavailable):
+                client.embed_sync(["hello"])
+        assert client.breaker.state == "open"
+        with pytest.raises(EmbeddingProviderUnavailable):
+            client.embed_sync(["hello"])
+    finally:
+        client.close()
+    assert calls["n"] == 2
+
+
+def test_breaker_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.database import ExtendedDatabase
+from app.evidence_store import ROWS_REF_KEY, EvidencePayloadStore
+
+
+def _csv_evidence(n):
+    return {
+        "id": "ev-csv",
+        "artifact_id": "a1",
+        "locator": "big.csv#data",
+        "preview": "...",
+        "content_type": "csv",
+        "full_data": [{"campaign": f"c{i}", "spend": float(i), 7: i} for i in range(n)],
+    }
+
+
+def test_large_payload_is_stored_out_of_line(tmp_path):
+    store = EvidencePayloadStore(tmp_path / "evidence", min_rows=100, format="jsonl")
+    original = _csv_evidence(250)
+    stored = store.offload(original)
+
+    assert isinstance(original["full_data"], list)  # input untouched
+    ref = stored["full_data"][ROWS_REF_KEY]
+    assert ref == {"path": "ev-csv.jsonl", "format": "jsonl", "row_count": 250, "columns": ["campaign", "spend", "7"]}
+    assert store.row_count(stored["full_data"]) == 250
+    assert store.read_rows(stored["full_data"], offset=240, limit=5) == [
+        {"campaign": f"c{i}", "spend": float(i), "7": i} for i in range(240, 245)
+    ]
+    assert len(store.read_rows(stored["full_data"], offset=200)) == 50
+
+    page = store.read_page(stored["full_data"], offset=200, limit=100)
+    assert page["total"] == 250 and len(page["rows"]) == 50 and page["next_offset"] is None
+    assert store.read_page(stored["full_data"], offset=0, limit=100)["next_offset"] == 100
+
+    # The evidence row keeps only the reference
+    db = ExtendedDatabase(":memory:")
+    db.add_evidence_many([stored])
+    assert db.get_evidence("ev-csv")["full_data"] == stored["full_data"]
+
+    store.clear()
+    assert not (tmp_path / "evidence").exists()
+
+
+def test_table_payload_keeps_metadata_inline(tmp_path):
+    store = EvidencePayloadStore(tmp_path, min_rows=3, format="jsonl")
+    table = {
+        "id": "ev-table",
+        "full_data": {"columns": ["a"], "rows": [{"a": i} for i in range(3)], "pages": [1, 2]},
+    }
+    stub = store.offload(table)["full_data"]
+    assert "rows" not in stub
+    assert stub["pages"] == [1, 2] and stub["columns"] == ["a"]
+    assert store.read_rows(stub, offset=1) == [{"a": 1}, {"a": 2}]
+
+    # Small, non-tabular and inline payloads are left alone
+    small = {"id": "s", "full_data": {"rows": [{"a": 1}]}}
+    assert store.offload(small) is small
+    text = {"id": "t", "full_data": {"text": "hello"}}
+    assert store.offload(text) is text
+    assert store.row_count(text["full_data"]) is None
+    assert store.read_page(small["full_data"], limit=10)["rows"] == [{"a": 1}]
+
+
+def test_parquet_range_reads_span_row_groups(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    import app.evidence_store as evidence_store
+
+    monkeypatch.setattr(evidence_store, "_ROW_GROUP_SIZE", 64)
+    store = EvidencePayloadStore(tmp_path, min_rows=10, format="parquet")
+    stub = store.offload(_csv_evidence(300))["full_data"]
+    assert stub[ROWS_REF_KEY]["format"] == "parquet"
+    rows = store.read_rows(stub, offset=60, limit=10)
+    assert [r["campaign"] for r in rows] == [f"c{i}" for i in range(60, 70)]
@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import ingest_dedup
+from app.ingest_registry import IngestRegistry
+
+
+class _ArtifactDB:
+    def get_artifact(self, artifact_id):
+        return {"id": artifact_id, "status": "processing"}
+
+
+def test_pending_match_is_a_conflict_until_the_first_ingestion_finishes(monkeypatch):
+    registry = IngestRegistry(":memory:")
+    monkeypatch.setattr(ingest_dedup, "INGEST_REGISTRY", registry)
+    monkeypatch.setattr(ingest_dedup, "db", _ArtifactDB())
+
+    assert ingest_dedup.claim_content("abc", 10, ".pdf", "a1", "report.pdf") is None
+    pending = ingest_dedup.claim_content("abc", 10, ".pdf", "a2", "copy.pdf")
+    result = ingest_dedup.duplicate_result("copy.pdf", pending)
+    assert result["status"] == "conflict" and result["artifact_id"] == "a1"
+
+    registry.complete("a1", {"markdown": "report.md"})
+    ready = ingest_dedup.claim_content("abc", 10, ".pdf", "a3", "copy.pdf")
+    result = ingest_dedup.duplicate_result("copy.pdf", ready)
+    assert result["status"] == "duplicate" and result["outputs"] == {"markdown": "report.md"}
+
+    # A failed first ingestion releases the content for the next copy
+    registry.release("a1")
+    assert ingest_dedup.claim_content("abc", 10, ".pdf", "a4", "copy.pdf") is None
@@ -0,0 +1,75 @@
+import hashlib
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.ingest_registry import IngestRegistry, copy_with_digest
+
+
+def test_copy_with_digest_matches_content(tmp_path):
+    payload = bytes(range(256)) * 1000
+    src = tmp_path / "src.bin"
+    src.write_bytes(payload)
+    dst = tmp_path / "dst.bin"
+
+    digest, size = copy_with_digest(src, dst, chunk_size=4096)
+
+    assert dst.read_bytes() == payload
+    assert size == len(payload)
+    assert digest == hashlib.sha256(payload).hexdigest()
+
+
+def test_claim_complete_and_duplicate_lookup(tmp_path):
+    path = tmp_path / "registry.sqlite3"
+    registry = IngestRegistry(path)
+    assert registry.claim("abc", ".pdf", "a1", size=10, filename="report.pdf") is None
+
+    # Same bytes again while the first copy is still processing
+    pending = registry.claim("abc", ".pdf", "a2")
+    assert pending["artifact_id"] == "a1"
+    assert pending["status"] == "pending"
+
+    # The suffix picks the ingester, so other file types are separate entries
+    assert registry.claim("abc", ".csv", "a3") is None
+
+    assert registry.complete("a1", {"markdown": "report.md"}) is True
+    registry.close()
+
+    # Entries survive a restart
+    entry = IngestRegistry(path).lookup("abc", ".pdf")
+    assert entry["artifact_id"] == "a1"
+    assert entry["status"] == "ready"
+    assert entry["outputs"] == {"markdown": "report.md"}
+    assert entry["filename"] == "report.pdf"
+
+
+def test_replace_release_and_clear():
+    registry = IngestRegistry(":memory:")
+    registry.claim("abc", ".pdf", "a1")
+    registry.complete("a1")
+
+    assert registry.claim("abc", ".pdf", "a2", replace=True) is None
+    assert registry.lookup("abc", ".pdf")["artifact_id"] == "a2"
+
+    assert registry.release("a2") is True
+    assert registry.lookup("abc", ".pdf") is None
+    assert registry.claim("abc", ".pdf", "a3") is None
+
+    registry.clear()
+    assert registry.lookup("abc", ".pdf") is None
+
+
+def test_stale_pending_claim_is_taken_over():
+    registry = IngestRegistry(":memory:", pending_ttl_seconds=0)
+    registry.claim("abc", ".pdf", "a1")
+
+    # A pending entry past its TTL belongs to a worker that died
+    assert registry.lookup("abc", ".pdf") is None
+    assert registry.claim("abc", ".pdf", "a2") is None
+    assert registry.lookup("abc", ".pdf") is None
+
+    registry.complete("a2")
+    assert registry.lookup("abc", ".pdf")["artifact_id"] == "a2"
@@ -0,0 +1,106 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.ingestion.scheduler import (
+    PRIORITY_BACKFILL,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_WATCH,
+    IngestionScheduler,
+    QueueFullError,
+)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_interactive_jobs_run_before_watch_and_backfill():
+    sched = IngestionScheduler(heavy_workers=1, light_workers=1, max_queue=10)
+    gate = threading.Event()
+    order = []
+
+    sched.submit("blocker", gate.wait, lane="heavy", file_type=".pdf")
+    assert _wait_for(lambda: sched.get("blocker").status == "running")
+    sched.submit("backfill", order.append, "backfill", priority=PRIORITY_BACKFILL, file_type=".pdf")
+    sched.submit("watch", order.append, "watch", priority=PRIORITY_WATCH, file_type=".pdf")
+    sched.submit("upload-1", order.append, "upload-1", priority=PRIORITY_INTERACTIVE, file_type=".pdf")
+    sched.submit("upload-2", order.append, "upload-2", priority=PRIORITY_INTERACTIVE, file_type=".pdf")
+    gate.set()
+
+    assert _wait_for(lambda: len(order) == 4)
+    assert order == ["upload-1", "upload-2", "watch", "backfill"]
+    sched.shutdown()
+
+
+def test_full_queue_rejects_and_blocking_submit_waits():
+    sched = IngestionScheduler(heavy_workers=1, light_workers=1, max_queue=1)
+    gate = threading.Event()
+
+    sched.submit("running", gate.wait, file_type=".pdf")
+    assert _wait_for(lambda: sched.get("running").status == "running")
+    sched.submit("queued", lambda: None, file_type=".pdf")
+    assert not sched.has_capacity("heavy")
+    with pytest.raises(QueueFullError):
+        sched.submit("rejected", lambda: None, file_type=".pdf")
+    with pytest.raises(QueueFullError):
+        sched.submit("timed-out", lambda: None, file_type=".pdf", block=True, timeout=0.05)
+
+    # The light lane has its own queue
+    sched.submit("csv", lambda: None, lane="light", file_type=".csv")
+
+    released = threading.Timer(0.1, gate.set)
+    released.start()
+    sched.submit("blocked", lambda: None, file_type=".pdf", block=True, timeout=5)
+    assert _wait_for(lambda: sched.get("blocked").status == "completed")
+    sched.shutdown()
+
+
+def test_cancel_queued_job_and_per_type_stats():
+    sched = IngestionScheduler(heavy_workers=1, light_workers=1, max_queue=10)
+    gate = threading.Event()
+    ran = []
+
+    sched.submit("running", gate.wait, file_type=".pdf")
+    assert _wait_for(lambda: sched.get("running").status == "running")
+    sched.submit("doomed", ran.append, "doomed", file_type=".pdf")
+    sched.submit("kept", ran.append, "kept", file_type=".pdf")
+
+    assert sched.stats()["file_types"][".pdf"]["queue_depth"] == 2
+    assert sched.cancel("doomed") == "cancelled"
+    assert sched.cancel("running") == "running"
+    assert sched.cancel("missing") is None
+    assert sched.has_capacity("heavy", 9)
+
+    def boom():
+        raise RuntimeError("bad file")
+
+    sched.submit("bad", boom, lane="light", file_type=".csv")
+    gate.set()
+    assert _wait_for(lambda: sched.get("kept").status == "completed")
+    assert _wait_for(lambda: sched.get("bad").status == "error")
+    assert ran == ["kept"]
+
+    stats = sched.stats()
+    pdf = stats["file_types"][".pdf"]
+    assert pdf["queue_depth"] == 0
+    assert pdf["completed"] == 2
+    assert pdf["cancelled"] == 1
+    assert pdf["wait_seconds_max"] > 0
+    assert pdf["service_seconds_sum"] > 0
+    assert stats["file_types"][".csv"]["failed"] == 1
+    assert stats["lanes"]["heavy"]["queue_depth"] == 0
+    assert any(line.startswith('pmoves_ingest_queue_depth{file_type=".pdf"}') for line in sched.prometheus_lines())
+    sched.shutdown()
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_keeps_compound_identifiers():
+    tokens = tokenize("GET /v1/users failed with ERR-404")
+    assert "users" in tokens
+    assert "v1/users" in tokens
+    assert "err-404" in tokens
+
+
+def test_bm25_ranks_rare_terms_and_supports_updates():
+    index = BM25Index()
+    index.add("a", "status endpoint returns service status")
+    index.add("b", "create order endpoint")
+    index.add("c", "list orders endpoint")
+
+    assert [doc for doc, _ in index.search("status")] == ["a"]
+    assert [doc for doc, _ in index.search("order endpoint", k=1)] == ["b"]
+    assert [doc for doc, _ in index.search("endpoint", allowed={"c"})] == ["c"]
+
+    index.add("a", "delete order endpoint")
+    assert index.search("status") == []
+    index.remove("b")
+    assert [doc for doc, _ in index.search("order")] == ["a"]
+    assert len(index) == 2
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "w"]], k=60)
+    assert fused[0][0] == "y"
+    assert {doc for doc, _ in fused} == {"x", "y", "z", "w"}
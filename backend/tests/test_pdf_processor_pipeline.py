@@ -164,3 +164,31 @@ def test_process_pdf_collects_advanced_artifacts(tmp_path, monkeypatch):
     assert md_path.exists()
     assert json_path.exists()
     assert units_path.exists()
+
+
+def test_process_pdf_emits_one_evidence_per_table_with_statement(tmp_path, monkeypatch):
+    grid = [["Line item", "2024"], ["Revenue", "1,200"], ["Total expenses", "(600)"], ["Net income", "600"]]
+    statement = DummyTable(grid[1:], grid[0], page=0, bbox=(0.1, 0.1, 0.9, 0.4))
+    statement.cells = [
+        SimpleNamespace(row_index=r, column_index=c, text=value)
+        for r, row in enumerate(grid)
+        for c, value in enumerate(row)
+    ]
+    doc = DummyDoc(pages=[DummyPage(tables=[statement])], pictures=[], texts=[])
+    monkeypatch.setattr(pdf_processor, "_convert_document", lambda *_: doc)
+
+    pdf_path = tmp_path / "statement.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4")
+    facts, evidence, analysis = pdf_processor.process_pdf(pdf_path, "2025-W40", tmp_path / "artifacts")
+
+    tables = [ev for ev in evidence if ev["content_type"] in {"table", "financial_table"}]
+    assert len(tables) == 1
+    assert tables[0]["content_type"] == "financial_table"
+    full_data = tables[0]["full_data"]
+    assert full_data["statement"]["type"] == "income_statement"
+    assert full_data["pages"] == [0] and len(full_data["rows"]) == 3
+    table_fact = next(f for f in facts if f["entity"] == "table")
+    assert table_fact["metrics"]["net_income"] == 600.0
+
+    timings = analysis["stage_timings"]
+    assert {"convert", "tables", "text", "charts", "formulas", "structure", "entities", "metric_hits"} <= set(timings)
@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from docling_core.types.doc import (
+    BoundingBox,
+    DocItemLabel,
+    DoclingDocument,
+    ProvenanceItem,
+    TableCell,
+    TableData,
+)
+
+from app.ingestion.advanced_table_processor import AdvancedTableProcessor
+from app.ingestion.pdf_sharding import convert_sharded, page_ranges, shutdown_executors
+
+
+def _prov(page_no):
+    return ProvenanceItem(page_no=page_no, bbox=BoundingBox(l=0, t=0, r=10, b=10), charspan=(0, 1))
+
+
+def _table(rows):
+    cells = []
+    for r, row in enumerate(rows):
+        for c, text in enumerate(row):
+            cells.append(TableCell(
+                text=text, start_row_offset_idx=r, end_row_offset_idx=r + 1,
+                start_col_offset_idx=c, end_col_offset_idx=c + 1, column_header=r == 0,
+            ))
+    return TableData(num_rows=len(rows), num_cols=len(rows[0]), table_cells=cells)
+
+
+class FakeConverter:
+    """Produces one text per page and a ledger table on pages 2 and 3."""
+
+    def convert(self, path, page_range):
+        start, end = page_range
+        doc = DoclingDocument(name="filing")
+        for page_no in range(start, end + 1):
+            doc.add_page(page_no=page_no, size={"width": 10, "height": 10})
+            doc.add_text(label=DocItemLabel.TEXT, text=f"page {page_no}", prov=_prov(page_no))
+            if page_no in (2, 3):
+                doc.add_table(data=_table([["Item", "Amount"], [f"row{page_no}", "1"]]), prov=_prov(page_no))
+        return SimpleNamespace(document=doc)
+
+
+def fake_factory(key):
+    return FakeConverter()
+
+
+def test_page_ranges_cover_every_page_once():
+    assert page_ranges(5, 2) == [(1, 2), (3, 4), (5, 5)]
+    assert page_ranges(3, 10) == [(1, 3)]
+
+
+def test_sharded_merge_keeps_provenance_and_spanning_tables(tmp_path):
+    pdf = tmp_path / "filing.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    try:
+        doc = convert_sharded(pdf, "key", fake_factory, workers=2, pages_per_shard=2, num_pages=5)
+    finally:
+        shutdown_executors()
+
+    assert [t.text for t in doc.texts] == [f"page {n}" for n in range(1, 6)]
+    assert [t.prov[0].page_no for t in doc.texts] == [1, 2, 3, 4, 5]
+    assert sorted(doc.pages) == [1, 2, 3, 4, 5]
+
+    # The ledger table starts in shard 1 (page 2) and continues in shard 2 (page 3)
+    spans = AdvancedTableProcessor().detect_spanning_tables(doc)
+    assert len(spans) == 1
+    assert spans[0]["merged"] is True
+    assert spans[0]["pages"] == [1, 2]
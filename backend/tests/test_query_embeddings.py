@@ -0,0 +1,74 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.query_embeddings import MicroBatcher, QueryVectorCache, normalize_query
+
+
+def test_normalize_query_collapses_whitespace():
+    assert normalize_query("  revenue   growth\n2024 ") == "revenue growth 2024"
+
+
+def test_query_cache_lru_and_ttl(monkeypatch):
+    clock = {"now": 100.0}
+    monkeypatch.setattr("app.query_embeddings.time.monotonic", lambda: clock["now"])
+    cache = QueryVectorCache(max_size=2, ttl=10)
+    cache.put("a", np.ones(2))
+    cache.put("b", np.ones(2))
+    assert cache.get("a") is not None  # "a" becomes most recently used
+    cache.put("c", np.ones(2))
+
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    clock["now"] += 11
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array([[float(len(t))] for t in texts])
+
+    batcher = MicroBatcher(encode, window=0.05, max_batch=64)
+    results = {}
+
+    def worker(text):
+        results[text] = batcher.encode(text)[0]
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in ["a", "bb", "ccc", "bb"]]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(calls[0]) == ["a", "bb", "ccc"]  # duplicates embedded once
+    assert results == {"a": 1.0, "bb": 2.0, "ccc": 3.0}
+
+
+def test_micro_batcher_flushes_full_batch_without_waiting():
+    batcher = MicroBatcher(lambda texts: np.zeros((len(texts), 1)), window=5.0, max_batch=1)
+    start = time.monotonic()
+    batcher.encode("x")
+    assert time.monotonic() - start < 1.0
+
+
+def test_micro_batcher_propagates_errors():
+    def encode(texts):
+        raise RuntimeError("provider down")
+
+    batcher = MicroBatcher(encode, window=0.0)
+    with pytest.raises(RuntimeError, match="provider down"):
+        batcher.encode("x")
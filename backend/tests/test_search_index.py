@@ -1,14 +1,25 @@
+import hashlib
 import sys
+import threading
 import types
 from pathlib import Path
 
 import numpy as np
+import pytest
 
 BACKEND_DIR = Path(__file__).resolve().parents[1]
 if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
-from app.search import SearchIndex
+from app.embedding_client import EmbeddingProviderUnavailable
+from app.search import SearchIndex, _top_k, build_faiss_index, parse_fields, project_fields, search_page
+
+
+@pytest.fixture(autouse=True)
+def isolated_embedding_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
+    monkeypatch.setenv("SEARCH_INDEX_DIR", str(tmp_path / "search_index"))
+    monkeypatch.setenv("OLLAMA_EMBED_RETRIES", "0")
 
 
 class DummyDB:
@@ -19,14 +30,15 @@ class DummyDB:
     def get_artifacts(self):
         return []
 
-    def list_apis(self, tag=None, method=None, path_like=None):
-        return [{
+    def list_apis(self, tag=None, method=None, path_like=None, document_id=None):
+        apis = [{
             "id": "api-1",
             "method": "GET",
             "path": "/status",
             "summary": "Status endpoint",
             "tags": ["health"],
         }]
+        return [a for a in apis if document_id in (None, a.get("document_id"))]
 
     def list_logs(self, level=None, code=None, q=None, ts_from=None, ts_to=None, document_id=None):
         return []
@@ -63,3 +75,453 @@ def test_rebuild_pushes_embeddings_to_remote(monkeypatch):
     assert record["chunk_index"] is None or isinstance(record["chunk_index"], int)
     assert isinstance(record["embedding"], list)
     assert len(record["embedding"]) == 3
+
+
+class IncrementalDB(DummyDB):
+    def __init__(self):
+        super().__init__()
+        self.apis = [{
+            "id": "api-1",
+            "document_id": "doc-1",
+            "method": "GET",
+            "path": "/status",
+            "summary": "Status endpoint",
+            "tags": ["health"],
+        }]
+        self.deleted = []
+
+    def list_apis(self, tag=None, method=None, path_like=None, document_id=None):
+        return [a for a in self.apis if document_id in (None, a.get("document_id"))]
+
+    def delete_search_chunks(self, ids):
+        self.deleted.extend(ids)
+
+
+def test_index_document_embeds_only_changed_chunks():
+    db = IncrementalDB()
+    index = SearchIndex(db)
+    index.prefer_ollama = index._use_ollama = False
+    encoded = []
+
+    def encode(texts, **_):
+        encoded.extend(texts)
+        return np.ones((len(texts), 3), dtype="float32")
+
+    index.model = types.SimpleNamespace(encode=encode)
+
+    index.rebuild()
+    assert len(encoded) == 1
+
+    # Unchanged rebuild reuses the stored vector
+    result = index.rebuild()
+    assert result["reused"] == 1
+    assert len(encoded) == 1
+
+    db.apis.append({
+        "id": "api-2",
+        "document_id": "doc-1",
+        "method": "POST",
+        "path": "/items",
+        "summary": "Create item",
+        "tags": [],
+    })
+    stats = index.index_document("doc-1")
+    assert stats == {"added": 1, "updated": 0, "unchanged": 1, "deleted": 0}
+    assert len(encoded) == 2
+    assert index.ids == ["api:api-1", "api:api-2"]
+    assert db.stored[-1]["id"] == "api:api-2"
+
+    db.apis = db.apis[1:]
+    stats = index.index_document("doc-1")
+    assert stats["deleted"] == 1
+    assert db.deleted == ["api:api-1"]
+    assert index.ids == ["api:api-2"]
+    assert [r.meta["id"] for r in index.search("items", k=5)] == ["api-2"]
+
+
+def test_queries_do_not_wait_for_embedding_during_updates():
+    db = IncrementalDB()
+    index = SearchIndex(db)
+    index.prefer_ollama = index._use_ollama = False
+    results = []
+
+    def encode(texts, **_):
+        if index._loaded:
+            # A query from another thread while this update is embedding
+            worker = threading.Thread(target=lambda: results.append(index.search("status", k=1, mode="lexical")))
+            worker.start()
+            worker.join(timeout=5)
+            assert not worker.is_alive()
+        return np.ones((len(texts), 3), dtype="float32")
+
+    index.model = types.SimpleNamespace(encode=encode)
+    index.rebuild()
+    db.apis.append({"id": "api-2", "document_id": "doc-1", "method": "POST", "path": "/items",
+                    "summary": "Create item", "tags": []})
+    assert index.index_document("doc-1")["added"] == 1
+    assert [r.meta["id"] for r in results[0]] == ["api-1"]
+
+
+def test_encode_reuses_persistent_embedding_cache():
+    encoded = []
+
+    def encode(texts, **_):
+        encoded.extend(texts)
+        return np.ones((len(texts), 3), dtype="float32")
+
+    first = SearchIndex(IncrementalDB())
+    first.prefer_ollama = first._use_ollama = False
+    first.model = types.SimpleNamespace(encode=encode)
+    first.rebuild()
+    assert encoded == ["GET /status Status endpoint health"]
+
+    # A fresh index (e.g. after a restart) is served from the on-disk cache.
+    second = SearchIndex(IncrementalDB())
+    second.prefer_ollama = second._use_ollama = False
+    second.model = types.SimpleNamespace(encode=encode)
+    assert second.rebuild()["items"] == 1
+    assert len(encoded) == 1
+
+
+def test_warm_start_serves_snapshot_without_embedding(tmp_path):
+    encoded = []
+
+    def encode(texts, **_):
+        encoded.extend(texts)
+        return np.ones((len(texts), 3), dtype="float32")
+
+    first = SearchIndex(IncrementalDB())
+    first.prefer_ollama = first._use_ollama = False
+    first.model = types.SimpleNamespace(encode=encode)
+    first.rebuild()
+    assert (tmp_path / "search_index" / "manifest.json").exists()
+
+    restarted = SearchIndex(IncrementalDB())
+    restarted.model = types.SimpleNamespace(encode=encode)
+    restarted._encode_uncached = lambda texts: pytest.fail("corpus should not be re-embedded")
+    info = restarted.warm_start()
+
+    assert info == {"items": 1, "snapshot": "loaded"}
+    assert restarted._use_ollama is False
+    assert restarted.ids == ["api:api-1"]
+    assert restarted.get_embeddings_for_document("doc-1") == [first.vectors[0].tolist()]
+
+
+def test_warm_start_only_embeds_changes_since_snapshot():
+    db = IncrementalDB()
+    encoded = []
+
+    def encode(texts, **_):
+        encoded.extend(texts)
+        return np.ones((len(texts), 3), dtype="float32")
+
+    first = SearchIndex(db)
+    first.prefer_ollama = first._use_ollama = False
+    first.model = types.SimpleNamespace(encode=encode)
+    first.rebuild()
+
+    db.apis[0]["summary"] = "Health probe"
+    restarted = SearchIndex(db)
+    restarted.model = types.SimpleNamespace(encode=encode)
+    info = restarted.warm_start()
+
+    assert info["snapshot"] == "refreshed"
+    assert info["embedded"] == 1
+    assert encoded[-1] == "GET /status Health probe health"
+
+
+
+def test_incremental_updates_coalesce_into_one_background_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEARCH_SNAPSHOT_DELAY_MS", "60000")
+    db = IncrementalDB()
+    index = SearchIndex(db)
+    index.prefer_ollama = index._use_ollama = False
+    index.model = types.SimpleNamespace(encode=lambda texts, **_: np.ones((len(texts), 3), dtype="float32"))
+    index.rebuild()
+    manifest = tmp_path / "search_index" / "manifest.json"
+    written = manifest.read_text()
+
+    for i in range(2, 5):
+        db.apis.append({"id": f"api-{i}", "document_id": "doc-1", "method": "GET", "path": f"/v{i}",
+                        "summary": "Version", "tags": []})
+        assert index.index_document("doc-1")["added"] == 1
+    # Updates only schedule a write; nothing touches the disk yet
+    assert manifest.read_text() == written
+
+    assert index.flush_snapshot() == manifest
+    assert index.flush_snapshot() is None
+    restarted = SearchIndex(db)
+    restarted.model = index.model
+    restarted._encode_uncached = lambda texts: pytest.fail("corpus should not be re-embedded")
+    assert restarted.warm_start() == {"items": 4, "snapshot": "loaded"}
+
+def test_top_k_matches_full_sort():
+    rng = np.random.default_rng(0)
+    sims = rng.normal(size=500).astype("float32")
+
+    assert _top_k(sims, 10).tolist() == np.argsort(-sims)[:10].tolist()
+    assert _top_k(sims, 1000).tolist() == np.argsort(-sims).tolist()
+    assert _top_k(sims[:0], 5).tolist() == []
+
+
+def test_build_faiss_index_trains_ann_types_and_falls_back_when_small():
+    pytest.importorskip("faiss")
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(2000, 32)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    for index_type in ("flat", "ivf_flat", "hnsw"):
+        index, effective = build_faiss_index(vectors, index_type)
+        assert effective == index_type
+        assert index.ntotal == len(vectors)
+        _, ids = index.search(vectors[:1], 1)
+        assert ids[0][0] == 0
+
+    # Too few points to train PQ codebooks / IVF cells
+    assert build_faiss_index(vectors, "ivf_pq")[1] == "ivf_flat"
+    assert build_faiss_index(vectors[:50], "ivf_pq")[1] == "flat"
+
+
+
+def _hashed_encode(texts, **_):
+    seeds = [int(hashlib.md5(t.encode()).hexdigest()[:8], 16) for t in texts]
+    return np.vstack([np.random.default_rng(seed).normal(size=16) for seed in seeds]).astype("float32")
+
+
+def _chunks(start, stop, prefix="text"):
+    return [{"id": f"c{i}", "text": f"{prefix} {i}", "meta": {"type": "api", "document_id": "doc"}}
+            for i in range(start, stop)]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "hnsw"])
+def test_incremental_updates_patch_the_faiss_index(monkeypatch, index_type):
+    pytest.importorskip("faiss")
+    monkeypatch.setenv("SEARCH_INDEX_TYPE", index_type)
+    builds = []
+    real_build = build_faiss_index
+    monkeypatch.setattr("app.search.build_faiss_index", lambda *a, **kw: builds.append(1) or real_build(*a, **kw))
+    index = SearchIndex(DummyDB())
+    index.prefer_ollama = index._use_ollama = False
+    index.model = types.SimpleNamespace(encode=_hashed_encode)
+
+    index.upsert_chunks(_chunks(0, 200))
+    assert index.effective_index_type == index_type and len(builds) == 1
+
+    index.upsert_chunks(_chunks(0, 1, prefix="changed") + _chunks(200, 205))
+    assert index.delete_chunks([f"c{i}" for i in range(10, 20)]) == 10
+    assert len(builds) == 1
+    assert index.search("changed 0", k=1, mode="vector")[0].id == "c0"
+    assert index.search("text 203", k=1, mode="vector")[0].id == "c203"
+    hits = index.search("text 50", k=300, threshold=-10.0, mode="vector")
+    live = {f"c{i}" for i in range(205)} - {f"c{i}" for i in range(10, 20)}
+    if index_type == "flat":  # the ANN types may miss some live rows
+        assert {h.id for h in hits} == live
+    assert len(hits) == len({h.id for h in hits}) and {h.id for h in hits} <= live
+    assert len(index._tombstones) == (11 if index_type == "hnsw" else 0)
+
+    # Doubling an IVF corpus retrains it; flat and HNSW keep being patched
+    index.upsert_chunks(_chunks(205, 600))
+    assert len(builds) == (2 if index_type == "ivf_flat" else 1)
+    assert index.search("text 599", k=1, mode="vector")[0].id == "c599"
+
+
+@pytest.mark.parametrize("index_type", ["ivf_flat", "hnsw"])
+def test_snapshot_index_is_patched_after_restart(monkeypatch, index_type):
+    pytest.importorskip("faiss")
+    monkeypatch.setenv("SEARCH_INDEX_TYPE", index_type)
+    first = SearchIndex(DummyDB())
+    first.prefer_ollama = first._use_ollama = False
+    first.model = types.SimpleNamespace(encode=_hashed_encode)
+    first.upsert_chunks(_chunks(0, 100))
+    first.delete_chunks(["c3"])
+    assert first.save_snapshot() is not None
+
+    restarted = SearchIndex(DummyDB())
+    restarted.model = first.model
+    assert restarted.load_snapshot() is not None
+    restarted._loaded = True
+    assert restarted._index_mmapped and restarted.effective_index_type == index_type
+    assert restarted._tombstones == first._tombstones
+    assert restarted.search("text 7", k=1, mode="vector")[0].id == "c7"
+
+    restarted.upsert_chunks(_chunks(100, 101))
+    assert not restarted._index_mmapped
+    assert restarted.search("text 100", k=1, mode="vector")[0].id == "c100"
+    assert "c3" not in {h.id for h in restarted.search("text 3", k=110, threshold=-10.0, mode="vector")}
+
+class FilterDB(DummyDB):
+    def list_apis(self, tag=None, method=None, path_like=None, document_id=None):
+        apis = [
+            {"id": f"api-{i}", "document_id": "doc-a" if i % 2 else "doc-b", "method": "GET",
+             "path": f"/status/{i}", "summary": "status", "tags": []}
+            for i in range(6)
+        ]
+        return [a for a in apis if document_id in (None, a["document_id"])]
+
+    def list_logs(self, level=None, code=None, q=None, ts_from=None, ts_to=None, document_id=None):
+        return [{"id": "log-1", "message": "disk full", "level": "ERROR", "document_id": "doc-a"}]
+
+
+@pytest.mark.parametrize("exact_max", [20_000, 0])
+def test_filtered_search_returns_k_matches_in_one_probe(monkeypatch, exact_max):
+    # exact_max=0 forces the FAISS id-selector path instead of the exact scan
+    monkeypatch.setattr("app.search.FILTER_EXACT_MAX", exact_max)
+    index = SearchIndex(FilterDB())
+    index.prefer_ollama = index._use_ollama = False
+    index.model = types.SimpleNamespace(
+        encode=lambda texts, **_: np.ones((len(texts), 3), dtype="float32")
+    )
+    index.rebuild()
+
+    logs = index.search("disk", k=1, types=["LOG"])
+    assert [r.meta["type"] for r in logs] == ["log"]
+
+    doc_a = index.search("status", k=10, types=["api"], document_id="doc-a")
+    assert len(doc_a) == 3
+    assert {r.meta["document_id"] for r in doc_a} == {"doc-a"}
+
+    assert index.search("status", k=10, types=["pdf"]) == []
+    assert len(index.search("status", k=10)) == 7
+
+
+def test_repeated_queries_are_served_from_query_cache():
+    encoded = []
+
+    def encode(texts, **_):
+        encoded.extend(texts)
+        return np.ones((len(texts), 3), dtype="float32")
+
+    index = SearchIndex(IncrementalDB())
+    index.prefer_ollama = index._use_ollama = False
+    index.model = types.SimpleNamespace(encode=encode)
+    index.rebuild()
+    embedded_before = len(encoded)
+
+    index.search("status  endpoint", k=1)
+    index.search(" status endpoint ", k=1)
+
+    assert encoded[embedded_before:] == ["status endpoint"]
+    assert index.query_cache.stats()["hits"] == 1
+
+
+def test_hybrid_search_ranks_exact_identifiers_first():
+    index = SearchIndex(FilterDB())
+    index.prefer_ollama = index._use_ollama = False
+    # Identical vectors: only the keyword side can tell the chunks apart
+    index.model = types.SimpleNamespace(
+        encode=lambda texts, **_: np.ones((len(texts), 3), dtype="float32")
+    )
+    index.rebuild()
+
+    hybrid = index.search("/status/4", k=3)
+    assert hybrid[0].meta["id"] == "api-4"
+    lexical = index.search("/status/4", k=3, mode="lexical")
+    assert lexical[0].meta["id"] == "api-4"
+    assert len(index.search("/status/4", k=3, mode="vector")) == 3
+    with pytest.raises(ValueError):
+        index.search("status", mode="fuzzy")
+
+
+
+def test_hybrid_scores_are_scaled_fused_ranks():
+    index = SearchIndex(DummyDB())
+    index.prefer_ollama = index._use_ollama = False
+    index.model = types.SimpleNamespace(encode=_hashed_encode)
+    index.upsert_chunks(_chunks(0, 30))
+
+    hits = index.search("text 7", k=5)
+    # First in both the vector and the keyword ranking
+    assert hits[0].id == "c7" and hits[0].score == pytest.approx(1.0)
+    assert [h.rank for h in hits] == [1, 2, 3, 4, 5]
+    assert all(0 < h.score <= 1.0 for h in hits)
+    assert [h.score for h in hits] == sorted((h.score for h in hits), reverse=True)
+
+def test_lexical_only_index_when_no_embedding_provider():
+    db = IncrementalDB()
+    index = SearchIndex(db)
+    index.prefer_ollama = index._use_ollama = False
+
+    def unavailable(texts, **_):
+        raise EmbeddingProviderUnavailable("down")
+
+    index.model = types.SimpleNamespace(encode=unavailable)
+
+    result = index.rebuild()
+    assert result["backend"] == "bm25"
+    assert index.vectors is None
+    assert [r.meta["id"] for r in index.search("status")] == ["api-1"]
+    assert index.search("status", mode="vector") == []
+
+    db.apis.append({
+        "id": "api-2",
+        "document_id": "doc-1",
+        "method": "POST",
+        "path": "/items",
+        "summary": "Create item",
+        "tags": [],
+    })
+    assert index.index_document("doc-1")["added"] == 1
+    assert [r.meta["id"] for r in index.search("items", mode="lexical")] == ["api-2"]
+
+
+def test_hybrid_query_degrades_to_lexical_when_provider_fails(monkeypatch):
+    index = SearchIndex(IncrementalDB())
+    index.prefer_ollama = index._use_ollama = False
+    index.model = types.SimpleNamespace(
+        encode=lambda texts, **_: np.ones((len(texts), 3), dtype="float32")
+    )
+    index.rebuild()
+
+    def unavailable(query):
+        raise EmbeddingProviderUnavailable("breaker open")
+
+    monkeypatch.setattr(index, "_embed_query", unavailable)
+    assert [r.meta["id"] for r in index.search("status")] == ["api-1"]
+    with pytest.raises(EmbeddingProviderUnavailable):
+        index.search("status", mode="vector")
+
+
+def test_search_page_walks_all_results_with_cursor():
+    index = SearchIndex(FilterDB())
+    index.prefer_ollama = index._use_ollama = False
+    index.model = types.SimpleNamespace(
+        encode=lambda texts, **_: np.ones((len(texts), 3), dtype="float32")
+    )
+    index.rebuild()
+
+    full = [h.id for h in index.search("status", k=10, mode="vector")]
+    seen, cursor = [], None
+    while True:
+        page, cursor = search_page(index, "status", limit=3, cursor=cursor, mode="vector")
+        seen.extend(h.id for h in page)
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(full)
+    assert len(seen) == len(set(seen)) == 7
+
+
+def test_project_fields_selects_top_level_and_meta_keys():
+    entry = {"score": 1.0, "id": "api:1", "text": "long", "meta": {"type": "api", "row": {"big": 1}}}
+    assert project_fields(entry, parse_fields("score, meta.type,missing")) == {"score": 1.0, "meta": {"type": "api"}}
+    assert project_fields(entry, parse_fields("")) is entry
+
+
+@pytest.mark.parametrize("mode", ["hybrid", "lexical", "vector"])
+def test_search_page_matches_one_unpaged_search(mode):
+    index = SearchIndex(DummyDB())
+    index.prefer_ollama = index._use_ollama = False
+    index.model = types.SimpleNamespace(encode=_hashed_encode)
+    # Shared and repeated terms give many tied BM25 scores
+    index.upsert_chunks([
+        {"id": f"c{i:03d}", "text": f"status {'endpoint ' * (i % 4)}{i % 7} item{i}", "meta": {"type": "api"}}
+        for i in range(120)
+    ])
+
+    full = [h.id for h in index.search("status endpoint 3", k=1000, mode=mode)]
+    seen, cursor = [], None
+    while True:
+        page, cursor = search_page(index, "status endpoint 3", limit=7, cursor=cursor, mode=mode)
+        seen.extend(h.id for h in page)
+        if cursor is None:
+            break
+    assert seen == full
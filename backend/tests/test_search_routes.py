@@ -1,4 +1,5 @@
 import asyncio
+import json
 import sys
 from pathlib import Path
 
@@ -15,9 +16,12 @@ from backend.app.search import SearchIndex, SearchResult
 class StubSearchIndex:
     def __init__(self, results):
         self._results = list(results)
+        self.probes = []
 
-    def search(self, query: str, k: int = 10):
-        return list(self._results)
+    def search(self, query: str, k: int = 10, types=None, **filters):
+        self.probes.append(k)
+        # Mirror SearchIndex: type filters are applied inside the index
+        return [r for r in self._results if not types or r.meta.get("type") in types]
 
     def rebuild(self):
         return {"items": len(self._results)}
@@ -110,6 +114,71 @@ def test_search_filters_mixed_case_types_and_preserves_page(stub_search):
     assert entry["meta"]["deeplink"]["page"] == 7
 
 
+def test_search_pages_with_cursor_and_projects_fields(stub_search):
+    results = [
+        SearchResult(score=0.9 - i / 10, text=f"API {i}", meta={"type": "api", "id": f"api-{i}"}, id=f"api:{i}")
+        for i in range(5)
+    ]
+    stub_search(results)
+
+    first = asyncio.run(main.search(main.SearchRequest(q="api", k=2, fields="id,meta.type")))
+    assert first["results"] == [{"id": "api:0", "meta": {"type": "api"}}, {"id": "api:1", "meta": {"type": "api"}}]
+    assert first["next_cursor"]
+
+    seen = [r["id"] for r in first["results"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = asyncio.run(main.search(main.SearchRequest(q="api", k=2, cursor=cursor, fields="id")))
+        seen.extend(r["id"] for r in page["results"])
+        cursor = page["next_cursor"]
+    assert seen == [f"api:{i}" for i in range(5)]
+
+    with pytest.raises(main.HTTPException) as exc:
+        asyncio.run(main.search(main.SearchRequest(q="api", cursor="not-a-cursor")))
+    assert exc.value.status_code == 400
+
+
+def test_search_stream_emits_ndjson_hits_then_summary(stub_search):
+    stub_search([
+        SearchResult(score=0.8, text="Log entry", meta={"type": "log", "code": "E1"}, id="log:1"),
+    ])
+
+    async def collect():
+        response = await main.search_stream(main.SearchRequest(q="error", fields="score,meta.deeplink"))
+        return response.media_type, [chunk async for chunk in response.body_iterator]
+
+    media_type, chunks = asyncio.run(collect())
+    lines = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert media_type == "application/x-ndjson"
+    assert lines[0] == {"score": 0.8, "meta": {"deeplink": {"panel": "logs", "document_id": None, "code": "E1"}}}
+    assert lines[-1]["done"] is True
+    assert lines[-1]["count"] == 1
+    assert lines[-1]["next_cursor"] is None
+
+
+def test_search_stream_sends_first_batch_before_ranking_the_rest(stub_search, monkeypatch):
+    monkeypatch.setenv("SEARCH_STREAM_BATCH", "2")
+    stub = stub_search([
+        SearchResult(score=0.9 - i / 100, text=f"API {i}", meta={"type": "api"}, id=f"api:{i}")
+        for i in range(10)
+    ])
+
+    async def collect():
+        response = await main.search_stream(main.SearchRequest(q="api", k=7, fields="id,rank"))
+        chunks = response.body_iterator
+        first = await chunks.__anext__()
+        probes_at_first_line = len(stub.probes)
+        return first, probes_at_first_line, [first] + [chunk async for chunk in chunks]
+
+    first, probes_at_first_line, chunks = asyncio.run(collect())
+    assert json.loads(first)["id"] == "api:0"
+    assert probes_at_first_line == 1
+    lines = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert [line["id"] for line in lines[:-1]] == [f"api:{i}" for i in range(7)]
+    assert lines[-1]["count"] == 7 and lines[-1]["next_cursor"]
+    assert len(stub.probes) == 3  # batches of 2, 4 and the last 1
+
+
 def test_search_index_falls_back_to_markdown_when_text_units_invalid(tmp_path, monkeypatch):
     # Ensure relative paths inside SearchIndex resolve within a temp sandbox
     monkeypatch.chdir(tmp_path)
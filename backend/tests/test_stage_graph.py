@@ -0,0 +1,55 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.ingestion.stage_graph import StageGraph
+
+
+def test_independent_stages_run_concurrently_and_dependencies_wait():
+    barrier = threading.Barrier(2, timeout=5)
+    order = []
+
+    def independent(name):
+        def run(_deps):
+            barrier.wait()  # deadlocks (times out) unless both run at once
+            order.append(name)
+            return name
+
+        return run
+
+    graph = StageGraph()
+    graph.add("a", independent("a"))
+    graph.add("b", independent("b"))
+    graph.add("joined", lambda deps: deps["a"] + deps["b"], deps=("a", "b"))
+    results, seconds = graph.run(max_workers=4)
+
+    assert results == {"a": "a", "b": "b", "joined": "ab"}
+    assert sorted(order) == ["a", "b"]
+    assert set(seconds) == {"a", "b", "joined"}
+    assert all(value >= 0 for value in seconds.values())
+
+
+def test_serial_mode_and_errors():
+    calls = []
+    graph = StageGraph()
+    graph.add("first", lambda _: calls.append("first") or 1)
+    graph.add("second", lambda deps: deps["first"] + 1, deps=("first",))
+    assert graph.run(max_workers=0)[0] == {"first": 1, "second": 2}
+
+    with pytest.raises(ValueError):
+        graph.add("third", lambda _: None, deps=("missing",))
+    with pytest.raises(ValueError):
+        graph.add("first", lambda _: None)
+
+    failing = StageGraph()
+    failing.add("boom", lambda _: 1 / 0)
+    failing.add("after", lambda _: calls.append("after"), deps=("boom",))
+    with pytest.raises(ZeroDivisionError):
+        failing.run(max_workers=2)
+    assert "after" not in calls
@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.analysis.financial_statement_detector import FinancialStatementDetector
+from app.analysis.table_metrics import (
+    CSV_METRIC_PATTERNS,
+    ColumnClassifier,
+    LabelIndex,
+    coerce_numeric,
+)
+from app.ingestion.pdf_processor import extract_metrics_from_table
+
+
+def test_classifier_and_table_totals():
+    classifier = ColumnClassifier(CSV_METRIC_PATTERNS)
+    assert classifier.metric_for("Total Cost (USD)") == "spend"
+    assert classifier.metric_for("Click-through") == "clicks"
+    assert classifier.metric_for("Campaign") is None
+
+    df = pd.DataFrame(
+        {
+            "Campaign": ["a", "b", "c"],
+            "Spend": ["100", "50", "n/a"],
+            "Sales": [10, 20, 30],  # counts as both revenue and conversions
+            "Clicks": [5, 5, 10],
+            "Impressions": [100, 100, 200],
+        }
+    )
+    metrics = extract_metrics_from_table(df)
+    assert metrics["spend"] == 150.0
+    assert metrics["revenue"] == metrics["conversions"] == 60.0
+    assert metrics["ctr"] == pytest.approx(0.05)
+    assert metrics["cpa"] == pytest.approx(2.5)
+    assert metrics["roas"] == pytest.approx(0.4)
+
+
+def test_coerce_numeric_handles_accounting_formats():
+    values = pd.Series(["$1,200", "(300)", "12%", " 7 ", "abc", None, 4, 2.5], dtype=object)
+    out = coerce_numeric(values).tolist()
+    assert out[:4] == [1200.0, -300.0, 12.0, 7.0]
+    assert np.isnan(out[4]) and np.isnan(out[5])
+    assert out[6:] == [4.0, 2.5]
+
+
+def test_label_index_lookup_order():
+    df = pd.DataFrame(
+        {
+            "Line item": ["Revenue", "Cost of sales", "Gross profit", "Net income", "Profit note"],
+            "2023": ["1,000", "(400)", "", None, "see below"],
+            "2022": ["900", "(350)", "550", "200", "x"],
+        }
+    )
+    index = LabelIndex(df)
+    assert index.find_value(("revenue",)) == 1000.0
+    assert index.find_value(("cost of",)) == -400.0
+    # Falls through to later columns, and skips matching rows with no numbers
+    assert index.find_value(("gross profit",)) == 550.0
+    assert index.find_value(("profit note", "net income")) == 200.0
+    assert index.find_value(("equity",)) is None
+    assert LabelIndex(pd.DataFrame()).find_value(("revenue",)) is None
+
+    summary = FinancialStatementDetector().parse_financial_statement(df, "income_statement")
+    assert summary["revenue"] == 1000.0
+    assert summary["gross_profit"] == 550.0
@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.evidence_store import ROWS_REF_KEY, EvidencePayloadStore
+from app.ingestion.csv_processor import process_csv
+from app.ingestion.xlsx_processor import process_xlsx
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setenv("TABULAR_CHUNK_ROWS", "4")
+
+
+def _campaigns(n):
+    return pd.DataFrame(
+        {
+            "Campaign": [f"c{i}" for i in range(n)],
+            "Spend": [float(i) if i % 5 else None for i in range(n)],
+            "Clicks": list(range(n)),
+            "Impressions": [100] * n,
+            # Numeric in the first chunks only; a whole-file read makes it text
+            "Click notes": [str(i) for i in range(n - 1)] + ["pending"],
+        }
+    )
+
+
+def test_chunked_csv_matches_whole_file_read(tmp_path, small_chunks):
+    path = tmp_path / "campaigns.csv"
+    _campaigns(23).to_csv(path, index=False)
+    df = pd.read_csv(path)
+
+    facts, evidence = process_csv(path, "2024-W01")
+
+    metrics = facts[0]["metrics"]
+    assert metrics["spend"] == pytest.approx(df["Spend"].sum())
+    assert metrics["clicks"] == df["Clicks"].sum()
+    assert metrics["ctr"] == pytest.approx(df["Clicks"].sum() / df["Impressions"].sum())
+    assert len(evidence[0]["full_data"]) == 23
+
+    stable = tmp_path / "stable.csv"
+    df.drop(columns=["Click notes"]).to_csv(stable, index=False)
+    assert process_csv(stable, "2024-W01")[1][0]["preview"] == pd.read_csv(stable).head(10).to_string()
+
+
+def test_large_csv_streams_rows_to_payload_store(tmp_path, small_chunks):
+    path = tmp_path / "campaigns.csv"
+    _campaigns(23).to_csv(path, index=False)
+    store = EvidencePayloadStore(tmp_path / "evidence", min_rows=10, format="jsonl")
+
+    _, evidence = process_csv(path, "2024-W01", store)
+
+    full_data = evidence[0]["full_data"]
+    assert full_data[ROWS_REF_KEY]["row_count"] == 23
+    assert full_data["columns"] == ["Campaign", "Spend", "Clicks", "Impressions", "Click notes"]
+    assert [r["Campaign"] for r in store.read_rows(full_data, offset=20)] == ["c20", "c21", "c22"]
+
+    # Small files stay inline
+    small = tmp_path / "small.csv"
+    _campaigns(5).to_csv(small, index=False)
+    assert isinstance(process_csv(small, "2024-W01", store)[1][0]["full_data"], list)
+
+
+def test_read_only_xlsx_matches_read_excel(tmp_path, small_chunks):
+    path = tmp_path / "book.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        _campaigns(11).drop(columns=["Click notes"]).to_excel(writer, sheet_name="Paid", index=False)
+        pd.DataFrame({"Lead": [1, 2], "Lead ": [3, None]}).to_excel(writer, sheet_name="Leads", index=False)
+        pd.DataFrame({"empty": []}).to_excel(writer, sheet_name="Blank", index=False)
+    store = EvidencePayloadStore(tmp_path / "evidence", min_rows=8, format="jsonl")
+
+    facts, evidence = process_xlsx(path, "2024-W01", store)
+
+    by_sheet = {ev["locator"].split("#")[1]: ev for ev in evidence}
+    assert list(by_sheet) == ["Paid", "Leads", "Blank"]
+    for sheet, ev in by_sheet.items():
+        assert ev["preview"] == pd.read_excel(path, sheet_name=sheet).head(10).to_string()
+    assert store.row_count(by_sheet["Paid"]["full_data"]) == 11
+    assert by_sheet["Leads"]["full_data"][1]["Lead"] == 2
+    assert {f["entity"]: f["metrics"] for f in facts} == {
+        "Paid": {"spend": 40.0},
+        "Leads": {"conversions": 6.0},
+    }
@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.task_store import TaskStore
+
+
+def test_task_state_survives_reopen(tmp_path):
+    path = tmp_path / "tasks.sqlite3"
+    store = TaskStore(path)
+    store.create("t1", filename="report.pdf", artifact_id="a1")
+    store.update("t1", status="running")
+    store.set_progress("t1", pages_done=4, pages_total=10, stage="convert", stage_seconds={"convert": 1.5})
+    store.set_progress("t1", stage="store", stage_seconds={"store": 0.25})
+    store.update("t1", status="completed", facts_count=3)
+    store.close()
+
+    # A second store on the same file (another worker, or after a restart)
+    task = TaskStore(path).get("t1")
+    assert task["status"] == "completed"
+    assert task["filename"] == "report.pdf"
+    assert task["artifact_id"] == "a1"
+    assert task["facts_count"] == 3
+    assert task["progress"] == {
+        "pages_done": 4,
+        "pages_total": 10,
+        "stage": "store",
+        "stage_timings": {"convert": 1.5, "store": 0.25},
+    }
+    assert "t1" in TaskStore(path)
+    assert TaskStore(path).update("missing", status="error") is False
+
+
+def test_list_counts_and_pagination():
+    store = TaskStore(":memory:")
+    for i in range(5):
+        store.create(f"t{i}")
+        time.sleep(0.001)
+    store.update("t0", status="error", error="boom")
+    store.update("t1", status="completed")
+    store.create("orch", kind="orchestration", record={"status": "pending"})
+
+    assert store.counts(kind="ingest") == {"queued": 3, "error": 1, "completed": 1}
+    first = store.list(kind="ingest", limit=2)
+    second = store.list(kind="ingest", limit=2, offset=2)
+    assert [t["id"] for t in first] == ["t4", "t3"]
+    assert [t["id"] for t in second] == ["t2", "t1"]
+    assert [t["id"] for t in store.list(status="error")] == ["t0"]
+    assert store.get("t0")["error"] == "boom"
+
+
+def test_compact_drops_only_old_finished_tasks():
+    store = TaskStore(":memory:", ttl_seconds=3600)
+    store.create("done")
+    store.update("done", status="completed")
+    store.create("failed")
+    store.update("failed", status="error")
+    store.create("waiting")
+
+    assert store.compact() == 0
+    assert store.compact(ttl_seconds=-1) == 2
+    assert store.get("done") is None
+    assert store.get("failed") is None
+    assert store.get("waiting")["status"] == "queued"
+
+
+def test_start_and_cancel_are_conditional():
+    store = TaskStore(":memory:")
+    store.create("cancelled")
+    assert store.cancel_queued("cancelled") is True
+    assert store.start("cancelled") is False
+    assert store.get("cancelled")["status"] == "cancelled"
+
+    store.create("running")
+    assert store.start("running") is True
+    assert store.cancel_queued("running") is False
+    assert store.get("running")["status"] == "running"
+    assert store.start("missing") is False
+
+
+def test_fail_interrupted_skips_tasks_of_live_processes(tmp_path):
+    path = tmp_path / "tasks.sqlite3"
+    store = TaskStore(path)
+    for task_id in ("restarted", "other_worker", "legacy", "ours", "done"):
+        store.create(task_id, artifact_id=f"a-{task_id}")
+    store.start("restarted")
+    store.update("done", status="completed")
+    owners = {
+        "restarted": f"{os.getpid()}:previous-boot",  # same pid, earlier process
+        "other_worker": f"{os.getppid()}:boot",  # a live process
+        "legacy": None,
+    }
+    for task_id, owner in owners.items():
+        store._conn.execute("UPDATE tasks SET owner = ? WHERE id = ?", (owner, task_id))
+
+    failed = TaskStore(path).fail_interrupted()
+
+    assert sorted(t["id"] for t in failed) == ["legacy", "restarted"]
+    assert all(t["status"] == "error" and t["error"].startswith("interrupted") for t in failed)
+    assert failed[0]["artifact_id"].startswith("a-")
+    assert store.get("other_worker")["status"] == "queued"
+    assert store.get("ours")["status"] == "queued"
+    assert store.get("done")["status"] == "completed"
+
+
+def test_orchestration_tasks_are_recovered_and_compacted(tmp_path, monkeypatch):
+    monkeypatch.setenv("TASK_STORE_PATH", str(tmp_path / "tasks.sqlite3"))
+    from app.api.routers import orchestration
+    from app.task_store import get_task_store
+
+    orchestration._put_task("stuck", {"task_id": "stuck", "status": "in_progress"})
+    orchestration._put_task("failed", {"task_id": "failed", "status": "pending"})
+    assert orchestration._update_task("failed", {"status": "failed"})
+    store = get_task_store()
+    assert store.get("stuck")["status"] == "running"
+    store._conn.execute("UPDATE tasks SET owner = NULL")
+
+    assert [t["id"] for t in store.fail_interrupted()] == ["stuck"]
+    assert orchestration._get_task("stuck")["status"] == "failed"
+    assert store.compact(ttl_seconds=-1) == 2
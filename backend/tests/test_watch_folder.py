@@ -0,0 +1,139 @@
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.ingestion.watch_folder import StabilityTracker, WatchCheckpoint, WatchFolder
+
+
+def test_tracker_debounces_each_file_independently(tmp_path):
+    first = tmp_path / "a.csv"
+    second = tmp_path / "b.csv"
+    first.write_text("x")
+    second.write_text("y")
+    tracker = StabilityTracker(debounce_seconds=1.0)
+    tracker.observe(first, now=0.0)
+    tracker.observe(second, now=0.5)
+
+    assert tracker.pop_ready(now=0.9) == []
+    assert [path for path, _ in tracker.pop_ready(now=1.2)] == [first]
+
+    # A write restarts the file's timer
+    second.write_text("still writing")
+    assert tracker.pop_ready(now=1.6) == []
+    assert [path for path, _ in tracker.pop_ready(now=2.7)] == [second]
+    assert len(tracker) == 0
+
+
+def test_tracker_skips_files_below_min_bytes(tmp_path):
+    empty = tmp_path / "empty.pdf"
+    empty.write_bytes(b"")
+    tracker = StabilityTracker(debounce_seconds=0.0, min_bytes=1)
+    tracker.observe(empty, now=0.0)
+    assert tracker.pop_ready(now=1.0) == []
+
+
+def test_bulk_drop_is_batched_and_checkpointed(tmp_path):
+    root = tmp_path / "watch"
+    root.mkdir()
+    for i in range(7):
+        (root / f"report_{i}.csv").write_text(f"spend\n{i}\n")
+    (root / "notes.txt").write_text("ignored")
+
+    batches = []
+    handled = []
+
+    def handler(path):
+        handled.append(path.name)
+        return path.name != "report_6.csv"
+
+    checkpoint_path = tmp_path / "checkpoint.sqlite3"
+    folder = WatchFolder(root, handler, {".csv"}, WatchCheckpoint(checkpoint_path), debounce_seconds=1.0, batch_size=3, workers=0)
+    original = folder._run_batch
+    folder._run_batch = lambda batch: (batches.append(len(batch)), original(batch))
+
+    assert folder.scan(now=0.0) == 7
+    assert folder.poll(now=0.5) == 0
+    assert folder.poll(now=1.0) == 7
+    assert batches == [3, 3, 1]
+    assert sorted(handled) == [f"report_{i}.csv" for i in range(7)]
+    stats = folder.stats()
+    assert stats["ingested"] == 6 and stats["failed"] == 1 and stats["checkpointed"] == 6
+    folder.checkpoint.close()
+
+    # After a restart only the failed file and a new drop are ingested
+    handled.clear()
+    (root / "late.csv").write_text("spend\n9\n")
+    restarted = WatchFolder(root, handler, {".csv"}, WatchCheckpoint(checkpoint_path), debounce_seconds=1.0, workers=0)
+    restarted.scan(now=0.0)
+    assert restarted.poll(now=1.0) == 2
+    assert sorted(handled) == ["late.csv", "report_6.csv"]
+
+
+def test_queued_files_are_checkpointed_when_ingestion_completes(tmp_path):
+    root = tmp_path / "watch"
+    root.mkdir()
+    for name in ("a.csv", "b.csv"):
+        (root / name).write_text("spend\n1\n")
+    outcomes = {}
+
+    def handler(path):
+        outcomes[f"task-{path.name}"] = None
+        return f"task-{path.name}"
+
+    checkpoint_path = tmp_path / "checkpoint.sqlite3"
+    folder = WatchFolder(
+        root, handler, {".csv"}, WatchCheckpoint(checkpoint_path), debounce_seconds=0.0, workers=0, resolve=outcomes.get
+    )
+    folder.scan(now=0.0)
+    assert folder.poll(now=0.0) == 2
+    stats = folder.stats()
+    assert stats["pending"] == 2 and stats["checkpointed"] == 0
+    folder.checkpoint.close()
+
+    # The process died before either task finished; the new one resolves the tickets
+    outcomes["task-a.csv"] = True
+    outcomes["task-b.csv"] = False
+    handled = []
+    restarted = WatchFolder(
+        root, lambda path: handled.append(path.name) or True, {".csv"}, WatchCheckpoint(checkpoint_path),
+        debounce_seconds=0.0, workers=0, resolve=outcomes.get,
+    )
+    restarted.scan(now=0.0)
+    assert restarted.poll(now=0.0) == 1
+    assert handled == ["b.csv"]
+    stats = restarted.stats()
+    assert stats["pending"] == 0 and stats["checkpointed"] == 2 and stats["failed"] == 1
+
+
+def test_failed_files_are_retried_with_backoff(tmp_path):
+    root = tmp_path / "watch"
+    root.mkdir()
+    (root / "a.csv").write_text("spend\n1\n")
+    attempts = []
+
+    def handler(path):
+        attempts.append(path.name)
+        return len(attempts) >= 3
+
+    folder = WatchFolder(
+        root, handler, {".csv"}, WatchCheckpoint(":memory:"), debounce_seconds=0.0, workers=0,
+        retry_seconds=1.0, max_retry_seconds=10.0,
+    )
+    folder.scan(now=0.0)
+    folder.poll(now=0.0)
+    assert attempts == ["a.csv"]
+
+    # First retry after 1s, the second after another 2s
+    folder.poll(now=0.5)
+    assert folder.poll(now=1.0) == 0
+    assert folder.poll(now=1.5) == 1
+    assert len(attempts) == 2
+    assert folder.poll(now=3.0) == 0
+    assert folder.poll(now=4.0) == 0
+    assert folder.poll(now=5.0) == 1
+    assert len(attempts) == 3
+    stats = folder.stats()
+    assert stats["retrying"] == 0 and stats["checkpointed"] == 1 and stats["failed"] == 2
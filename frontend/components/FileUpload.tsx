@@ -30,7 +30,7 @@ export default function FileUpload({ onUploadComplete }: FileUploadProps) {
           const res = await fetch(`${API}/tasks/${id}`);
           if (!res.ok) continue;
           const data = await res.json();
-          if (data.status === 'completed' || data.status === 'error') {
+          if (data.status === 'completed' || data.status === 'error' || data.status === 'cancelled') {
             remaining.delete(id);
             setResults(prev => prev.map(r => r.task_id === id ? { ...r, ...data } : r));
           }
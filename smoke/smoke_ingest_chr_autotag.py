@@ -11,7 +11,8 @@ def wait_for_queue(timeout=60):
         if not r.ok:
             time.sleep(1)
             continue
-        q = r.json().get("queued", 0)
+        summary = r.json()
+        q = summary.get("queued", 0) + summary.get("running", 0)
         if q == 0:
             return True
         time.sleep(1)
@@ -0,0 +1,95 @@
+"""Benchmark text metric extraction against the previous per-pattern scans.
+
+Builds a synthetic corpus of report paragraphs (a fraction of them stating
+metrics) and times, per paragraph, the two extractions ``process_pdf`` runs:
+``BusinessMetricExtractor.extract_metrics`` and ``extract_metrics_from_text``.
+The baseline is the previous code (every uncompiled pattern run with
+``re.finditer``/``re.search`` on every paragraph, separately for each call
+site); the engine scans each paragraph once and shares the hits.
+
+Usage:
+    python tools/benchmarks/bench_metric_extraction.py --paragraphs 20000 --hit-ratio 0.2
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.analysis.metric_extractor import (
+    BUSINESS_METRIC_PATTERNS,
+    MARKETING_METRIC_PATTERNS,
+    METRIC_ENGINE,
+    BusinessMetricExtractor,
+)
+from app.ingestion.pdf_processor import extract_metrics_from_text
+
+WORDS = (
+    "the company reported results across all segments while operating costs remained stable "
+    "and management expects continued demand in the coming quarters despite currency headwinds"
+).split()
+METRIC_SENTENCES = (
+    "Revenue reached ${n}M with {p}% growth and a {p}% margin.",
+    "Sales: ${n},200 and net income: {n}K for the period.",
+    "ROAS: 3.{p}, Spend: ${n},000, Clicks: {n}5, CTR: 1.{p}%.",
+)
+
+
+def corpus(paragraphs: int, hit_ratio: float, words: int) -> list:
+    rng = random.Random(0)
+    texts = []
+    for i in range(paragraphs):
+        body = rng.choices(WORDS, k=words)
+        if rng.random() < hit_ratio:
+            sentence = rng.choice(METRIC_SENTENCES).format(n=i % 97 + 1, p=i % 9 + 1)
+            body.insert(rng.randrange(len(body)), sentence)
+        texts.append(" ".join(body))
+    return texts
+
+
+def baseline(texts: list) -> int:
+    hits = 0
+    for text in texts:
+        for patterns in BUSINESS_METRIC_PATTERNS.values():
+            for pattern in patterns:
+                hits += sum(1 for _ in re.finditer(pattern, text, re.IGNORECASE))
+        for patterns in MARKETING_METRIC_PATTERNS.values():
+            hits += sum(1 for pattern in patterns if re.search(pattern, text, re.IGNORECASE))
+    return hits
+
+
+def engine(texts: list) -> int:
+    extractor = BusinessMetricExtractor()
+    hits = 0
+    for text in texts:
+        matches = METRIC_ENGINE.scan(text)
+        hits += len(extractor.extract_metrics(text, matches=matches))
+        hits += len(extract_metrics_from_text(text, matches))
+    return hits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Text metric extraction: per-pattern scans vs shared engine")
+    parser.add_argument("--paragraphs", type=int, default=20000, help="Paragraphs in the corpus")
+    parser.add_argument("--hit-ratio", type=float, default=0.2, help="Fraction of paragraphs stating metrics")
+    parser.add_argument("--words", type=int, default=80, help="Filler words per paragraph")
+    args = parser.parse_args()
+
+    texts = corpus(args.paragraphs, args.hit_ratio, args.words)
+    size_mb = sum(len(t) for t in texts) / 1e6
+    print(f"{'extractor':<10}{'hits':>8}{'seconds':>10}{'MB/s':>8}")
+    for label, fn in (("baseline", baseline), ("engine", engine)):
+        t0 = time.perf_counter()
+        hits = fn(texts)
+        elapsed = time.perf_counter() - t0
+        print(f"{label:<10}{hits:>8}{elapsed:>10.2f}{size_mb / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark per-document Docling conversion latency, cold vs. warm converter.
+
+Cold: a new DocumentConverter is built for every document, so layout and
+table models are loaded each time (the behaviour before converter pooling).
+Warm: documents are converted through the shared converter pool after a
+single warm-up, as ``process_pdf`` does now.
+
+Usage:
+    python tools/benchmarks/bench_pdf_converter.py samples/financials/financial_statements.pdf --repeat 3
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.ingestion.pdf_processor import CONVERTER_POOL, build_converter, converter_key_from_env
+
+
+def report(label: str, timings: list) -> None:
+    print(
+        f"{label:<8}{len(timings):>6}{statistics.mean(timings):>10.2f}"
+        f"{statistics.median(timings):>10.2f}{min(timings):>10.2f}{max(timings):>10.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cold vs. warm Docling converters")
+    parser.add_argument(
+        "pdfs",
+        nargs="*",
+        default=[str(REPO_ROOT / "samples" / "financials" / "financial_statements.pdf")],
+        help="PDF files to convert",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Conversions per PDF and mode")
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.pdfs]
+    key = converter_key_from_env()
+    print(f"options={key} documents={len(paths)} repeat={args.repeat}")
+
+    cold = []
+    for _ in range(args.repeat):
+        for path in paths:
+            t0 = time.perf_counter()
+            build_converter(key).convert(str(path))
+            cold.append(time.perf_counter() - t0)
+
+    warm_s = CONVERTER_POOL.warm(key)
+    warm = []
+    for _ in range(args.repeat):
+        for path in paths:
+            t0 = time.perf_counter()
+            with CONVERTER_POOL.checkout(key) as converter:
+                converter.convert(str(path))
+            warm.append(time.perf_counter() - t0)
+
+    print(f"one-time warm-up: {warm_s:.2f}s")
+    print(f"{'mode':<8}{'docs':>6}{'mean s':>10}{'median s':>10}{'min s':>10}{'max s':>10}")
+    report("cold", cold)
+    report("warm", warm)
+    print(f"speedup (median): {statistics.median(cold) / statistics.median(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark SearchIndex vector index modes against exact (flat) search.
+
+Builds each FAISS index type over a synthetic clustered corpus of
+normalized float32 vectors and reports build time, index size, query
+latency and recall@k relative to brute-force flat search. The numpy
+fallback (argpartition top-k) is measured as well.
+
+Usage:
+    python tools/benchmarks/bench_search_index.py --n 50000 --dim 1024 --k 10
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.search import INDEX_TYPES, _top_k, apply_search_params, build_faiss_index, faiss
+
+
+def make_corpus(n: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    """Clustered vectors resemble real embeddings better than pure noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    vecs = centers[labels] + 0.5 * rng.normal(size=(n, dim)).astype(np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    return vecs
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    hits = sum(len(set(t) & set(f[f >= 0])) for t, f in zip(truth, found))
+    return hits / truth.size
+
+
+def index_bytes(index) -> int:
+    return int(faiss.serialize_index(index).size)
+
+
+def bench_numpy(corpus: np.ndarray, queries: np.ndarray, k: int) -> None:
+    t0 = time.perf_counter()
+    for q in queries:
+        sims = corpus @ q
+        np.argsort(-sims)[:k]
+    full = (time.perf_counter() - t0) / len(queries) * 1000
+    t0 = time.perf_counter()
+    for q in queries:
+        _top_k(corpus @ q, k)
+    part = (time.perf_counter() - t0) / len(queries) * 1000
+    print(f"{'numpy argsort':<16}{'':>10}{corpus.nbytes / 2**20:>10.1f}{full:>12.3f}{1.0:>10.3f}")
+    print(f"{'numpy argpart':<16}{'':>10}{corpus.nbytes / 2**20:>10.1f}{part:>12.3f}{1.0:>10.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark SearchIndex ANN index modes")
+    parser.add_argument("--n", type=int, default=50_000, help="Corpus size")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Top-k for recall@k")
+    parser.add_argument("--clusters", type=int, default=200, help="Synthetic topic clusters")
+    parser.add_argument("--nprobe", type=int, default=8, help="IVF cells probed per query")
+    parser.add_argument("--ef-search", type=int, default=64, help="HNSW efSearch")
+    parser.add_argument("--pq-m", type=int, default=16, help="PQ sub-quantizers")
+    parser.add_argument("--types", default=",".join(INDEX_TYPES), help="Comma-separated index types")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.n, args.dim, args.clusters, args.seed)
+    queries = make_corpus(args.queries, args.dim, args.clusters, args.seed + 1)
+    truth = np.stack([_top_k(corpus @ q, args.k) for q in queries])
+
+    print(f"corpus={args.n} dim={args.dim} queries={args.queries} k={args.k}")
+    print(f"{'index':<16}{'build s':>10}{'size MiB':>10}{'query ms':>12}{'recall@k':>10}")
+    bench_numpy(corpus, queries, args.k)
+    if faiss is None:
+        print("faiss not installed; skipping FAISS index types")
+        return
+
+    for index_type in [t.strip() for t in args.types.split(",") if t.strip()]:
+        t0 = time.perf_counter()
+        index, effective = build_faiss_index(corpus, index_type, pq_m=args.pq_m)
+        build_s = time.perf_counter() - t0
+        apply_search_params(index, args.nprobe, args.ef_search)
+        t0 = time.perf_counter()
+        _, found = index.search(queries, args.k)
+        query_ms = (time.perf_counter() - t0) / len(queries) * 1000
+        label = effective if effective == index_type else f"{index_type}->{effective}"
+        print(
+            f"{label:<16}{build_s:>10.2f}{index_bytes(index) / 2**20:>10.1f}"
+            f"{query_ms:>12.3f}{recall_at_k(truth, found):>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
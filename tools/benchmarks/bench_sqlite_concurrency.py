@@ -0,0 +1,117 @@
+"""Benchmark SQLite read latency while an ingest writer is running.
+
+A writer thread bulk-inserts evidence and log rows in batches (as
+``_process_and_store`` does) while reader threads issue the API's typical
+queries. Runs once with the default SQLAlchemy engine and rollback journal
+(the behaviour before the tuned profile) and once with the tuned profile
+(WAL, pragmas, read/write engine split).
+
+Usage:
+    python tools/benchmarks/bench_sqlite_concurrency.py --batches 40 --batch-size 500 --readers 4
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlmodel import create_engine
+
+from app.database import ExtendedDatabase
+
+
+def untuned(db: ExtendedDatabase) -> ExtendedDatabase:
+    db.engine.dispose()
+    db.read_engine.dispose()
+    engine = create_engine(db.db_url, echo=False)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=DELETE")
+    db.engine = db.read_engine = engine
+    return db
+
+
+def run(db: ExtendedDatabase, batches: int, batch_size: int, readers: int) -> dict:
+    done = threading.Event()
+    latencies: list = []
+    errors: list = []
+    lock = threading.Lock()
+
+    def writer():
+        try:
+            for b in range(batches):
+                artifact_id = f"artifact-{b % 8}"
+                db.add_evidence_many([
+                    {"id": str(uuid.uuid4()), "artifact_id": artifact_id, "locator": f"p{i}",
+                     "preview": "x" * 200, "full_data": {"i": i}}
+                    for i in range(batch_size)
+                ])
+                db.add_logs([
+                    {"id": str(uuid.uuid4()), "document_id": artifact_id, "level": "INFO",
+                     "code": f"C{i % 20}", "message": f"line {i}"}
+                    for i in range(batch_size // 5)
+                ])
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(f"writer: {exc}")
+        finally:
+            done.set()
+
+    def reader(n: int):
+        while not done.is_set():
+            t0 = time.perf_counter()
+            try:
+                db.list_logs(level="INFO", code=f"C{n % 20}", document_id=f"artifact-{n % 8}")
+                db.list_tags(document_id=f"artifact-{n % 8}")
+                db.get_artifacts()
+            except Exception as exc:
+                errors.append(f"reader: {exc}")
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    writer()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "ingest_s": elapsed,
+        "reads": len(latencies),
+        "p50_ms": statistics.median(latencies) if latencies else float("nan"),
+        "p95_ms": latencies[int(len(latencies) * 0.95)] if latencies else float("nan"),
+        "max_ms": latencies[-1] if latencies else float("nan"),
+        "errors": len(errors),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite read latency under concurrent ingest")
+    parser.add_argument("--batches", type=int, default=40, help="Writer batches")
+    parser.add_argument("--batch-size", type=int, default=500, help="Evidence rows per batch")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent reader threads")
+    args = parser.parse_args()
+
+    print(f"{'profile':<10}{'ingest s':>10}{'reads':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'errors':>8}")
+    for label, prepare in (("default", untuned), ("tuned", lambda db: db)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = prepare(ExtendedDatabase(str(Path(tmp) / "bench.sqlite3")))
+            r = run(db, args.batches, args.batch_size, args.readers)
+            print(
+                f"{label:<10}{r['ingest_s']:>10.2f}{r['reads']:>8}{r['p50_ms']:>10.2f}"
+                f"{r['p95_ms']:>10.2f}{r['max_ms']:>10.2f}{r['errors']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
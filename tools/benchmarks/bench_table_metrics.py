@@ -0,0 +1,135 @@
+"""Benchmark table metric extraction against the previous per-cell code.
+
+Times ``extract_metrics_from_table`` (one ``pd.to_numeric`` per column
+instead of one per column and matching metric) and the financial statement
+parser (a ``LabelIndex`` built once per table instead of an ``iterrows``
+walk per lookup) on synthetic tables. The previous implementations are kept
+below as the baseline.
+
+Usage:
+    python tools/benchmarks/bench_table_metrics.py --rows 20000 --cols 40 --repeat 3
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = REPO_ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app.analysis.financial_statement_detector import FinancialStatementDetector
+from app.analysis.table_metrics import TABLE_METRIC_PATTERNS, add_derived_metrics, column_metric_totals
+
+STATEMENT_TERMS = [
+    ("revenue", "total revenue"),
+    ("expenses", "total expenses"),
+    ("net income", "profit"),
+    ("gross profit",),
+]
+
+
+def baseline_table_metrics(df: pd.DataFrame) -> dict:
+    metrics = {}
+    for metric, patterns in TABLE_METRIC_PATTERNS.items():
+        for col in df.columns:
+            if any(p in str(col).lower() for p in patterns):
+                total = pd.to_numeric(df[col], errors="coerce").sum()
+                if not pd.isna(total):
+                    metrics[metric] = float(total)
+    return add_derived_metrics(metrics)
+
+
+def _to_numeric(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not pd.isna(value):
+        return float(value)
+    text = str(value).strip().replace(",", "").replace("$", "")
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    if text.endswith("%"):
+        text = text[:-1]
+    try:
+        return -float(text) if negative else float(text)
+    except ValueError:
+        return None
+
+
+def baseline_find_value(df: pd.DataFrame, terms) -> float:
+    label_col = df.columns[0]
+    for _, row in df.iterrows():
+        label = str(row[label_col]).lower()
+        if any(term in label for term in terms):
+            for value in row.tolist()[1:]:
+                numeric = _to_numeric(value)
+                if numeric is not None:
+                    return numeric
+    return None
+
+
+def marketing_table(rows: int, cols: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    names = ["Spend", "Cost per lead", "Revenue", "Sales", "Clicks", "Impressions", "Views", "ROAS"]
+    data = {f"{names[i % len(names)]} {i}": rng.random(rows) * 100 for i in range(cols)}
+    data[f"{names[0]} text"] = rng.integers(0, 1000, rows).astype(str)
+    return pd.DataFrame(data)
+
+
+def statement_table(rows: int) -> pd.DataFrame:
+    labels = [f"Line item {i}" for i in range(rows)]
+    for pos, label in zip((rows // 4, rows // 2, (3 * rows) // 4, rows - 1),
+                          ("Total revenue", "Total expenses", "Gross profit", "Net income")):
+        labels[pos] = label
+    return pd.DataFrame({
+        "Item": labels,
+        "2024": [f"${i:,}" for i in range(rows)],
+        "2023": [f"({i})" for i in range(rows)],
+    })
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Table metric extraction: per-cell baseline vs vectorized")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows per synthetic table")
+    parser.add_argument("--cols", type=int, default=40, help="Numeric columns in the marketing table")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (best is reported)")
+    args = parser.parse_args()
+
+    detector = FinancialStatementDetector()
+    marketing = marketing_table(args.rows, args.cols)
+    statement = statement_table(args.rows)
+    assert baseline_table_metrics(marketing) == add_derived_metrics(column_metric_totals(marketing))
+    parsed = detector.parse_financial_statement(statement, "income_statement")
+    assert [parsed[k] for k in ("revenue", "expenses", "net_income", "gross_profit")] == [
+        baseline_find_value(statement, terms) for terms in STATEMENT_TERMS
+    ]
+
+    cases = (
+        ("table metrics", lambda: baseline_table_metrics(marketing),
+         lambda: add_derived_metrics(column_metric_totals(marketing))),
+        ("statement parse", lambda: [baseline_find_value(statement, t) for t in STATEMENT_TERMS],
+         lambda: detector.parse_financial_statement(statement, "income_statement")),
+    )
+    print(f"{'case':<18}{'baseline ms':>14}{'vectorized ms':>16}{'speedup':>10}")
+    for label, before, after in cases:
+        b = best_of(args.repeat, before)
+        a = best_of(args.repeat, after)
+        print(f"{label:<18}{b:>14.1f}{a:>16.1f}{b / a:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()